@@ -1,11 +1,29 @@
 import streamlit as st
 import pandas as pd
-import hashlib
 import json
 from datetime import datetime, timedelta
 import os
+import tempfile
+import time
 import plotly.express as px
 
+from طبقة_البيانات import إحصائيات_الذاكرة
+from الأرصدة import الرصيد_السنوي
+from الطلبات import تقديم_طلب, طابور_المعتمد, قرار_المعتمد, الحالة_بعد_الموافقة
+from الاعتماد import الحالات_المعلقة, مرحلة_المستخدم
+from المصادقة import أنواع_المستخدمين, تشفير_كلمة_المرور
+from استيراد_المستخدمين import الأعمدة_المطلوبة, الأعمدة_الاختيارية, استيراد_المستخدمين
+from الإشعارات import الحصول_على_الموزع
+from التصدير import الصيغ_المتاحة, تصدير_الطلبات
+from الرصد import (
+    حد_العمليات, حد_التشغيلات, مسار_السجل,
+    تشغيل_الصفحة, تعيين_الصفحة, ملخص_العمليات, ملخص_التشغيلات, أبطأ_التشغيلات, مسح,
+)
+from التخزين import (
+    الحصول_على_المخزن,
+    جدول_المستخدمين, جدول_أنواع_الإجازات, جدول_أرصدة_الإجازات, جدول_طلبات_الإجازة, جدول_الإشعارات,
+)
+
 # إعدادات الصفحة
 st.set_page_config(
     page_title="نظام إدارة الإجازات - المطار",
@@ -14,6 +32,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# مدة عرض رسالة الترحيب بعد تسجيل الدخول بالثواني (0 لتعطيلها)
+مهلة_ما_بعد_الدخول = float(os.environ.get('VACATION_LOGIN_DELAY', '3'))
+
+# أيام الطلبات محللة في الجداول؛ تُعرض بلا وقت
+أعمدة_الأيام = {
+    "من": st.column_config.DateColumn(format="YYYY-MM-DD"),
+    "إلى": st.column_config.DateColumn(format="YYYY-MM-DD"),
+}
+
 # CSS مخصص للعربية
 st.markdown("""
 <style>
@@ -49,22 +76,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # وظائف نظام الملفات
-def تشفير_كلمة_المرور(كلمة_المرور):
-    return hashlib.sha256(كلمة_المرور.encode()).hexdigest()
-
-def تحميل_البيانات(اسم_الملف, بيانات_افتراضية=None):
-    """تحميل البيانات من ملف CSV"""
-    try:
-        return pd.read_csv(اسم_الملف)
-    except:
-        if بيانات_افتراضية is not None:
-            return بيانات_افتراضية
-        return pd.DataFrame()
-
-def حفظ_البيانات(اسم_الملف, البيانات):
-    """حفظ البيانات في ملف CSV"""
-    البيانات.to_csv(اسم_الملف, index=False)
-
 def تهيئة_النظام():
     """تهيئة البيانات الأولية للنظام"""
     
@@ -82,16 +93,16 @@ def تهيئة_النظام():
     
     # أنواع الإجازات
     أنواع_الإجازات = pd.DataFrame([
-        {'معرف': 1, 'اسم_الإجازة': 'إجازة اعتيادية', 'الوصف': 'الإجازة الاعتيادية السنوية', 'الحالة': 'مفعل'},
-        {'معرف': 2, 'اسم_الإجازة': 'إجازة عرضة', 'الوصف': 'إجازة العرضة', 'الحالة': 'مفعل'},
-        {'معرف': 3, 'اسم_الإجازة': 'إجازة بدل راحة', 'الوصف': 'بدل الراحة', 'الحالة': 'مفعل'},
-        {'معرف': 4, 'اسم_الإجازة': 'إجازة بدل عمل', 'الوصف': 'بدل العمل', 'الحالة': 'مفعل'},
-        {'معرف': 5, 'اسم_الإجازة': 'إجازة بدون مرتب', 'الوصف': 'إجازة بدون مرتب', 'الحالة': 'مفعل'},
-        {'معرف': 6, 'اسم_الإجازة': 'إجازة مرضية', 'الوصف': 'الإجازة المرضية', 'الحالة': 'مفعل'},
-        {'معرف': 7, 'اسم_الإجازة': 'إجازة طارئة', 'الوصف': 'الإجازة الطارئة', 'الحالة': 'مفعل'},
-        {'معرف': 8, 'اسم_الإجازة': 'إجازة دراسية', 'الوصف': 'الإجازة الدراسية', 'الحالة': 'مفعل'},
-        {'معرف': 9, 'اسم_الإجازة': 'إجازة حج / عمرة', 'الوصف': 'إجازة الحج أو العمرة', 'الحالة': 'مفعل'},
-        {'معرف': 10, 'اسم_الإجازة': 'إجازة مرافقة مريض', 'الوصف': 'إجازة مرافقة المريض', 'الحالة': 'مفعل'}
+        {'معرف': 1, 'اسم_الإجازة': 'إجازة اعتيادية', 'الوصف': 'الإجازة الاعتيادية السنوية', 'الحالة': 'مفعل', 'مخصومة': 1},
+        {'معرف': 2, 'اسم_الإجازة': 'إجازة عرضة', 'الوصف': 'إجازة العرضة', 'الحالة': 'مفعل', 'مخصومة': 1},
+        {'معرف': 3, 'اسم_الإجازة': 'إجازة بدل راحة', 'الوصف': 'بدل الراحة', 'الحالة': 'مفعل', 'مخصومة': 0},
+        {'معرف': 4, 'اسم_الإجازة': 'إجازة بدل عمل', 'الوصف': 'بدل العمل', 'الحالة': 'مفعل', 'مخصومة': 0},
+        {'معرف': 5, 'اسم_الإجازة': 'إجازة بدون مرتب', 'الوصف': 'إجازة بدون مرتب', 'الحالة': 'مفعل', 'مخصومة': 0},
+        {'معرف': 6, 'اسم_الإجازة': 'إجازة مرضية', 'الوصف': 'الإجازة المرضية', 'الحالة': 'مفعل', 'مخصومة': 0},
+        {'معرف': 7, 'اسم_الإجازة': 'إجازة طارئة', 'الوصف': 'الإجازة الطارئة', 'الحالة': 'مفعل', 'مخصومة': 0},
+        {'معرف': 8, 'اسم_الإجازة': 'إجازة دراسية', 'الوصف': 'الإجازة الدراسية', 'الحالة': 'مفعل', 'مخصومة': 0},
+        {'معرف': 9, 'اسم_الإجازة': 'إجازة حج / عمرة', 'الوصف': 'إجازة الحج أو العمرة', 'الحالة': 'مفعل', 'مخصومة': 0},
+        {'معرف': 10, 'اسم_الإجازة': 'إجازة مرافقة مريض', 'الوصف': 'إجازة مرافقة المريض', 'الحالة': 'مفعل', 'مخصومة': 0}
     ])
     
     # أرصدة الإجازات
@@ -101,19 +112,22 @@ def تهيئة_النظام():
         'رصيد_السنة_الحالية': 30,
         'رصيد_العام_السابق_1': 15,
         'رصيد_العام_السابق_2': 10,
-        'السنة': 2024,
+        'السنة': datetime.now().year,
         'تاريخ_التحديث': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }])
     
     # حفظ البيانات
-    حفظ_البيانات('المستخدمين.csv', بيانات_المستخدمين)
-    حفظ_البيانات('أنواع_الإجازات.csv', أنواع_الإجازات)
-    حفظ_البيانات('أرصدة_الإجازات.csv', أرصدة_الإجازات)
-    حفظ_البيانات('طلبات_الإجازة.csv', pd.DataFrame())
-    حفظ_البيانات('الإشعارات.csv', pd.DataFrame())
+    الحصول_على_المخزن().تهيئة({
+        جدول_المستخدمين: بيانات_المستخدمين,
+        جدول_أنواع_الإجازات: أنواع_الإجازات,
+        جدول_أرصدة_الإجازات: أرصدة_الإجازات,
+        جدول_طلبات_الإجازة: pd.DataFrame(),
+        جدول_الإشعارات: pd.DataFrame(),
+    })
 
 # صفحة تسجيل الدخول
 def صفحة_تسجيل_الدخول():
+    تعيين_الصفحة("تسجيل الدخول")
     st.markdown("<h1 style='text-align: center; color: #1f77b4;'>✈️ نظام إدارة الإجازات - المطار</h1>", unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -127,24 +141,24 @@ def صفحة_تسجيل_الدخول():
             
             if زر_الدخول:
                 if اسم_المستخدم and كلمة_المرور:
-                    المستخدمين = تحميل_البيانات('المستخدمين.csv')
+                    # البحث في فهرس المستخدمين المبني مسبقاً
+                    دليل_المستخدمين = الحصول_على_المخزن().دليل_المستخدمين()
                     
-                    if not المستخدمين.empty:
-                        مستخدم = المستخدمين[
-                            (المستخدمين['اسم_المستخدم'] == اسم_المستخدم) & 
-                            (المستخدمين['كلمة_المرور'] == تشفير_كلمة_المرور(كلمة_المرور)) &
-                            (المستخدمين['الحالة'] == 'نشط')
-                        ]
+                    if دليل_المستخدمين:
+                        مستخدم = دليل_المستخدمين.get(اسم_المستخدم)
                         
-                        if not مستخدم.empty:
-                            مستخدم = مستخدم.iloc[0]
+                        if (مستخدم is not None and
+                                مستخدم['كلمة_المرور'] == تشفير_كلمة_المرور(كلمة_المرور) and
+                                مستخدم['الحالة'] == 'نشط'):
                             st.session_state.معرف_المستخدم = مستخدم['معرف']
                             st.session_state.اسم_المستخدم = مستخدم['اسم_المستخدم']
                             st.session_state.اسم_الموظف = مستخدم['اسم_الموظف']
                             st.session_state.نوع_المستخدم = مستخدم['نوع_المستخدم']
                             st.session_state.القسم = مستخدم['القسم']
-                            st.success(f"✅ مرحباً {مستخدم['اسم_الموظف']}!")
-                            time.sleep(1)
+                            # رسالة الترحيب تُعرض في اللوحة دون إيقاف الخادم
+                            st.session_state.رسالة_الترحيب = (
+                                f"✅ مرحباً {مستخدم['اسم_الموظف']}!", time.time() + مهلة_ما_بعد_الدخول
+                            )
                             st.rerun()
                         else:
                             st.error("❌ اسم المستخدم أو كلمة المرور غير صحيحة")
@@ -165,8 +179,9 @@ def لوحة_الموظف():
     st.sidebar.title(f"👤 {st.session_state.اسم_الموظف}")
     st.sidebar.markdown(f"**القسم:** {st.session_state.القسم}")
     
-    قائمة_الموظف = ["الرئيسية", "طلب إجازة جديدة", "طلباتي", "رصيد الإجازات"]
+    قائمة_الموظف = ["الرئيسية", "طلب إجازة جديدة", "طلباتي", "رصيد الإجازات", "الإشعارات"]
     اختيار = st.sidebar.selectbox("القائمة", قائمة_الموظف)
+    تعيين_الصفحة(f"موظف/{اختيار}")
     
     if اختيار == "الرئيسية":
         الرئيسية_الموظف()
@@ -176,6 +191,8 @@ def لوحة_الموظف():
         عرض_طلباتي()
     elif اختيار == "رصيد الإجازات":
         عرض_رصيد_الإجازات()
+    elif اختيار == "الإشعارات":
+        عرض_الإشعارات()
 
 def الرئيسية_الموظف():
     st.title("🏠 لوحة تحكم الموظف")
@@ -183,24 +200,15 @@ def الرئيسية_الموظف():
     # إحصائيات سريعة
     col1, col2, col3, col4 = st.columns(4)
     
-    # تحميل البيانات
-    طلبات_الإجازة = تحميل_البيانات('طلبات_الإجازة.csv', pd.DataFrame())
-    أرصدة_الإجازات = تحميل_البيانات('أرصدة_الإجازات.csv', pd.DataFrame())
-    
-    if not طلبات_الإجازة.empty:
-        طلبات_الموظف = طلبات_الإجازة[طلبات_الإجازة['معرف_الموظف'] == st.session_state.معرف_المستخدم]
-        عدد_الطلبات = len(طلبات_الموظف)
-        طلبات_معلقة = len(طلبات_الموظف[طلبات_الموظف['الحالة'] == 'قيد المراجعة'])
-    else:
-        عدد_الطلبات = 0
-        طلبات_معلقة = 0
+    # الاستعلام عن بيانات الموظف فقط
+    المخزن = الحصول_على_المخزن()
+    معرف_الموظف = st.session_state.معرف_المستخدم
+    عدد_الطلبات = المخزن.عدد_طلبات_الموظف(معرف_الموظف)
+    طلبات_معلقة = sum(المخزن.عدد_طلبات_الموظف(معرف_الموظف, الحالة) for الحالة in الحالات_المعلقة)
     
-    if not أرصدة_الإجازات.empty:
-        رصيد_الموظف = أرصدة_الإجازات[أرصدة_الإجازات['معرف_الموظف'] == st.session_state.معرف_المستخدم]
-        if not رصيد_الموظف.empty:
-            رصيد_حالي = رصيد_الموظف.iloc[0]['رصيد_السنة_الحالية']
-        else:
-            رصيد_حالي = 0
+    رصيد_الموظف = المخزن.أرصدة_الموظف(معرف_الموظف)
+    if not رصيد_الموظف.empty:
+        رصيد_حالي = رصيد_الموظف.iloc[0]['رصيد_السنة_الحالية']
     else:
         رصيد_حالي = 0
     
@@ -214,28 +222,20 @@ def الرئيسية_الموظف():
     # آخر الطلبات
     st.subheader("📋 آخر طلبات الإجازة")
     
-    if not طلبات_الإجازة.empty:
-        طلبات_الموظف = طلبات_الإجازة[طلبات_الإجازة['معرف_الموظف'] == st.session_state.معرف_المخدم].tail(5)
-        أنواع_الإجازات = تحميل_البيانات('أنواع_الإجازات.csv')
+    طلبات_الموظف = المخزن.طلبات_الموظف(معرف_الموظف, العدد=5)
+    
+    if not طلبات_الموظف.empty:
+        بيانات_الجدول = المخزن.إضافة_الأسماء(طلبات_الموظف)[
+            ['اسم_الإجازة', 'تاريخ_البدء', 'تاريخ_الانتهاء', 'عدد_الأيام', 'الحالة', 'تاريخ_الطلب']
+        ].rename(columns={
+            'اسم_الإجازة': "نوع الإجازة",
+            'تاريخ_البدء': "من",
+            'تاريخ_الانتهاء': "إلى",
+            'عدد_الأيام': "عدد الأيام",
+            'تاريخ_الطلب': "تاريخ الطلب"
+        }).reset_index(drop=True)
         
-        if not طلبات_الموظف.empty:
-            بيانات_الجدول = []
-            for _, طلب in طلبات_الموظف.iterrows():
-                نوع_الإجازة = أنواع_الإجازات[أنواع_الإجازات['معرف'] == طلب['نوع_الإجازة']]
-                اسم_الإجازة = نوع_الإجازة.iloc[0]['اسم_الإجازة'] if not نوع_الإجازة.empty else "غير معروف"
-                
-                بيانات_الجدول.append({
-                    "نوع الإجازة": اسم_الإجازة,
-                    "من": طلب['تاريخ_البدء'],
-                    "إلى": طلب['تاريخ_الانتهاء'],
-                    "عدد الأيام": طلب['عدد_الأيام'],
-                    "الحالة": طلب['الحالة'],
-                    "تاريخ الطلب": طلب['تاريخ_الطلب']
-                })
-            
-            st.dataframe(بيانات_الجدول, use_container_width=True)
-        else:
-            st.info("لا توجد طلبات إجازة حتى الآن")
+        st.dataframe(بيانات_الجدول, use_container_width=True, column_config=أعمدة_الأيام)
     else:
         st.info("لا توجد طلبات إجازة حتى الآن")
 
@@ -243,8 +243,9 @@ def طلب_إجازة_جديدة():
     st.title("📝 طلب إجازة جديدة")
     
     # تحميل البيانات
-    أنواع_الإجازات = تحميل_البيانات('أنواع_الإجازات.csv')
-    أرصدة_الإجازات = تحميل_البيانات('أرصدة_الإجازات.csv', pd.DataFrame())
+    المخزن = الحصول_على_المخزن()
+    أنواع_الإجازات = المخزن.أنواع_الإجازات()
+    رصيد_الموظف = المخزن.أرصدة_الموظف(st.session_state.معرف_المستخدم)
     
     with st.form("طلب_إجازة"):
         col1, col2 = st.columns(2)
@@ -261,18 +262,14 @@ def طلب_إجازة_جديدة():
         
         with col2:
             # عرض معلومات الرصيد
-            if not أرصدة_الإجازات.empty:
-                رصيد_الموظف = أرصدة_الإجازات[أرصدة_الإجازات['معرف_الموظف'] == st.session_state.معرف_المستخدم]
-                if not رصيد_الموظف.empty:
-                    رصيد = رصيد_الموظف.iloc[0]
-                    st.info(f"""
-                    **رصيد الإجازات المتاح:**
-                    - السنة الحالية: {رصيد['رصيد_السنة_الحالية']} يوم
-                    - العام السابق 1: {رصيد['رصيد_العام_السابق_1']} يوم
-                    - العام السابق 2: {رصيد['رصيد_العام_السابق_2']} يوم
-                    """)
-                else:
-                    st.warning("لا يوجد رصيد إجازات متاح")
+            if not رصيد_الموظف.empty:
+                رصيد = رصيد_الموظف.iloc[0]
+                st.info(f"""
+                **رصيد الإجازات المتاح:**
+                - السنة الحالية: {رصيد['رصيد_السنة_الحالية']} يوم
+                - العام السابق 1: {رصيد['رصيد_العام_السابق_1']} يوم
+                - العام السابق 2: {رصيد['رصيد_العام_السابق_2']} يوم
+                """)
             else:
                 st.warning("لا يوجد رصيد إجازات متاح")
             
@@ -280,125 +277,242 @@ def طلب_إجازة_جديدة():
         
         if st.form_submit_button("تقديم طلب الإجازة"):
             if تاريخ_البدء and تاريخ_الانتهاء:
-                if تاريخ_الانتهاء >= تاريخ_البدء:
-                    عدد_الأيام = (تاريخ_الانتهاء - تاريخ_البدء).days + 1
-                    
-                    # تحميل الطلبات الحالية
-                    طلبات_الإجازة = تحميل_البيانات('طلبات_الإجازة.csv', pd.DataFrame())
-                    
-                    # إنطلب جديد
-                    طلب_جديد = {
-                        'معرف_الموظف': st.session_state.معرف_المستخدم,
-                        'نوع_الإجازة': نوع_الإجازة,
-                        'تاريخ_البدء': تاريخ_البدء.strftime('%Y-%m-%d'),
-                        'تاريخ_الانتهاء': تاريخ_الانتهاء.strftime('%Y-%m-%d'),
-                        'عدد_الأيام': عدد_الأيام,
-                        'السبب': السبب,
-                        'الحالة': 'قيد المراجعة',
-                        'ملاحظات_المدير': '',
-                        'معرف_المدير_الموافق': None,
-                        'تاريخ_الطلب': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                    
-                    # إضافة الطلب الجديد
-                    if طلبات_الإجازة.empty:
-                        طلب_جديد['معرف'] = 1
-                        طلبات_الإجازة = pd.DataFrame([طلب_جديد])
-                    else:
-                        طلب_جديد['معرف'] = طلبات_الإجازة['معرف'].max() + 1
-                        طلبات_الإجازة = pd.concat([طلبات_الإجازة, pd.DataFrame([طلب_جديد])], ignore_index=True)
-                    
-                    # حفظ البيانات
-                    حفظ_البيانات('طلبات_الإجازة.csv', طلبات_الإجازة)
-                    
-                    st.success("✅ تم تقديم طلب الإجازة بنجاح وسيتم مراجعته قريباً")
-                else:
-                    st.error("❌ تاريخ الانتهاء يجب أن يكون بعد تاريخ البدء")
+                try:
+                    _, عدد_الأيام = تقديم_طلب(
+                        المخزن, st.session_state.معرف_المستخدم, st.session_state.القسم,
+                        نوع_الإجازة, تاريخ_البدء, تاريخ_الانتهاء, السبب,
+                    )
+                    st.success(f"✅ تم تقديم طلب الإجازة بنجاح ({عدد_الأيام} يوم عمل) وسيتم مراجعته قريباً")
+                except ValueError as خطأ:
+                    st.error(f"❌ {خطأ}")
             else:
                 st.error("❌ يرجى ملء جميع الحقول")
 
 def عرض_طلباتي():
     st.title("📋 طلبات الإجازة الخاصة بي")
     
-    طلبات_الإجازة = تحميل_البيانات('طلبات_الإجازة.csv', pd.DataFrame())
-    أنواع_الإجازات = تحميل_البيانات('أنواع_الإجازات.csv')
-    
-    if not طلبات_الإجازة.empty:
-        طلبات_الموظف = طلبات_الإجازة[طلبات_الإجازة['معرف_الموظف'] == st.session_state.معرف_المستخدم]
-        
-        if not طلبات_الموظف.empty:
-            for _, طلب in طلبات_الموظف.iterrows():
-                نوع_الإجازة = أنواع_الإجازات[أنواع_الإجازات['معرف'] == طلب['نوع_الإجازة']]
-                اسم_الإجازة = نوع_الإجازة.iloc[0]['اسم_الإجازة'] if not نوع_الإجازة.empty else "غير معروف"
+    المخزن = الحصول_على_المخزن()
+    طلبات_الموظف = المخزن.طلبات_الموظف(st.session_state.معرف_المستخدم)
+    # الطلبات المغلقة القديمة في الأرشيف السنوي ولا تُقرأ إلا عند طلبها
+    if st.checkbox("عرض الطلبات المؤرشفة"):
+        طلبات_الموظف = pd.concat(
+            [طلبات_الموظف, المخزن.طلبات_الموظف_المؤرشفة(st.session_state.معرف_المستخدم)], ignore_index=True
+        )
+    
+    if not طلبات_الموظف.empty:
+        for _, طلب in المخزن.إضافة_الأسماء(طلبات_الموظف).iterrows():
+            with st.expander(f"{طلب['اسم_الإجازة']} - {طلب['تاريخ_البدء']:%Y-%m-%d} إلى {طلب['تاريخ_الانتهاء']:%Y-%m-%d}"):
+                col1, col2, col3 = st.columns(3)
+                col1.metric("عدد الأيام", طلب['عدد_الأيام'])
+                col2.metric("الحالة", طلب['الحالة'])
+                col3.metric("تاريخ الطلب", طلب['تاريخ_الطلب'])
                 
-                with st.expander(f"{اسم_الإجازة} - {طلب['تاريخ_البدء']} إلى {طلب['تاريخ_الانتهاء']}"):
-                    col1, col2, col3 = st.columns(3)
-                    col1.metric("عدد الأيام", طلب['عدد_الأيام'])
-                    col2.metric("الحالة", طلب['الحالة'])
-                    col3.metric("تاريخ الطلب", طلب['تاريخ_الطلب'])
-                    
-                    if طلب['السبب']:
-                        st.write(f"**السبب:** {طلب['السبب']}")
-                    if طلب['ملاحظات_المدير']:
-                        st.write(f"**ملاحظات المدير:** {طلب['ملاحظات_المدير']}")
-        else:
-            st.info("لا توجد طلبات إجازة")
+                if طلب['السبب']:
+                    st.write(f"**السبب:** {طلب['السبب']}")
+                if طلب['ملاحظات_المدير']:
+                    st.write(f"**ملاحظات المدير:** {طلب['ملاحظات_المدير']}")
     else:
         st.info("لا توجد طلبات إجازة")
 
 def عرض_رصيد_الإجازات():
     st.title("💰 رصيد الإجازات")
     
-    أرصدة_الإجازات = تحميل_البيانات('أرصدة_الإجازات.csv', pd.DataFrame())
+    المخزن = الحصول_على_المخزن()
+    أرصدة_الموظف = المخزن.أرصدة_الموظف(st.session_state.معرف_المستخدم)
     
-    if not أرصدة_الإجازات.empty:
-        أرصدة_الموظف = أرصدة_الإجازات[أرصدة_الإجازات['معرف_الموظف'] == st.session_state.معرف_المستخدم]
+    if not أرصدة_الموظف.empty:
+        for _, رصيد in أرصدة_الموظف.iterrows():
+            st.subheader(f"سنة {رصيد['السنة']}")
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("رصيد السنة الحالية", رصيد['رصيد_السنة_الحالية'])
+            col2.metric("رصيد العام السابق 1", رصيد['رصيد_العام_السابق_1'])
+            col3.metric("رصيد العام السابق 2", رصيد['رصيد_العام_السابق_2'])
         
-        if not أرصدة_الموظف.empty:
-            for _, رصيد in أرصدة_الموظف.iterrows():
-                st.subheader(f"سنة {رصيد['السنة']}")
-                
-                col1, col2, col3 = st.columns(3)
-                col1.metric("رصيد السنة الحالية", رصيد['رصيد_السنة_الحالية'])
-                col2.metric("رصيد العام السابق 1", رصيد['رصيد_العام_السابق_1'])
-                col3.metric("رصيد العام السابق 2", رصيد['رصيد_العام_السابق_2'])
-        else:
-            st.warning("لا يوجد رصيد إجازات مسجل")
+        # سجل حركات الرصيد
+        سجل_الأرصدة = المخزن.سجل_أرصدة_الموظف(st.session_state.معرف_المستخدم)
+        if not سجل_الأرصدة.empty:
+            st.subheader("📜 سجل حركات الرصيد")
+            st.dataframe(سجل_الأرصدة[[
+                'التاريخ', 'العملية', 'معرف_الطلب', 'فرق_السنة_الحالية', 'فرق_العام_السابق_1', 'فرق_العام_السابق_2',
+                'الساقط', 'السنة'
+            ]].rename(columns={
+                'معرف_الطلب': "رقم الطلب",
+                'فرق_السنة_الحالية': "السنة الحالية",
+                'فرق_العام_السابق_1': "العام السابق 1",
+                'فرق_العام_السابق_2': "العام السابق 2",
+            }).iloc[::-1], use_container_width=True, hide_index=True)
     else:
         st.warning("لا يوجد رصيد إجازات مسجل")
 
+def عرض_الإشعارات():
+    st.title("🔔 الإشعارات")
+    
+    المخزن = الحصول_على_المخزن()
+    معرف_المستخدم = st.session_state.معرف_المستخدم
+    if المخزن.عدد_الإشعارات_غير_المقروءة(معرف_المستخدم):
+        if st.button("✔️ تعليم الكل كمقروء"):
+            المخزن.تعليم_الإشعارات_مقروءة(معرف_المستخدم)
+            st.rerun()
+    
+    الإشعارات = المخزن.إشعارات_المستخدم(معرف_المستخدم)
+    if الإشعارات.empty:
+        st.info("لا توجد إشعارات")
+        return
+    for الإشعار in الإشعارات.itertuples(index=False):
+        علامة = "" if الإشعار.مقروء else "🆕 "
+        st.markdown(f"{علامة}{الإشعار.الرسالة}")
+        st.caption(الإشعار.تاريخ_الإنشاء)
+
 # التطبيق الرئيسي
 def main():
     # تهيئة النظام إذا كان أول تشغيل
-    if not os.path.exists('المستخدمين.csv'):
+    if not الحصول_على_المخزن().مهيأ():
         تهيئة_النظام()
         st.success("✅ تم تهيئة النظام بنجاح!")
     
+    # تشغيل خيط الإشعارات مرة واحدة لكل عملية
+    الحصول_على_الموزع()
+    
     # التحقق من تسجيل الدخول
     if 'معرف_المستخدم' not in st.session_state:
         صفحة_تسجيل_الدخول()
     else:
+        # رسالة الترحيب بعد الدخول حتى انتهاء مهلتها
+        if 'رسالة_الترحيب' in st.session_state:
+            الرسالة, وقت_الانتهاء = st.session_state.رسالة_الترحيب
+            if time.time() < وقت_الانتهاء:
+                st.success(الرسالة)
+            else:
+                del st.session_state['رسالة_الترحيب']
+        
         # إضافة زر تسجيل الخروج في السايدبار
         with st.sidebar:
             if st.button("🚪 تسجيل الخروج"):
                 for key in list(st.session_state.keys()):
                     del st.session_state[key]
                 st.rerun()
+            غير_المقروءة = الحصول_على_المخزن().عدد_الإشعارات_غير_المقروءة(st.session_state.معرف_المستخدم)
+            if غير_المقروءة:
+                st.info(f"🔔 لديك {غير_المقروءة} إشعار غير مقروء")
         
         # توجيه حسب نوع المستخدم
         if st.session_state.نوع_المستخدم == 'موظف':
             لوحة_الموظف()
         elif st.session_state.نوع_المستخدم == 'مدير_النظام':
             لوحة_مدير_النظام()
+        elif st.session_state.نوع_المستخدم in مرحلة_المستخدم:
+            لوحة_المعتمد()
         else:
             st.warning("لوحة التحكم قيد التطوير لنوع المستخدم هذا")
 
+# لوحة مدير القسم والمسؤول الإداري: طابور مرحلتهما في قسمهما وصفحات الموظف لطلباتهما
+def لوحة_المعتمد():
+    st.sidebar.title(f"🧑‍💼 {st.session_state.نوع_المستخدم.replace('_', ' ')} - {st.session_state.اسم_الموظف}")
+    st.sidebar.markdown(f"**القسم:** {st.session_state.القسم}")
+    
+    قائمة_المعتمد = ["الرئيسية", "طابور الاعتماد", "طلب إجازة جديدة", "طلباتي", "رصيد الإجازات", "الإشعارات"]
+    اختيار = st.sidebar.selectbox("القائمة", قائمة_المعتمد)
+    تعيين_الصفحة(f"{st.session_state.نوع_المستخدم}/{اختيار}")
+    
+    if اختيار == "الرئيسية":
+        الرئيسية_المعتمد()
+    elif اختيار == "طابور الاعتماد":
+        عرض_طابور_الاعتماد()
+    elif اختيار == "طلب إجازة جديدة":
+        طلب_إجازة_جديدة()
+    elif اختيار == "طلباتي":
+        عرض_طلباتي()
+    elif اختيار == "رصيد الإجازات":
+        عرض_رصيد_الإجازات()
+    elif اختيار == "الإشعارات":
+        عرض_الإشعارات()
+
+def المعتمد_الحالي():
+    return {
+        'معرف': st.session_state.معرف_المستخدم,
+        'نوع_المستخدم': st.session_state.نوع_المستخدم,
+        'القسم': st.session_state.القسم,
+    }
+
+def الرئيسية_المعتمد():
+    st.title(f"🏢 لوحة تحكم قسم {st.session_state.القسم}")
+    
+    المخزن = الحصول_على_المخزن()
+    القسم = st.session_state.القسم
+    # عدد الطابور من فهرس القسم والمرحلة وبقية الأرقام من العدادات المجمعة
+    الطابور, في_الطابور = طابور_المعتمد(المخزن, المعتمد_الحالي(), الحد=5)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("بانتظار اعتمادي", في_الطابور)
+    with col2:
+        st.metric("موظفو القسم", المخزن.الإحصائيات()['المستخدمين']['حسب_القسم'].get(القسم, 0))
+    with col3:
+        st.metric("طلبات القسم المعلقة", sum(المخزن.عدد_طلبات_القسم(القسم, ح) for ح in الحالات_المعلقة))
+    with col4:
+        st.metric("طلبات القسم المعتمدة", المخزن.عدد_طلبات_القسم(القسم, 'معتمد'))
+    
+    st.subheader("📋 أقدم الطلبات في طابوري")
+    if الطابور.empty:
+        st.info("لا توجد طلبات بانتظار اعتمادك")
+        return
+    st.dataframe(
+        المخزن.إضافة_الأسماء(الطابور, أسماء_الموظفين=True)[
+            ['معرف', 'اسم_الموظف', 'اسم_الإجازة', 'تاريخ_البدء', 'تاريخ_الانتهاء', 'عدد_الأيام']
+        ].rename(columns={
+            'اسم_الموظف': "الموظف",
+            'اسم_الإجازة': "نوع الإجازة",
+            'تاريخ_البدء': "من",
+            'تاريخ_الانتهاء': "إلى",
+            'عدد_الأيام': "عدد الأيام"
+        }),
+        use_container_width=True,
+        hide_index=True,
+        column_config=أعمدة_الأيام,
+    )
+
+def عرض_طابور_الاعتماد():
+    st.title("📋 طابور الاعتماد")
+    
+    المخزن = الحصول_على_المخزن()
+    المعتمد = المعتمد_الحالي()
+    رسائل_القرارات()
+    
+    # الموافقة تحيل الطلب إلى المرحلة التالية التي لها معتمد في القسم أو تعتمده نهائياً
+    المرحلة = مرحلة_المستخدم[المعتمد['نوع_المستخدم']]
+    التالية = الحالة_بعد_الموافقة(المخزن, المعتمد['القسم'], المرحلة)
+    st.caption(
+        f"طلبات قسم {المعتمد['القسم']} في مرحلة «{المرحلة}»؛ "
+        + ("الموافقة تعتمدها نهائياً" if التالية == 'معتمد' else f"الموافقة تحيلها إلى «{التالية}»")
+    )
+    
+    حجم_الصفحة = st.selectbox("عدد الطلبات في الصفحة", [25, 50, 100])
+    _, الإجمالي = طابور_المعتمد(المخزن, المعتمد, الحد=0)
+    if الإجمالي == 0:
+        st.info("لا توجد طلبات بانتظار اعتمادك")
+        return
+    
+    عدد_الصفحات = (الإجمالي + حجم_الصفحة - 1) // حجم_الصفحة
+    الصفحة = st.number_input(f"الصفحة (من {عدد_الصفحات})", min_value=1, max_value=عدد_الصفحات, value=1)
+    الطابور, _ = طابور_المعتمد(المخزن, المعتمد, (الصفحة - 1) * حجم_الصفحة, حجم_الصفحة)
+    
+    st.caption(f"{الإجمالي} طلب بانتظار اعتمادك")
+    نموذج_القرارات(
+        المخزن.إضافة_الأسماء(الطابور, أسماء_الموظفين=True),
+        lambda المعرفات, الحالة, الإصدارات: قرار_المعتمد(المخزن, المعتمد, المعرفات, الحالة, الإصدارات),
+    )
+
 # لوحة مدير النظام (مبسطة)
 def لوحة_مدير_النظام():
     st.sidebar.title(f"👨‍💼 مدير النظام - {st.session_state.اسم_الموظف}")
     
-    قائمة_المدير = ["الرئيسية", "إدارة المستخدمين", "الطلبات المعلقة"]
+    قائمة_المدير = [
+        "الرئيسية", "إدارة المستخدمين", "الطلبات المعلقة", "تحليلات الغياب", "تصدير التقارير", "الإشعارات",
+        "تشخيص الأداء",
+    ]
     اختيار = st.sidebar.selectbox("القائمة", قائمة_المدير)
+    تعيين_الصفحة(f"مدير_النظام/{اختيار}")
     
     if اختيار == "الرئيسية":
         الرئيسية_مدير_النظام()
@@ -406,6 +520,14 @@ def لوحة_مدير_النظام():
         إدارة_المستخدمين()
     elif اختيار == "الطلبات المعلقة":
         الطلبات_المعلقة()
+    elif اختيار == "تحليلات الغياب":
+        تحليلات_الغياب()
+    elif اختيار == "تصدير التقارير":
+        تصدير_التقارير()
+    elif اختيار == "الإشعارات":
+        عرض_الإشعارات()
+    elif اختيار == "تشخيص الأداء":
+        تشخيص_الأداء()
 
 def الرئيسية_مدير_النظام():
     st.title("👨‍💼 لوحة تحكم مدير النظام")
@@ -413,12 +535,11 @@ def الرئيسية_مدير_النظام():
     # إحصائيات
     col1, col2, col3, col4 = st.columns(4)
     
-    المستخدمين = تحميل_البيانات('المستخدمين.csv')
-    طلبات_الإجازة = تحميل_البيانات('طلبات_الإجازة.csv', pd.DataFrame())
-    
-    عدد_الموظفين = len(المستخدمين) if not المستخدمين.empty else 0
-    طلبات_معلقة = len(طلبات_الإجازة[طلبات_الإجازة['الحالة'] == 'قيد المراجعة']) if not طلبات_الإجازة.empty else 0
-    طلبات_معتمدة = len(طلبات_الإجازة[طلبات_الإجازة['الحالة'] == 'معتمد']) if not طلبات_الإجازة.empty else 0
+    المخزن = الحصول_على_المخزن()
+    عدد_الموظفين = المخزن.عدد_المستخدمين()
+    طلبات_معلقة = sum(المخزن.عدد_الطلبات_بالحالة(الحالة) for الحالة in الحالات_المعلقة)
+    طلبات_معتمدة = المخزن.عدد_الطلبات_بالحالة('معتمد')
+    طلبات_مرفوضة = المخزن.عدد_الطلبات_بالحالة('مرفوض')
     
     with col1:
         st.metric("إجمالي الموظفين", عدد_الموظفين)
@@ -426,11 +547,26 @@ def الرئيسية_مدير_النظام():
         st.metric("طلبات قيد المراجعة", طلبات_معلقة)
     with col3:
         st.metric("طلبات معتمدة", طلبات_معتمدة)
+    with col4:
+        st.metric("طلبات مرفوضة", طلبات_مرفوضة)
+    
+    # الطلبات حسب القسم من العدادات المجمعة
+    حسب_القسم = المخزن.الإحصائيات()['حسب_القسم']
+    if حسب_القسم:
+        st.subheader("📊 الطلبات حسب القسم")
+        جدول_الأقسام = pd.DataFrame.from_dict(حسب_القسم, orient='index').fillna(0).astype(int)
+        جدول_الأقسام.index = [ق or "بدون قسم" for ق in جدول_الأقسام.index]
+        st.dataframe(جدول_الأقسام.sort_index(), use_container_width=True)
+    
+    # عدادات الذاكرة المؤقتة للجداول
+    with st.expander("ذاكرة الجداول المؤقتة"):
+        st.json(إحصائيات_الذاكرة())
 
 def إدارة_المستخدمين():
     st.title("👥 إدارة المستخدمين")
     
-    المستخدمين = تحميل_البيانات('المستخدمين.csv')
+    المخزن = الحصول_على_المخزن()
+    المستخدمين = المخزن.المستخدمين()
     
     if not المستخدمين.empty:
         st.subheader("المستخدمون الحاليون")
@@ -447,14 +583,15 @@ def إدارة_المستخدمين():
             اسم_الموظف = st.text_input("اسم الموظف")
         
         with col2:
-            نوع_المستخدم = st.selectbox("نوع المستخدم", ["موظف", "مدير", "مسؤول_إداري", "مدير_النظام"])
+            نوع_المستخدم = st.selectbox("نوع المستخدم", أنواع_المستخدمين)
             القسم = st.text_input("القسم")
         
         if st.form_submit_button("إضافة مستخدم"):
-            if اسم_المستخدم and كلمة_المرور and اسم_الموظف:
+            if اسم_المستخدم and المخزن.المستخدم(اسم_المستخدم) is not None:
+                st.error("❌ اسم المستخدم موجود مسبقاً")
+            elif اسم_المستخدم and كلمة_المرور and اسم_الموظف:
                 # إضافة المستخدم الجديد
                 مستخدم_جديد = {
-                    'معرف': len(المستخدمين) + 1,
                     'اسم_المستخدم': اسم_المستخدم,
                     'كلمة_المرور': تشفير_كلمة_المرور(كلمة_المرور),
                     'اسم_الموظف': اسم_الموظف,
@@ -464,75 +601,336 @@ def إدارة_المستخدمين():
                     'تاريخ_الإنشاء': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 }
                 
-                المستخدمين = pd.concat([المستخدمين, pd.DataFrame([مستخدم_جديد])], ignore_index=True)
-                حفظ_البيانات('المستخدمين.csv', المستخدمين)
-                
                 # إنشاء رصيد للمستخدم الجديد
-                أرصدة_الإجازات = تحميل_البيانات('أرصدة_الإجازات.csv', pd.DataFrame())
                 رصيد_جديد = {
-                    'معرف': len(أرصدة_الإجازات) + 1,
-                    'معرف_الموظف': مستخدم_جديد['معرف'],
-                    'رصيد_السنة_الحالية': 30,
+                    'رصيد_السنة_الحالية': الرصيد_السنوي,
                     'رصيد_العام_السابق_1': 0,
                     'رصيد_العام_السابق_2': 0,
-                    'السنة': 2024,
+                    'السنة': datetime.now().year,
                     'تاريخ_التحديث': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 }
                 
-                أرصدة_الإجازات = pd.concat([أرصدة_الإجازات, pd.DataFrame([رصيد_جديد])], ignore_index=True)
-                حفظ_البيانات('أرصدة_الإجازات.csv', أرصدة_الإجازات)
-                
-                st.success("✅ تم إضافة المستخدم بنجاح")
-                st.rerun()
+                try:
+                    المخزن.إضافة_مستخدم(مستخدم_جديد, رصيد_جديد)
+                except ValueError as خطأ:
+                    # أضافه مستخدم آخر بين الفحص والإضافة
+                    st.error(f"❌ {خطأ}")
+                else:
+                    st.success("✅ تم إضافة المستخدم بنجاح")
+                    st.rerun()
             else:
                 st.error("❌ يرجى ملء جميع الحقول المطلوبة")
+    
+    # استيراد مستخدمين بالجملة
+    st.subheader("استيراد مستخدمين من ملف")
+    st.caption(
+        f"الأعمدة المطلوبة: {', '.join(الأعمدة_المطلوبة)} — الاختيارية: {', '.join(الأعمدة_الاختيارية)}"
+    )
+    الملف = st.file_uploader("ملف CSV أو XLSX", type=['csv', 'xlsx'])
+    تجربة = st.checkbox("فحص الملف فقط دون إضافة")
+    if الملف is not None and st.button("استيراد"):
+        try:
+            العدد, الأخطاء = استيراد_المستخدمين(المخزن, الملف, الملف.name, تجربة=تجربة)
+        except (RuntimeError, ValueError) as خطأ:
+            st.error(f"❌ تعذرت قراءة الملف: {خطأ}")
+        else:
+            if تجربة:
+                st.info(f"سيضاف {العدد} مستخدم")
+            else:
+                st.success(f"✅ تم استيراد {العدد} مستخدم")
+            if not الأخطاء.empty:
+                st.warning(f"⚠️ رُفض {len(الأخطاء)} سطر")
+                st.dataframe(الأخطاء, use_container_width=True, hide_index=True)
+                st.download_button(
+                    "تنزيل تقرير الأخطاء", الأخطاء.to_csv(index=False).encode('utf-8-sig'),
+                    file_name="أخطاء_الاستيراد.csv", mime="text/csv"
+                )
+
+def تصدير_التقارير():
+    st.title("📤 تصدير التقارير")
+    
+    المخزن = الحصول_على_المخزن()
+    أنواع_الإجازات = المخزن.قاموس_الأسماء(جدول_أنواع_الإجازات, 'اسم_الإجازة')
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        الفترة = st.date_input("الفترة", value=[])
+    with col2:
+        القسم = st.selectbox("القسم", [None] + المخزن.الأقسام(), format_func=lambda x: "الكل" if x is None else x)
+    with col3:
+        الحالة = st.selectbox(
+            "الحالة", [None, *الحالات_المعلقة, 'معتمد', 'مرفوض'], format_func=lambda x: "الكل" if x is None else x
+        )
+    with col4:
+        نوع_الإجازة = st.selectbox(
+            "نوع الإجازة", [None] + list(أنواع_الإجازات),
+            format_func=lambda x: "الكل" if x is None else أنواع_الإجازات[x]
+        )
+    الصيغة = st.radio("الصيغة", الصيغ_المتاحة(), horizontal=True)
+    مع_الأرشيف = st.checkbox("تضمين الأرشيف", help="الطلبات المعتمدة والمرفوضة المنقولة إلى أرشيف السنوات السابقة")
+    
+    if st.button("تجهيز الملف"):
+        # الكتابة دفعة بدفعة إلى ملف مؤقت، ثم قراءته للتنزيل
+        with tempfile.TemporaryDirectory() as المجلد:
+            المسار = os.path.join(المجلد, f"طلبات_الإجازة.{الصيغة}")
+            العدد = تصدير_الطلبات(
+                المخزن, المسار, الصيغة, الحالة=الحالة, القسم=القسم, نوع_الإجازة=نوع_الإجازة, مع_الأرشيف=مع_الأرشيف,
+                من_تاريخ=الفترة[0].strftime('%Y-%m-%d') if len(الفترة) > 0 else None,
+                إلى_تاريخ=الفترة[-1].strftime('%Y-%m-%d') if len(الفترة) > 0 else None,
+            )
+            with open(المسار, 'rb') as الملف:
+                st.session_state.ملف_التصدير = (os.path.basename(المسار), الملف.read(), العدد)
+    
+    if 'ملف_التصدير' in st.session_state:
+        الاسم, البيانات, العدد = st.session_state.ملف_التصدير
+        st.success(f"✅ {العدد} طلب جاهز للتنزيل")
+        st.download_button("📥 تنزيل", البيانات, file_name=الاسم)
 
 def الطلبات_المعلقة():
     st.title("📋 الطلبات المعلقة")
     
-    طلبات_الإجازة = تحميل_البيانات('طلبات_الإجازة.csv', pd.DataFrame())
-    أنواع_الإجازات = تحميل_البيانات('أنواع_الإجازات.csv')
-    المستخدمين = تحميل_البيانات('المستخدمين.csv')
+    المخزن = الحصول_على_المخزن()
+    رسائل_القرارات()
     
-    if not طلبات_الإجازة.empty:
-        طلبات_معلقة = طلبات_الإجازة[طلبات_الإجازة['الحالة'] == 'قيد المراجعة']
-        
-        if not طلبات_معلقة.empty:
-            for _, طلب in طلبات_معلقة.iterrows():
-                نوع_الإجازة = أنواع_الإجازات[أنواع_الإجازات['معرف'] == طلب['نوع_الإجازة']]
-                اسم_الإجازة = نوع_الإجازة.iloc[0]['اسم_الإجازة'] if not نوع_الإجازة.empty else "غير معروف"
-                
-                الموظف = المستخدمين[المستخدمين['معرف'] == طلب['معرف_الموظف']]
-                اسم_الموظف = الموظف.iloc[0]['اسم_الموظف'] if not الموظف.empty else "غير معروف"
-                
-                with st.expander(f"{اسم_الموظف} - {اسم_الإجازة}"):
-                    col1, col2 = st.columns(2)
-                    col1.write(f"**الفترة:** {طلب['تاريخ_البدء']} إلى {طلب['تاريخ_الانتهاء']}")
-                    col1.write(f"**عدد الأيام:** {طلب['عدد_الأيام']}")
-                    col2.write(f"**السبب:** {طلب['السبب']}")
-                    
-                    # خيارات الموافقة أو الرفض
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button(f"✅ الموافقة", key=f"approve_{طلب['معرف']}"):
-                            # تحديث حالة الطلب
-                            طلبات_الإجازة.loc[طلبات_الإجازة['معرف'] == طلب['معرف'], 'الحالة'] = 'معتمد'
-                            طلبات_الإجازة.loc[طلبات_الإجازة['معرف'] == طلب['معرف'], 'معرف_المدير_الموافق'] = st.session_state.معرف_المستخدم
-                            حفظ_البيانات('طلبات_الإجازة.csv', طلبات_الإجازة)
-                            st.success("✅ تمت الموافقة على الطلب")
-                            st.rerun()
-                    
-                    with col2:
-                        if st.button(f"❌ الرفض", key=f"reject_{طلب['معرف']}"):
-                            طلبات_الإجازة.loc[طلبات_الإجازة['معرف'] == طلب['معرف'], 'الحالة'] = 'مرفوض'
-                            طلبات_الإجازة.loc[طلبات_الإجازة['معرف'] == طلب['معرف'], 'معرف_المدير_الموافق'] = st.session_state.معرف_المستخدم
-                            حفظ_البيانات('طلبات_الإجازة.csv', طلبات_الإجازة)
-                            st.success("✅ تم رفض الطلب")
-                            st.rerun()
-        else:
-            st.info("لا توجد طلبات معلقة")
-    else:
-        st.info("لا توجد طلبات إجازة")
+    # المرشحات
+    أنواع_الإجازات = المخزن.قاموس_الأسماء(جدول_أنواع_الإجازات, 'اسم_الإجازة')
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        القسم = st.selectbox("القسم", [None] + المخزن.الأقسام(), format_func=lambda x: "الكل" if x is None else x)
+    with col2:
+        نوع_الإجازة = st.selectbox(
+            "نوع الإجازة", [None] + list(أنواع_الإجازات),
+            format_func=lambda x: "الكل" if x is None else أنواع_الإجازات[x]
+        )
+    with col3:
+        الفترة = st.date_input("الفترة", value=[])
+    with col4:
+        حجم_الصفحة = st.selectbox("عدد الطلبات في الصفحة", [25, 50, 100])
+    with col5:
+        # مدير النظام يقرر في أي مرحلة، وموافقته تعتمد الطلب نهائياً
+        المرحلة = st.selectbox("مرحلة الاعتماد", الحالات_المعلقة)
+    
+    من_تاريخ = الفترة[0].strftime('%Y-%m-%d') if len(الفترة) > 0 else None
+    إلى_تاريخ = الفترة[-1].strftime('%Y-%m-%d') if len(الفترة) > 0 else None
+    مرشحات = dict(القسم=القسم, نوع_الإجازة=نوع_الإجازة, من_تاريخ=من_تاريخ, إلى_تاريخ=إلى_تاريخ)
+    
+    _, الإجمالي = المخزن.صفحة_الطلبات(المرحلة, **مرشحات, الحد=0)
+    if الإجمالي == 0:
+        st.info("لا توجد طلبات معلقة")
+        return
+    
+    عدد_الصفحات = (الإجمالي + حجم_الصفحة - 1) // حجم_الصفحة
+    الصفحة = st.number_input(f"الصفحة (من {عدد_الصفحات})", min_value=1, max_value=عدد_الصفحات, value=1)
+    طلبات_معلقة, _ = المخزن.صفحة_الطلبات(
+        المرحلة, **مرشحات, الإزاحة=(الصفحة - 1) * حجم_الصفحة, الحد=حجم_الصفحة
+    )
+    
+    st.caption(f"{الإجمالي} طلب مطابق")
+    نموذج_القرارات(
+        المخزن.إضافة_الأسماء(طلبات_معلقة, أسماء_الموظفين=True),
+        lambda المعرفات, الحالة, الإصدارات: المخزن.تحديث_حالة_الطلبات(
+            المعرفات, الحالة, st.session_state.معرف_المستخدم, الإصدارات
+        ),
+    )
+
+def رسائل_القرارات():
+    # رسالة آخر إجراء جماعي (تبقى بعد إعادة التشغيل)
+    if 'رسالة_الطلبات_المعلقة' in st.session_state:
+        st.success(st.session_state.pop('رسالة_الطلبات_المعلقة'))
+    if 'تحذير_الطلبات_المعلقة' in st.session_state:
+        st.warning(st.session_state.pop('تحذير_الطلبات_المعلقة'))
+
+def نموذج_القرارات(طلبات_معلقة, القرار):
+    """جدول صفحة الطلبات المعلقة مع التحديد المتعدد وأزرار الموافقة والرفض
+
+    القرار(المعرفات، الحالة، الإصدارات) ينفذ القرار ويعيد (المنفذة، المتعارضة).
+    """
+    # القرار يُبنى على الطلبات كما عُرضت في التشغيل السابق؛ إذا غيرها مدير آخر منذ ذلك لا يُطبق عليها
+    المعروضة = st.session_state.get('إصدارات_الطلبات_المعلقة', {})
+    الإصدارات = dict(zip(
+        طلبات_معلقة['معرف'].tolist(),
+        طلبات_معلقة.get('الإصدار', pd.Series(0, index=طلبات_معلقة.index)).fillna(0).astype(int).tolist(),
+    ))
+    st.session_state.إصدارات_الطلبات_المعلقة = الإصدارات
+    
+    st.dataframe(
+        طلبات_معلقة[['معرف', 'اسم_الموظف', 'اسم_الإجازة', 'تاريخ_البدء', 'تاريخ_الانتهاء', 'عدد_الأيام', 'السبب']].rename(columns={
+            'اسم_الموظف': "الموظف",
+            'اسم_الإجازة': "نوع الإجازة",
+            'تاريخ_البدء': "من",
+            'تاريخ_الانتهاء': "إلى",
+            'عدد_الأيام': "عدد الأيام"
+        }),
+        use_container_width=True,
+        hide_index=True,
+        column_config=أعمدة_الأيام,
+    )
+    
+    # التحديد المتعدد والإجراءات الجماعية
+    تسميات = {
+        طلب.معرف: f"#{طلب.معرف} - {طلب.اسم_الموظف} - {طلب.اسم_الإجازة} ({طلب.تاريخ_البدء:%Y-%m-%d} إلى {طلب.تاريخ_الانتهاء:%Y-%m-%d})"
+        for طلب in طلبات_معلقة.itertuples()
+    }
+    # يتغير المفتاح بعد كل إجراء جماعي ليبدأ التحديد من جديد
+    الجولة = st.session_state.get('جولة_الطلبات_المعلقة', 0)
+    تحديد_الكل = st.checkbox("تحديد كل طلبات الصفحة", key=f"تحديد_الكل_{الجولة}")
+    المحددة = st.multiselect(
+        "الطلبات المحددة",
+        options=list(تسميات),
+        default=list(تسميات) if تحديد_الكل else [],
+        format_func=lambda x: تسميات[x],
+        key=f"الطلبات_المحددة_{الجولة}"
+    )
+    
+    def تنفيذ_القرار(الحالة):
+        المنفذة, المتعارضة = القرار(المحددة, الحالة, {م: المعروضة.get(م, الإصدارات[م]) for م in المحددة})
+        التحذيرات = []
+        if المتعارضة:
+            التحذيرات.append(f"⚠️ {len(المتعارضة)} طلب عدّله مستخدم آخر بعد عرضه فلم يُطبق عليه القرار؛ راجعه من جديد")
+        if len(المنفذة) + len(المتعارضة) < len(المحددة):
+            التحذيرات.append(
+                f"⚠️ لم يعتمد {len(المحددة) - len(المنفذة) - len(المتعارضة)} طلب لعدم كفاية رصيد الموظف"
+            )
+        if التحذيرات:
+            st.session_state.تحذير_الطلبات_المعلقة = "\n\n".join(التحذيرات)
+        st.session_state.جولة_الطلبات_المعلقة = الجولة + 1
+        return المنفذة
+    
+    # خيارات الموافقة أو الرفض
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(f"✅ الموافقة على المحدد ({len(المحددة)})", disabled=not المحددة):
+            المعتمدة = تنفيذ_القرار('معتمد')
+            st.session_state.رسالة_الطلبات_المعلقة = f"✅ تمت الموافقة على {len(المعتمدة)} طلب"
+            st.rerun()
+    
+    with col2:
+        if st.button(f"❌ رفض المحدد ({len(المحددة)})", disabled=not المحددة):
+            المرفوضة = تنفيذ_القرار('مرفوض')
+            st.session_state.رسالة_الطلبات_المعلقة = f"✅ تم رفض {len(المرفوضة)} طلب"
+            st.rerun()
+
+def تحليلات_الغياب():
+    st.title("📈 تحليلات الغياب")
+    
+    المخزن = الحصول_على_المخزن()
+    اليوم = datetime.now().date()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        من_تاريخ = st.date_input("من تاريخ", value=اليوم.replace(month=1, day=1))
+    with col2:
+        إلى_تاريخ = st.date_input("إلى تاريخ", value=اليوم.replace(month=12, day=31))
+    with col3:
+        الأقسام = st.multiselect("الأقسام", المخزن.الأقسام())
+    
+    if من_تاريخ > إلى_تاريخ:
+        st.error("❌ تاريخ البداية بعد تاريخ النهاية")
+        return
+    
+    المجاميع = المخزن.مجاميع_الغياب(من_تاريخ, إلى_تاريخ)
+    if الأقسام:
+        المجاميع = المجاميع[المجاميع['القسم'].isin(الأقسام)]
+    if المجاميع.empty:
+        st.info("لا توجد إجازات معتمدة في هذه الفترة")
+        return
+    المجاميع = المجاميع.assign(
+        القسم=المجاميع['القسم'].replace('', "بدون قسم"),
+        اسم_الإجازة=المجاميع['نوع_الإجازة'].map(
+            المخزن.قاموس_الأسماء(جدول_أنواع_الإجازات, 'اسم_الإجازة')
+        ).fillna("غير معروف"),
+    )
+    
+    col1, col2, col3 = st.columns(3)
+    اليومي = المجاميع.groupby('اليوم')['العدد'].sum()
+    with col1:
+        st.metric("أيام الغياب المعتمدة", int(اليومي.sum()))
+    with col2:
+        st.metric("أعلى غياب في يوم", int(اليومي.max()))
+    with col3:
+        st.metric("متوسط الغياب اليومي", f"{اليومي.sum() / ((إلى_تاريخ - من_تاريخ).days + 1):.1f}")
+    
+    # خريطة حرارية: الأقسام × الأيام (أسابيع للفترات الطويلة حتى تبقى مقروءة)
+    st.subheader("🗓️ الغياب حسب القسم")
+    التجميع = 'W' if (إلى_تاريخ - من_تاريخ).days > 120 else 'D'
+    الخريطة = (
+        المجاميع.groupby(['القسم', pd.Grouper(key='اليوم', freq=التجميع)])['العدد'].sum()
+        .unstack(fill_value=0)
+    )
+    if التجميع == 'W':
+        # متوسط الغائبين في اليوم خلال الأسبوع
+        الخريطة = الخريطة / 7
+    st.plotly_chart(
+        px.imshow(
+            الخريطة, aspect='auto', color_continuous_scale='Reds',
+            labels={'x': "الأسبوع" if التجميع == 'W' else "اليوم", 'y': "القسم", 'color': "الغائبون"},
+        ),
+        use_container_width=True,
+    )
+    
+    # خريطة حرارية: أيام الأسبوع × الأسابيع
+    st.subheader("📅 الغياب حسب يوم الأسبوع")
+    التقويم = اليومي.to_frame('العدد').reset_index()
+    التقويم['الأسبوع'] = التقويم['اليوم'].dt.to_period('W').dt.start_time
+    التقويم['يوم_الأسبوع'] = التقويم['اليوم'].dt.dayofweek
+    التقويم = التقويم.pivot_table(index='يوم_الأسبوع', columns='الأسبوع', values='العدد', aggfunc='sum', fill_value=0)
+    التقويم = التقويم.reindex(range(7), fill_value=0)
+    التقويم.index = ["الإثنين", "الثلاثاء", "الأربعاء", "الخميس", "الجمعة", "السبت", "الأحد"]
+    st.plotly_chart(
+        px.imshow(
+            التقويم, aspect='auto', color_continuous_scale='Blues',
+            labels={'x': "الأسبوع", 'y': "", 'color': "الغائبون"},
+        ),
+        use_container_width=True,
+    )
+    
+    # الاتجاه الشهري حسب نوع الإجازة
+    st.subheader("📊 الاتجاه الشهري حسب نوع الإجازة")
+    الاتجاه = (
+        المجاميع.groupby([pd.Grouper(key='اليوم', freq='MS'), 'اسم_الإجازة'])['العدد'].sum()
+        .reset_index()
+    )
+    st.plotly_chart(
+        px.bar(
+            الاتجاه, x='اليوم', y='العدد', color='اسم_الإجازة',
+            labels={'اليوم': "الشهر", 'العدد': "أيام الغياب", 'اسم_الإجازة': "نوع الإجازة"},
+        ),
+        use_container_width=True,
+    )
+
+def تشخيص_الأداء():
+    st.title("🩺 تشخيص الأداء")
+    st.caption(
+        f"آخر {حد_التشغيلات} تشغيل و{حد_العمليات} عملية في هذه العملية، والأزمنة بالميلي ثانية. "
+        f"السجل الكامل بصيغة JSON: {مسار_السجل or 'معطل'}"
+    )
+    # المسح قبل القراءة حتى تظهر النتيجة في نفس التشغيل
+    if st.button("🗑️ مسح القياسات"):
+        مسح()
+    
+    التشغيلات = ملخص_التشغيلات()
+    if التشغيلات.empty:
+        st.info("لا توجد قياسات بعد")
+        return
+    st.subheader("⏱️ زمن إعادة التشغيل حسب الصفحة")
+    st.dataframe(التشغيلات.round(1), use_container_width=True)
+    
+    st.subheader("🐢 أبطأ التشغيلات الأخيرة")
+    الأبطأ = أبطأ_التشغيلات()
+    الأعمدة_الزمنية = ['الزمن', 'زمن_قراءة', 'زمن_كتابة', 'زمن_العرض']
+    الأبطأ[الأعمدة_الزمنية] = (الأبطأ[الأعمدة_الزمنية] * 1000).round(1)
+    st.dataframe(الأبطأ[[
+        'الصفحة', 'المستخدم', *الأعمدة_الزمنية, 'عدد_العمليات', 'بايتات_قراءة', 'بايتات_كتابة', 'الصفوف',
+    ]].rename(columns={
+        'الزمن': "الإجمالي", 'زمن_قراءة': "القراءة", 'زمن_كتابة': "الكتابة", 'زمن_العرض': "العرض",
+        'عدد_العمليات': "العمليات", 'بايتات_قراءة': "بايتات مقروءة", 'بايتات_كتابة': "بايتات مكتوبة",
+    }), use_container_width=True, hide_index=True)
+    
+    st.subheader("💾 عمليات القراءة والكتابة")
+    st.dataframe(ملخص_العمليات().round(2), use_container_width=True)
+    
+    with st.expander("ذاكرة الجداول المؤقتة"):
+        st.json(إحصائيات_الذاكرة())
 
 if __name__ == "__main__":
-    main()
+    # كل إعادة تشغيل للسكربت تُقاس كاملة وتُسمى بالصفحة التي عرضتها
+    with تشغيل_الصفحة(st.session_state.get('اسم_المستخدم')):
+        main()
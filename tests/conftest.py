@@ -0,0 +1,35 @@
+"""إعداد مشترك: كل اختبار في مجلد مؤقت خاص به، فملفات الجداول والعدادات والأرشيف والتقويم نسبية إليه"""
+import os
+import sys
+
+import pytest
+
+الجذر = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, الجذر)
+sys.path.insert(0, os.path.join(الجذر, 'قياس_الأداء'))
+
+import التخزين  # noqa: E402
+from التخزين import مخزن_CSV, مخزن_SQLite  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def مجلد_العمل(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # سجل الأداء لا يُكتب في الاختبارات، والمخزن المشترك يُنشأ من جديد في مجلد الاختبار
+    monkeypatch.setattr('الرصد.مسار_السجل', '')
+    monkeypatch.setattr(التخزين, '_المخزن', None)
+    return tmp_path
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def مخزن_فارغ(request):
+    """مخزن من كل خلفية دون جداول"""
+    return مخزن_CSV() if request.param == 'csv' else مخزن_SQLite('الإجازات.db')
+
+
+@pytest.fixture
+def المخزن(مخزن_فارغ):
+    """مخزن مهيأ ببيانات المولد: 40 موظفاً في أقسامه و400 طلب"""
+    مخزن_فارغ.تهيئة(توليد_البيانات(40, 400, 0))
+    return مخزن_فارغ
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import أيام_العمل
+from أيام_العمل import تقويم_العمل, حفظ_التقويم
+from التخزين import جدول_طلبات_الإجازة
+
+
+@pytest.fixture(autouse=True)
+def تقويم_الاختبار(monkeypatch):
+    monkeypatch.setattr(أيام_العمل, 'مسار_التقويم', 'التقويم.json')
+
+
+def test_العطل_وأيام_الراحة_لا_تُحتسب():
+    التقويم = تقويم_العمل(['2031-03-05'], {'العمليات': '1111111'})
+    # من الإثنين إلى الأحد: الجمعة والسبت راحة والأربعاء عطلة
+    assert التقويم.أيام('2031-03-03', '2031-03-09') == 4
+    assert التقويم.أيام('2031-03-03', '2031-03-09', 'العمليات') == 6
+    assert التقويم.أيام('2031-03-07', '2031-03-08') == 0
+
+
+def test_الحساب_المتجه_يطابق_حساب_كل_طلب():
+    التقويم = تقويم_العمل(['2031-03-05', '2031-04-01'], {'العمليات': '1111111', 'الشحن': '0111110'})
+    مولد = np.random.default_rng(0)
+    البدايات = pd.Timestamp('2031-03-01') + pd.to_timedelta(مولد.integers(0, 60, 200), 'D')
+    النهايات = البدايات + pd.to_timedelta(مولد.integers(0, 20, 200), 'D')
+    الأقسام = مولد.choice(['العمليات', 'الشحن', 'الموارد', ''], 200)
+    المتجهة = التقويم.أيام_الطلبات(pd.Series(البدايات), pd.Series(النهايات), الأقسام)
+    assert المتجهة.tolist() == [التقويم.أيام(ب, ن, ق) for ب, ن, ق in zip(البدايات, النهايات, الأقسام)]
+
+
+def test_التقويم_غير_الصالح_يُرفض_عند_الحفظ():
+    with pytest.raises(ValueError):
+        حفظ_التقويم(['2031-02-30'], {})
+    with pytest.raises(ValueError):
+        حفظ_التقويم([], {'العمليات': '11'})
+
+
+def test_تغيير_التقويم_يعيد_حساب_الطلبات_المعلقة_فقط(المخزن):
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    المعلق = الطلبات[الطلبات['الحالة'] == 'قيد المراجعة'].iloc[0]
+    المخزن.إعادة_حساب_الأيام(None)
+    قبل = المخزن.جدول(جدول_طلبات_الإجازة).set_index('معرف')
+
+    # كل يوم في فترة الطلب المعلق عطلة الآن
+    الأيام = pd.date_range(المعلق['تاريخ_البدء'], المعلق['تاريخ_الانتهاء']).strftime('%Y-%m-%d').tolist()
+    حفظ_التقويم(الأيام, {})
+    assert أيام_العمل.التقويم().أيام(الأيام[0], الأيام[-1]) == 0
+    assert المخزن.إعادة_حساب_الأيام() >= 1
+
+    بعد = المخزن.جدول(جدول_طلبات_الإجازة).set_index('معرف')
+    assert بعد.at[المعلق['معرف'], 'عدد_الأيام'] == 0
+    assert بعد.at[المعلق['معرف'], 'الإصدار'] == قبل.at[المعلق['معرف'], 'الإصدار'] + 1
+    المعتمدة = قبل.index[قبل['الحالة'] == 'معتمد']
+    assert بعد.loc[المعتمدة, 'عدد_الأيام'].tolist() == قبل.loc[المعتمدة, 'عدد_الأيام'].tolist()
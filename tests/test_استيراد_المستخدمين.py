@@ -0,0 +1,64 @@
+import io
+
+import pytest
+
+import استيراد_المستخدمين
+from المصادقة import تشفير_كلمة_المرور
+from استيراد_المستخدمين import استيراد_المستخدمين as استيراد, تشفير_متوازي
+
+الملف = '''اسم_المستخدم,كلمة_المرور,اسم_الموظف,نوع_المستخدم,القسم,رصيد_العام_السابق_1
+جديد1,سر1,موظف أول,,العمليات,5
+جديد2,سر2,,موظف,العمليات,
+جديد3,سر3,موظف ثالث,مدير_عام,العمليات,
+جديد4,سر4,موظف رابع,,العمليات,-2
+جديد1,سر5,مكرر,,العمليات,
+جديد6,سر6,موظف سادس,مدير,الشحن,
+'''
+
+
+def مصدر(النص=الملف):
+    return io.BytesIO(النص.encode('utf-8'))
+
+
+def test_الاستيراد_يضيف_السليمة_ويبلغ_عن_كل_سطر_مرفوض(المخزن):
+    الموجود = المخزن.المستخدمين()['اسم_المستخدم'].iloc[0]
+    المضافة, التقرير = استيراد(المخزن, مصدر(الملف + f'{الموجود},س,موجود,,العمليات,\n'), 'm.csv', حجم_الدفعة=2)
+
+    assert المضافة == 2
+    assert التقرير.set_index('السطر')['الخطأ'].to_dict() == {
+        3: "الحقل اسم_الموظف فارغ",
+        4: "نوع المستخدم غير معروف",
+        5: "رصيد_العام_السابق_1 ليس عدداً صحيحاً موجباً",
+        6: "اسم المستخدم مكرر في الملف (السطر 2)",
+        8: "اسم المستخدم موجود مسبقاً",
+    }
+    الأول = المخزن.المستخدم('جديد1')
+    assert الأول['كلمة_المرور'] == تشفير_كلمة_المرور('سر1') and الأول['نوع_المستخدم'] == 'موظف'
+    الرصيد = المخزن.أرصدة_الموظف(الأول['معرف']).iloc[0]
+    assert (الرصيد['رصيد_السنة_الحالية'], الرصيد['رصيد_العام_السابق_1']) == (30, 5)
+    assert المخزن.المستخدم('جديد6')['القسم'] == 'الشحن'
+
+
+def test_التجربة_تفحص_دون_كتابة(المخزن):
+    العدد = المخزن.عدد_المستخدمين()
+    المضافة, التقرير = استيراد(المخزن, مصدر(), 'm.csv', تجربة=True)
+    assert (المضافة, len(التقرير)) == (2, 4)
+    assert المخزن.عدد_المستخدمين() == العدد and المخزن.المستخدم('جديد1') is None
+
+
+def test_التشفير_المتوازي_يحفظ_الترتيب(monkeypatch):
+    monkeypatch.setattr(استيراد_المستخدمين, 'الحد_الأدنى_للتوازي', 0)
+    الكلمات = [f'كلمة{ر}' for ر in range(50)]
+    assert تشفير_متوازي(الكلمات, العمال=3) == [تشفير_كلمة_المرور(ك) for ك in الكلمات]
+
+
+def test_استيراد_xlsx(المخزن):
+    openpyxl = pytest.importorskip('openpyxl')
+    الكتاب = openpyxl.Workbook()
+    for السطر in الملف.splitlines():
+        الكتاب.active.append(السطر.split(','))
+    الملف_الثنائي = io.BytesIO()
+    الكتاب.save(الملف_الثنائي)
+    الملف_الثنائي.seek(0)
+    المضافة, التقرير = استيراد(المخزن, الملف_الثنائي, 'm.xlsx', حجم_الدفعة=4)
+    assert المضافة == 2 and التقرير['السطر'].tolist() == [3, 4, 5, 6]
@@ -0,0 +1,71 @@
+import os
+
+import pandas as pd
+
+import الأرشيف
+from التخزين import جدول_طلبات_الإجازة
+
+
+def طلب_جديد(معرف_الموظف):
+    return {
+        'معرف_الموظف': معرف_الموظف, 'نوع_الإجازة': 3, 'تاريخ_البدء': '2031-03-03', 'تاريخ_الانتهاء': '2031-03-03',
+        'عدد_الأيام': 1, 'السبب': '', 'الحالة': 'قيد المراجعة', 'ملاحظات_المدير': '', 'معرف_المدير_الموافق': None,
+        'تاريخ_الطلب': '2031-01-01 00:00:00', 'الإصدار': 0,
+    }
+
+
+def test_الأرشفة_تنقل_المغلقة_إلى_أقسام_سنواتها(المخزن):
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    القطع = الطلبات['تاريخ_البدء'].quantile(0.6).strftime('%Y-%m-%d')
+    المستحقة = الطلبات[الأرشيف.المستحقة(الطلبات, القطع)]
+
+    assert المخزن.أرشفة_الطلبات(القطع) == len(المستحقة) > 0
+    الباقية = المخزن.جدول(جدول_طلبات_الإجازة)
+    assert len(الباقية) == len(الطلبات) - len(المستحقة)
+    assert not الباقية['معرف'].isin(المستحقة['معرف']).any()
+
+    الفهرس = الأرشيف.الفهرس()
+    السنوات = المستحقة['تاريخ_البدء'].dt.year.value_counts()
+    assert {int(س): ق['العدد'] for س, ق in الفهرس.items()} == السنوات.to_dict()
+    for السنة in السنوات.index:
+        assert os.path.exists(الأرشيف.مسار_السنة(السنة))
+    المؤرشفة = الأرشيف.قراءة()
+    assert sorted(المؤرشفة['معرف']) == sorted(المستحقة['معرف'])
+    assert المخزن.أرشفة_الطلبات(القطع) == 0
+    assert المخزن.الإحصائيات() == المخزن.إعادة_بناء_الإحصائيات()
+
+
+def test_القراءة_تفتح_أقسام_الفترة_فقط_وإعادة_الإلحاق_لا_تكرر(المخزن):
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    المخزن.أرشفة_الطلبات('2100-01-01')
+    السنوات = sorted(int(س) for س in الأرشيف.الفهرس())
+    assert len(السنوات) > 1
+    الأولى = الأرشيف.قراءة(f'{السنوات[0]}-01-01', f'{السنوات[0]}-06-30')
+    assert set(الأولى['تاريخ_البدء'].dt.year) <= {السنوات[0], السنوات[0] - 1}
+
+    المؤرشفة = الأرشيف.قراءة()
+    الأرشيف.إلحاق(المؤرشفة.head(20))
+    assert len(الأرشيف.قراءة()) == len(المؤرشفة)
+    assert len(المؤرشفة) == الطلبات['الحالة'].isin(الأرشيف.الحالات_المغلقة).sum()
+
+
+def test_معرفات_الطلبات_الجديدة_لا_تعيد_المؤرشفة(المخزن):
+    المعلقة = المخزن.الطلبات_بالحالة('قيد المراجعة')['معرف'].tolist()
+    المخزن.تحديث_حالة_الطلبات(المعلقة, 'مرفوض', 1)
+    المخزن.أرشفة_الطلبات('2100-01-01')
+    assert len(المخزن.جدول(جدول_طلبات_الإجازة)) == 0
+    معرف = المخزن.إضافة_طلب(طلب_جديد(3))
+    assert معرف == الأرشيف.أكبر_معرف() + 1
+
+
+def test_التصدير_والمجاميع_تشمل_الأرشيف(المخزن):
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    المعتمدة = الطلبات[الطلبات['الحالة'] == 'معتمد']
+    من, إلى = المعتمدة['تاريخ_البدء'].min(), المعتمدة['تاريخ_الانتهاء'].max()
+    قبل = المخزن.مجاميع_الغياب(f'{من:%Y-%m-%d}', f'{إلى:%Y-%m-%d}')['العدد'].sum()
+
+    المخزن.أرشفة_الطلبات(الطلبات['تاريخ_البدء'].median().strftime('%Y-%m-%d'))
+    assert المخزن.مجاميع_الغياب(f'{من:%Y-%m-%d}', f'{إلى:%Y-%m-%d}')['العدد'].sum() == قبل
+    الدفعات = pd.concat(المخزن.دفعات_الطلبات('معتمد', حجم_الدفعة=25, مع_الأرشيف=True))
+    assert sorted(الدفعات['معرف']) == sorted(المعتمدة['معرف'])
+    assert len(pd.concat(المخزن.دفعات_الطلبات('معتمد', حجم_الدفعة=25))) < len(المعتمدة)
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from الأرصدة import الأنواع_المخصومة, ترتيب_الخصم, ترحيل_السنة, توزيع_الخصم
+from التخزين import جدول_أنواع_الإجازات, جدول_سجل_الأرصدة
+from توليد_البيانات import توليد_البيانات
+
+
+def طلب(معرف_الموظف, نوع_الإجازة, الأيام):
+    return {
+        'معرف_الموظف': معرف_الموظف, 'نوع_الإجازة': نوع_الإجازة, 'تاريخ_البدء': '2031-03-03',
+        'تاريخ_الانتهاء': '2031-03-03', 'عدد_الأيام': الأيام, 'السبب': '', 'الحالة': 'قيد المراجعة',
+        'ملاحظات_المدير': '', 'معرف_المدير_الموافق': None, 'تاريخ_الطلب': '2031-01-01 00:00:00', 'الإصدار': 0,
+    }
+
+
+def مجموع_الرصيد(المخزن, معرف_الموظف):
+    return int(المخزن.أرصدة_الموظف(معرف_الموظف)[ترتيب_الخصم].sum(axis=1).iloc[0])
+
+
+def test_الأنواع_المخصومة_من_العمود_والفراغ_للافتراضي():
+    الأنواع = pd.DataFrame({'معرف': [1, 2, 3, 4]})
+    assert الأنواع_المخصومة(الأنواع) == {1, 2}
+    الأنواع['مخصومة'] = pd.array([None, 0, None, 1], dtype='Int8')
+    assert الأنواع_المخصومة(الأنواع) == {1, 4}
+
+
+def test_الخصم_حسب_عمود_مخصومة_والاسترداد_عند_الرفض(مخزن_فارغ):
+    الجداول = توليد_البيانات(20, 0, 0)
+    # العرضة لم تعد تخصم، وبدل الراحة صار يخصم
+    الجداول[جدول_أنواع_الإجازات]['مخصومة'] = [1, 0, 1] + [0] * (len(الجداول[جدول_أنواع_الإجازات]) - 3)
+    مخزن_فارغ.تهيئة(الجداول)
+    الرصيد = مجموع_الرصيد(مخزن_فارغ, 3)
+
+    مخصوم = مخزن_فارغ.إضافة_طلب(طلب(3, 3, 4))
+    غير_مخصوم = مخزن_فارغ.إضافة_طلب(طلب(3, 2, 5))
+    assert مخزن_فارغ.تحديث_حالة_الطلبات([مخصوم, غير_مخصوم], 'معتمد', 1)[0]
+    assert مجموع_الرصيد(مخزن_فارغ, 3) == الرصيد - 4
+    السجل = مخزن_فارغ.جدول(جدول_سجل_الأرصدة)
+    assert السجل['معرف_الطلب'].dropna().astype(int).tolist() == [مخصوم]
+
+    مخزن_فارغ.تحديث_حالة_الطلب(مخصوم, 'مرفوض', 1)
+    assert مجموع_الرصيد(مخزن_فارغ, 3) == الرصيد
+    assert مخزن_فارغ.جدول(جدول_سجل_الأرصدة)['العملية'].tolist() == ['خصم', 'استرداد']
+
+
+def test_الخصم_من_الأقدم_أولاً_ويرفض_ما_يتجاوز_الرصيد():
+    الرصيد = {'رصيد_العام_السابق_2': 2, 'رصيد_العام_السابق_1': 3, 'رصيد_السنة_الحالية': 30}
+    assert توزيع_الخصم(الرصيد, 4) == {'رصيد_العام_السابق_2': -2, 'رصيد_العام_السابق_1': -2, 'رصيد_السنة_الحالية': 0}
+    assert توزيع_الخصم(الرصيد, 36) is None
+
+
+def test_الترحيل_يزيح_الخانات_بعدد_السنوات_المنقضية():
+    الأرصدة = pd.DataFrame({
+        'معرف_الموظف': [1, 2, 3],
+        'رصيد_السنة_الحالية': [20, 20, 20],
+        'رصيد_العام_السابق_1': [5, 5, 5],
+        'رصيد_العام_السابق_2': [2, 2, 2],
+        'السنة': [2030, 2029, 2031],
+        'تاريخ_التحديث': '',
+    })
+    الناتج, القيود = ترحيل_السنة(الأرصدة, 2031, الرصيد_السنوي=30)
+    assert الناتج['رصيد_السنة_الحالية'].tolist() == [30, 30, 20]
+    assert الناتج['رصيد_العام_السابق_1'].tolist() == [20, 30, 5]
+    assert الناتج['رصيد_العام_السابق_2'].tolist() == [5, 20, 2]
+    assert القيود['معرف_الموظف'].tolist() == [1, 2]
+    assert القيود['الساقط'].tolist() == [2, 7]
@@ -0,0 +1,53 @@
+import os
+
+from الإشعارات import موزع_الإشعارات, ملف_الإشعارات_المعلقة
+
+
+class مخزن_متعثر:
+    """يفشل في أول «الفشل» كتابة ثم يحفظ الإشعارات في قائمة"""
+
+    def __init__(self, الفشل):
+        self.الفشل = الفشل
+        self.المكتوبة = []
+
+    def إضافة_إشعارات(self, الإشعارات):
+        if self.الفشل:
+            self.الفشل -= 1
+            raise OSError("القرص ممتلئ")
+        self.المكتوبة.extend(الإشعارات)
+
+
+def موزع(المخزن):
+    return موزع_الإشعارات(المخزن, المهلة=0.01, المحاولات=3, مهلة_الإعادة=0.01)
+
+
+def test_الموزع_يكتب_الإشعارات_على_دفعات(المخزن):
+    الموزع = موزع(المخزن)
+    for ر in range(20):
+        الموزع.إرسال(1, f'رسالة {ر}')
+    الموزع.انتظار()
+    assert len(المخزن.إشعارات_المستخدم(1, 100)) == 20
+    assert المخزن.عدد_الإشعارات_غير_المقروءة(1) == 20
+
+
+def test_الدفعة_الفاشلة_تُعاد_إلى_الطابور(caplog):
+    المخزن = مخزن_متعثر(2)
+    الموزع = موزع(المخزن)
+    الموزع.إرسال(7, 'مرحبا')
+    الموزع.انتظار()
+    assert المخزن.المكتوبة == [{'معرف_المستخدم': 7, 'الرسالة': 'مرحبا'}]
+    assert 'تعذرت كتابة' in caplog.text
+    assert not os.path.exists(ملف_الإشعارات_المعلقة)
+
+
+def test_الأحداث_المستنفدة_تُحفظ_ويعيدها_الموزع_التالي():
+    موزع_أول = موزع(مخزن_متعثر(10))
+    موزع_أول.إرسال(7, 'أ')
+    موزع_أول.إرسال(8, 'ب')
+    موزع_أول.انتظار()
+    assert os.path.exists(ملف_الإشعارات_المعلقة)
+
+    المخزن = مخزن_متعثر(0)
+    موزع(المخزن).انتظار()
+    assert sorted(ش['الرسالة'] for ش in المخزن.المكتوبة) == ['أ', 'ب']
+    assert [م for م in os.listdir('.') if م.startswith(ملف_الإشعارات_المعلقة)] == [f'{ملف_الإشعارات_المعلقة}.lock']
@@ -0,0 +1,79 @@
+from التخزين import جدول_المستخدمين, جدول_طلبات_الإجازة
+from الاعتماد import الحالات_المعلقة
+from الطلبات import طابور_المعتمد, قرار_المعتمد
+from توليد_البيانات import توليد_البيانات
+
+
+def معتمد_القسم(المخزن, القسم, نوع_المستخدم):
+    المستخدمين = المخزن.المستخدمين()
+    return المستخدمين[(المستخدمين['القسم'] == القسم)
+                      & (المستخدمين['نوع_المستخدم'] == نوع_المستخدم)].iloc[0].to_dict()
+
+
+def طلب_معلق(معرف_الموظف):
+    return {
+        'معرف_الموظف': معرف_الموظف, 'نوع_الإجازة': 3, 'تاريخ_البدء': '2031-03-03',
+        'تاريخ_الانتهاء': '2031-03-03', 'عدد_الأيام': 1, 'السبب': '', 'الحالة': 'قيد المراجعة',
+        'ملاحظات_المدير': '', 'معرف_المدير_الموافق': None, 'تاريخ_الطلب': '2031-01-01 00:00:00', 'الإصدار': 0,
+    }
+
+
+def test_الطوابير_تطابق_تصفية_الجدول_لكل_قسم_ومرحلة(المخزن):
+    # نقل نصف معلقات كل قسم إلى مرحلة المسؤول الإداري حتى يكون للمرحلتين طوابير
+    for القسم in المخزن.الأقسام():
+        المدير = معتمد_القسم(المخزن, القسم, 'مدير')
+        الطابور, _ = طابور_المعتمد(المخزن, المدير, الحد=1000)
+        قرار_المعتمد(المخزن, المدير, الطابور['معرف'].tolist()[::2], 'معتمد')
+
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    الأقسام = المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+    الطلبات['القسم'] = الطلبات['معرف_الموظف'].astype(int).map(الأقسام)
+    assert (الطلبات['الحالة'] == الحالات_المعلقة[1]).any()
+    for القسم in المخزن.الأقسام():
+        المدير = معتمد_القسم(المخزن, القسم, 'مدير')
+        for الحالة in الحالات_المعلقة:
+            المتوقعة = الطلبات[(الطلبات['القسم'] == القسم) & (الطلبات['الحالة'] == الحالة)
+                               & (الطلبات['معرف_الموظف'] != المدير['معرف'])]['معرف'].sort_values().tolist()
+            الطابور, الإجمالي = المخزن.طابور_الاعتماد(القسم, الحالة, 0, 1000, المدير['معرف'])
+            assert الإجمالي == len(المتوقعة) and الطابور['معرف'].tolist() == المتوقعة
+            الصفحة, _ = المخزن.طابور_الاعتماد(القسم, الحالة, 1, 2, المدير['معرف'])
+            assert الصفحة['معرف'].tolist() == المتوقعة[1:3]
+
+
+def test_الموافقة_تمر_بالمراحل_والرفض_نهائي(المخزن):
+    القسم = المخزن.المستخدمين()['القسم'].value_counts().index[0]
+    المدير = معتمد_القسم(المخزن, القسم, 'مدير')
+    المسؤول = معتمد_القسم(المخزن, القسم, 'مسؤول_إداري')
+    الموظف = معتمد_القسم(المخزن, القسم, 'موظف')
+    أ = المخزن.إضافة_طلب(طلب_معلق(الموظف['معرف']))
+    ب = المخزن.إضافة_طلب(طلب_معلق(الموظف['معرف']))
+    assert المخزن.معرفات_المعتمدين(الموظف['معرف']) == [المدير['معرف']]
+
+    assert قرار_المعتمد(المخزن, المدير, [أ], 'معتمد') == ([أ], [])
+    assert قرار_المعتمد(المخزن, المدير, [ب], 'مرفوض') == ([ب], [])
+    # ما خرج من طابور المدير يُعد متعارضاً إذا قرر فيه ثانية
+    assert قرار_المعتمد(المخزن, المدير, [أ, ب], 'معتمد') == ([], [أ, ب])
+    الطابور, _ = طابور_المعتمد(المخزن, المسؤول, الحد=1000)
+    assert أ in الطابور['معرف'].tolist() and ب not in الطابور['معرف'].tolist()
+
+    assert قرار_المعتمد(المخزن, المسؤول, [أ], 'معتمد') == ([أ], [])
+    الحالات = المخزن.جدول(جدول_طلبات_الإجازة).set_index('معرف')['الحالة']
+    assert (الحالات[أ], الحالات[ب]) == ('معتمد', 'مرفوض')
+
+
+def test_القسم_دون_مسؤول_إداري_يعتمد_بموافقة_المدير_ومدير_النظام_بديل(مخزن_فارغ):
+    الجداول = توليد_البيانات(40, 0, 0)
+    المستخدمين = الجداول[جدول_المستخدمين]
+    المستخدمين.loc[المستخدمين['نوع_المستخدم'] == 'مسؤول_إداري', 'نوع_المستخدم'] = 'موظف'
+    المستخدمين.loc[المستخدمين['معرف'] == 40, ['نوع_المستخدم', 'القسم']] = ['مدير_النظام', 'الإدارة العامة']
+    مخزن_فارغ.تهيئة(الجداول)
+    القسم = المستخدمين['القسم'].value_counts().index[0]
+    المدير = معتمد_القسم(مخزن_فارغ, القسم, 'مدير')
+    الموظف = معتمد_القسم(مخزن_فارغ, القسم, 'موظف')
+
+    المعرف = مخزن_فارغ.إضافة_طلب(طلب_معلق(الموظف['معرف']))
+    assert قرار_المعتمد(مخزن_فارغ, المدير, [المعرف], 'معتمد') == ([المعرف], [])
+    assert مخزن_فارغ.جدول(جدول_طلبات_الإجازة).set_index('معرف').at[المعرف, 'الحالة'] == 'معتمد'
+    # طلب المدير نفسه لا يراجعه هو، بل مدير النظام
+    assert مخزن_فارغ.معرفات_المعتمدين(المدير['معرف']) == [40]
+    assert مخزن_فارغ.معرفات_المعتمدين(الموظف['معرف'], 'بانتظار المسؤول الإداري') == [40]
@@ -0,0 +1,81 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from التحليلات import مجاميع_الغياب, تجميع_الغياب
+from التخزين import جدول_المستخدمين, جدول_طلبات_الإجازة
+
+
+def طلبات_عشوائية(العدد, البذرة=0):
+    مولد = np.random.default_rng(البذرة)
+    البدايات = pd.Timestamp('2031-01-01') + pd.to_timedelta(مولد.integers(0, 120, العدد), 'D')
+    return pd.DataFrame({
+        'معرف_الموظف': مولد.integers(1, 20, العدد),
+        'نوع_الإجازة': مولد.integers(1, 4, العدد),
+        'تاريخ_البدء': البدايات,
+        'تاريخ_الانتهاء': البدايات + pd.to_timedelta(مولد.integers(0, 20, العدد), 'D'),
+    })
+
+
+def بالحلقة(الطلبات, الأقسام, البداية, النهاية):
+    العداد = Counter()
+    for الطلب in الطلبات.itertuples(index=False):
+        for اليوم in pd.date_range(max(الطلب.تاريخ_البدء, البداية), min(الطلب.تاريخ_الانتهاء, النهاية)):
+            العداد[(اليوم, الأقسام.get(الطلب.معرف_الموظف, ''), الطلب.نوع_الإجازة)] += 1
+    return العداد
+
+
+def كعداد(المجاميع):
+    return Counter({
+        (pd.Timestamp(ص.اليوم), ص.القسم, ص.نوع_الإجازة): ص.العدد for ص in المجاميع.itertuples(index=False)
+    })
+
+
+الأقسام = {م: f'قسم {م % 3}' for م in range(1, 15)}
+
+
+def test_التوسيع_المتجه_يطابق_الحلقة():
+    الطلبات = طلبات_عشوائية(200)
+    البداية, النهاية = pd.Timestamp('2031-02-01'), pd.Timestamp('2031-03-31')
+    assert كعداد(تجميع_الغياب(الطلبات, الأقسام, البداية, النهاية)) == بالحلقة(الطلبات, الأقسام, البداية, النهاية)
+
+
+def test_المجاميع_الشهرية_تحسب_الأشهر_الناقصة_أو_المبطلة_فقط():
+    الطلبات = طلبات_عشوائية(200)
+    الاستدعاءات = []
+
+    def المعتمدة(من, إلى):
+        الاستدعاءات.append((من, إلى))
+        return الطلبات[(الطلبات['تاريخ_الانتهاء'] >= من) & (الطلبات['تاريخ_البدء'] <= إلى)]
+
+    المجاميع = مجاميع_الغياب()
+    الأولى = المجاميع.الفترة(المعتمدة, الأقسام, '2031-01-10', '2031-03-20')
+    assert الاستدعاءات == [('2031-01-01', '2031-03-31')]
+    assert كعداد(الأولى) == بالحلقة(الطلبات, الأقسام, pd.Timestamp('2031-01-10'), pd.Timestamp('2031-03-20'))
+
+    المجاميع.الفترة(المعتمدة, الأقسام, '2031-02-01', '2031-02-28')
+    assert len(الاستدعاءات) == 1
+    المجاميع.إبطال([{'تاريخ_البدء': '2031-02-27', 'تاريخ_الانتهاء': '2031-03-02'}])
+    المجاميع.الفترة(المعتمدة, الأقسام, '2031-01-01', '2031-03-31')
+    assert الاستدعاءات[1:] == [('2031-02-01', '2031-03-31')]
+
+
+def test_مجاميع_المخزن_تتبع_الاعتماد(المخزن):
+    المعلق = المخزن.الطلبات_بالحالة('قيد المراجعة').iloc[0]
+    من, إلى = f"{المعلق['تاريخ_البدء']:%Y-%m-%d}", f"{المعلق['تاريخ_الانتهاء']:%Y-%m-%d}"
+    القسم = المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم')[المعلق['معرف_الموظف']]
+
+    def غياب_القسم():
+        المجاميع = المخزن.مجاميع_الغياب(من, إلى)
+        return المجاميع.loc[المجاميع['القسم'] == القسم, 'العدد'].sum()
+
+    قبل = غياب_القسم()
+    assert المخزن.تحديث_حالة_الطلب(int(المعلق['معرف']), 'معتمد', 1)
+    الأيام = (المعلق['تاريخ_الانتهاء'] - المعلق['تاريخ_البدء']).days + 1
+    assert غياب_القسم() == قبل + الأيام
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    المعتمدة = الطلبات[الطلبات['الحالة'] == 'معتمد']
+    assert كعداد(المخزن.مجاميع_الغياب(من, إلى)) == بالحلقة(
+        المعتمدة, المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم'), pd.Timestamp(من), pd.Timestamp(إلى)
+    )
@@ -0,0 +1,205 @@
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from التخزين import (
+    مخزن_CSV, مخزن_SQLite, جدول_المستخدمين, جدول_أرصدة_الإجازات, جدول_طلبات_الإجازة, ملفات_الجداول,
+)
+from توليد_البيانات import توليد_البيانات
+from طبقة_البيانات import أنواع_الأعمدة, تاريخ
+
+
+def مستخدم(الاسم, القسم='العمليات', النوع='موظف'):
+    return {
+        'اسم_المستخدم': الاسم, 'كلمة_المرور': '', 'اسم_الموظف': f'موظف {الاسم}', 'نوع_المستخدم': النوع,
+        'القسم': القسم, 'الحالة': 'نشط', 'تاريخ_الإنشاء': '2026-01-01 00:00:00',
+    }
+
+
+def رصيد():
+    return {
+        'رصيد_السنة_الحالية': 30, 'رصيد_العام_السابق_1': 0, 'رصيد_العام_السابق_2': 0,
+        'السنة': 2026, 'تاريخ_التحديث': '',
+    }
+
+
+def test_إضافة_مستخدم_مع_رصيده(المخزن):
+    معرف = المخزن.إضافة_مستخدم(مستخدم('جديد'), رصيد())
+    assert المخزن.المستخدم('جديد')['معرف'] == معرف
+    assert المخزن.أرصدة_الموظف(معرف)['رصيد_السنة_الحالية'].tolist() == [30]
+    assert المخزن.عدد_المستخدمين() == 41
+
+
+def test_اسم_مستخدم_موجود_يُرفض_بنفس_الخطأ_في_الخلفيتين(المخزن):
+    المخزن.إضافة_مستخدم(مستخدم('مكرر'), رصيد())
+    العدد = len(المخزن.جدول(جدول_المستخدمين))
+    with pytest.raises(ValueError, match='مكرر'):
+        المخزن.إضافة_مستخدم(مستخدم('مكرر'), رصيد())
+    assert len(المخزن.جدول(جدول_المستخدمين)) == العدد
+
+
+def test_تكرار_داخل_الدفعة_يرفض_الدفعة_كلها(المخزن):
+    العدد = len(المخزن.جدول(جدول_المستخدمين))
+    الأرصدة = len(المخزن.جدول(جدول_أرصدة_الإجازات))
+    with pytest.raises(ValueError, match='ب'):
+        المخزن.إضافة_مستخدمين(
+            pd.DataFrame([مستخدم('أ'), مستخدم('ب'), مستخدم('ب')]), pd.DataFrame([رصيد()] * 3)
+        )
+    assert len(المخزن.جدول(جدول_المستخدمين)) == العدد
+    assert len(المخزن.جدول(جدول_أرصدة_الإجازات)) == الأرصدة
+
+
+def test_الخلفيتان_تعيدان_نفس_صفحة_الطلبات():
+    الخلفيتان = [مخزن_CSV(), مخزن_SQLite('الإجازات.db')]
+    for المخزن in الخلفيتان:
+        المخزن.تهيئة(توليد_البيانات(40, 400, 0))
+    for الحالة in ('قيد المراجعة', 'معتمد'):
+        (أ, عدد_أ), (ب, عدد_ب) = [
+            م.صفحة_الطلبات(الحالة, القسم='العمليات', الإزاحة=5, الحد=10) for م in الخلفيتان
+        ]
+        assert عدد_أ == عدد_ب
+        assert أ['معرف'].tolist() == ب['معرف'].tolist()
+    assert [len(م.جدول(جدول_طلبات_الإجازة)) for م in الخلفيتان] == [400, 400]
+
+
+def test_إضافة_الأسماء_تطابق_البحث_لكل_صف(المخزن):
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة).head(50)
+    الأنواع = المخزن.أنواع_الإجازات()
+    المستخدمون = المخزن.المستخدمين()
+    الناتج = المخزن.إضافة_الأسماء(الطلبات, أسماء_الموظفين=True)
+    for الصف in الناتج.itertuples():
+        assert الصف.اسم_الإجازة == الأنواع[الأنواع['معرف'] == الصف.نوع_الإجازة]['اسم_الإجازة'].iloc[0]
+        assert الصف.اسم_الموظف == المستخدمون[المستخدمون['معرف'] == الصف.معرف_الموظف]['اسم_الموظف'].iloc[0]
+
+
+def test_إضافة_الأسماء_تتبع_تغير_الجدول_والمجهول_له_اسم_ثابت(المخزن):
+    معرف = المخزن.إضافة_مستخدم(مستخدم('جديد'), رصيد())
+    الطلبات = pd.DataFrame({'معرف_الموظف': [معرف, 9999], 'نوع_الإجازة': [1, 99]})
+    # بناء القاموس قبل الإضافة ثم التأكد من إعادة بنائه بعدها
+    المخزن.إضافة_الأسماء(الطلبات, أسماء_الموظفين=True)
+    الثاني = المخزن.إضافة_مستخدم(مستخدم('أحدث'), رصيد())
+    الناتج = المخزن.إضافة_الأسماء(pd.DataFrame({'معرف_الموظف': [معرف, 9999, الثاني], 'نوع_الإجازة': [1, 99, 1]}), True)
+    assert الناتج['اسم_الموظف'].tolist() == ['موظف جديد', 'غير معروف', 'موظف أحدث']
+    assert الناتج['اسم_الإجازة'].tolist()[1] == 'غير معروف'
+
+
+def test_صفحات_الطلبات_تغطي_المطابقة_للمرشحات_دون_تكرار(المخزن):
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    الأقسام = الطلبات['معرف_الموظف'].map(المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم'))
+    القسم = الأقسام.value_counts().index[0]
+    من, إلى = الطلبات['تاريخ_البدء'].quantile([0.1, 0.9])
+    المتوقعة = set(الطلبات.loc[
+        (الطلبات['الحالة'] == 'قيد المراجعة') & (الأقسام == القسم)
+        & (الطلبات['تاريخ_الانتهاء'] >= من) & (الطلبات['تاريخ_البدء'] <= إلى), 'معرف'
+    ].tolist())
+    assert len(المتوقعة) > 2
+    المرشحات = dict(القسم=القسم, من_تاريخ=f'{من:%Y-%m-%d}', إلى_تاريخ=f'{إلى:%Y-%m-%d}')
+
+    المعرفات = []
+    for الإزاحة in range(0, len(المتوقعة) + 2, 2):
+        الصفحة, الإجمالي = المخزن.صفحة_الطلبات('قيد المراجعة', **المرشحات, الإزاحة=الإزاحة, الحد=2)
+        assert الإجمالي == len(المتوقعة) and len(الصفحة) <= 2
+        المعرفات += الصفحة['معرف'].tolist()
+    assert len(المعرفات) == len(المتوقعة) and set(المعرفات) == المتوقعة
+
+
+def test_القرار_الجماعي_يحدث_كل_المحددة_فقط(المخزن):
+    المعلقة = المخزن.الطلبات_بالحالة('قيد المراجعة')['معرف'].tolist()
+    المرفوضة_قبل = المخزن.عدد_الطلبات_بالحالة('مرفوض')
+    المنفذة, المتعارضة = المخزن.تحديث_حالة_الطلبات(المعلقة[:5], 'مرفوض', 1)
+    assert sorted(المنفذة) == sorted(المعلقة[:5]) and المتعارضة == []
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة).set_index('معرف')
+    assert (الطلبات.loc[المعلقة[:5], 'الحالة'] == 'مرفوض').all()
+    assert (الطلبات.loc[المعلقة[5:], 'الحالة'] == 'قيد المراجعة').all()
+    assert المخزن.عدد_الطلبات_بالحالة('مرفوض') == المرفوضة_قبل + 5
+
+
+def test_دليل_المستخدمين_يُبنى_مرة_ويتبع_الإضافة(المخزن):
+    الدليل = المخزن.دليل_المستخدمين()
+    المستخدمون = المخزن.المستخدمين()
+    assert len(الدليل) == len(المستخدمون)
+    for المستخدم in المستخدمون.sample(10, random_state=0).itertuples():
+        assert الدليل[المستخدم.اسم_المستخدم]['معرف'] == المستخدم.معرف
+    assert المخزن.دليل_المستخدمين() is الدليل
+
+    معرف = المخزن.إضافة_مستخدم(مستخدم('جديد'), رصيد())
+    assert المخزن.دليل_المستخدمين() is not الدليل
+    assert المخزن.المستخدم('جديد')['معرف'] == معرف
+    assert المخزن.المستخدم('غير_موجود') is None
+
+
+def test_العدادات_التدريجية_تطابق_إعادة_البناء(المخزن):
+    المعلقة = المخزن.الطلبات_بالحالة('قيد المراجعة')
+    المخزن.تحديث_حالة_الطلبات(المعلقة['معرف'].head(4).tolist(), 'مرفوض', 1)
+    المخزن.تحديث_حالة_الطلبات(المعلقة['معرف'].iloc[4:6].tolist(), 'معتمد', 1)
+    معرف = المخزن.إضافة_مستخدم(مستخدم('جديد', القسم='قسم جديد'), رصيد())
+    المخزن.إضافة_طلب({
+        'معرف_الموظف': معرف, 'نوع_الإجازة': 3, 'تاريخ_البدء': '2031-03-03', 'تاريخ_الانتهاء': '2031-03-04',
+        'عدد_الأيام': 2, 'السبب': '', 'الحالة': 'قيد المراجعة', 'ملاحظات_المدير': '',
+        'معرف_المدير_الموافق': None, 'تاريخ_الطلب': '2031-01-01 00:00:00', 'الإصدار': 0,
+    })
+    التدريجية = copy.deepcopy(المخزن.الإحصائيات())
+    assert التدريجية['المستخدمين']['حسب_القسم']['قسم جديد'] == 1
+    assert المخزن.عدد_طلبات_القسم('قسم جديد', 'قيد المراجعة') == 1
+    assert التدريجية == المخزن.إعادة_بناء_الإحصائيات()
+
+
+def test_الجداول_تُحمل_بأنواع_المخطط_في_الخلفيتين(المخزن):
+    for الجدول, الملف in ملفات_الجداول.items():
+        البيانات = المخزن.جدول(الجدول)
+        for العمود, النوع in أنواع_الأعمدة[الملف].items():
+            if العمود not in البيانات or (البيانات.empty and النوع is str):
+                continue
+            الفعلي = البيانات[العمود].dtype
+            if النوع == 'category':
+                assert isinstance(الفعلي, pd.CategoricalDtype), (الجدول, العمود)
+            elif النوع == تاريخ:
+                assert الفعلي.kind == 'M', (الجدول, العمود)
+            elif النوع is not str:
+                assert الفعلي.name.lower() == النوع.lower(), (الجدول, العمود, الفعلي)
+
+
+def test_الإدراج_المخالف_للمخطط_يُرفض_في_الخلفيتين(المخزن):
+    العدد = len(المخزن.جدول(جدول_طلبات_الإجازة))
+    with pytest.raises(ValueError, match='تاريخ_البدء'):
+        المخزن.إضافة_طلب({
+            'معرف_الموظف': 3, 'نوع_الإجازة': 1, 'تاريخ_البدء': 'غداً', 'تاريخ_الانتهاء': '2031-03-03',
+            'عدد_الأيام': 1, 'السبب': '', 'الحالة': 'قيد المراجعة', 'ملاحظات_المدير': '',
+            'معرف_المدير_الموافق': None, 'تاريخ_الطلب': '2031-01-01 00:00:00', 'الإصدار': 0,
+        })
+    assert len(المخزن.جدول(جدول_طلبات_الإجازة)) == العدد
+
+
+def test_القرار_على_إصدار_قديم_يُرفض_كمتعارض(المخزن):
+    المعلقة = المخزن.الطلبات_بالحالة('قيد المراجعة').set_index('معرف')['الإصدار'].fillna(0).astype(int)
+    أ, ب, ج = المعلقة.index[:3]
+    الإصدارات = {م: int(المعلقة[م]) for م in (أ, ب, ج)}
+    assert المخزن.تحديث_حالة_الطلب(أ, 'مرفوض', 1, الإصدار=الإصدارات[أ])
+
+    # القرار المبني على القراءة السابقة لا يطبق على «أ» ويطبق على غيره، والمعرف دون إصدار لا يُقارن
+    الإصدارات.pop(ج)
+    المنفذة, المتعارضة = المخزن.تحديث_حالة_الطلبات([أ, ب, ج], 'معتمد', 1, الإصدارات)
+    assert المتعارضة == [أ] and sorted(المنفذة) == sorted([ب, ج])
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة).set_index('معرف')
+    assert الطلبات.at[أ, 'الحالة'] == 'مرفوض'
+    assert [int(الطلبات.at[م, 'الإصدار']) for م in (أ, ب, ج)] == [int(المعلقة[م]) + 1 for م in (أ, ب, ج)]
+    assert not المخزن.تحديث_حالة_الطلب(ب, 'مرفوض', 1, الإصدار=int(المعلقة[ب]))
+
+
+def test_القرارات_المتزامنة_على_نفس_الإصدار_ينفذ_أحدها(المخزن):
+    المعرف, الإصدار = المخزن.الطلبات_بالحالة('قيد المراجعة')[['معرف', 'الإصدار']].fillna(0).iloc[0]
+    الحاجز = threading.Barrier(4)
+
+    def قرار(الحالة):
+        الحاجز.wait()
+        return المخزن.تحديث_حالة_الطلب(int(المعرف), الحالة, 1, الإصدار=int(الإصدار))
+
+    with ThreadPoolExecutor(4) as المنفذ:
+        النتائج = list(المنفذ.map(قرار, ['معتمد', 'مرفوض'] * 2))
+    assert sum(النتائج) == 1
+    الطلب = المخزن.جدول(جدول_طلبات_الإجازة).set_index('معرف').loc[int(المعرف)]
+    assert int(الطلب['الإصدار']) == int(الإصدار) + 1
+    assert الطلب['الحالة'] == ['معتمد', 'مرفوض'][النتائج.index(True) % 2]
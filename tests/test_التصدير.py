@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from التخزين import جدول_طلبات_الإجازة
+from التصدير import أعمدة_التصدير, الصيغ_المتاحة, تصدير_الطلبات
+
+
+def المتوقعة(المخزن, الحالة):
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    return الطلبات.loc[الطلبات['الحالة'] == الحالة, 'معرف'].tolist()
+
+
+def test_تصدير_csv_على_دفعات_يطابق_المرشحات(المخزن):
+    العدد = تصدير_الطلبات(المخزن, 'تقرير.csv', حجم_الدفعة=7, الحالة='معتمد')
+    التقرير = pd.read_csv('تقرير.csv', encoding='utf-8-sig')
+    assert العدد == len(التقرير)
+    assert التقرير.columns.tolist() == list(أعمدة_التصدير.values())
+    assert التقرير['رقم الطلب'].tolist() == المتوقعة(المخزن, 'معتمد')
+    assert (التقرير['الحالة'] == 'معتمد').all()
+    assert التقرير['من'].str.fullmatch(r'\d{4}-\d{2}-\d{2}').all()
+    assert التقرير['الموظف'].ne('غير معروف').all() and التقرير['القسم'].ne('').all()
+
+
+def test_تصدير_parquet_بنفس_صفوف_csv(المخزن):
+    pytest.importorskip('pyarrow')
+    assert 'parquet' in الصيغ_المتاحة()
+    تصدير_الطلبات(المخزن, 'تقرير.csv', حجم_الدفعة=50, الحالة='مرفوض')
+    العدد = تصدير_الطلبات(المخزن, 'تقرير.parquet', 'parquet', حجم_الدفعة=50, الحالة='مرفوض')
+    التقرير = pd.read_parquet('تقرير.parquet')
+    assert العدد == len(التقرير) == len(المتوقعة(المخزن, 'مرفوض'))
+    assert التقرير['رقم الطلب'].tolist() == pd.read_csv('تقرير.csv', encoding='utf-8-sig')['رقم الطلب'].tolist()
+
+
+def test_تصدير_xlsx(المخزن):
+    openpyxl = pytest.importorskip('openpyxl')
+    العدد = تصدير_الطلبات(المخزن, 'تقرير.xlsx', 'xlsx', حجم_الدفعة=50, الحالة='معتمد')
+    الصفوف = list(openpyxl.load_workbook('تقرير.xlsx', read_only=True).active.iter_rows(values_only=True))
+    assert list(الصفوف[0]) == list(أعمدة_التصدير.values())
+    assert العدد == len(الصفوف) - 1 == len(المتوقعة(المخزن, 'معتمد'))
+
+
+def test_صيغة_غير_معروفة(المخزن):
+    with pytest.raises(ValueError):
+        تصدير_الطلبات(المخزن, 'تقرير.txt', 'txt')
@@ -0,0 +1,61 @@
+import time
+
+import pandas as pd
+import pytest
+
+import الرصد
+from الرصد import تشغيل_الصفحة, تعيين_الصفحة, رصد_الدفعات, قياس
+from طبقة_البيانات import ملف_طلبات_الإجازة, تحميل_البيانات, حفظ_البيانات
+
+
+@pytest.fixture(autouse=True)
+def سجل_فارغ():
+    الرصد.مسح()
+
+
+def test_التشغيل_يجمع_العمليات_الخارجية_فقط_والعرض_هو_الباقي():
+    with تشغيل_الصفحة('مستخدم') as التشغيل:
+        تعيين_الصفحة('الرئيسية')
+        with قياس('كتابة', 'كتابة', الجدول='أ') as السجل:
+            السجل.update(البايتات=100, الصفوف=2)
+            # عملية داخلية محسوبة ضمن الخارجية
+            with قياس('تحميل', الجدول='أ') as الداخلي:
+                الداخلي.update(البايتات=50)
+        with قياس('تحميل', الجدول='ب') as السجل:
+            السجل.update(البايتات=30, الصفوف=3)
+        time.sleep(0.01)
+
+    assert التشغيل['الصفحة'] == 'الرئيسية'
+    assert التشغيل['عدد_العمليات'] == 2
+    assert (التشغيل['بايتات_كتابة'], التشغيل['بايتات_قراءة'], التشغيل['الصفوف']) == (100, 30, 5)
+    assert التشغيل['زمن_العرض'] == pytest.approx(
+        التشغيل['الزمن'] - التشغيل['زمن_قراءة'] - التشغيل['زمن_كتابة']
+    )
+    assert التشغيل['زمن_العرض'] >= 0.01
+    assert الرصد.ملخص_التشغيلات().index.tolist() == ['الرئيسية']
+    الملخص = الرصد.ملخص_العمليات()
+    assert الملخص.loc[('تحميل', 'أ'), 'العدد'] == 1 and الملخص.loc[('كتابة', 'أ'), 'البايتات'] == 100
+
+
+def test_طبقة_البيانات_تسجل_القراءة_من_الملف_ومن_الذاكرة():
+    حفظ_البيانات(ملف_طلبات_الإجازة, pd.DataFrame({'معرف': [1, 2]}))
+    with تشغيل_الصفحة() as التشغيل:
+        تحميل_البيانات(ملف_طلبات_الإجازة)
+        تحميل_البيانات(ملف_طلبات_الإجازة)
+    assert التشغيل['عدد_العمليات'] == 2
+    with الرصد._قفل:
+        من_الذاكرة = [ع.get('من_الذاكرة') for ع in الرصد._العمليات if ع['العملية'] == 'تحميل']
+    assert sorted(من_الذاكرة) == [False, True]
+
+
+def test_رصد_الدفعات_يقيس_الإنتاج_دون_زمن_المستهلك():
+    def دفعات():
+        for _ in range(3):
+            time.sleep(0.01)
+            yield [1, 2]
+
+    for _ in رصد_الدفعات(دفعات(), 'دفعات', الجدول='ج'):
+        time.sleep(0.05)
+    الملخص = الرصد.ملخص_العمليات().loc[('دفعات', 'ج')]
+    assert الملخص['الصفوف'] == 6
+    assert 30 <= الملخص['الأقصى'] < 150
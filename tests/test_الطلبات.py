@@ -0,0 +1,59 @@
+import threading
+from datetime import date
+
+import pytest
+
+import الطلبات
+from التخزين import جدول_المستخدمين, جدول_طلبات_الإجازة
+from الطلبات import تقديم_طلب
+
+# يوم إثنين بعيد لا طلبات فيه من المولد
+اليوم = date(2031, 3, 3)
+
+
+def موظفو_قسم(المخزن, العدد):
+    المستخدمون = المخزن.جدول(جدول_المستخدمين)
+    الموظفون = المستخدمون[المستخدمون['نوع_المستخدم'] == 'موظف']
+    القسم = الموظفون['القسم'].value_counts().index[0]
+    return القسم, الموظفون[الموظفون['القسم'] == القسم]['معرف'].tolist()[:العدد]
+
+
+def test_الطلب_المتداخل_مع_طلب_سابق_يُرفض(المخزن):
+    القسم, (الموظف,) = موظفو_قسم(المخزن, 1)
+    معرف, الأيام = تقديم_طلب(المخزن, الموظف, القسم, 1, اليوم, date(2031, 3, 4))
+    assert الأيام == 2
+    with pytest.raises(ValueError, match=str(معرف)):
+        تقديم_طلب(المخزن, الموظف, القسم, 1, date(2031, 3, 4), date(2031, 3, 5))
+
+
+def test_الطلب_يُرفض_عند_بلوغ_حد_الغياب(المخزن, monkeypatch):
+    monkeypatch.setattr(الطلبات, 'الحد_الأدنى_للحضور', 1.0)
+    القسم, (الأول, الثاني) = موظفو_قسم(المخزن, 2)
+    تقديم_طلب(المخزن, الأول, القسم, 1, اليوم, اليوم)
+    with pytest.raises(ValueError, match='الحد الأقصى'):
+        تقديم_طلب(المخزن, الثاني, القسم, 1, اليوم, اليوم)
+
+
+def test_التقديم_المتزامن_لا_يتجاوز_حد_الغياب(المخزن, monkeypatch):
+    # الحد الأقصى غائب واحد: من بين طلبات متزامنة لنفس اليوم يُقبل طلب واحد فقط
+    monkeypatch.setattr(الطلبات, 'الحد_الأدنى_للحضور', 1.0)
+    القسم, الموظفون = موظفو_قسم(المخزن, 6)
+    العدد_السابق = len(المخزن.جدول(جدول_طلبات_الإجازة))
+    البدء = threading.Barrier(len(الموظفون))
+    المقبولة, المرفوضة = [], []
+
+    def قدّم(الموظف):
+        البدء.wait()
+        try:
+            المقبولة.append(تقديم_طلب(المخزن, الموظف, القسم, 1, اليوم, اليوم))
+        except ValueError:
+            المرفوضة.append(الموظف)
+
+    الخيوط = [threading.Thread(target=قدّم, args=(م,)) for م in الموظفون]
+    for الخيط in الخيوط:
+        الخيط.start()
+    for الخيط in الخيوط:
+        الخيط.join()
+
+    assert len(المقبولة) == 1 and len(المرفوضة) == len(الموظفون) - 1
+    assert len(المخزن.جدول(جدول_طلبات_الإجازة)) == العدد_السابق + 1
@@ -0,0 +1,57 @@
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+
+from الفترات import فهرس_الإجازات, فهرس_الفترات
+
+
+def test_فهرس_الفترات_يطابق_المسح_المباشر_مع_الإضافة_والحذف():
+    مولد = random.Random(0)
+    الفهرس, الفترات = فهرس_الفترات(), {}
+    for المعرف in range(300):
+        البداية = مولد.randint(0, 200)
+        الفترات[المعرف] = (البداية, البداية + مولد.randint(0, 15))
+        الفهرس.إضافة(المعرف, *الفترات[المعرف])
+    for المعرف in مولد.sample(range(300), 100):
+        الفهرس.حذف(المعرف)
+        del الفترات[المعرف]
+    # إعادة إضافة معرف موجود تستبدل فترته
+    المستبدل = next(iter(الفترات))
+    الفهرس.إضافة(المستبدل, 500, 510)
+    الفترات[المستبدل] = (500, 510)
+
+    for _ in range(200):
+        ب = مولد.randint(-5, 520)
+        ن = ب + مولد.randint(0, 20)
+        المتوقعة = {م for م, (س, ص) in الفترات.items() if س <= ن and ص >= ب}
+        assert الفهرس.عدد_المتداخلة(ب, ن) == len(المتوقعة)
+        assert set(الفهرس.المتداخلة(ب, ن)) == المتوقعة
+    assert الفهرس.الأعداد_اليومية(100, 110) == [
+        sum(س <= ي <= ص for س, ص in الفترات.values()) for ي in range(100, 111)
+    ]
+
+
+def test_البناء_من_الجدول_يطابق_التحديث_طلباً_طلباً():
+    البداية = date(2031, 1, 1)
+    الطلبات = pd.DataFrame([
+        {'معرف': ر, 'معرف_الموظف': ر % 7, 'الحالة': ('معتمد', 'قيد المراجعة', 'مرفوض')[ر % 3],
+         'تاريخ_البدء': str(البداية + timedelta(days=ر)), 'تاريخ_الانتهاء': str(البداية + timedelta(days=ر + ر % 4))}
+        for ر in range(1, 60)
+    ])
+    الأقسام = {م: 'أ' if م < 4 else 'ب' for م in range(7)}
+    المبني = فهرس_الإجازات.بناء(الطلبات, الأقسام)
+    التدريجي = فهرس_الإجازات()
+    for الطلب in الطلبات.to_dict('records'):
+        التدريجي.تحديث(الطلب, الأقسام[الطلب['معرف_الموظف']])
+
+    for القسم in ('أ', 'ب'):
+        assert المبني.الغياب_اليومي(القسم, '2031-01-01', '2031-03-15') == \
+            التدريجي.الغياب_اليومي(القسم, '2031-01-01', '2031-03-15')
+    for الموظف in range(7):
+        assert sorted(المبني.طلبات_متداخلة(الموظف, '2031-01-10', '2031-02-10')) == \
+            sorted(التدريجي.طلبات_متداخلة(الموظف, '2031-01-10', '2031-02-10'))
+    # الطلب المرفوض لا يُحسب، ورفض طلب فعال يزيله
+    assert المبني.طلبات_متداخلة(2, '2031-01-03', '2031-01-03') == []
+    التدريجي.تحديث({**الطلبات.iloc[0].to_dict(), 'الحالة': 'مرفوض'}, الأقسام[1])
+    assert التدريجي.طلبات_متداخلة(1, '2031-01-02', '2031-01-02') == []
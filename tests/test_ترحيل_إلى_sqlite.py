@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from التخزين import مخزن_CSV, مخزن_SQLite, جدول_المستخدمين, ملفات_الجداول
+from ترحيل_إلى_sqlite import ترحيل
+from توليد_البيانات import توليد_البيانات
+
+
+def test_الترحيل_ينقل_كل_الجداول_كما_هي():
+    المصدر = مخزن_CSV()
+    المصدر.تهيئة(توليد_البيانات(40, 400, 0))
+    الأعداد = ترحيل('الإجازات.db')
+
+    الوجهة = مخزن_SQLite('الإجازات.db')
+    for اسم_الجدول in ملفات_الجداول:
+        المتوقع = المصدر.جدول(اسم_الجدول)
+        assert الأعداد[اسم_الجدول] == len(المتوقع)
+        pd.testing.assert_frame_equal(الوجهة.جدول(اسم_الجدول), المتوقع)
+    for الحالة in ('قيد المراجعة', 'معتمد', 'مرفوض'):
+        assert الوجهة.عدد_الطلبات_بالحالة(الحالة) == المصدر.عدد_الطلبات_بالحالة(الحالة)
+    assert الوجهة.دليل_المستخدمين().keys() == المصدر.دليل_المستخدمين().keys()
+
+
+def test_الترحيل_لا_يستبدل_قاعدة_مهيأة_إلا_بطلب():
+    مخزن_CSV().تهيئة(توليد_البيانات(10, 20, 0))
+    ترحيل('الإجازات.db')
+    مخزن_CSV().تهيئة(توليد_البيانات(12, 30, 1))
+    with pytest.raises(RuntimeError):
+        ترحيل('الإجازات.db')
+    assert ترحيل('الإجازات.db', استبدال=True)[جدول_المستخدمين] == 12
@@ -0,0 +1,126 @@
+import http.client
+import json
+import threading
+from urllib.parse import urlencode
+
+import pytest
+
+import التخزين
+from المصادقة import إصدار_رمز, التحقق_من_رمز
+from الأرصدة import ترتيب_الخصم
+from خادم_الواجهة import تشغيل
+from قياس_الصفحات import تجهيز_البيانات, كلمة_مرور_القياس
+
+
+@pytest.fixture
+def الخادم(مخزن_فارغ, monkeypatch):
+    """خادم على منفذ حر فوق مخزن الاختبار، يعيد (المخزن، المنفذ)"""
+    مخزن_فارغ.تهيئة(تجهيز_البيانات(40, 300, 0))
+    monkeypatch.setattr(التخزين, '_المخزن', مخزن_فارغ)
+    monkeypatch.setattr('الإشعارات._الموزع', None)
+    الخادم = تشغيل('127.0.0.1', 0, 4)
+    threading.Thread(target=الخادم.serve_forever, daemon=True).start()
+    yield مخزن_فارغ, الخادم.server_address[1]
+    الخادم.shutdown()
+    الخادم.server_close()
+
+
+def طلب(المنفذ, الطريقة, المسار, الجسم=None, الرمز=None, الرؤوس=None):
+    """(رمز الحالة، جسم الرد) لطلب واحد على اتصال جديد"""
+    الاتصال = http.client.HTTPConnection('127.0.0.1', المنفذ, timeout=10)
+    الرؤوس = dict(الرؤوس or {})
+    if الرمز:
+        الرؤوس['Authorization'] = f'Bearer {الرمز}'
+    المحتوى = json.dumps(الجسم).encode() if الجسم is not None else None
+    الاتصال.request(الطريقة, المسار, body=المحتوى, headers=الرؤوس)
+    الرد = الاتصال.getresponse()
+    النتيجة = الرد.status, json.loads(الرد.read())
+    الاتصال.close()
+    return النتيجة
+
+
+def مستخدم_من_نوع(المخزن, نوع_المستخدم):
+    المستخدمين = المخزن.المستخدمين()
+    return المستخدمين[المستخدمين['نوع_المستخدم'] == نوع_المستخدم].iloc[0]
+
+
+def دخول(المنفذ, اسم_المستخدم):
+    الحالة, الجسم = طلب(المنفذ, 'POST', '/api/login',
+                        {'اسم_المستخدم': اسم_المستخدم, 'كلمة_المرور': كلمة_مرور_القياس})
+    assert الحالة == 200
+    return الجسم['الرمز']
+
+
+def test_الرمز_الموقع_ينتهي_ويرفض_التعديل():
+    الرمز = إصدار_رمز('موظف1')
+    assert التحقق_من_رمز(الرمز) == 'موظف1'
+    assert التحقق_من_رمز(إصدار_رمز('موظف1', المدة=-1)) is None
+    الحمولة, التوقيع = الرمز.split('.')
+    assert التحقق_من_رمز(إصدار_رمز('مدير').split('.')[0] + '.' + التوقيع) is None
+    assert التحقق_من_رمز(الحمولة) is None
+    assert التحقق_من_رمز('') is None
+
+
+def test_الدخول_والرموز_والصلاحيات(الخادم):
+    المخزن, المنفذ = الخادم
+    الموظف = مستخدم_من_نوع(المخزن, 'موظف')
+
+    الحالة, _ = طلب(المنفذ, 'POST', '/api/login',
+                    {'اسم_المستخدم': الموظف['اسم_المستخدم'], 'كلمة_المرور': 'خطأ'})
+    assert الحالة == 401
+    الرمز = دخول(المنفذ, الموظف['اسم_المستخدم'])
+
+    الحالة, الجسم = طلب(المنفذ, 'GET', '/api/balance', الرمز=الرمز)
+    assert الحالة == 200
+    assert [ر['معرف_الموظف'] for ر in الجسم['الأرصدة']] == [int(الموظف['معرف'])]
+    for الرمز_المرفوض in (None, الرمز + 'x', إصدار_رمز(الموظف['اسم_المستخدم'], المدة=-1)):
+        assert طلب(المنفذ, 'GET', '/api/balance', الرمز=الرمز_المرفوض)[0] == 401
+    # الموظف لا يرى طوابير الاعتماد ولا يقرر فيها
+    assert طلب(المنفذ, 'GET', '/api/requests/pending', الرمز=الرمز)[0] == 403
+    assert طلب(المنفذ, 'POST', '/api/requests/decision', {'المعرفات': [1], 'الحالة': 'معتمد'},
+               الرمز=الرمز)[0] == 403
+    assert طلب(المنفذ, 'GET', '/api/unknown', الرمز=الرمز)[0] == 404
+    assert طلب(المنفذ, 'POST', '/api/requests', الرمز=الرمز,
+               الرؤوس={'Content-Length': str(64 * 1024 + 1)})[0] == 413
+
+
+def test_تقديم_طلب_ثم_قرار_بالإصدار(الخادم):
+    المخزن, المنفذ = الخادم
+    الموظف = مستخدم_من_نوع(المخزن, 'موظف')
+    المدير = مستخدم_من_نوع(المخزن, 'مدير_النظام')
+    رمز_الموظف = دخول(المنفذ, الموظف['اسم_المستخدم'])
+    رمز_المدير = دخول(المنفذ, المدير['اسم_المستخدم'])
+    الرصيد = int(المخزن.أرصدة_الموظف(int(الموظف['معرف']))[ترتيب_الخصم].sum(axis=1).iloc[0])
+
+    الحالة, الجسم = طلب(المنفذ, 'POST', '/api/requests', {
+        'نوع_الإجازة': 1, 'تاريخ_البدء': '2031-03-03', 'تاريخ_الانتهاء': '2031-03-04', 'السبب': 'اختبار',
+    }, الرمز=رمز_الموظف)
+    assert الحالة == 201
+    المعرف, الأيام = الجسم['معرف'], الجسم['عدد_الأيام']
+    # التاريخ غير الصالح والطلب المتداخل يُرفضان
+    assert طلب(المنفذ, 'POST', '/api/requests', {
+        'نوع_الإجازة': 1, 'تاريخ_البدء': '3/3/2031', 'تاريخ_الانتهاء': '2031-03-04',
+    }, الرمز=رمز_الموظف)[0] == 400
+    assert طلب(المنفذ, 'POST', '/api/requests', {
+        'نوع_الإجازة': 1, 'تاريخ_البدء': '2031-03-04', 'تاريخ_الانتهاء': '2031-03-05',
+    }, الرمز=رمز_الموظف)[0] == 422
+
+    الاستعلام = urlencode({'department': الموظف['القسم'], 'from': '2031-03-01'})
+    الحالة, الجسم = طلب(المنفذ, 'GET', f'/api/requests/pending?{الاستعلام}', الرمز=رمز_المدير)
+    assert الحالة == 200
+    [الصف] = [ص for ص in الجسم['الطلبات'] if ص['معرف'] == المعرف]
+    assert الصف['اسم_الموظف'] == الموظف['اسم_الموظف']
+
+    # قرار مبني على إصدار قديم يُعاد كمتعارض ولا يغير الطلب
+    _, الجسم = طلب(المنفذ, 'POST', '/api/requests/decision', {
+        'المعرفات': [المعرف], 'الإصدارات': [الصف['الإصدار'] + 1], 'الحالة': 'معتمد',
+    }, الرمز=رمز_المدير)
+    assert الجسم == {'المنفذة': [], 'المتعارضة': [المعرف], 'المتعذرة': []}
+    _, الجسم = طلب(المنفذ, 'POST', '/api/requests/decision', {
+        'المعرفات': [المعرف], 'الإصدارات': [الصف['الإصدار']], 'الحالة': 'معتمد',
+    }, الرمز=رمز_المدير)
+    assert الجسم['المنفذة'] == [المعرف]
+
+    _, الجسم = طلب(المنفذ, 'GET', '/api/balance', الرمز=رمز_الموظف)
+    assert sum(الجسم['الأرصدة'][0][ع] for ع in ترتيب_الخصم) == الرصيد - الأيام
+    assert [ق['معرف_الطلب'] for ق in الجسم['السجل']] == [المعرف]
@@ -0,0 +1,129 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from طبقة_البيانات import (
+    ملف_طلبات_الإجازة, تحميل_البيانات, حفظ_البيانات, إضافة_صفوف, المعرف_التالي, ذاكرة_الجداول,
+    ذاكرة_الجداول_المشتركة, التحقق_من_الأنواع, نصوص_الأيام,
+)
+
+الأعمدة = (
+    'معرف,معرف_الموظف,نوع_الإجازة,تاريخ_البدء,تاريخ_الانتهاء,عدد_الأيام,السبب,الحالة,'
+    'ملاحظات_المدير,معرف_المدير_الموافق,تاريخ_الطلب'
+)
+
+
+def طلب(معرف, **القيم):
+    return {
+        'معرف': معرف, 'معرف_الموظف': 2, 'نوع_الإجازة': 1, 'تاريخ_البدء': '2026-02-01',
+        'تاريخ_الانتهاء': '2026-02-02', 'عدد_الأيام': 2, 'السبب': '', 'الحالة': 'قيد المراجعة',
+        'ملاحظات_المدير': '', 'معرف_المدير_الموافق': None, 'تاريخ_الطلب': '2026-01-01 00:00:00', **القيم,
+    }
+
+
+def test_الإلحاق_لا_يعيد_كتابة_الصفوف_السابقة():
+    إضافة_صفوف(ملف_طلبات_الإجازة, [طلب(1), طلب(2)])
+    with open(ملف_طلبات_الإجازة, 'rb') as الملف:
+        البداية = الملف.read()
+    إضافة_صفوف(ملف_طلبات_الإجازة, [طلب(3, السبب='سفر، عائلي')])
+    with open(ملف_طلبات_الإجازة, 'rb') as الملف:
+        assert الملف.read().startswith(البداية)
+    الجدول = تحميل_البيانات(ملف_طلبات_الإجازة)
+    assert الجدول['معرف'].tolist() == [1, 2, 3]
+    assert الجدول['السبب'].iloc[-1] == 'سفر، عائلي'
+
+
+def test_الإلحاق_بعمود_جديد_يعيد_الكتابة_مع_الصفوف_السابقة():
+    إضافة_صفوف(ملف_طلبات_الإجازة, [طلب(1)])
+    إضافة_صفوف(ملف_طلبات_الإجازة, [طلب(2, الإصدار=0)])
+    الجدول = تحميل_البيانات(ملف_طلبات_الإجازة)
+    assert الجدول['معرف'].tolist() == [1, 2]
+    assert 'الإصدار' in الجدول.columns
+
+
+def test_ملف_تالف_لا_يُمحى_عند_إعادة_الكتابة_ولا_يبذر_العداد_من_الصفر():
+    with open(ملف_طلبات_الإجازة, 'w', encoding='utf-8') as الملف:
+        الملف.write(f'{الأعمدة}\n1,2,1,2026-01-01,2026-01-02,2,,معتمد,,,x\n2,abc,1,2026-01-01,2026-01-02,2,,معتمد,,,x\n')
+    with open(ملف_طلبات_الإجازة, 'rb') as الملف:
+        الأصل = الملف.read()
+
+    with pytest.raises(ValueError):
+        إضافة_صفوف(ملف_طلبات_الإجازة, [طلب(3, الإصدار=0)])
+    with pytest.raises(ValueError):
+        المعرف_التالي(ملف_طلبات_الإجازة)
+    with open(ملف_طلبات_الإجازة, 'rb') as الملف:
+        assert الملف.read() == الأصل
+
+
+def test_الملف_غير_الموجود_يعيد_الافتراضي():
+    assert تحميل_البيانات('غير_موجود.csv', pd.DataFrame({'أ': [1]}))['أ'].tolist() == [1]
+
+
+def test_الحفظ_الذري_لا_يترك_ملفات_مؤقتة():
+    حفظ_البيانات(ملف_طلبات_الإجازة, pd.DataFrame([طلب(1), طلب(2)]))
+    حفظ_البيانات(ملف_طلبات_الإجازة, pd.DataFrame([طلب(1)]))
+    assert تحميل_البيانات(ملف_طلبات_الإجازة)['معرف'].tolist() == [1]
+    assert [م for م in os.listdir('.') if م.endswith('.tmp')] == []
+
+
+def test_العداد_يبدأ_من_أكبر_معرف_ولا_يكرر_بين_الخيوط():
+    إضافة_صفوف(ملف_طلبات_الإجازة, [طلب(1), طلب(7)])
+    with ThreadPoolExecutor(8) as المنفذ:
+        المعرفات = list(المنفذ.map(lambda _: المعرف_التالي(ملف_طلبات_الإجازة), range(50)))
+    assert sorted(المعرفات) == list(range(8, 58))
+    assert المعرف_التالي(ملف_طلبات_الإجازة, 3) == 58
+    assert المعرف_التالي(ملف_طلبات_الإجازة) == 61
+
+
+def test_التحميل_الثاني_من_الذاكرة_ونسخة_مستقلة():
+    حفظ_البيانات(ملف_طلبات_الإجازة, pd.DataFrame([طلب(1), طلب(2)]))
+    الأول = تحميل_البيانات(ملف_طلبات_الإجازة)
+    الإصابات = ذاكرة_الجداول_المشتركة.الإحصائيات()['الإصابات']
+    الأول.loc[0, 'السبب'] = 'معدل'
+    الثاني = تحميل_البيانات(ملف_طلبات_الإجازة)
+    assert ذاكرة_الجداول_المشتركة.الإحصائيات()['الإصابات'] == الإصابات + 1
+    assert الثاني['السبب'].tolist() == ['', '']
+
+
+def test_تغير_الملف_يبطل_الذاكرة():
+    حفظ_البيانات(ملف_طلبات_الإجازة, pd.DataFrame([طلب(1)]))
+    assert len(تحميل_البيانات(ملف_طلبات_الإجازة)) == 1
+    إضافة_صفوف(ملف_طلبات_الإجازة, [طلب(2)])
+    assert تحميل_البيانات(ملف_طلبات_الإجازة)['معرف'].tolist() == [1, 2]
+
+
+def test_الذاكرة_تخلي_الأقدم_استخداماً_عند_تجاوز_الحد():
+    الجدول = pd.DataFrame({'أ': range(100)})
+    الحجم = int(الجدول.memory_usage(index=True, deep=True).sum())
+    الذاكرة = ذاكرة_الجداول(الحجم * 2)
+    الذاكرة.تخزين('أ', 1, الجدول)
+    الذاكرة.تخزين('ب', 1, الجدول)
+    assert الذاكرة.جلب('أ', 1) is not None
+    الذاكرة.تخزين('ج', 1, الجدول)
+    assert الذاكرة.جلب('ب', 1) is None
+    assert الذاكرة.جلب('أ', 1) is not None and الذاكرة.جلب('ج', 1) is not None
+    assert الذاكرة.جلب('أ', 2) is None
+    assert الذاكرة.الإحصائيات()['الإخلاءات'] == 1
+
+
+def test_التحقق_يرفض_ما_يخالف_المخطط():
+    التحقق_من_الأنواع(ملف_طلبات_الإجازة, pd.DataFrame([طلب(1)]))
+    for الخطأ, الطلب in (
+        ('تاريخ غير صالح', طلب(1, تاريخ_البدء='2026-13-40')),
+        ('قيم غير صحيحة', طلب(1.5)),
+        ('قيم غير صحيحة', طلب(1, معرف_الموظف='أحمد')),
+        ('عمود إلزامي', طلب(None)),
+    ):
+        with pytest.raises(ValueError, match=الخطأ):
+            التحقق_من_الأنواع(ملف_طلبات_الإجازة, pd.DataFrame([الطلب]))
+    with pytest.raises(ValueError):
+        إضافة_صفوف(ملف_طلبات_الإجازة, [طلب(1, عدد_الأيام='ثلاثة')])
+    assert not os.path.exists(ملف_طلبات_الإجازة)
+
+
+def test_أعمدة_الأيام_تُكتب_أياماً_والفراغ_نصاً_فارغاً():
+    البيانات = pd.DataFrame({'اليوم': pd.to_datetime(['2026-01-02', None, '2026-01-02']), 'أ': [1, 2, 3]})
+    assert نصوص_الأيام(البيانات)['اليوم'].tolist() == ['2026-01-02', '', '2026-01-02']
+    assert البيانات['اليوم'].dtype.kind == 'M'
@@ -0,0 +1,28 @@
+import pandas as pd
+
+import قياس_الصفحات
+from توليد_البيانات import توليد_البيانات
+
+
+def test_المقارنة_تبلغ_عن_التراجع_فوق_العتبة_فقط():
+    خط_الأساس = {'أ': {'الزمن': 1.0, 'الذاكرة': 10.0}, 'ب': {'الزمن': 1.0, 'الذاكرة': 10.0}}
+    النتائج = {'أ': {'الزمن': 1.2, 'الذاكرة': 10.0}, 'ب': {'الزمن': 1.0, 'الذاكرة': 14.0}}
+    assert قياس_الصفحات.مقارنة(النتائج, خط_الأساس, 0.25) == ['ب: الذاكرة +40%']
+
+
+def test_الفحص_بلا_خط_أساس_يفشل_قبل_القياس(monkeypatch):
+    monkeypatch.setattr('sys.argv', ['قياس_الصفحات.py', '--baseline', 'غير_موجود.json'])
+    monkeypatch.setattr(قياس_الصفحات.subprocess, 'run', None)
+    assert قياس_الصفحات.main() == 2
+
+
+def test_المولد_حتمي_بالبذرة():
+    الأولى, الثانية = توليد_البيانات(30, 200, 5), توليد_البيانات(30, 200, 5)
+    assert الأولى.keys() == الثانية.keys()
+    # أوقات الإنشاء والتحديث من الساعة الحالية
+    الأوقات = ['تاريخ_الإنشاء', 'تاريخ_الطلب', 'تاريخ_التحديث']
+    for الجدول in الأولى:
+        pd.testing.assert_frame_equal(
+            الأولى[الجدول].drop(columns=الأوقات, errors='ignore'),
+            الثانية[الجدول].drop(columns=الأوقات, errors='ignore'),
+        )
@@ -0,0 +1,76 @@
+"""محرك أيام العمل: الأيام المحتسبة من الإجازة بعد استبعاد العطل الرسمية وأيام راحة جدول القسم
+
+التقويم ملف JSON صغير (VACATION_CALENDAR):
+    {"العطل": ["2026-09-23", ...], "أيام_العمل": {"": "1111001", "العمليات": "1111111"}}
+أيام_العمل قناع أسبوعي لكل قسم من الإثنين إلى الأحد كما في numpy.busday_count، والمفتاح الفارغ لبقية الأقسام.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from طبقة_البيانات import بصمة_الملف, قراءة_json, كتابة_json, نص_التاريخ
+
+مسار_التقويم = os.environ.get('VACATION_CALENDAR', 'التقويم.json')
+
+# الجمعة والسبت راحة للأقسام التي ليس لها جدول ورديات
+القناع_الافتراضي = '1111001'
+
+
+def _أيام(التواريخ):
+    """مصفوفة datetime64[D] من عمود محلل أو نصوص YYYY-MM-DD"""
+    return pd.to_datetime(pd.Series(التواريخ), format='ISO8601').to_numpy().astype('datetime64[D]')
+
+
+class تقويم_العمل:
+    """تقويم busday مبني مرة لكل جدول ورديات مع العطل المشتركة"""
+
+    def __init__(self, العطل=(), أيام_العمل=None):
+        العطل = np.unique(np.array(list(العطل), dtype='datetime64[D]'))
+        self.العطل = [str(اليوم) for اليوم in العطل]
+        self.الأقنعة = {'': القناع_الافتراضي, **(أيام_العمل or {})}
+        # تاريخ أو قناع غير صالح يرفع ValueError هنا لا عند أول طلب
+        self._التقاويم = {
+            القسم: np.busdaycalendar(weekmask=القناع, holidays=العطل) for القسم, القناع in self.الأقنعة.items()
+        }
+
+    def أيام(self, البداية, النهاية, القسم=''):
+        """الأيام المحتسبة من البداية إلى النهاية شاملة لموظف في القسم"""
+        البداية, النهاية = (np.datetime64(نص_التاريخ(ي)[:10], 'D') for ي in (البداية, النهاية))
+        return int(np.busday_count(
+            البداية, النهاية + 1, busdaycal=self._التقاويم.get(القسم, self._التقاويم[''])
+        ))
+
+    def أيام_الطلبات(self, البدايات, النهايات, الأقسام):
+        """الأيام المحتسبة لأعمدة طلبات كاملة: busday_count متجه واحد لكل جدول ورديات مستخدم"""
+        البدايات, النهايات = _أيام(البدايات), _أيام(النهايات) + 1
+        الأقسام = np.asarray(الأقسام, dtype=object)
+        النتيجة = np.busday_count(البدايات, النهايات, busdaycal=self._التقاويم[''])
+        for القسم, التقويم in self._التقاويم.items():
+            القناع = الأقسام == القسم
+            if القسم and القناع.any():
+                النتيجة[القناع] = np.busday_count(البدايات[القناع], النهايات[القناع], busdaycal=التقويم)
+        return النتيجة.astype('int32')
+
+
+_المحفوظ = None
+_قفل = threading.Lock()
+
+
+def التقويم():
+    """تقويم العمل الحالي، يُبنى مرة لكل نسخة من ملف التقويم"""
+    global _المحفوظ
+    البصمة = بصمة_الملف(مسار_التقويم)
+    with _قفل:
+        if _المحفوظ is None or _المحفوظ[0] != البصمة:
+            البيانات = قراءة_json(مسار_التقويم, {})
+            _المحفوظ = (البصمة, تقويم_العمل(البيانات.get('العطل', ()), البيانات.get('أيام_العمل')))
+        return _المحفوظ[1]
+
+
+def حفظ_التقويم(العطل, أيام_العمل):
+    """التحقق من التقويم بعد بنائه ثم كتابته؛ لا يغير عدد_الأيام في الطلبات القائمة"""
+    التقويم_الجديد = تقويم_العمل(العطل, أيام_العمل)
+    كتابة_json(مسار_التقويم, {'العطل': التقويم_الجديد.العطل, 'أيام_العمل': أيام_العمل})
+    return التقويم_الجديد
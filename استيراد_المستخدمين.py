@@ -0,0 +1,145 @@
+"""استيراد المستخدمين وأرصدتهم بالجملة من ملف CSV أو XLSX
+
+يُقرأ الملف على دفعات، وتُفحص كل دفعة وتُحذف أسماء المستخدمين المكررة، وتُشفر كلمات المرور
+على عدة أنوية، ثم تُكتب كل الصفوف السليمة دفعة واحدة مع تقرير أخطاء لكل سطر مرفوض.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import openpyxl
+except ImportError:  # مطلوبة لملفات XLSX فقط
+    openpyxl = None
+
+from الأرصدة import الرصيد_السنوي
+from المصادقة import أنواع_المستخدمين, تشفير_دفعة
+
+الأعمدة_المطلوبة = ['اسم_المستخدم', 'كلمة_المرور', 'اسم_الموظف']
+أعمدة_الأرصدة = ['رصيد_السنة_الحالية', 'رصيد_العام_السابق_1', 'رصيد_العام_السابق_2']
+الأعمدة_الاختيارية = ['نوع_المستخدم', 'القسم'] + أعمدة_الأرصدة
+
+# أقل عدد كلمات مرور يستحق توزيعه على عمليات (sha256 سريع وكلفة بدء العمليات أكبر منه للملفات الصغيرة)
+الحد_الأدنى_للتوازي = 20_000
+
+
+def قراءة_على_دفعات(المصدر, اسم_الملف, حجم_الدفعة=5000):
+    """قراءة ملف CSV أو XLSX (مسار أو كائن ملف) كدفعات DataFrame نصية مرقمة بأسطر الملف"""
+    if str(اسم_الملف).lower().endswith('.xlsx'):
+        yield from _قراءة_xlsx(المصدر, حجم_الدفعة)
+        return
+    for الدفعة in pd.read_csv(المصدر, dtype=str, keep_default_na=False, chunksize=حجم_الدفعة):
+        # السطر الأول عناوين الأعمدة
+        الدفعة.index = الدفعة.index + 2
+        yield الدفعة
+
+
+def _قراءة_xlsx(المصدر, حجم_الدفعة):
+    if openpyxl is None:
+        raise RuntimeError("قراءة ملفات XLSX تتطلب تثبيت openpyxl")
+    الكتاب = openpyxl.load_workbook(المصدر, read_only=True, data_only=True)
+    try:
+        الصفوف = الكتاب.active.iter_rows(values_only=True)
+        العناوين = [str(ع).strip() if ع is not None else '' for ع in next(الصفوف, ())]
+        الدفعة, السطر = [], 2
+        for الصف in الصفوف:
+            الدفعة.append(['' if ق is None else str(ق) for ق in الصف])
+            if len(الدفعة) == حجم_الدفعة:
+                yield pd.DataFrame(الدفعة, columns=العناوين, index=range(السطر, السطر + len(الدفعة)))
+                السطر += len(الدفعة)
+                الدفعة = []
+        if الدفعة:
+            yield pd.DataFrame(الدفعة, columns=العناوين, index=range(السطر, السطر + len(الدفعة)))
+    finally:
+        الكتاب.close()
+
+
+def تشفير_متوازي(كلمات_المرور, العمال=None):
+    """تشفير كلمات المرور على عدة عمليات، أو في العملية نفسها إذا كانت قليلة"""
+    كلمات_المرور = list(كلمات_المرور)
+    if len(كلمات_المرور) < الحد_الأدنى_للتوازي or العمال == 1:
+        return تشفير_دفعة(كلمات_المرور)
+    العمال = العمال or os.cpu_count() or 1
+    الحجم = -(-len(كلمات_المرور) // العمال)
+    الأجزاء = [كلمات_المرور[ب:ب + الحجم] for ب in range(0, len(كلمات_المرور), الحجم)]
+    with ProcessPoolExecutor(max_workers=العمال) as المنفذ:
+        return [ه for الجزء in المنفذ.map(تشفير_دفعة, الأجزاء) for ه in الجزء]
+
+
+def فحص_دفعة(الدفعة, الموجودون, المرئيون):
+    """فحص دفعة وإرجاع (الصفوف السليمة، قائمة الأخطاء)
+
+    الموجودون: أسماء المستخدمين في النظام. المرئيون: قاموس اسم -> سطر أول ظهور في الملف، يُحدث هنا.
+    """
+    الدفعة = الدفعة.reindex(columns=الأعمدة_المطلوبة + الأعمدة_الاختيارية, fill_value='')
+    الدفعة = الدفعة.fillna('').astype(str).apply(lambda عمود: عمود.str.strip())
+    الدفعة['نوع_المستخدم'] = الدفعة['نوع_المستخدم'].replace('', 'موظف')
+
+    الأخطاء = pd.Series('', index=الدفعة.index)
+
+    def سجل(القناع, الرسالة):
+        الأخطاء[القناع & (الأخطاء == '')] = الرسالة
+
+    for العمود in الأعمدة_المطلوبة:
+        سجل(الدفعة[العمود] == '', f"الحقل {العمود} فارغ")
+    سجل(~الدفعة['نوع_المستخدم'].isin(أنواع_المستخدمين), "نوع المستخدم غير معروف")
+    for العمود in أعمدة_الأرصدة:
+        القيم = pd.to_numeric(الدفعة[العمود], errors='coerce')
+        سجل((الدفعة[العمود] != '') & ~((القيم >= 0) & (القيم % 1 == 0)), f"{العمود} ليس عدداً صحيحاً موجباً")
+    سجل(الدفعة['اسم_المستخدم'].isin(الموجودون), "اسم المستخدم موجود مسبقاً")
+
+    # التكرار داخل الملف: أول ظهور هو المعتمد
+    for السطر, الاسم in الدفعة.loc[الأخطاء == '', 'اسم_المستخدم'].items():
+        if الاسم in المرئيون:
+            الأخطاء[السطر] = f"اسم المستخدم مكرر في الملف (السطر {المرئيون[الاسم]})"
+        else:
+            المرئيون[الاسم] = السطر
+
+    المرفوضة = الأخطاء != ''
+    التقرير = [
+        {'السطر': السطر, 'اسم_المستخدم': الدفعة.at[السطر, 'اسم_المستخدم'], 'الخطأ': الخطأ}
+        for السطر, الخطأ in الأخطاء[المرفوضة].items()
+    ]
+    return الدفعة[~المرفوضة], التقرير
+
+
+def استيراد_المستخدمين(المخزن, المصدر, اسم_الملف=None, حجم_الدفعة=5000, العمال=None, تجربة=False):
+    """استيراد ملف مستخدمين وإرجاع (عدد الصفوف السليمة المضافة، تقرير الأخطاء كـ DataFrame)
+
+    مع «تجربة» يُفحص الملف فقط ويُعاد عدد من كانوا سيضافون دون كتابة.
+    """
+    الموجودون = set(المخزن.دليل_المستخدمين())
+    المرئيون, السليمة, الأخطاء = {}, [], []
+    for الدفعة in قراءة_على_دفعات(المصدر, اسم_الملف or المصدر, حجم_الدفعة):
+        سليمة, تقرير = فحص_دفعة(الدفعة, الموجودون, المرئيون)
+        السليمة.append(سليمة)
+        الأخطاء.extend(تقرير)
+
+    التقرير = pd.DataFrame(الأخطاء, columns=['السطر', 'اسم_المستخدم', 'الخطأ'])
+    السليمة = pd.concat(السليمة) if السليمة else pd.DataFrame(columns=الأعمدة_المطلوبة + الأعمدة_الاختيارية)
+    if تجربة or السليمة.empty:
+        return len(السليمة), التقرير
+
+    الآن = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    المستخدمين = pd.DataFrame({
+        'اسم_المستخدم': السليمة['اسم_المستخدم'].to_numpy(),
+        'كلمة_المرور': تشفير_متوازي(السليمة['كلمة_المرور'], العمال),
+        'اسم_الموظف': السليمة['اسم_الموظف'].to_numpy(),
+        'نوع_المستخدم': السليمة['نوع_المستخدم'].to_numpy(),
+        'القسم': السليمة['القسم'].to_numpy(),
+        'الحالة': 'نشط',
+        'تاريخ_الإنشاء': الآن,
+    })
+    الأرصدة = pd.DataFrame({
+        العمود: pd.to_numeric(السليمة[العمود], errors='coerce').fillna(
+            الرصيد_السنوي if العمود == 'رصيد_السنة_الحالية' else 0
+        ).astype('int64').to_numpy()
+        for العمود in أعمدة_الأرصدة
+    })
+    الأرصدة['السنة'] = datetime.now().year
+    الأرصدة['تاريخ_التحديث'] = الآن
+
+    المخزن.إضافة_مستخدمين(المستخدمين, الأرصدة)
+    return len(المستخدمين), التقرير
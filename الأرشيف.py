@@ -0,0 +1,85 @@
+"""أرشيف طلبات الإجازة المغلقة: ملف CSV مضغوط لكل سنة من تاريخ_البدء
+
+الأرشفة تنقل الطلبات المعتمدة والمرفوضة المنتهية قبل تاريخ القطع من جدول الطلبات إلى أقسامها السنوية،
+فلا تحمل الصفحات إلا السنة الحالية والطلبات المفتوحة، وتُقرأ الأقسام عند الطلب للعروض التاريخية والتصدير.
+"""
+import os
+
+import pandas as pd
+
+from طبقة_البيانات import (
+    أنواع_الأعمدة, تطبيق_الأنواع, تحميل_البيانات, تحميل_على_دفعات, حفظ_البيانات, قفل_الملف, قراءة_json, كتابة_json,
+    نص_التاريخ, ملف_طلبات_الإجازة,
+)
+
+مجلد_الأرشيف = os.environ.get('VACATION_ARCHIVE', 'أرشيف_الطلبات')
+الحالات_المغلقة = ('معتمد', 'مرفوض')
+
+
+def _مسار_الفهرس():
+    return os.path.join(مجلد_الأرشيف, 'الفهرس.json')
+
+
+def مسار_السنة(السنة):
+    return os.path.join(مجلد_الأرشيف, f'طلبات_{السنة}.csv.gz')
+
+
+def الفهرس():
+    """السنة -> {العدد، أول_بدء، آخر_انتهاء، أكبر_معرف} لكل قسم مؤرشف"""
+    return قراءة_json(_مسار_الفهرس(), {})
+
+
+def أكبر_معرف():
+    """أكبر معرف طلب في الأرشيف حتى لا يُعاد استخدامه بعد حذف الطلبات من الجدول"""
+    return max((القسم['أكبر_معرف'] for القسم in الفهرس().values()), default=0)
+
+
+def السنوات(من_تاريخ=None, إلى_تاريخ=None):
+    """سنوات الأقسام التي فيها طلبات متقاطعة مع الفترة، من مدى تواريخ كل قسم في الفهرس"""
+    return sorted(
+        int(السنة) for السنة, القسم in الفهرس().items()
+        if (من_تاريخ is None or القسم['آخر_انتهاء'] >= str(من_تاريخ))
+        and (إلى_تاريخ is None or القسم['أول_بدء'] <= str(إلى_تاريخ))
+    )
+
+
+def قراءة(من_تاريخ=None, إلى_تاريخ=None):
+    """الطلبات المؤرشفة في الأقسام المتقاطعة مع الفترة (الترشيح الدقيق على المستدعي)"""
+    الأقسام = [تحميل_البيانات(مسار_السنة(س), المخطط=ملف_طلبات_الإجازة) for س in السنوات(من_تاريخ, إلى_تاريخ)]
+    if not الأقسام:
+        return تطبيق_الأنواع(ملف_طلبات_الإجازة, pd.DataFrame(columns=list(أنواع_الأعمدة[ملف_طلبات_الإجازة])))
+    return pd.concat(الأقسام, ignore_index=True)
+
+
+def دفعات(حجم_الدفعة=10_000, من_تاريخ=None, إلى_تاريخ=None):
+    """دفعات الأقسام المتقاطعة مع الفترة بترتيب سنواتها"""
+    for السنة in السنوات(من_تاريخ, إلى_تاريخ):
+        yield from تحميل_على_دفعات(مسار_السنة(السنة), حجم_الدفعة, المخطط=ملف_طلبات_الإجازة)
+
+
+def المستحقة(الطلبات, تاريخ_القطع):
+    """قناع الطلبات المغلقة المنتهية قبل تاريخ القطع"""
+    return الطلبات['الحالة'].isin(الحالات_المغلقة) & (الطلبات['تاريخ_الانتهاء'] < str(تاريخ_القطع))
+
+
+def إلحاق(الطلبات):
+    """دمج طلبات في أقسام سنواتها وتحديث الفهرس
+
+    يُستدعى قبل حذفها من الجدول: الانقطاع بين الخطوتين يترك الطلب في الاثنين، وإعادة الأرشفة تزيل التكرار بالمعرف.
+    """
+    os.makedirs(مجلد_الأرشيف, exist_ok=True)
+    with قفل_الملف(_مسار_الفهرس()):
+        الفهرس_الحالي = الفهرس()
+        for السنة, الجديدة in الطلبات.groupby(الطلبات['تاريخ_البدء'].dt.year.astype(str)):
+            المسار = مسار_السنة(السنة)
+            الحالية = تحميل_البيانات(المسار, المخطط=ملف_طلبات_الإجازة)
+            القسم = pd.concat([الحالية, الجديدة]) if not الحالية.empty else الجديدة
+            القسم = القسم.drop_duplicates('معرف', keep='last').sort_values('معرف')
+            حفظ_البيانات(المسار, القسم)
+            الفهرس_الحالي[السنة] = {
+                'العدد': len(القسم),
+                'أول_بدء': نص_التاريخ(القسم['تاريخ_البدء'].min()),
+                'آخر_انتهاء': نص_التاريخ(القسم['تاريخ_الانتهاء'].max()),
+                'أكبر_معرف': int(القسم['معرف'].max()),
+            }
+        كتابة_json(_مسار_الفهرس(), الفهرس_الحالي)
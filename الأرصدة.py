@@ -0,0 +1,153 @@
+"""محرك أرصدة الإجازات: خصم الأيام المعتمدة من خانات الرصيد وترحيل نهاية السنة مع سجل حركات"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# الرصيد الممنوح في بداية كل سنة
+الرصيد_السنوي = 30
+
+# الأنواع المخصومة من الرصيد (الاعتيادية والعرضة) حيث عمود «مخصومة» فارغ: جداول أنواع أقدم منه
+الأنواع_المخصومة_افتراضياً = {1, 2}
+
+# ترتيب الخصم: الأقدم أولاً لأنه أول ما يسقط عند الترحيل
+ترتيب_الخصم = ['رصيد_العام_السابق_2', 'رصيد_العام_السابق_1', 'رصيد_السنة_الحالية']
+
+# عمود الفرق في سجل الأرصدة لكل خانة
+أعمدة_الفروق = {
+    'رصيد_السنة_الحالية': 'فرق_السنة_الحالية',
+    'رصيد_العام_السابق_1': 'فرق_العام_السابق_1',
+    'رصيد_العام_السابق_2': 'فرق_العام_السابق_2',
+}
+
+
+def _عدد_صحيح(القيمة):
+    return 0 if القيمة is None or pd.isna(القيمة) else int(القيمة)
+
+
+def قيد(معرف_الموظف, العملية, الفروق, السنة, معرف_الطلب=None, معرف_المنفذ=None, الساقط=0):
+    """صف واحد في سجل الأرصدة"""
+    return {
+        'معرف_الموظف': معرف_الموظف,
+        'معرف_الطلب': معرف_الطلب,
+        'العملية': العملية,
+        **{أعمدة_الفروق[الخانة]: الفروق.get(الخانة, 0) for الخانة in ترتيب_الخصم},
+        'الساقط': الساقط,
+        'السنة': السنة,
+        'معرف_المنفذ': معرف_المنفذ,
+        'التاريخ': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def توزيع_الخصم(الرصيد, الأيام):
+    """فروق الخانات لخصم «الأيام» من رصيد موظف واحد بترتيب الخصم، أو None إذا لم يكفِ الرصيد"""
+    الفروق = {}
+    المتبقي = int(الأيام)
+    for الخانة in ترتيب_الخصم:
+        المخصوم = min(المتبقي, max(_عدد_صحيح(الرصيد.get(الخانة)), 0))
+        الفروق[الخانة] = -المخصوم
+        المتبقي -= المخصوم
+    return None if المتبقي > 0 else الفروق
+
+
+def صافي_القيود(السجل):
+    """مجموع فروق كل طلب في السجل (لاسترداد ما خُصم عند إلغاء الاعتماد)"""
+    if السجل.empty:
+        return {}
+    الأعمدة = [أعمدة_الفروق[الخانة] for الخانة in ترتيب_الخصم]
+    المجاميع = السجل.dropna(subset=['معرف_الطلب']).groupby('معرف_الطلب')[الأعمدة].sum()
+    return {
+        int(معرف_الطلب): {الخانة: int(الصف[أعمدة_الفروق[الخانة]]) for الخانة in ترتيب_الخصم}
+        for معرف_الطلب, الصف in المجاميع.iterrows()
+    }
+
+
+def الأنواع_المخصومة(أنواع_الإجازات):
+    """معرفات أنواع الإجازات التي تخصم أيامها من الرصيد حسب عمود «مخصومة» في جدول الأنواع"""
+    الافتراضي = أنواع_الإجازات['معرف'].isin(الأنواع_المخصومة_افتراضياً)
+    if 'مخصومة' not in أنواع_الإجازات:
+        المخصومة = الافتراضي
+    else:
+        المخصومة = أنواع_الإجازات['مخصومة'].astype('boolean').fillna(الافتراضي)
+    return set(أنواع_الإجازات.loc[المخصومة.to_numpy(bool), 'معرف'].astype(int).tolist())
+
+
+def تخطيط_تغيير_الحالة(الطلبات, الأرصدة, القيود_السابقة, الحالة, معرف_المنفذ, المخصومة):
+    """حساب أثر تغيير حالة الطلبات على الأرصدة دون كتابة
+
+    الأرصدة: قاموس معرف الموظف -> قاموس الخانات، يُعدل في مكانه.
+    المخصومة: معرفات الأنواع التي تخصم من الرصيد (الأنواع_المخصومة).
+    يعيد (المعرفات المنفذة، المعرفات المتعذرة لعدم كفاية الرصيد، قيود السجل الجديدة، الموظفين المعدلة أرصدتهم)
+    """
+    المنفذة, المتعذرة, القيود, المعدلة = [], [], [], set()
+    for الطلب in الطلبات.itertuples(index=False):
+        معرف_الطلب, معرف_الموظف = int(الطلب.معرف), int(الطلب.معرف_الموظف)
+        مخصوم = _عدد_صحيح(الطلب.نوع_الإجازة) in المخصومة
+        الرصيد = الأرصدة.get(معرف_الموظف)
+
+        if مخصوم and الحالة == 'معتمد' and الطلب.الحالة != 'معتمد':
+            الفروق = توزيع_الخصم(الرصيد or {}, _عدد_صحيح(الطلب.عدد_الأيام))
+            if الفروق is None or الرصيد is None:
+                المتعذرة.append(معرف_الطلب)
+                continue
+            العملية = 'خصم'
+        elif مخصوم and الطلب.الحالة == 'معتمد' and الحالة != 'معتمد' and الرصيد is not None:
+            الفروق = {خ: -ف for خ, ف in القيود_السابقة.get(معرف_الطلب, {}).items()}
+            العملية = 'استرداد'
+        else:
+            المنفذة.append(معرف_الطلب)
+            continue
+
+        for الخانة, الفرق in الفروق.items():
+            الرصيد[الخانة] = _عدد_صحيح(الرصيد[الخانة]) + الفرق
+        القيود.append(قيد(معرف_الموظف, العملية, الفروق, الرصيد.get('السنة'), معرف_الطلب, معرف_المنفذ))
+        المعدلة.add(معرف_الموظف)
+        المنفذة.append(معرف_الطلب)
+    return المنفذة, المتعذرة, القيود, المعدلة
+
+
+def ترحيل_السنة(الأرصدة, السنة_الجديدة, الرصيد_السنوي=الرصيد_السنوي, معرف_المنفذ=None):
+    """ترحيل أرصدة كل الموظفين إلى «السنة_الجديدة» في تمريرة واحدة متجهة
+
+    كل سنة منقضية تزيح الخانات خطوة: السابق_2 يسقط، السابق_1 يصبح السابق_2،
+    الحالي يصبح السابق_1، ويُمنح رصيد سنوي جديد. الصفوف المرحلة مسبقاً لا تتغير.
+    يعيد (الأرصدة بعد الترحيل، قيود السجل كـ DataFrame)
+    """
+    السنوات = الأرصدة['السنة'].fillna(السنة_الجديدة).astype('int64').to_numpy()
+    الفجوة = np.clip(السنة_الجديدة - السنوات, 0, 3)
+    المستحقة = الفجوة > 0
+
+    الحالي = الأرصدة['رصيد_السنة_الحالية'].fillna(0).astype('int64').to_numpy()
+    السابق_1 = الأرصدة['رصيد_العام_السابق_1'].fillna(0).astype('int64').to_numpy()
+    السابق_2 = الأرصدة['رصيد_العام_السابق_2'].fillna(0).astype('int64').to_numpy()
+
+    # الخانات بعد الإزاحة بعدد السنوات المنقضية (حتى 3 سنوات تسقط بعدها كل الخانات القديمة)
+    جديد_2 = np.select([الفجوة == 0, الفجوة == 1, الفجوة == 2], [السابق_2, السابق_1, الحالي], الرصيد_السنوي)
+    جديد_1 = np.select([الفجوة == 0, الفجوة == 1], [السابق_1, الحالي], الرصيد_السنوي)
+    جديد_الحالي = np.where(المستحقة, الرصيد_السنوي, الحالي)
+    الساقط = (
+        np.where(الفجوة >= 1, السابق_2, 0)
+        + np.where(الفجوة >= 2, السابق_1, 0)
+        + np.where(الفجوة >= 3, الحالي, 0)
+    )
+
+    الناتج = الأرصدة.copy()
+    الناتج['رصيد_السنة_الحالية'] = pd.array(جديد_الحالي, dtype='Int64')
+    الناتج['رصيد_العام_السابق_1'] = pd.array(جديد_1, dtype='Int64')
+    الناتج['رصيد_العام_السابق_2'] = pd.array(جديد_2, dtype='Int64')
+    الناتج.loc[المستحقة, 'السنة'] = السنة_الجديدة
+    الناتج.loc[المستحقة, 'تاريخ_التحديث'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    القيود = pd.DataFrame({
+        'معرف_الموظف': الأرصدة['معرف_الموظف'].to_numpy()[المستحقة],
+        'معرف_الطلب': pd.array([pd.NA] * int(المستحقة.sum()), dtype='Int64'),
+        'العملية': 'ترحيل',
+        'فرق_السنة_الحالية': (جديد_الحالي - الحالي)[المستحقة],
+        'فرق_العام_السابق_1': (جديد_1 - السابق_1)[المستحقة],
+        'فرق_العام_السابق_2': (جديد_2 - السابق_2)[المستحقة],
+        'الساقط': الساقط[المستحقة],
+        'السنة': السنة_الجديدة,
+        'معرف_المنفذ': pd.array([معرف_المنفذ] * int(المستحقة.sum()), dtype='Int64'),
+        'التاريخ': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    })
+    return الناتج, القيود
@@ -0,0 +1,150 @@
+"""طابور إشعارات تملؤه كتابات الطلبات ويفرغه خيط خلفي يكتب الإشعارات على دفعات"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from الاعتماد import الحالات_المعلقة
+from التخزين import الحصول_على_المخزن, جدول_المستخدمين
+from طبقة_البيانات import قفل_الملف
+
+_المسجل = logging.getLogger('نظام_الإجازات.الإشعارات')
+
+# أحداث فشلت كتابتها بعد كل المحاولات: سطر JSON لكل حدث، يعيد أول موزع يبدأ بعدها إرسالها
+ملف_الإشعارات_المعلقة = 'إشعارات_معلقة.jsonl'
+
+# رسالة صاحب الطلب عند كل حالة جديدة
+رسائل_الحالة = {
+    'معتمد': "✅ تم اعتماد طلب الإجازة رقم {معرف} ({تاريخ_البدء} - {تاريخ_الانتهاء})",
+    'مرفوض': "❌ تم رفض طلب الإجازة رقم {معرف} ({تاريخ_البدء} - {تاريخ_الانتهاء})",
+    'بانتظار المسؤول الإداري': "➡️ وافق مدير القسم على طلب الإجازة رقم {معرف} وأُحيل إلى المسؤول الإداري",
+}
+# رسالة معتمدي كل مرحلة عند وصول طلب إلى طابورهم
+رسائل_المعتمدين = {
+    'قيد المراجعة': "📝 طلب إجازة جديد رقم {معرف} من {اسم_الموظف} ({تاريخ_البدء} - {تاريخ_الانتهاء})",
+    'بانتظار المسؤول الإداري': "📝 طلب إجازة رقم {معرف} من {اسم_الموظف} ({تاريخ_البدء} - {تاريخ_الانتهاء}) "
+                               "وافق عليه مدير القسم وينتظر اعتمادك",
+}
+
+
+class موزع_الإشعارات:
+    """يستقبل الأحداث دون انتظار الكتابة، ويجمعها خيط خلفي في دفعة كل «المهلة» أو كل «حجم_الدفعة» حدث"""
+
+    def __init__(self, المخزن, حجم_الدفعة=500, المهلة=0.5, المحاولات=3, مهلة_الإعادة=0.5):
+        self.المخزن = المخزن
+        self.حجم_الدفعة = حجم_الدفعة
+        self.المهلة = المهلة
+        self.المحاولات = المحاولات
+        self.مهلة_الإعادة = مهلة_الإعادة
+        self._الطابور = queue.Queue()
+        self._استعادة_المعلقة()
+        self._الخيط = threading.Thread(target=self._العامل, name='موزع_الإشعارات', daemon=True)
+        self._الخيط.start()
+        # تفريغ ما بقي في الطابور قبل خروج العملية
+        atexit.register(self.انتظار)
+
+    def إرسال(self, معرف_المستخدم, الرسالة):
+        self._الطابور.put(('إشعارات', [{'معرف_المستخدم': int(معرف_المستخدم), 'الرسالة': الرسالة}], 0))
+
+    def طلبات_متغيرة(self, الطلبات):
+        """طلبات أضيفت أو تغيرت حالتها (قواميس بأعمدة جدول الطلبات)؛ المستلمون يُحسبون في الخيط الخلفي"""
+        الطلبات = [
+            {ع: الطلب[ع] for ع in ('معرف', 'معرف_الموظف', 'الحالة', 'تاريخ_البدء', 'تاريخ_الانتهاء')}
+            for الطلب in الطلبات
+        ]
+        if الطلبات:
+            self._الطابور.put(('طلبات', الطلبات, 0))
+
+    def انتظار(self):
+        """الانتظار حتى تُكتب كل الإشعارات المرسلة حتى الآن"""
+        self._الطابور.join()
+
+    def _إشعارات_الطلبات(self, الطلبات):
+        الأسماء = self.المخزن.قاموس_الأسماء(جدول_المستخدمين, 'اسم_الموظف')
+        الإشعارات = []
+        for الطلب in الطلبات:
+            القيم = {**الطلب, 'معرف': int(الطلب['معرف']), 'اسم_الموظف': الأسماء.get(int(الطلب['معرف_الموظف']), '')}
+            if الطلب['الحالة'] in الحالات_المعلقة:
+                الرسالة = رسائل_المعتمدين[الطلب['الحالة']].format(**القيم)
+                الإشعارات.extend(
+                    {'معرف_المستخدم': م, 'الرسالة': الرسالة}
+                    for م in self.المخزن.معرفات_المعتمدين(int(الطلب['معرف_الموظف']), الطلب['الحالة'])
+                )
+            if الطلب['الحالة'] in رسائل_الحالة:
+                الإشعارات.append({
+                    'معرف_المستخدم': int(الطلب['معرف_الموظف']),
+                    'الرسالة': رسائل_الحالة[الطلب['الحالة']].format(**القيم),
+                })
+        return الإشعارات
+
+    def _العامل(self):
+        while True:
+            الدفعة = [self._الطابور.get()]
+            النهاية = time.monotonic() + self.المهلة
+            while len(الدفعة) < self.حجم_الدفعة:
+                try:
+                    الدفعة.append(self._الطابور.get(timeout=max(0, النهاية - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                الإشعارات = []
+                for النوع, العناصر, _ in الدفعة:
+                    الإشعارات.extend(self._إشعارات_الطلبات(العناصر) if النوع == 'طلبات' else العناصر)
+                self.المخزن.إضافة_إشعارات(الإشعارات)
+            except Exception:
+                # لا يتوقف الخيط بسبب دفعة فاشلة ولا تضيع أحداثها
+                _المسجل.exception("تعذرت كتابة %d حدث إشعار", len(الدفعة))
+                self._إعادة_الدفعة(الدفعة)
+            finally:
+                for _ in الدفعة:
+                    self._الطابور.task_done()
+
+    def _إعادة_الدفعة(self, الدفعة):
+        """إعادة أحداث الدفعة إلى الطابور بعد مهلة تتضاعف، وحفظ ما استنفد محاولاته في ملف المعلقة
+
+        تُعاد قبل task_done فلا ينتهي انتظار() وفي الطابور حدث لم يُكتب.
+        """
+        المستنفدة = [(ن, ع) for ن, ع, م in الدفعة if م + 1 >= self.المحاولات]
+        المعادة = [(ن, ع, م + 1) for ن, ع, م in الدفعة if م + 1 < self.المحاولات]
+        if المعادة:
+            time.sleep(self.مهلة_الإعادة * 2 ** min(م for _, _, م in المعادة))
+            for الحدث in المعادة:
+                self._الطابور.put(الحدث)
+        if المستنفدة:
+            _المسجل.error("حُفظ %d حدث إشعار في %s لإعادة إرسالها", len(المستنفدة), ملف_الإشعارات_المعلقة)
+            with قفل_الملف(ملف_الإشعارات_المعلقة):
+                with open(ملف_الإشعارات_المعلقة, 'a', encoding='utf-8') as الملف:
+                    for النوع, العناصر in المستنفدة:
+                        الملف.write(json.dumps([النوع, العناصر], ensure_ascii=False, default=str) + '\n')
+
+    def _استعادة_المعلقة(self):
+        """وضع أحداث ملف المعلقة في الطابور بمحاولات جديدة؛ النقل باسم فريد يمنع موزعاً آخر من أخذها أيضاً"""
+        المأخوذ = f'{ملف_الإشعارات_المعلقة}.{os.getpid()}.{id(self)}'
+        with قفل_الملف(ملف_الإشعارات_المعلقة):
+            if not os.path.exists(ملف_الإشعارات_المعلقة):
+                return
+            os.replace(ملف_الإشعارات_المعلقة, المأخوذ)
+        with open(المأخوذ, encoding='utf-8') as الملف:
+            for السطر in الملف:
+                if السطر.strip():
+                    النوع, العناصر = json.loads(السطر)
+                    self._الطابور.put((النوع, العناصر, 0))
+        os.remove(المأخوذ)
+
+
+_الموزع = None
+_قفل_الموزع = threading.Lock()
+
+
+def الحصول_على_الموزع():
+    """موزع واحد للعملية مربوط بالمخزن المشترك حتى تصله أحداث كتاباته"""
+    global _الموزع
+    with _قفل_الموزع:
+        if _الموزع is None:
+            المخزن = الحصول_على_المخزن()
+            _الموزع = موزع_الإشعارات(المخزن)
+            المخزن.موزع_الإشعارات = _الموزع
+        return _الموزع
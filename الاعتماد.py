@@ -0,0 +1,50 @@
+"""مراحل اعتماد طلب الإجازة: مدير القسم أولاً ثم المسؤول الإداري، وطابور كل مرحلة في كل قسم"""
+from collections import defaultdict
+
+# حالة الطلب المعلق في كل مرحلة ونوع المستخدم الذي يعتمدها، بترتيب المراحل
+مراحل_الاعتماد = {
+    'قيد المراجعة': 'مدير',
+    'بانتظار المسؤول الإداري': 'مسؤول_إداري',
+}
+الحالات_المعلقة = tuple(مراحل_الاعتماد)
+مرحلة_المستخدم = {نوع_المستخدم: الحالة for الحالة, نوع_المستخدم in مراحل_الاعتماد.items()}
+
+
+def المراحل_التالية(الحالة):
+    """حالات المراحل بعد «الحالة» بالترتيب"""
+    return الحالات_المعلقة[الحالات_المعلقة.index(الحالة) + 1:]
+
+
+class فهرس_الطوابير:
+    """صفوف الطلبات المعلقة لكل (قسم، مرحلة)، حتى يُفتح طابور مدير دون المرور على طلبات بقية الشركة"""
+
+    def __init__(self):
+        self.الطوابير = defaultdict(dict)
+        self._المفاتيح = {}
+
+    @classmethod
+    def بناء(cls, الطلبات, الأقسام):
+        """بناء الطوابير من جدول الطلبات وقاموس معرف الموظف -> القسم"""
+        الفهرس = cls()
+        المعلقة = الطلبات[الطلبات['الحالة'].isin(الحالات_المعلقة)]
+        for الطلب, القسم in zip(
+            المعلقة.to_dict('records'), المعلقة['معرف_الموظف'].map(الأقسام).fillna('').tolist()
+        ):
+            الفهرس.تحديث(الطلب, القسم)
+        return الفهرس
+
+    def تحديث(self, الطلب, القسم):
+        """نقل طلب جديد أو متغير (قاموس بأعمدة جدول الطلبات) إلى طابور مرحلته، أو إخراجه إذا لم يعد معلقاً"""
+        المعرف = int(الطلب['معرف'])
+        المفتاح = self._المفاتيح.pop(المعرف, None)
+        if المفتاح is not None:
+            del self.الطوابير[المفتاح][المعرف]
+        if الطلب['الحالة'] in الحالات_المعلقة:
+            المفتاح = (القسم, الطلب['الحالة'])
+            self.الطوابير[المفتاح][المعرف] = الطلب
+            self._المفاتيح[المعرف] = المفتاح
+
+    def الطابور(self, القسم, الحالة):
+        """صفوف طابور القسم في المرحلة مرتبة بالمعرف"""
+        الطابور = self.الطوابير.get((القسم, الحالة), {})
+        return [الطابور[م] for م in sorted(الطابور)]
@@ -0,0 +1,87 @@
+"""تحليلات الغياب: توسيع الطلبات المعتمدة إلى أيام ومجاميع شهرية مخزنة لا يُعاد حسابها إلا للأشهر المتغيرة"""
+import numpy as np
+import pandas as pd
+
+
+def _أيام(التواريخ):
+    return pd.to_datetime(التواريخ, format='ISO8601').to_numpy().astype('datetime64[D]')
+
+
+def بداية_الشهر(اليوم):
+    return np.datetime64(اليوم, 'M').astype('datetime64[D]')
+
+
+def أشهر_الفترة(البداية, النهاية):
+    """مفاتيح الأشهر (YYYY-MM) التي تغطيها الفترة"""
+    return [str(ش) for ش in np.arange(np.datetime64(البداية, 'M'), np.datetime64(النهاية, 'M') + 1)]
+
+
+def توسيع_الأيام(البدايات, النهايات):
+    """توسيع فترات [البداية، النهاية] إلى صف لكل يوم دون حلقات
+
+    يعيد (رقم الفترة لكل يوم، اليوم) كمصفوفتين بطول مجموع أطوال الفترات.
+    """
+    الأطوال = (النهايات - البدايات).astype('int64') + 1
+    الأطوال = np.maximum(الأطوال, 0)
+    الفترات = np.repeat(np.arange(len(الأطوال)), الأطوال)
+    # موقع كل يوم داخل فترته = ترتيبه العام - موقع أول أيام فترته
+    الإزاحات = np.arange(الأطوال.sum()) - np.repeat(np.cumsum(الأطوال) - الأطوال, الأطوال)
+    return الفترات, البدايات[الفترات] + الإزاحات
+
+
+def تجميع_الغياب(الطلبات, الأقسام, البداية, النهاية):
+    """عدد الغائبين لكل (يوم، قسم، نوع إجازة) من طلبات معتمدة، مقصوصاً على [البداية، النهاية]"""
+    البداية, النهاية = np.datetime64(البداية, 'D'), np.datetime64(النهاية, 'D')
+    البدايات = np.maximum(_أيام(الطلبات['تاريخ_البدء']), البداية)
+    النهايات = np.minimum(_أيام(الطلبات['تاريخ_الانتهاء']), النهاية)
+    الفترات, الأيام = توسيع_الأيام(البدايات, النهايات)
+
+    # التجميع على رموز الأقسام والأنواع ثم فك الرموز، أسرع من groupby على نصوص
+    رموز_الأقسام, الأقسام_الفريدة = pd.factorize(الطلبات['معرف_الموظف'].map(الأقسام).fillna('').to_numpy())
+    رموز_الأنواع, الأنواع_الفريدة = pd.factorize(الطلبات['نوع_الإجازة'].to_numpy())
+    عدد_الأقسام, عدد_الأنواع = max(len(الأقسام_الفريدة), 1), max(len(الأنواع_الفريدة), 1)
+    المفاتيح = (
+        ((الأيام - البداية).astype('int64') * عدد_الأقسام + رموز_الأقسام[الفترات]) * عدد_الأنواع
+        + رموز_الأنواع[الفترات]
+    )
+    الفريدة, العدد = np.unique(المفاتيح, return_counts=True)
+    return pd.DataFrame({
+        'اليوم': البداية + الفريدة // (عدد_الأقسام * عدد_الأنواع),
+        'القسم': الأقسام_الفريدة[(الفريدة // عدد_الأنواع) % عدد_الأقسام],
+        'نوع_الإجازة': الأنواع_الفريدة[الفريدة % عدد_الأنواع],
+        'العدد': العدد,
+    })
+
+
+class مجاميع_الغياب:
+    """مجاميع الغياب اليومية مخزنة لكل شهر؛ الكتابة تُبطل أشهر الطلبات المتغيرة فقط"""
+
+    def __init__(self):
+        self.الأشهر = {}
+
+    def إبطال(self, الطلبات):
+        """إبطال أشهر كل طلب تغير (قواميس بأعمدة جدول الطلبات)"""
+        for الطلب in الطلبات:
+            for الشهر in أشهر_الفترة(الطلب['تاريخ_البدء'][:10], الطلب['تاريخ_الانتهاء'][:10]):
+                self.الأشهر.pop(الشهر, None)
+
+    def الفترة(self, الطلبات_المعتمدة, الأقسام, البداية, النهاية):
+        """مجاميع الأيام من البداية إلى النهاية، مع حساب الأشهر الناقصة فقط
+
+        الطلبات_المعتمدة: دالة (من، إلى) -> الطلبات المعتمدة المتقاطعة مع الفترة.
+        """
+        الأشهر = أشهر_الفترة(البداية, النهاية)
+        الناقصة = [ش for ش in الأشهر if ش not in self.الأشهر]
+        if الناقصة:
+            # حساب الأشهر الناقصة معاً في توسيع واحد ثم تقسيمها
+            من = بداية_الشهر(الناقصة[0])
+            إلى = بداية_الشهر(np.datetime64(الناقصة[-1], 'M') + 1) - 1
+            المجاميع = تجميع_الغياب(الطلبات_المعتمدة(str(من), str(إلى)), الأقسام, من, إلى)
+            الشهر = المجاميع['اليوم'].to_numpy().astype('datetime64[M]').astype(str)
+            for مفتاح in الناقصة:
+                self.الأشهر[مفتاح] = المجاميع[الشهر == مفتاح].reset_index(drop=True)
+
+        الناتج = pd.concat([self.الأشهر[ش] for ش in الأشهر], ignore_index=True)
+        البداية, النهاية = np.datetime64(البداية, 'D'), np.datetime64(النهاية, 'D')
+        الأيام = الناتج['اليوم'].to_numpy().astype('datetime64[D]')
+        return الناتج[(الأيام >= البداية) & (الأيام <= النهاية)].reset_index(drop=True)
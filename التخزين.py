@@ -0,0 +1,1313 @@
+"""خلفيات تخزين قابلة للتبديل: ملفات CSV أو قاعدة SQLite محلية"""
+import os
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from طبقة_البيانات import (
+    أنواع_الأعمدة, عمود_عددي, بصمة_الملف, تطبيق_الأنواع, التحقق_من_الأنواع, تعيين_قيمة, زيادة_الإصدار, نص_التاريخ,
+    تحميل_البيانات, تحميل_على_دفعات, حفظ_البيانات, إضافة_صف, إضافة_صفوف,
+    المعرف_التالي, قفل_الملف, قراءة_json, كتابة_json, تحديث_json,
+    ملف_المستخدمين, ملف_أنواع_الإجازات, ملف_أرصدة_الإجازات, ملف_طلبات_الإجازة, ملف_الإشعارات, ملف_سجل_الأرصدة,
+    ملف_الإحصائيات,
+)
+from الأرصدة import الأنواع_المخصومة, ترتيب_الخصم, تخطيط_تغيير_الحالة, ترحيل_السنة, صافي_القيود
+from الفترات import فهرس_الإجازات
+from الاعتماد import الحالات_المعلقة, مراحل_الاعتماد, فهرس_الطوابير
+from التحليلات import مجاميع_الغياب
+from الرصد import قياس, رصد_الدفعات
+import الأرشيف
+import أيام_العمل
+
+# أسماء الجداول وملفاتها
+جدول_المستخدمين = 'المستخدمين'
+جدول_أنواع_الإجازات = 'أنواع_الإجازات'
+جدول_أرصدة_الإجازات = 'أرصدة_الإجازات'
+جدول_طلبات_الإجازة = 'طلبات_الإجازة'
+جدول_الإشعارات = 'الإشعارات'
+جدول_سجل_الأرصدة = 'سجل_الأرصدة'
+
+ملفات_الجداول = {
+    جدول_المستخدمين: ملف_المستخدمين,
+    جدول_أنواع_الإجازات: ملف_أنواع_الإجازات,
+    جدول_أرصدة_الإجازات: ملف_أرصدة_الإجازات,
+    جدول_طلبات_الإجازة: ملف_طلبات_الإجازة,
+    جدول_الإشعارات: ملف_الإشعارات,
+    جدول_سجل_الأرصدة: ملف_سجل_الأرصدة,
+}
+
+
+def جدول_فارغ(اسم_الجدول):
+    """جدول بدون صفوف بأعمدة المخطط وأنواعها"""
+    الملف = ملفات_الجداول[اسم_الجدول]
+    return تطبيق_الأنواع(الملف, pd.DataFrame(columns=list(أنواع_الأعمدة[الملف])))
+
+
+def إحصائيات_فارغة():
+    return {'حسب_الحالة': {}, 'حسب_الموظف': {}, 'حسب_القسم': {}, 'المستخدمين': {'الإجمالي': 0, 'حسب_القسم': {}}}
+
+
+def إضافة_عد(الإحصائيات, معرف_الموظف, القسم, الحالة, المقدار=1):
+    """تعديل عدادات حالة واحدة للكل وللموظف ولقسمه"""
+    for العدادات in (
+        الإحصائيات['حسب_الحالة'],
+        الإحصائيات['حسب_الموظف'].setdefault(str(int(معرف_الموظف)), {}),
+        الإحصائيات['حسب_القسم'].setdefault(القسم or '', {}),
+    ):
+        العدادات[الحالة] = العدادات.get(الحالة, 0) + المقدار
+        if not العدادات[الحالة]:
+            del العدادات[الحالة]
+
+
+def حساب_الإحصائيات(المستخدمين, الطلبات):
+    """حساب الإحصائيات المجمعة كاملة من الجداول (لإعادة البناء فقط)"""
+    الإحصائيات = إحصائيات_فارغة()
+    الإحصائيات['المستخدمين'] = {
+        'الإجمالي': len(المستخدمين),
+        # العمود فئوي: value_counts تعيد الفئات الغائبة بعدد صفر
+        'حسب_القسم': {str(ق): int(ع) for ق, ع in المستخدمين['القسم'].value_counts().items() if ع},
+    }
+    if الطلبات.empty:
+        return الإحصائيات
+    الأقسام = dict(zip(المستخدمين['معرف'].tolist(), المستخدمين['القسم'].tolist()))
+    الطلبات = الطلبات.assign(القسم=الطلبات['معرف_الموظف'].map(الأقسام).fillna(''))
+    الإحصائيات['حسب_الحالة'] = {str(ح): int(ع) for ح, ع in الطلبات['الحالة'].value_counts().items() if ع}
+    for النطاق, العمود in (('حسب_الموظف', 'معرف_الموظف'), ('حسب_القسم', 'القسم')):
+        for (المفتاح, الحالة), العدد in الطلبات.groupby([العمود, 'الحالة'], observed=True).size().items():
+            الإحصائيات[النطاق].setdefault(str(المفتاح), {})[str(الحالة)] = int(العدد)
+    return الإحصائيات
+
+
+class مخزن_أساسي:
+    """الواجهة المشتركة لخلفيات التخزين"""
+
+    def __init__(self):
+        self._المشتقات = {}
+        self._قفل_المشتقات = threading.Lock()
+        # يربطه الحصول_على_الموزع في التطبيق؛ السكربتات تكتب دون إشعارات
+        self.موزع_الإشعارات = None
+
+    def مهيأ(self):
+        raise NotImplementedError
+
+    def بصمة_الجدول(self, اسم_الجدول):
+        """قيمة تتغير كلما تغير محتوى الجدول"""
+        raise NotImplementedError
+
+    def تهيئة(self, الجداول):
+        """كتابة الجداول الأولية للنظام (قاموس اسم الجدول -> DataFrame)"""
+        raise NotImplementedError
+
+    def جدول(self, اسم_الجدول):
+        raise NotImplementedError
+
+    def المستخدم(self, اسم_المستخدم):
+        """سجل المستخدم كقاموس أو None"""
+        return self.دليل_المستخدمين().get(اسم_المستخدم)
+
+    def الإحصائيات(self):
+        """العدادات المجمعة حسب الحالة والموظف والقسم، محدثة تدريجياً مع كل كتابة"""
+        raise NotImplementedError
+
+    def إعادة_بناء_الإحصائيات(self):
+        """إعادة حساب العدادات المجمعة من الجداول (للاسترداد بعد خلل)"""
+        raise NotImplementedError
+
+    def عدد_المستخدمين(self):
+        return self.الإحصائيات()['المستخدمين']['الإجمالي']
+
+    def أرصدة_الموظف(self, معرف_الموظف):
+        raise NotImplementedError
+
+    def طلبات_الموظف(self, معرف_الموظف, العدد=None):
+        """طلبات الموظف بترتيب تقديمها، أو آخر «العدد» منها فقط"""
+        raise NotImplementedError
+
+    def عدد_طلبات_الموظف(self, معرف_الموظف, الحالة=None):
+        العدادات = self.الإحصائيات()['حسب_الموظف'].get(str(int(معرف_الموظف)), {})
+        return sum(العدادات.values()) if الحالة is None else العدادات.get(الحالة, 0)
+
+    def عدد_طلبات_القسم(self, القسم, الحالة=None):
+        العدادات = self.الإحصائيات()['حسب_القسم'].get(القسم, {})
+        return sum(العدادات.values()) if الحالة is None else العدادات.get(الحالة, 0)
+
+    def الطلبات_بالحالة(self, الحالة):
+        raise NotImplementedError
+
+    def عدد_الطلبات_بالحالة(self, الحالة):
+        return self.الإحصائيات()['حسب_الحالة'].get(الحالة, 0)
+
+    def إضافة_طلب(self, الطلب):
+        """إضافة طلب إجازة وإرجاع معرفه"""
+        raise NotImplementedError
+
+    def معاملة_الطلبات(self):
+        """كتلة حصرية على جدول الطلبات بين العمليات: فحص ثم إضافة داخلها لا تتخللهما كتابة أخرى
+
+        متداخلة: إضافة_طلب داخلها تعمل في نفس القفل أو المعاملة.
+        """
+        raise NotImplementedError
+
+    def صفحة_الطلبات(self, الحالة, القسم=None, نوع_الإجازة=None, من_تاريخ=None, إلى_تاريخ=None,
+                      الإزاحة=0, الحد=50):
+        """صفحة من الطلبات المصفاة مع العدد الإجمالي المطابق للمرشحات
+
+        المرشحات الفارغة (None) لا تُطبق، والفترة تطابق الطلبات المتقاطعة معها.
+        """
+        raise NotImplementedError
+
+    def دفعات_الطلبات(self, الحالة=None, القسم=None, نوع_الإجازة=None, من_تاريخ=None, إلى_تاريخ=None,
+                       حجم_الدفعة=10_000, مع_الأرشيف=False):
+        """مولد دفعات الطلبات المطابقة للمرشحات (مثل صفحة_الطلبات والحالة اختيارية) بذاكرة محدودة
+
+        مع_الأرشيف تسبقها الطلبات المؤرشفة المطابقة من أقسام السنوات المتقاطعة مع الفترة.
+        """
+        if مع_الأرشيف and الحالة in (None, *الأرشيف.الحالات_المغلقة):
+            for الدفعة in الأرشيف.دفعات(حجم_الدفعة, من_تاريخ, إلى_تاريخ):
+                الدفعة = self._ترشيح_الطلبات(الدفعة, الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ)
+                if not الدفعة.empty:
+                    yield الدفعة
+        yield from self._دفعات_الطلبات_الحية(الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ, حجم_الدفعة)
+
+    def _دفعات_الطلبات_الحية(self, الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ, حجم_الدفعة):
+        raise NotImplementedError
+
+    def _ترشيح_الطلبات(self, الطلبات, الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ):
+        if الحالة is not None:
+            الطلبات = الطلبات[الطلبات['الحالة'] == الحالة]
+        if القسم is not None:
+            الأقسام = الطلبات['معرف_الموظف'].map(self.قاموس_الأسماء(جدول_المستخدمين, 'القسم'))
+            الطلبات = الطلبات[الأقسام == القسم]
+        if نوع_الإجازة is not None:
+            الطلبات = الطلبات[الطلبات['نوع_الإجازة'] == نوع_الإجازة]
+        if من_تاريخ is not None:
+            الطلبات = الطلبات[الطلبات['تاريخ_الانتهاء'] >= من_تاريخ]
+        if إلى_تاريخ is not None:
+            الطلبات = الطلبات[الطلبات['تاريخ_البدء'] <= إلى_تاريخ]
+        return الطلبات
+
+    def أرشفة_الطلبات(self, تاريخ_القطع):
+        """نقل الطلبات المعتمدة والمرفوضة المنتهية قبل تاريخ القطع إلى الأرشيف السنوي وإرجاع عددها
+
+        تنقص عدادات لوحات التحكم بعددها لأنها تحسب جدول الطلبات الحي كما تفعل إعادة بنائها.
+        """
+        raise NotImplementedError
+
+    def طلبات_الموظف_المؤرشفة(self, معرف_الموظف):
+        الطلبات = الأرشيف.قراءة()
+        return الطلبات[الطلبات['معرف_الموظف'] == معرف_الموظف]
+
+    def الأيام_المحتسبة(self, الطلبات):
+        """أيام العمل لكل طلب بتقويم العمل الحالي وجدول ورديات قسم صاحبه"""
+        الأقسام = self.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+        return أيام_العمل.التقويم().أيام_الطلبات(
+            الطلبات['تاريخ_البدء'], الطلبات['تاريخ_الانتهاء'],
+            الطلبات['معرف_الموظف'].map(الأقسام).fillna('').astype(object),
+        )
+
+    def إعادة_حساب_الأيام(self, الحالات=الحالات_المعلقة):
+        """إعادة حساب عدد_الأيام لطلبات الحالات (كل الطلبات مع None) في كتابة واحدة وإرجاع عدد المتغيرة
+
+        الافتراضي الطلبات المعلقة في مراحل الاعتماد وحدها: المعتمدة خُصمت أيامها من الرصيد، واسترداد إلغائها من قيود السجل.
+        """
+        raise NotImplementedError
+
+    def _إبقاء_مشتقات_الطلبات(self, البصمة_السابقة, البصمة_الجديدة):
+        # الفترات والغياب لا تعتمد على عدد الأيام فتبقى كما هي بعد إعادة حسابه
+        for المفتاح in ('الفترات', 'الغياب'):
+            self.تعديل_المشتق(جدول_طلبات_الإجازة, المفتاح, البصمة_السابقة, البصمة_الجديدة, lambda _: None)
+
+    def الأقسام(self):
+        raise NotImplementedError
+
+    def تحديث_حالة_الطلبات(self, المعرفات, الحالة, معرف_المدير, الإصدارات=None):
+        """تحديث حالة مجموعة طلبات في كتابة واحدة مع خصم الرصيد عند الاعتماد أو استرداده عند إلغائه
+
+        الإصدارات: قاموس معرف الطلب -> إصداره كما عرضه صاحب القرار؛ الطلب الذي تغير إصداره منذ ذلك
+        (قرار من عملية أخرى أو إعادة حساب أيامه) لا يُطبق عليه القرار.
+        يعيد (معرفات الطلبات المحدثة، معرفات المتعارضة)؛ الطلبات التي لا يكفي رصيدها للاعتماد تبقى دون تغيير
+        """
+        raise NotImplementedError
+
+    def تحديث_حالة_الطلب(self, معرف_الطلب, الحالة, معرف_المدير, الإصدار=None):
+        الإصدارات = None if الإصدار is None else {معرف_الطلب: الإصدار}
+        return bool(self.تحديث_حالة_الطلبات([معرف_الطلب], الحالة, معرف_المدير, الإصدارات)[0])
+
+    @staticmethod
+    def _فصل_المتعارضة(المستهدفة, الإصدارات):
+        """الطلبات التي ما زال إصدارها كما قرأه صاحب القرار، ومعرفات التي تغيرت بعده"""
+        if not الإصدارات:
+            return المستهدفة, []
+        المتوقعة = المستهدفة['معرف'].map({int(م): int(إ) for م, إ in الإصدارات.items()})
+        الحالية = المستهدفة['الإصدار'].fillna(0) if 'الإصدار' in المستهدفة else 0
+        المتعارضة = (المتوقعة.notna() & (المتوقعة != الحالية)).to_numpy(bool)
+        return المستهدفة[~المتعارضة], المستهدفة.loc[المتعارضة, 'معرف'].astype(int).tolist()
+
+    def سجل_أرصدة_الموظف(self, معرف_الموظف):
+        """حركات رصيد الموظف (خصم، استرداد، ترحيل) بترتيب حدوثها"""
+        raise NotImplementedError
+
+    def ترحيل_الأرصدة(self, السنة_الجديدة, معرف_المنفذ=None):
+        """ترحيل أرصدة كل الموظفين إلى سنة جديدة وإرجاع عدد الأرصدة المرحلة"""
+        raise NotImplementedError
+
+    def إضافة_مستخدم(self, المستخدم, الرصيد):
+        """إضافة مستخدم مع رصيد إجازاته وإرجاع معرفه"""
+        return self.إضافة_مستخدمين(pd.DataFrame([المستخدم]), pd.DataFrame([الرصيد]))[0]
+
+    def إضافة_مستخدمين(self, المستخدمين, الأرصدة):
+        """إضافة مستخدمين مع صف رصيد مقابل لكل منهم بنفس الترتيب في كتابة واحدة، وإرجاع معرفاتهم
+
+        يرفع ValueError دون إضافة أي منهم إذا تكرر اسم مستخدم في الدفعة أو كان موجوداً مسبقاً.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _رفض_الأسماء_المكررة(المستخدمين, الموجودة):
+        الأسماء = المستخدمين['اسم_المستخدم']
+        المكررة = sorted(set(الأسماء[الأسماء.duplicated()]) | (set(الأسماء) & set(الموجودة)))
+        if المكررة:
+            raise ValueError(f"اسم المستخدم موجود مسبقاً: {', '.join(map(str, المكررة))}")
+
+    def إضافة_إشعارات(self, الإشعارات):
+        """إضافة إشعارات (قواميس بمعرف_المستخدم والرسالة) غير مقروءة في كتابة واحدة"""
+        raise NotImplementedError
+
+    def إشعارات_المستخدم(self, معرف_المستخدم, العدد=50):
+        """أحدث إشعارات المستخدم أولاً"""
+        raise NotImplementedError
+
+    def تعليم_الإشعارات_مقروءة(self, معرف_المستخدم):
+        raise NotImplementedError
+
+    def عدد_الإشعارات_غير_المقروءة(self, معرف_المستخدم):
+        """من فهرس غير المقروءة في الذاكرة دون مسح جدول الإشعارات"""
+        return self.مشتق_من_الجدول(
+            جدول_الإشعارات, 'غير_المقروءة', self._عد_غير_المقروءة, يقرأ_الجدول=False
+        ).get(int(معرف_المستخدم), 0)
+
+    def _عد_غير_المقروءة(self):
+        الإشعارات = self.جدول(جدول_الإشعارات)
+        return Counter(الإشعارات.loc[الإشعارات['مقروء'].fillna(0) == 0, 'معرف_المستخدم'].astype(int).tolist())
+
+    def _جديدة_غير_مقروءة(self, الإشعارات):
+        الآن = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return [{'مقروء': 0, 'تاريخ_الإنشاء': الآن, **ش} for ش in الإشعارات]
+
+    def معتمدو_القسم(self, القسم, نوع_المستخدم):
+        """معرفات المستخدمين النشطين من نوع في القسم (مدير_النظام لكل الأقسام)"""
+        def بناء(الجدول):
+            النشطون = الجدول[الجدول['الحالة'] == 'نشط']
+            المعتمدون = {}
+            for (النوع, قسم), المعرفات in النشطون.groupby(['نوع_المستخدم', 'القسم'], observed=True)['معرف']:
+                المعتمدون.setdefault((النوع, قسم), []).extend(المعرفات.astype(int).tolist())
+            return المعتمدون
+
+        المعتمدون = self.مشتق_من_الجدول(جدول_المستخدمين, 'المعتمدون', بناء)
+        if نوع_المستخدم == 'مدير_النظام':
+            return [م for (النوع, _), المعرفات in المعتمدون.items() if النوع == نوع_المستخدم for م in المعرفات]
+        return المعتمدون.get((نوع_المستخدم, القسم), [])
+
+    def معرفات_المعتمدين(self, معرف_الموظف, الحالة='قيد المراجعة'):
+        """من يراجع طلب الموظف في مرحلة «الحالة» ويُشعر به: معتمدو المرحلة في قسمه، أو مدير النظام إذا لم يوجدوا"""
+        القسم = self.قاموس_الأسماء(جدول_المستخدمين, 'القسم').get(int(معرف_الموظف), '')
+        المعتمدون = [
+            م for م in self.معتمدو_القسم(القسم, مراحل_الاعتماد.get(الحالة, 'مدير_النظام')) if م != int(معرف_الموظف)
+        ]
+        return المعتمدون or self.معتمدو_القسم(القسم, 'مدير_النظام')
+
+    def أنواع_الإجازات(self):
+        return self.جدول(جدول_أنواع_الإجازات)
+
+    def معرفات_الأنواع_المخصومة(self):
+        """أنواع الإجازات التي تخصم من الرصيد، يُعاد حسابها فقط عند تغير جدول الأنواع"""
+        return self.مشتق_من_الجدول(جدول_أنواع_الإجازات, 'المخصومة', الأنواع_المخصومة)
+
+    def المستخدمين(self):
+        return self.جدول(جدول_المستخدمين)
+
+    def مشتق_من_الجدول(self, اسم_الجدول, المفتاح, البناء, يقرأ_الجدول=True):
+        """بنية مشتقة من جدول كامل تُبنى مرة وتُعاد بناؤها فقط عند تغير بصمته
+
+        مع يقرأ_الجدول=False تُستدعى البناء دون معاملات للبنى التي تملأ نفسها عند الطلب.
+        """
+        البصمة = self.بصمة_الجدول(اسم_الجدول)
+        with self._قفل_المشتقات:
+            العنصر = self._المشتقات.get((اسم_الجدول, المفتاح))
+            if العنصر is not None and العنصر[0] == البصمة:
+                return العنصر[1]
+        المشتق = البناء(self.جدول(اسم_الجدول)) if يقرأ_الجدول else البناء()
+        with self._قفل_المشتقات:
+            self._المشتقات[(اسم_الجدول, المفتاح)] = (البصمة, المشتق)
+        return المشتق
+
+    def تعديل_المشتق(self, اسم_الجدول, المفتاح, البصمة_السابقة, البصمة_الجديدة, التعديل):
+        """تطبيق كتابة معروفة على بنية مشتقة بدلاً من إعادة بنائها، ما لم يتغير الجدول من مصدر آخر"""
+        with self._قفل_المشتقات:
+            العنصر = self._المشتقات.get((اسم_الجدول, المفتاح))
+            if العنصر is None:
+                return
+            if العنصر[0] != البصمة_السابقة:
+                del self._المشتقات[(اسم_الجدول, المفتاح)]
+                return
+            التعديل(العنصر[1])
+            self._المشتقات[(اسم_الجدول, المفتاح)] = (البصمة_الجديدة, العنصر[1])
+
+    def فهرس_الإجازات(self):
+        """فهرس فترات الطلبات الفعالة لكل موظف ولكل قسم، يُحدث تدريجياً مع كتابات هذه العملية"""
+        return self.مشتق_من_الجدول(
+            جدول_طلبات_الإجازة, 'الفترات',
+            lambda الطلبات: فهرس_الإجازات.بناء(الطلبات, self.قاموس_الأسماء(جدول_المستخدمين, 'القسم'))
+        )
+
+    def فهرس_الطوابير(self):
+        """طوابير الطلبات المعلقة لكل قسم ومرحلة اعتماد، تُحدث تدريجياً مع كتابات هذه العملية"""
+        return self.مشتق_من_الجدول(
+            جدول_طلبات_الإجازة, 'الطوابير',
+            lambda الطلبات: فهرس_الطوابير.بناء(الطلبات, self.قاموس_الأسماء(جدول_المستخدمين, 'القسم'))
+        )
+
+    def طابور_الاعتماد(self, القسم, الحالة, الإزاحة=0, الحد=50, باستثناء_الموظف=None):
+        """صفحة من طلبات القسم المعلقة في مرحلة «الحالة» وعددها الكلي، من الفهرس دون المرور على الجدول
+
+        باستثناء_الموظف: معرف المعتمد حتى لا تُعرض عليه طلباته هو.
+        """
+        الطابور = self.فهرس_الطوابير().الطابور(القسم, الحالة)
+        if باستثناء_الموظف is not None:
+            الطابور = [ط for ط in الطابور if int(ط['معرف_الموظف']) != int(باستثناء_الموظف)]
+        الصفحة = pd.DataFrame(الطابور[الإزاحة:الإزاحة + الحد], columns=list(أنواع_الأعمدة[ملف_طلبات_الإجازة]))
+        return تطبيق_الأنواع(ملف_طلبات_الإجازة, الصفحة), len(الطابور)
+
+    def _تحديث_مشتقات_الطلبات(self, البصمة_السابقة, البصمة_الجديدة, الطلبات):
+        """تطبيق طلبات أضيفت أو تغيرت حالتها على فهرس الفترات والطوابير ومجاميع الغياب وإرسال إشعاراتها"""
+        الأقسام = self.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+        # صفوف الجدول تحمل التواريخ محللة والطلبات الجديدة نصوصاً؛ المشتقات تستقبل صيغة التخزين
+        الطلبات = [
+            {**الطلب, 'تاريخ_البدء': نص_التاريخ(الطلب['تاريخ_البدء']),
+             'تاريخ_الانتهاء': نص_التاريخ(الطلب['تاريخ_الانتهاء'])}
+            for الطلب in الطلبات
+        ]
+
+        def تطبيق(الفهرس):
+            for الطلب in الطلبات:
+                الفهرس.تحديث(الطلب, الأقسام.get(int(الطلب['معرف_الموظف']), ''))
+
+        self.تعديل_المشتق(جدول_طلبات_الإجازة, 'الفترات', البصمة_السابقة, البصمة_الجديدة, تطبيق)
+        self.تعديل_المشتق(جدول_طلبات_الإجازة, 'الطوابير', البصمة_السابقة, البصمة_الجديدة, تطبيق)
+        self.تعديل_المشتق(
+            جدول_طلبات_الإجازة, 'الغياب', البصمة_السابقة, البصمة_الجديدة,
+            lambda المجاميع: المجاميع.إبطال(الطلبات),
+        )
+        if self.موزع_الإشعارات is not None:
+            self.موزع_الإشعارات.طلبات_متغيرة(الطلبات)
+
+    def تعارضات_الطلب(self, معرف_الموظف, تاريخ_البدء, تاريخ_الانتهاء):
+        """طلبات الموظف الفعالة المتداخلة مع الفترة، وعدد الغائبين من قسمه في كل يوم منها"""
+        الفهرس = self.فهرس_الإجازات()
+        القسم = self.قاموس_الأسماء(جدول_المستخدمين, 'القسم').get(معرف_الموظف, '')
+        return (
+            الفهرس.طلبات_متداخلة(معرف_الموظف, تاريخ_البدء, تاريخ_الانتهاء),
+            الفهرس.الغياب_اليومي(القسم, تاريخ_البدء, تاريخ_الانتهاء),
+        )
+
+    def _الطلبات_المعتمدة_في_الفترة(self, من_تاريخ, إلى_تاريخ):
+        الطلبات = self.جدول(جدول_طلبات_الإجازة)
+        return الطلبات[
+            (الطلبات['الحالة'] == 'معتمد')
+            & (الطلبات['تاريخ_البدء'] <= إلى_تاريخ) & (الطلبات['تاريخ_الانتهاء'] >= من_تاريخ)
+        ]
+
+    def _المعتمدة_مع_الأرشيف(self, من_تاريخ, إلى_تاريخ):
+        الحية = self._الطلبات_المعتمدة_في_الفترة(من_تاريخ, إلى_تاريخ)
+        if not الأرشيف.السنوات(من_تاريخ, إلى_تاريخ):
+            return الحية
+        المؤرشفة = self._ترشيح_الطلبات(الأرشيف.قراءة(من_تاريخ, إلى_تاريخ), 'معتمد', None, None, من_تاريخ, إلى_تاريخ)
+        # طلب بقي في الجدول بعد انقطاع أثناء أرشفته يُحسب مرة واحدة
+        return pd.concat([الحية, المؤرشفة], ignore_index=True).drop_duplicates('معرف')
+
+    def مجاميع_الغياب(self, من_تاريخ, إلى_تاريخ):
+        """عدد الغائبين بطلبات معتمدة لكل (يوم، قسم، نوع إجازة) في الفترة، من مجاميع شهرية مخزنة
+
+        تشمل الطلبات المؤرشفة؛ الأرشفة تغير بصمة جدول الطلبات فتُبنى المجاميع من جديد.
+        """
+        المجاميع = self.مشتق_من_الجدول(جدول_طلبات_الإجازة, 'الغياب', مجاميع_الغياب, يقرأ_الجدول=False)
+        return المجاميع.الفترة(
+            self._المعتمدة_مع_الأرشيف, self.قاموس_الأسماء(جدول_المستخدمين, 'القسم'),
+            str(من_تاريخ), str(إلى_تاريخ),
+        )
+
+    def قاموس_الأسماء(self, اسم_الجدول, عمود_الاسم):
+        """قاموس معرف -> اسم يُعاد بناؤه فقط عند تغير الجدول"""
+        return self.مشتق_من_الجدول(
+            اسم_الجدول, ('أسماء', عمود_الاسم),
+            lambda الجدول: dict(zip(الجدول['معرف'].tolist(), الجدول[عمود_الاسم].tolist()))
+        )
+
+    def دليل_المستخدمين(self):
+        """فهرس اسم المستخدم -> سجل المستخدم لتسجيل الدخول بزمن ثابت"""
+        return self.مشتق_من_الجدول(
+            جدول_المستخدمين, 'الدليل',
+            lambda الجدول: {م['اسم_المستخدم']: م for م in الجدول.drop_duplicates('اسم_المستخدم').to_dict('records')}
+        )
+
+    def إضافة_الأسماء(self, الطلبات, أسماء_الموظفين=False):
+        """إضافة اسم الإجازة (واسم الموظف عند الطلب) لجدول طلبات بربط متجه واحد"""
+        الطلبات = الطلبات.copy()
+        الطلبات['اسم_الإجازة'] = الطلبات['نوع_الإجازة'].map(
+            self.قاموس_الأسماء(جدول_أنواع_الإجازات, 'اسم_الإجازة')
+        ).fillna("غير معروف")
+        if أسماء_الموظفين:
+            الطلبات['اسم_الموظف'] = الطلبات['معرف_الموظف'].map(
+                self.قاموس_الأسماء(جدول_المستخدمين, 'اسم_الموظف')
+            ).fillna("غير معروف")
+        return الطلبات
+
+
+class مخزن_CSV(مخزن_أساسي):
+    """التخزين في ملفات CSV عبر طبقة البيانات المخزنة مؤقتاً"""
+
+    def مهيأ(self):
+        return os.path.exists(ملف_المستخدمين)
+
+    def بصمة_الجدول(self, اسم_الجدول):
+        return بصمة_الملف(os.path.abspath(ملفات_الجداول[اسم_الجدول]))
+
+    def تهيئة(self, الجداول):
+        for اسم_الجدول, البيانات in الجداول.items():
+            حفظ_البيانات(ملفات_الجداول[اسم_الجدول], البيانات)
+        self.إعادة_بناء_الإحصائيات()
+
+    def جدول(self, اسم_الجدول):
+        البيانات = تحميل_البيانات(ملفات_الجداول[اسم_الجدول])
+        if البيانات.empty and len(البيانات.columns) == 0:
+            return جدول_فارغ(اسم_الجدول)
+        return البيانات
+
+    def الإحصائيات(self):
+        البصمة = بصمة_الملف(os.path.abspath(ملف_الإحصائيات))
+        if البصمة is None:
+            return self.إعادة_بناء_الإحصائيات()
+        المخزنة = getattr(self, '_الإحصائيات_المخزنة', None)
+        if المخزنة is None or المخزنة[0] != البصمة:
+            المخزنة = self._الإحصائيات_المخزنة = (البصمة, قراءة_json(ملف_الإحصائيات, None) or إحصائيات_فارغة())
+        return المخزنة[1]
+
+    def إعادة_بناء_الإحصائيات(self):
+        with قفل_الملف(ملف_طلبات_الإجازة), قفل_الملف(ملف_المستخدمين), قفل_الملف(ملف_الإحصائيات):
+            الإحصائيات = حساب_الإحصائيات(self.جدول(جدول_المستخدمين), self.جدول(جدول_طلبات_الإجازة))
+            كتابة_json(ملف_الإحصائيات, الإحصائيات)
+        return الإحصائيات
+
+    def _تعديل_الإحصائيات(self, التعديل):
+        """تطبيق فروق العدادات على ملف الإحصائيات (يُستدعى تحت قفل الجدول المعدل)"""
+        if not os.path.exists(ملف_الإحصائيات):
+            self.إعادة_بناء_الإحصائيات()
+            return
+        تحديث_json(ملف_الإحصائيات, lambda الإحصائيات: التعديل(الإحصائيات or إحصائيات_فارغة()))
+
+    def أرصدة_الموظف(self, معرف_الموظف):
+        الأرصدة = self.جدول(جدول_أرصدة_الإجازات)
+        return الأرصدة[الأرصدة['معرف_الموظف'] == معرف_الموظف]
+
+    def طلبات_الموظف(self, معرف_الموظف, العدد=None):
+        الطلبات = self.جدول(جدول_طلبات_الإجازة)
+        طلبات_الموظف = الطلبات[الطلبات['معرف_الموظف'] == معرف_الموظف]
+        return طلبات_الموظف if العدد is None else طلبات_الموظف.tail(العدد)
+
+    def الطلبات_بالحالة(self, الحالة):
+        الطلبات = self.جدول(جدول_طلبات_الإجازة)
+        return الطلبات[الطلبات['الحالة'] == الحالة]
+
+    def معاملة_الطلبات(self):
+        return قفل_الملف(ملف_طلبات_الإجازة)
+
+    def إضافة_طلب(self, الطلب):
+        الطلب = {'معرف': المعرف_التالي(ملف_طلبات_الإجازة), **الطلب}
+        القسم = self.قاموس_الأسماء(جدول_المستخدمين, 'القسم').get(الطلب['معرف_الموظف'], '')
+        with قفل_الملف(ملف_طلبات_الإجازة):
+            البصمة_السابقة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+            إضافة_صف(ملف_طلبات_الإجازة, الطلب)
+            self._تحديث_مشتقات_الطلبات(البصمة_السابقة, self.بصمة_الجدول(جدول_طلبات_الإجازة), [الطلب])
+            self._تعديل_الإحصائيات(
+                lambda الإحصائيات: إضافة_عد(الإحصائيات, الطلب['معرف_الموظف'], القسم, الطلب['الحالة'])
+            )
+        return الطلب['معرف']
+
+    def صفحة_الطلبات(self, الحالة, القسم=None, نوع_الإجازة=None, من_تاريخ=None, إلى_تاريخ=None,
+                      الإزاحة=0, الحد=50):
+        الطلبات = self._ترشيح_الطلبات(
+            self.الطلبات_بالحالة(الحالة), None, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ
+        )
+        return الطلبات.iloc[الإزاحة:الإزاحة + الحد], len(الطلبات)
+
+    def _دفعات_الطلبات_الحية(self, الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ, حجم_الدفعة):
+        for الدفعة in تحميل_على_دفعات(ملف_طلبات_الإجازة, حجم_الدفعة):
+            الدفعة = self._ترشيح_الطلبات(الدفعة, الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ)
+            if not الدفعة.empty:
+                yield الدفعة
+
+    def إعادة_حساب_الأيام(self, الحالات=الحالات_المعلقة):
+        with قفل_الملف(ملف_طلبات_الإجازة):
+            الطلبات = self.جدول(جدول_طلبات_الإجازة)
+            المستهدفة = الطلبات if الحالات is None else الطلبات[الطلبات['الحالة'].isin(الحالات)]
+            الأيام = self.الأيام_المحتسبة(المستهدفة)
+            المتغيرة = المستهدفة['عدد_الأيام'].ne(الأيام).fillna(True).to_numpy(bool)
+            if not المتغيرة.any():
+                return 0
+            الطلبات.loc[المستهدفة.index[المتغيرة], 'عدد_الأيام'] = الأيام[المتغيرة]
+            زيادة_الإصدار(الطلبات, المستهدفة.index[المتغيرة])
+            البصمة_السابقة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+            حفظ_البيانات(ملف_طلبات_الإجازة, الطلبات)
+            self._إبقاء_مشتقات_الطلبات(البصمة_السابقة, self.بصمة_الجدول(جدول_طلبات_الإجازة))
+        return int(المتغيرة.sum())
+
+    def الأقسام(self):
+        return sorted(ق for ق in self.جدول(جدول_المستخدمين)['القسم'].unique() if ق)
+
+    def تحديث_حالة_الطلبات(self, المعرفات, الحالة, معرف_المدير, الإصدارات=None):
+        # تحديث نسخ حديثة من الملفات تحت أقفالها
+        with قفل_الملف(ملف_طلبات_الإجازة), قفل_الملف(ملف_أرصدة_الإجازات), قفل_الملف(ملف_سجل_الأرصدة):
+            الطلبات = self.جدول(جدول_طلبات_الإجازة)
+            المستهدفة, المتعارضة = self._فصل_المتعارضة(
+                الطلبات[الطلبات['معرف'].isin([int(م) for م in المعرفات])], الإصدارات
+            )
+
+            جدول_الأرصدة = self.جدول(جدول_أرصدة_الإجازات)
+            الأرصدة = {
+                int(ص['معرف_الموظف']): ص
+                for ص in جدول_الأرصدة[جدول_الأرصدة['معرف_الموظف'].isin(المستهدفة['معرف_الموظف'])]
+                .drop_duplicates('معرف_الموظف').reset_index().to_dict('records')
+            }
+            القيود_السابقة = {}
+            if (المستهدفة['الحالة'] == 'معتمد').any():
+                القيود_السابقة = صافي_القيود(self.جدول(جدول_سجل_الأرصدة))
+            المنفذة, _, القيود, المعدلة = تخطيط_تغيير_الحالة(
+                المستهدفة, الأرصدة, القيود_السابقة, الحالة, معرف_المدير, self.معرفات_الأنواع_المخصومة()
+            )
+
+            الصفوف = الطلبات['معرف'].isin(المنفذة)
+            السابقة = الطلبات.loc[الصفوف, ['معرف_الموظف', 'الحالة']].to_records(index=False)
+            تعيين_قيمة(الطلبات, الصفوف, 'الحالة', الحالة)
+            الطلبات.loc[الصفوف, 'معرف_المدير_الموافق'] = معرف_المدير
+            زيادة_الإصدار(الطلبات, الصفوف)
+            البصمة_السابقة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+            حفظ_البيانات(ملف_طلبات_الإجازة, الطلبات)
+            self._تحديث_مشتقات_الطلبات(
+                البصمة_السابقة, self.بصمة_الجدول(جدول_طلبات_الإجازة), الطلبات[الصفوف].to_dict('records')
+            )
+
+            if المعدلة:
+                for معرف_الموظف in المعدلة:
+                    الرصيد = الأرصدة[معرف_الموظف]
+                    جدول_الأرصدة.loc[الرصيد['index'], ترتيب_الخصم] = [الرصيد[خ] for خ in ترتيب_الخصم]
+                    جدول_الأرصدة.loc[الرصيد['index'], 'تاريخ_التحديث'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                حفظ_البيانات(ملف_أرصدة_الإجازات, جدول_الأرصدة)
+                self._إلحاق_القيود(القيود)
+
+            الأقسام = self.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+
+            def نقل_العدادات(الإحصائيات):
+                for معرف_الموظف, الحالة_السابقة in السابقة:
+                    القسم = الأقسام.get(معرف_الموظف, '')
+                    إضافة_عد(الإحصائيات, معرف_الموظف, القسم, الحالة_السابقة, -1)
+                    إضافة_عد(الإحصائيات, معرف_الموظف, القسم, الحالة, 1)
+
+            self._تعديل_الإحصائيات(نقل_العدادات)
+        return المنفذة, المتعارضة
+
+    def أرشفة_الطلبات(self, تاريخ_القطع):
+        with قفل_الملف(ملف_طلبات_الإجازة):
+            الطلبات = self.جدول(جدول_طلبات_الإجازة)
+            المستحقة = الأرشيف.المستحقة(الطلبات, تاريخ_القطع)
+            if not المستحقة.any():
+                return 0
+            المؤرشفة = الطلبات[المستحقة]
+            الأرشيف.إلحاق(المؤرشفة)
+            # تثبيت عداد المعرفات قبل الحذف: يبدأ عند أول استخدام من أكبر معرف باقٍ في الجدول
+            المعرف_التالي(ملف_طلبات_الإجازة, 0)
+            حفظ_البيانات(ملف_طلبات_الإجازة, الطلبات[~المستحقة])
+
+            الأقسام = self.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+
+            def طرح_العدادات(الإحصائيات):
+                for معرف_الموظف, الحالة in المؤرشفة[['معرف_الموظف', 'الحالة']].itertuples(index=False):
+                    إضافة_عد(الإحصائيات, معرف_الموظف, الأقسام.get(معرف_الموظف, ''), الحالة, -1)
+
+            self._تعديل_الإحصائيات(طرح_العدادات)
+        return len(المؤرشفة)
+
+    def _إلحاق_القيود(self, القيود):
+        if not القيود:
+            return
+        أول_معرف = المعرف_التالي(ملف_سجل_الأرصدة, len(القيود))
+        إضافة_صفوف(ملف_سجل_الأرصدة, [{'معرف': أول_معرف + ر, **ق} for ر, ق in enumerate(القيود)])
+
+    def سجل_أرصدة_الموظف(self, معرف_الموظف):
+        السجل = self.جدول(جدول_سجل_الأرصدة)
+        return السجل[السجل['معرف_الموظف'] == معرف_الموظف]
+
+    def ترحيل_الأرصدة(self, السنة_الجديدة, معرف_المنفذ=None):
+        with قفل_الملف(ملف_أرصدة_الإجازات), قفل_الملف(ملف_سجل_الأرصدة):
+            الأرصدة, القيود = ترحيل_السنة(self.جدول(جدول_أرصدة_الإجازات), السنة_الجديدة, معرف_المنفذ=معرف_المنفذ)
+            if القيود.empty:
+                return 0
+            حفظ_البيانات(ملف_أرصدة_الإجازات, الأرصدة)
+            self._إلحاق_القيود(القيود.to_dict('records'))
+        return len(القيود)
+
+    def إضافة_مستخدمين(self, المستخدمين, الأرصدة):
+        if المستخدمين.empty:
+            return []
+        with قفل_الملف(ملف_المستخدمين):
+            # الفحص والإلحاق تحت نفس القفل حتى لا تضيف عمليتان نفس الاسم معاً
+            self._رفض_الأسماء_المكررة(المستخدمين, self.دليل_المستخدمين())
+            أول_معرف = المعرف_التالي(ملف_المستخدمين, len(المستخدمين))
+            المعرفات = list(range(أول_معرف, أول_معرف + len(المستخدمين)))
+            المستخدمين = المستخدمين.assign(معرف=المعرفات)
+            أول_رصيد = المعرف_التالي(ملف_أرصدة_الإجازات, len(الأرصدة))
+            الأرصدة = الأرصدة.assign(معرف=range(أول_رصيد, أول_رصيد + len(الأرصدة)), معرف_الموظف=المعرفات)
+            إضافة_صفوف(ملف_المستخدمين, المستخدمين.to_dict('records'))
+            الأقسام = المستخدمين.get('القسم', pd.Series('', index=المستخدمين.index)).fillna('').value_counts()
+
+            def عد_المستخدمين(الإحصائيات):
+                العدادات = الإحصائيات['المستخدمين']
+                العدادات['الإجمالي'] += len(المستخدمين)
+                for القسم, العدد in الأقسام.items():
+                    العدادات['حسب_القسم'][القسم] = العدادات['حسب_القسم'].get(القسم, 0) + int(العدد)
+
+            self._تعديل_الإحصائيات(عد_المستخدمين)
+        إضافة_صفوف(ملف_أرصدة_الإجازات, الأرصدة.to_dict('records'))
+        return المعرفات
+
+    def إضافة_إشعارات(self, الإشعارات):
+        if not الإشعارات:
+            return
+        with قفل_الملف(ملف_الإشعارات):
+            أول_معرف = المعرف_التالي(ملف_الإشعارات, len(الإشعارات))
+            الصفوف = [{'معرف': أول_معرف + ر, **ش} for ر, ش in enumerate(self._جديدة_غير_مقروءة(الإشعارات))]
+            البصمة_السابقة = self.بصمة_الجدول(جدول_الإشعارات)
+            إضافة_صفوف(ملف_الإشعارات, الصفوف)
+            self.تعديل_المشتق(
+                جدول_الإشعارات, 'غير_المقروءة', البصمة_السابقة, self.بصمة_الجدول(جدول_الإشعارات),
+                lambda العدادات: العدادات.update(int(ص['معرف_المستخدم']) for ص in الصفوف),
+            )
+
+    def إشعارات_المستخدم(self, معرف_المستخدم, العدد=50):
+        الإشعارات = self.جدول(جدول_الإشعارات)
+        return الإشعارات[الإشعارات['معرف_المستخدم'] == معرف_المستخدم].iloc[::-1].head(العدد)
+
+    def تعليم_الإشعارات_مقروءة(self, معرف_المستخدم):
+        with قفل_الملف(ملف_الإشعارات):
+            الإشعارات = self.جدول(جدول_الإشعارات)
+            الصفوف = (الإشعارات['معرف_المستخدم'] == معرف_المستخدم) & (الإشعارات['مقروء'].fillna(0) == 0)
+            if not الصفوف.any():
+                return
+            الإشعارات.loc[الصفوف, 'مقروء'] = 1
+            البصمة_السابقة = self.بصمة_الجدول(جدول_الإشعارات)
+            حفظ_البيانات(ملف_الإشعارات, الإشعارات)
+            self.تعديل_المشتق(
+                جدول_الإشعارات, 'غير_المقروءة', البصمة_السابقة, self.بصمة_الجدول(جدول_الإشعارات),
+                lambda العدادات: العدادات.pop(int(معرف_المستخدم), None),
+            )
+
+
+def _قيمة_sql(القيمة):
+    """تحويل قيم pandas/numpy إلى أنواع يقبلها sqlite3"""
+    if القيمة is None or (not isinstance(القيمة, str) and pd.isna(القيمة)):
+        return None
+    if isinstance(القيمة, np.integer):
+        return int(القيمة)
+    if isinstance(القيمة, np.floating):
+        return float(القيمة)
+    if isinstance(القيمة, (pd.Timestamp, date)):
+        return نص_التاريخ(القيمة)
+    return القيمة
+
+
+class _اتصال_مرصود(sqlite3.Connection):
+    """اتصال يوقت كل execute في سجل الأداء؛ قراءات pandas تمر بمؤشر خاص فتُقاس في _استعلام"""
+
+    def _مرصود(self, التنفيذ, sql, المعاملات):
+        العبارة = sql.lstrip().split(None, 1)[0].upper()
+        النوع = 'قراءة' if العبارة in ('SELECT', 'PRAGMA') else 'كتابة'
+        with قياس(f'sql.{العبارة}', النوع) as السجل:
+            المؤشر = التنفيذ(sql, *المعاملات)
+            السجل['الصفوف'] = max(المؤشر.rowcount, 0)
+        return المؤشر
+
+    def execute(self, sql, *المعاملات):
+        return self._مرصود(super().execute, sql, المعاملات)
+
+    def executemany(self, sql, *المعاملات):
+        return self._مرصود(super().executemany, sql, المعاملات)
+
+
+class مخزن_SQLite(مخزن_أساسي):
+    """التخزين في قاعدة SQLite محلية مع فهارس على أعمدة التصفية"""
+
+    الفهارس = [
+        ('فهرس_المستخدمين_الاسم', جدول_المستخدمين, ['اسم_المستخدم'], True),
+        ('فهرس_المستخدمين_القسم', جدول_المستخدمين, ['القسم'], False),
+        ('فهرس_الأرصدة_الموظف', جدول_أرصدة_الإجازات, ['معرف_الموظف'], False),
+        ('فهرس_الطلبات_الموظف', جدول_طلبات_الإجازة, ['معرف_الموظف', 'معرف'], False),
+        ('فهرس_الطلبات_الحالة', جدول_طلبات_الإجازة, ['الحالة', 'معرف'], False),
+        ('فهرس_الطلبات_الحالة_الموظف', جدول_طلبات_الإجازة, ['الحالة', 'معرف_الموظف'], False),
+        ('فهرس_الطلبات_التواريخ', جدول_طلبات_الإجازة, ['تاريخ_البدء', 'تاريخ_الانتهاء'], False),
+        ('فهرس_الطلبات_تاريخ_الطلب', جدول_طلبات_الإجازة, ['تاريخ_الطلب'], False),
+        ('فهرس_الإشعارات_المستخدم', جدول_الإشعارات, ['معرف_المستخدم', 'مقروء'], False),
+        ('فهرس_السجل_الموظف', جدول_سجل_الأرصدة, ['معرف_الموظف', 'معرف'], False),
+        ('فهرس_السجل_الطلب', جدول_سجل_الأرصدة, ['معرف_الطلب'], False),
+    ]
+
+    def __init__(self, مسار_القاعدة):
+        super().__init__()
+        self.مسار_القاعدة = مسار_القاعدة
+        self._محلي = threading.local()
+        self._إنشاء_المخطط()
+
+    def _اتصال(self):
+        """اتصال منفصل لكل خيط لأن جلسات Streamlit تعمل في خيوط مختلفة"""
+        الاتصال = getattr(self._محلي, 'الاتصال', None)
+        if الاتصال is None:
+            الاتصال = sqlite3.connect(self.مسار_القاعدة, timeout=30, factory=_اتصال_مرصود)
+            الاتصال.execute('PRAGMA journal_mode=WAL')
+            الاتصال.execute('PRAGMA synchronous=NORMAL')
+            self._محلي.الاتصال = الاتصال
+        return الاتصال
+
+    def _إنشاء_المخطط(self):
+        الاتصال = self._اتصال()
+        with الاتصال:
+            for اسم_الجدول, الملف in ملفات_الجداول.items():
+                الأعمدة = []
+                for العمود, النوع in أنواع_الأعمدة[الملف].items():
+                    if العمود == 'معرف':
+                        الأعمدة.append('"معرف" INTEGER PRIMARY KEY')
+                    else:
+                        الأعمدة.append(f'"{العمود}" {"INTEGER" if عمود_عددي(النوع) else "TEXT"}')
+                الاتصال.execute(f'CREATE TABLE IF NOT EXISTS "{اسم_الجدول}" ({", ".join(الأعمدة)})')
+                # أعمدة أضيفت إلى المخطط بعد إنشاء قاعدة قائمة
+                الموجودة = {ص[1] for ص in الاتصال.execute(f'PRAGMA table_info("{اسم_الجدول}")')}
+                for العمود, النوع in أنواع_الأعمدة[الملف].items():
+                    if العمود not in الموجودة:
+                        الاتصال.execute(
+                            f'ALTER TABLE "{اسم_الجدول}" ADD COLUMN "{العمود}" {"INTEGER" if عمود_عددي(النوع) else "TEXT"}'
+                        )
+            for الاسم, اسم_الجدول, الأعمدة, فريد in self.الفهارس:
+                قائمة_الأعمدة = ', '.join(f'"{العمود}"' for العمود in الأعمدة)
+                الاتصال.execute(
+                    f'CREATE {"UNIQUE " if فريد else ""}INDEX IF NOT EXISTS "{الاسم}" '
+                    f'ON "{اسم_الجدول}" ({قائمة_الأعمدة})'
+                )
+
+            # رقم إصدار لكل جدول تزيده المشغلات مع كل كتابة ليُبنى عليه التخزين المؤقت
+            الاتصال.execute('CREATE TABLE IF NOT EXISTS "إصدارات_الجداول" ("الجدول" TEXT PRIMARY KEY, "الإصدار" INTEGER)')
+            for اسم_الجدول in ملفات_الجداول:
+                الاتصال.execute(
+                    'INSERT OR IGNORE INTO "إصدارات_الجداول" VALUES (?, 0)', [اسم_الجدول]
+                )
+                for الحدث in ('INSERT', 'UPDATE', 'DELETE'):
+                    الاتصال.execute(
+                        f'CREATE TRIGGER IF NOT EXISTS "إصدار_{اسم_الجدول}_{الحدث}" AFTER {الحدث} ON "{اسم_الجدول}" '
+                        f'BEGIN UPDATE "إصدارات_الجداول" SET "الإصدار" = "الإصدار" + 1 '
+                        f"WHERE \"الجدول\" = '{اسم_الجدول}'; END"
+                    )
+
+            # عدادات مجمعة تحدثها المشغلات في نفس معاملة الكتابة فتبقى القراءة بحث مفتاح واحد
+            جديد = الاتصال.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'العدادات_المجمعة'"
+            ).fetchone() is None
+            الاتصال.execute(
+                'CREATE TABLE IF NOT EXISTS "العدادات_المجمعة" ("النطاق" TEXT, "المفتاح" TEXT, "الحالة" TEXT, '
+                '"العدد" INTEGER, PRIMARY KEY ("النطاق", "المفتاح", "الحالة")) WITHOUT ROWID'
+            )
+            for الحدث, الصف, المقدار in (('INSERT', 'NEW', 1), ('DELETE', 'OLD', -1)):
+                الاتصال.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "عداد_الطلبات_{الحدث}" AFTER {الحدث} ON "{جدول_طلبات_الإجازة}" '
+                    f'BEGIN {self._عد_الطلب(الصف, المقدار)} END'
+                )
+                عد_المستخدم = ' '.join([
+                    self._زيادة_عداد("'المستخدمين'", "''", "'الإجمالي'", المقدار),
+                    self._زيادة_عداد("'المستخدمين'", f'COALESCE({الصف}."القسم", \'\')', "'القسم'", المقدار),
+                ])
+                الاتصال.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "عداد_المستخدمين_{الحدث}" AFTER {الحدث} ON "{جدول_المستخدمين}" '
+                    f'BEGIN {عد_المستخدم} END'
+                )
+            الاتصال.execute(
+                f'CREATE TRIGGER IF NOT EXISTS "عداد_الطلبات_UPDATE" AFTER UPDATE OF "الحالة" ON "{جدول_طلبات_الإجازة}" '
+                f'WHEN OLD."الحالة" IS NOT NEW."الحالة" '
+                f'BEGIN {self._عد_الطلب("OLD", -1)} {self._عد_الطلب("NEW", 1)} END'
+            )
+        if جديد:
+            self.إعادة_بناء_الإحصائيات()
+
+    @staticmethod
+    def _زيادة_عداد(النطاق, المفتاح, الحالة, المقدار):
+        return (
+            f'INSERT INTO "العدادات_المجمعة" VALUES ({النطاق}, {المفتاح}, {الحالة}, {المقدار}) '
+            f'ON CONFLICT DO UPDATE SET "العدد" = "العدد" + excluded."العدد";'
+        )
+
+    def _عد_الطلب(self, الصف, المقدار):
+        """جمل المشغل التي تعدل عدادات طلب واحد للكل وللموظف ولقسمه"""
+        الحالة = f'{الصف}."الحالة"'
+        القسم = (
+            f'COALESCE((SELECT "القسم" FROM "{جدول_المستخدمين}" WHERE "معرف" = {الصف}."معرف_الموظف"), \'\')'
+        )
+        return ' '.join([
+            self._زيادة_عداد("'الكل'", "''", الحالة, المقدار),
+            self._زيادة_عداد("'الموظف'", f'CAST({الصف}."معرف_الموظف" AS TEXT)', الحالة, المقدار),
+            self._زيادة_عداد("'القسم'", القسم, الحالة, المقدار),
+        ])
+
+    def _استعلام(self, اسم_الجدول, الشرط='', المعاملات=(), اللاحقة=''):
+        sql = f'SELECT * FROM "{اسم_الجدول}"'
+        if الشرط:
+            sql += f' WHERE {الشرط}'
+        if اللاحقة:
+            sql += f' {اللاحقة}'
+        with قياس('استعلام', الجدول=اسم_الجدول) as السجل:
+            البيانات = pd.read_sql_query(sql, self._اتصال(), params=[_قيمة_sql(م) for م in المعاملات])
+            السجل['الصفوف'] = len(البيانات)
+        return تطبيق_الأنواع(ملفات_الجداول[اسم_الجدول], البيانات)
+
+    def _عدد(self, اسم_الجدول, الشرط='', المعاملات=()):
+        sql = f'SELECT COUNT(*) FROM "{اسم_الجدول}"' + (f' WHERE {الشرط}' if الشرط else '')
+        return self._اتصال().execute(sql, [_قيمة_sql(م) for م in المعاملات]).fetchone()[0]
+
+    def _إدراج(self, الاتصال, اسم_الجدول, الصفوف):
+        """إدراج قائمة صفوف (قواميس) وإرجاع معرف آخر صف"""
+        الأعمدة = list(أنواع_الأعمدة[ملفات_الجداول[اسم_الجدول]])
+        الصفوف = [{ع: ص.get(ع) for ع in الأعمدة if ع in ص} for ص in الصفوف]
+        التحقق_من_الأنواع(ملفات_الجداول[اسم_الجدول], pd.DataFrame(الصفوف))
+        آخر_معرف = None
+        for الصف in الصفوف:
+            قائمة_الأعمدة = ', '.join(f'"{ع}"' for ع in الصف)
+            علامات = ', '.join('?' for _ in الصف)
+            المؤشر = الاتصال.execute(
+                f'INSERT INTO "{اسم_الجدول}" ({قائمة_الأعمدة}) VALUES ({علامات})',
+                [_قيمة_sql(ق) for ق in الصف.values()],
+            )
+            آخر_معرف = المؤشر.lastrowid
+        return آخر_معرف
+
+    def _إدراج_جدول(self, الاتصال, اسم_الجدول, البيانات):
+        """إدراج DataFrame كامل بـ executemany"""
+        الأعمدة = [ع for ع in أنواع_الأعمدة[ملفات_الجداول[اسم_الجدول]] if ع in البيانات.columns]
+        if البيانات.empty or not الأعمدة:
+            return
+        التحقق_من_الأنواع(ملفات_الجداول[اسم_الجدول], البيانات)
+        قائمة_الأعمدة = ', '.join(f'"{ع}"' for ع in الأعمدة)
+        علامات = ', '.join('?' for _ in الأعمدة)
+        الاتصال.executemany(
+            f'INSERT INTO "{اسم_الجدول}" ({قائمة_الأعمدة}) VALUES ({علامات})',
+            ([_قيمة_sql(ق) for ق in صف] for صف in البيانات[الأعمدة].itertuples(index=False)),
+        )
+
+    def استيراد(self, الجداول, استبدال=False):
+        """استيراد جداول كاملة في معاملة واحدة"""
+        الاتصال = self._اتصال()
+        with الاتصال:
+            for اسم_الجدول, البيانات in الجداول.items():
+                if استبدال:
+                    الاتصال.execute(f'DELETE FROM "{اسم_الجدول}"')
+                self._إدراج_جدول(الاتصال, اسم_الجدول, البيانات)
+
+    def مهيأ(self):
+        return self._عدد(جدول_المستخدمين) > 0
+
+    def بصمة_الجدول(self, اسم_الجدول):
+        return self._اتصال().execute(
+            'SELECT "الإصدار" FROM "إصدارات_الجداول" WHERE "الجدول" = ?', [اسم_الجدول]
+        ).fetchone()[0]
+
+    def تهيئة(self, الجداول):
+        self.استيراد(الجداول, استبدال=True)
+
+    def جدول(self, اسم_الجدول):
+        return self._استعلام(اسم_الجدول, اللاحقة='ORDER BY "معرف"')
+
+    def _قيمة_عداد(self, النطاق, المفتاح='', الحالة=None):
+        sql = 'SELECT COALESCE(SUM("العدد"), 0) FROM "العدادات_المجمعة" WHERE "النطاق" = ? AND "المفتاح" = ?'
+        المعاملات = [النطاق, المفتاح]
+        if الحالة is not None:
+            sql += ' AND "الحالة" = ?'
+            المعاملات.append(الحالة)
+        return self._اتصال().execute(sql, المعاملات).fetchone()[0]
+
+    def الإحصائيات(self):
+        الإحصائيات = إحصائيات_فارغة()
+        for النطاق, المفتاح, الحالة, العدد in self._اتصال().execute(
+            'SELECT "النطاق", "المفتاح", "الحالة", "العدد" FROM "العدادات_المجمعة" WHERE "العدد" != 0'
+        ):
+            if النطاق == 'الكل':
+                الإحصائيات['حسب_الحالة'][الحالة] = العدد
+            elif النطاق == 'الموظف':
+                الإحصائيات['حسب_الموظف'].setdefault(المفتاح, {})[الحالة] = العدد
+            elif النطاق == 'القسم':
+                الإحصائيات['حسب_القسم'].setdefault(المفتاح, {})[الحالة] = العدد
+            elif الحالة == 'الإجمالي':
+                الإحصائيات['المستخدمين']['الإجمالي'] = العدد
+            else:
+                الإحصائيات['المستخدمين']['حسب_القسم'][المفتاح] = العدد
+        return الإحصائيات
+
+    def إعادة_بناء_الإحصائيات(self):
+        الاتصال = self._اتصال()
+        with الاتصال:
+            الاتصال.execute('DELETE FROM "العدادات_المجمعة"')
+            الاتصال.execute(
+                f'INSERT INTO "العدادات_المجمعة" SELECT \'الكل\', \'\', "الحالة", COUNT(*) '
+                f'FROM "{جدول_طلبات_الإجازة}" GROUP BY "الحالة"'
+            )
+            الاتصال.execute(
+                f'INSERT INTO "العدادات_المجمعة" SELECT \'الموظف\', CAST("معرف_الموظف" AS TEXT), "الحالة", COUNT(*) '
+                f'FROM "{جدول_طلبات_الإجازة}" GROUP BY "معرف_الموظف", "الحالة"'
+            )
+            الاتصال.execute(
+                f'INSERT INTO "العدادات_المجمعة" SELECT \'القسم\', COALESCE(م."القسم", \'\'), ط."الحالة", COUNT(*) '
+                f'FROM "{جدول_طلبات_الإجازة}" ط LEFT JOIN "{جدول_المستخدمين}" م ON م."معرف" = ط."معرف_الموظف" '
+                f'GROUP BY 2, 3'
+            )
+            الاتصال.execute(
+                f'INSERT INTO "العدادات_المجمعة" SELECT \'المستخدمين\', \'\', \'الإجمالي\', COUNT(*) FROM "{جدول_المستخدمين}"'
+            )
+            الاتصال.execute(
+                f'INSERT INTO "العدادات_المجمعة" SELECT \'المستخدمين\', COALESCE("القسم", \'\'), \'القسم\', COUNT(*) '
+                f'FROM "{جدول_المستخدمين}" GROUP BY 2'
+            )
+        return self.الإحصائيات()
+
+    def عدد_المستخدمين(self):
+        return self._قيمة_عداد('المستخدمين', '', 'الإجمالي')
+
+    def أرصدة_الموظف(self, معرف_الموظف):
+        return self._استعلام(جدول_أرصدة_الإجازات, '"معرف_الموظف" = ?', [معرف_الموظف], 'ORDER BY "معرف"')
+
+    def طلبات_الموظف(self, معرف_الموظف, العدد=None):
+        if العدد is None:
+            return self._استعلام(جدول_طلبات_الإجازة, '"معرف_الموظف" = ?', [معرف_الموظف], 'ORDER BY "معرف"')
+        الأخيرة = self._استعلام(
+            جدول_طلبات_الإجازة, '"معرف_الموظف" = ?', [معرف_الموظف, العدد], 'ORDER BY "معرف" DESC LIMIT ?'
+        )
+        return الأخيرة.iloc[::-1].reset_index(drop=True)
+
+    def عدد_طلبات_الموظف(self, معرف_الموظف, الحالة=None):
+        return self._قيمة_عداد('الموظف', str(int(معرف_الموظف)), الحالة)
+
+    def عدد_طلبات_القسم(self, القسم, الحالة=None):
+        return self._قيمة_عداد('القسم', القسم, الحالة)
+
+    def الطلبات_بالحالة(self, الحالة):
+        return self._استعلام(جدول_طلبات_الإجازة, '"الحالة" = ?', [الحالة], 'ORDER BY "معرف"')
+
+    def عدد_الطلبات_بالحالة(self, الحالة):
+        return self._قيمة_عداد('الكل', '', الحالة)
+
+    @contextmanager
+    def معاملة_الطلبات(self):
+        الاتصال = self._اتصال()
+        if getattr(self._محلي, 'في_معاملة', False):
+            yield
+            return
+        # BEGIN IMMEDIATE يحجز قفل الكتابة من بداية الكتلة فتُقرأ البيانات وتُكتب دون كاتب آخر بينهما
+        with الاتصال:
+            الاتصال.execute('BEGIN IMMEDIATE')
+            self._محلي.في_معاملة = True
+            try:
+                yield
+            finally:
+                self._محلي.في_معاملة = False
+
+    def إضافة_طلب(self, الطلب):
+        الاتصال = self._اتصال()
+        with self.معاملة_الطلبات():
+            البصمة_السابقة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+            # المعرف التلقائي يلي أكبر معرف في الجدول، وقد تكون الأرشفة حذفت ما بعده
+            أكبر_مؤرشف = الأرشيف.أكبر_معرف()
+            if أكبر_مؤرشف and الاتصال.execute(
+                f'SELECT COALESCE(MAX("معرف"), 0) FROM "{جدول_طلبات_الإجازة}"'
+            ).fetchone()[0] < أكبر_مؤرشف:
+                الطلب = {**الطلب, 'معرف': أكبر_مؤرشف + 1}
+            معرف = self._إدراج(الاتصال, جدول_طلبات_الإجازة, [الطلب])
+            البصمة_الجديدة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+        self._تحديث_مشتقات_الطلبات(البصمة_السابقة, البصمة_الجديدة, [{**الطلب, 'معرف': معرف}])
+        return معرف
+
+    def صفحة_الطلبات(self, الحالة, القسم=None, نوع_الإجازة=None, من_تاريخ=None, إلى_تاريخ=None,
+                      الإزاحة=0, الحد=50):
+        المصدر, المعاملات = self._مصدر_الطلبات(الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ)
+        return self._صفحة_من_المصدر(المصدر, المعاملات, الإزاحة, الحد)
+
+    def طابور_الاعتماد(self, القسم, الحالة, الإزاحة=0, الحد=50, باستثناء_الموظف=None):
+        # CROSS JOIN يثبت ترتيب الربط: موظفو القسم من فهرس الأقسام ثم طلباتهم في المرحلة من فهرس
+        # (الحالة، معرف_الموظف)، فلا يمر الاستعلام على طلبات المرحلة في بقية الأقسام
+        المصدر = (
+            f'FROM "{جدول_المستخدمين}" م CROSS JOIN "{جدول_طلبات_الإجازة}" ط ON ط."معرف_الموظف" = م."معرف" '
+            f'WHERE م."القسم" = ? AND ط."الحالة" = ?'
+        )
+        المعاملات = [القسم, الحالة]
+        if باستثناء_الموظف is not None:
+            المصدر += ' AND ط."معرف_الموظف" != ?'
+            المعاملات.append(int(باستثناء_الموظف))
+        return self._صفحة_من_المصدر(المصدر, المعاملات, الإزاحة, الحد)
+
+    def _صفحة_من_المصدر(self, المصدر, المعاملات, الإزاحة, الحد):
+        الإجمالي = self._اتصال().execute(f'SELECT COUNT(*) {المصدر}', المعاملات).fetchone()[0]
+        with قياس('استعلام', الجدول=جدول_طلبات_الإجازة) as السجل:
+            الصفحة = pd.read_sql_query(
+                f'SELECT ط.* {المصدر} ORDER BY ط."معرف" LIMIT ? OFFSET ?',
+                self._اتصال(), params=المعاملات + [int(الحد), int(الإزاحة)],
+            )
+            السجل['الصفوف'] = len(الصفحة)
+        return تطبيق_الأنواع(ملف_طلبات_الإجازة, الصفحة), الإجمالي
+
+    def _مصدر_الطلبات(self, الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ):
+        """جملة FROM ... WHERE للمرشحات مع معاملاتها"""
+        الشروط = []
+        المعاملات = []
+        الربط = ''
+        if الحالة is not None:
+            الشروط.append('ط."الحالة" = ?')
+            المعاملات.append(الحالة)
+        if القسم is not None:
+            الربط = f' JOIN "{جدول_المستخدمين}" م ON م."معرف" = ط."معرف_الموظف"'
+            الشروط.append('م."القسم" = ?')
+            المعاملات.append(القسم)
+        if نوع_الإجازة is not None:
+            الشروط.append('ط."نوع_الإجازة" = ?')
+            المعاملات.append(نوع_الإجازة)
+        if من_تاريخ is not None:
+            الشروط.append('ط."تاريخ_الانتهاء" >= ?')
+            المعاملات.append(من_تاريخ)
+        if إلى_تاريخ is not None:
+            الشروط.append('ط."تاريخ_البدء" <= ?')
+            المعاملات.append(إلى_تاريخ)
+
+        المصدر = f'FROM "{جدول_طلبات_الإجازة}" ط{الربط}'
+        if الشروط:
+            المصدر += f' WHERE {" AND ".join(الشروط)}'
+        return المصدر, [_قيمة_sql(م) for م in المعاملات]
+
+    def _دفعات_الطلبات_الحية(self, الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ, حجم_الدفعة):
+        المصدر, المعاملات = self._مصدر_الطلبات(الحالة, القسم, نوع_الإجازة, من_تاريخ, إلى_تاريخ)
+        # اتصال خاص بالتصدير: الاستعلام المفتوح يبقي لقطة قراءة واحدة حتى آخر دفعة
+        الاتصال = sqlite3.connect(self.مسار_القاعدة, timeout=30)
+        try:
+            الدفعات = pd.read_sql_query(
+                f'SELECT ط.* {المصدر} ORDER BY ط."معرف"', الاتصال, params=المعاملات, chunksize=حجم_الدفعة
+            )
+            for الدفعة in رصد_الدفعات(الدفعات, 'استعلام_دفعات', الجدول=جدول_طلبات_الإجازة):
+                yield تطبيق_الأنواع(ملف_طلبات_الإجازة, الدفعة)
+        finally:
+            الاتصال.close()
+
+    def إعادة_حساب_الأيام(self, الحالات=الحالات_المعلقة):
+        الشرط = '' if الحالات is None else f'"الحالة" IN ({", ".join("?" for _ in الحالات)})'
+        الاتصال = self._اتصال()
+        with الاتصال:
+            الاتصال.execute('BEGIN IMMEDIATE')
+            المستهدفة = self._استعلام(جدول_طلبات_الإجازة, الشرط, list(الحالات or ()))
+            الأيام = self.الأيام_المحتسبة(المستهدفة)
+            المتغيرة = المستهدفة['عدد_الأيام'].ne(الأيام).fillna(True).to_numpy(bool)
+            if not المتغيرة.any():
+                return 0
+            البصمة_السابقة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+            الاتصال.executemany(
+                f'UPDATE "{جدول_طلبات_الإجازة}" SET "عدد_الأيام" = ?, "الإصدار" = COALESCE("الإصدار", 0) + 1 '
+                f'WHERE "معرف" = ?',
+                zip(الأيام[المتغيرة].tolist(), المستهدفة['معرف'].to_numpy()[المتغيرة].tolist()),
+            )
+            البصمة_الجديدة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+        self._إبقاء_مشتقات_الطلبات(البصمة_السابقة, البصمة_الجديدة)
+        return int(المتغيرة.sum())
+
+    def الأقسام(self):
+        الصفوف = self._اتصال().execute(
+            f'SELECT DISTINCT "القسم" FROM "{جدول_المستخدمين}" WHERE "القسم" != \'\' ORDER BY "القسم"'
+        ).fetchall()
+        return [ص[0] for ص in الصفوف if ص[0]]
+
+    def تحديث_حالة_الطلبات(self, المعرفات, الحالة, معرف_المدير, الإصدارات=None):
+        المعرفات = [int(م) for م in المعرفات]
+        if not المعرفات:
+            return [], []
+        علامات = ', '.join('?' for _ in المعرفات)
+        الاتصال = self._اتصال()
+        with الاتصال:
+            # حجز الكتابة قبل القراءة حتى لا يُخصم نفس الرصيد مرتين من عمليتين
+            الاتصال.execute('BEGIN IMMEDIATE')
+            المستهدفة, المتعارضة = self._فصل_المتعارضة(
+                self._استعلام(جدول_طلبات_الإجازة, f'"معرف" IN ({علامات})', المعرفات), الإصدارات
+            )
+            الموظفون = المستهدفة['معرف_الموظف'].dropna().unique().tolist()
+            جدول_الأرصدة = self._استعلام(
+                جدول_أرصدة_الإجازات, f'"معرف_الموظف" IN ({", ".join("?" for _ in الموظفون)})', الموظفون,
+                'ORDER BY "معرف"',
+            )
+            الأرصدة = {
+                int(ص['معرف_الموظف']): ص
+                for ص in جدول_الأرصدة.drop_duplicates('معرف_الموظف').to_dict('records')
+            }
+            المعتمدة = المستهدفة.loc[المستهدفة['الحالة'] == 'معتمد', 'معرف'].tolist()
+            القيود_السابقة = صافي_القيود(self._استعلام(
+                جدول_سجل_الأرصدة, f'"معرف_الطلب" IN ({", ".join("?" for _ in المعتمدة)})', المعتمدة
+            )) if المعتمدة else {}
+            المنفذة, _, القيود, المعدلة = تخطيط_تغيير_الحالة(
+                المستهدفة, الأرصدة, القيود_السابقة, الحالة, معرف_المدير, self.معرفات_الأنواع_المخصومة()
+            )
+
+            البصمة_السابقة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+            الاتصال.executemany(
+                f'UPDATE "{جدول_طلبات_الإجازة}" SET "الحالة" = ?, "معرف_المدير_الموافق" = ?, '
+                f'"الإصدار" = COALESCE("الإصدار", 0) + 1 WHERE "معرف" = ?',
+                [[الحالة, _قيمة_sql(معرف_المدير), م] for م in المنفذة],
+            )
+            البصمة_الجديدة = self.بصمة_الجدول(جدول_طلبات_الإجازة)
+            الاتصال.executemany(
+                f'UPDATE "{جدول_أرصدة_الإجازات}" SET '
+                + ', '.join(f'"{خ}" = ?' for خ in ترتيب_الخصم)
+                + ', "تاريخ_التحديث" = ? WHERE "معرف" = ?',
+                [
+                    [_قيمة_sql(الأرصدة[م][خ]) for خ in ترتيب_الخصم]
+                    + [datetime.now().strftime('%Y-%m-%d %H:%M:%S'), _قيمة_sql(الأرصدة[م]['معرف'])]
+                    for م in المعدلة
+                ],
+            )
+            self._إدراج_جدول(الاتصال, جدول_سجل_الأرصدة, pd.DataFrame(القيود))
+        المحدثة = المستهدفة[المستهدفة['معرف'].isin(المنفذة)]
+        المحدثة = المحدثة.assign(
+            الحالة=الحالة, معرف_المدير_الموافق=معرف_المدير, الإصدار=المحدثة['الإصدار'].fillna(0) + 1
+        )
+        self._تحديث_مشتقات_الطلبات(البصمة_السابقة, البصمة_الجديدة, المحدثة.to_dict('records'))
+        return المنفذة, المتعارضة
+
+    def _الطلبات_المعتمدة_في_الفترة(self, من_تاريخ, إلى_تاريخ):
+        return self._استعلام(
+            جدول_طلبات_الإجازة, '"الحالة" = ? AND "تاريخ_البدء" <= ? AND "تاريخ_الانتهاء" >= ?',
+            ['معتمد', إلى_تاريخ, من_تاريخ],
+        )
+
+    def أرشفة_الطلبات(self, تاريخ_القطع):
+        الشرط = '"الحالة" IN (?, ?) AND "تاريخ_الانتهاء" < ?'
+        المعاملات = [*الأرشيف.الحالات_المغلقة, str(تاريخ_القطع)]
+        الاتصال = self._اتصال()
+        with الاتصال:
+            # الحذف في نفس المعاملة بعد كتابة الأقسام؛ مشغلات العدادات تنقصها
+            الاتصال.execute('BEGIN IMMEDIATE')
+            المؤرشفة = self._استعلام(جدول_طلبات_الإجازة, الشرط, المعاملات, 'ORDER BY "معرف"')
+            if المؤرشفة.empty:
+                return 0
+            الأرشيف.إلحاق(المؤرشفة)
+            الاتصال.execute(f'DELETE FROM "{جدول_طلبات_الإجازة}" WHERE {الشرط}', المعاملات)
+        return len(المؤرشفة)
+
+    def سجل_أرصدة_الموظف(self, معرف_الموظف):
+        return self._استعلام(جدول_سجل_الأرصدة, '"معرف_الموظف" = ?', [معرف_الموظف], 'ORDER BY "معرف"')
+
+    def ترحيل_الأرصدة(self, السنة_الجديدة, معرف_المنفذ=None):
+        الاتصال = self._اتصال()
+        with الاتصال:
+            الاتصال.execute('BEGIN IMMEDIATE')
+            الأرصدة = self._استعلام(جدول_أرصدة_الإجازات, '"السنة" < ? OR "السنة" IS NULL', [السنة_الجديدة])
+            الأرصدة, القيود = ترحيل_السنة(الأرصدة, السنة_الجديدة, معرف_المنفذ=معرف_المنفذ)
+            الاتصال.executemany(
+                f'UPDATE "{جدول_أرصدة_الإجازات}" SET "رصيد_السنة_الحالية" = ?, "رصيد_العام_السابق_1" = ?, '
+                f'"رصيد_العام_السابق_2" = ?, "السنة" = ?, "تاريخ_التحديث" = ? WHERE "معرف" = ?',
+                ([_قيمة_sql(ق) for ق in صف] for صف in الأرصدة[[
+                    'رصيد_السنة_الحالية', 'رصيد_العام_السابق_1', 'رصيد_العام_السابق_2', 'السنة', 'تاريخ_التحديث',
+                    'معرف',
+                ]].itertuples(index=False)),
+            )
+            self._إدراج_جدول(الاتصال, جدول_سجل_الأرصدة, القيود)
+        return len(القيود)
+
+    def إضافة_مستخدمين(self, المستخدمين, الأرصدة):
+        if المستخدمين.empty:
+            return []
+        الاتصال = self._اتصال()
+        with الاتصال:
+            الاتصال.execute('BEGIN IMMEDIATE')
+            # الفهرس الفريد يرفض التكرار أيضاً، لكن بـ IntegrityError؛ الفحص هنا يوحد الخطأ مع CSV
+            الأسماء = المستخدمين['اسم_المستخدم'].astype(str).tolist()
+            الموجودة = [
+                الاسم
+                for البداية in range(0, len(الأسماء), 500)
+                for (الاسم,) in الاتصال.execute(
+                    f'SELECT "اسم_المستخدم" FROM "{جدول_المستخدمين}" WHERE "اسم_المستخدم" IN '
+                    f'({", ".join("?" * len(الأسماء[البداية:البداية + 500]))})',
+                    الأسماء[البداية:البداية + 500],
+                )
+            ]
+            self._رفض_الأسماء_المكررة(المستخدمين, الموجودة)
+            أول_معرف = الاتصال.execute(
+                f'SELECT COALESCE(MAX("معرف"), 0) + 1 FROM "{جدول_المستخدمين}"'
+            ).fetchone()[0]
+            المعرفات = list(range(أول_معرف, أول_معرف + len(المستخدمين)))
+            self._إدراج_جدول(الاتصال, جدول_المستخدمين, المستخدمين.assign(معرف=المعرفات))
+            self._إدراج_جدول(الاتصال, جدول_أرصدة_الإجازات, الأرصدة.assign(معرف_الموظف=المعرفات))
+        return المعرفات
+
+    def _عد_غير_المقروءة(self):
+        return Counter(dict(self._اتصال().execute(
+            f'SELECT "معرف_المستخدم", COUNT(*) FROM "{جدول_الإشعارات}" WHERE "مقروء" = 0 GROUP BY "معرف_المستخدم"'
+        ).fetchall()))
+
+    def إضافة_إشعارات(self, الإشعارات):
+        if not الإشعارات:
+            return
+        الاتصال = self._اتصال()
+        with الاتصال:
+            الاتصال.execute('BEGIN IMMEDIATE')
+            البصمة_السابقة = self.بصمة_الجدول(جدول_الإشعارات)
+            self._إدراج_جدول(الاتصال, جدول_الإشعارات, pd.DataFrame(self._جديدة_غير_مقروءة(الإشعارات)))
+            البصمة_الجديدة = self.بصمة_الجدول(جدول_الإشعارات)
+        self.تعديل_المشتق(
+            جدول_الإشعارات, 'غير_المقروءة', البصمة_السابقة, البصمة_الجديدة,
+            lambda العدادات: العدادات.update(int(ش['معرف_المستخدم']) for ش in الإشعارات),
+        )
+
+    def إشعارات_المستخدم(self, معرف_المستخدم, العدد=50):
+        return self._استعلام(
+            جدول_الإشعارات, '"معرف_المستخدم" = ?', [معرف_المستخدم], f'ORDER BY "معرف" DESC LIMIT {int(العدد)}'
+        )
+
+    def تعليم_الإشعارات_مقروءة(self, معرف_المستخدم):
+        الاتصال = self._اتصال()
+        with الاتصال:
+            الاتصال.execute('BEGIN IMMEDIATE')
+            البصمة_السابقة = self.بصمة_الجدول(جدول_الإشعارات)
+            الاتصال.execute(
+                f'UPDATE "{جدول_الإشعارات}" SET "مقروء" = 1 WHERE "معرف_المستخدم" = ? AND "مقروء" = 0',
+                [_قيمة_sql(معرف_المستخدم)],
+            )
+            البصمة_الجديدة = self.بصمة_الجدول(جدول_الإشعارات)
+        self.تعديل_المشتق(
+            جدول_الإشعارات, 'غير_المقروءة', البصمة_السابقة, البصمة_الجديدة,
+            lambda العدادات: العدادات.pop(int(معرف_المستخدم), None),
+        )
+
+
+_المخزن = None
+_قفل_المخزن = threading.Lock()
+
+
+def الحصول_على_المخزن():
+    """خلفية التخزين المختارة عبر VACATION_STORAGE (csv أو sqlite)"""
+    global _المخزن
+    with _قفل_المخزن:
+        if _المخزن is None:
+            النوع = os.environ.get('VACATION_STORAGE', 'csv').lower()
+            if النوع == 'sqlite':
+                _المخزن = مخزن_SQLite(os.environ.get('VACATION_DB', 'الإجازات.db'))
+            elif النوع == 'csv':
+                _المخزن = مخزن_CSV()
+            else:
+                raise ValueError(f"خلفية تخزين غير معروفة: {النوع}")
+        return _المخزن
@@ -0,0 +1,105 @@
+"""تصدير تقارير طلبات الإجازة إلى CSV أو XLSX أو Parquet عبر سلسلة مولدات بذاكرة محدودة
+
+دفعات الطلبات المرشحة ← إضافة أسماء الموظفين والأقسام والإجازات ← كاتب الصيغة، دفعة بدفعة.
+"""
+try:
+    import openpyxl
+except ImportError:  # مطلوبة لصيغة XLSX فقط
+    openpyxl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # مطلوبة لصيغة Parquet فقط
+    pa = pq = None
+
+from التخزين import جدول_المستخدمين
+from طبقة_البيانات import نصوص_الأيام
+
+# أعمدة الأيام (datetime64 في المخطط)؛ كل كاتب يخرجها أياماً بلا وقت
+أعمدة_الأيام = ('تاريخ_البدء', 'تاريخ_الانتهاء')
+
+# أعمدة التقرير وعناوينها
+أعمدة_التصدير = {
+    'معرف': "رقم الطلب",
+    'اسم_الموظف': "الموظف",
+    'القسم': "القسم",
+    'اسم_الإجازة': "نوع الإجازة",
+    'تاريخ_البدء': "من",
+    'تاريخ_الانتهاء': "إلى",
+    'عدد_الأيام': "عدد الأيام",
+    'الحالة': "الحالة",
+    'السبب': "السبب",
+    'ملاحظات_المدير': "ملاحظات المدير",
+    'تاريخ_الطلب': "تاريخ الطلب",
+}
+
+
+def دفعات_التقرير(المخزن, حجم_الدفعة=10_000, **المرشحات):
+    """دفعات التقرير بأعمدته النهائية والأسماء محلولة"""
+    الأقسام = المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+    for الدفعة in المخزن.دفعات_الطلبات(حجم_الدفعة=حجم_الدفعة, **المرشحات):
+        الدفعة = المخزن.إضافة_الأسماء(الدفعة, أسماء_الموظفين=True)
+        الدفعة['القسم'] = الدفعة['معرف_الموظف'].map(الأقسام).fillna('')
+        yield الدفعة[list(أعمدة_التصدير)].rename(columns=أعمدة_التصدير)
+
+
+def كتابة_csv(الدفعات, المسار):
+    # utf-8-sig حتى يفتحه Excel بالعربية مباشرة
+    with open(المسار, 'w', encoding='utf-8-sig', newline='') as الملف:
+        الملف.write(','.join(أعمدة_التصدير.values()) + '\n')
+        for الدفعة in الدفعات:
+            نصوص_الأيام(الدفعة).to_csv(الملف, header=False, index=False)
+
+
+def كتابة_xlsx(الدفعات, المسار):
+    if openpyxl is None:
+        raise RuntimeError("التصدير إلى XLSX يتطلب تثبيت openpyxl")
+    # وضع الكتابة فقط يكتب الصفوف إلى ملف مؤقت بدلاً من إبقاء الورقة كاملة في الذاكرة
+    الكتاب = openpyxl.Workbook(write_only=True)
+    الورقة = الكتاب.create_sheet("طلبات الإجازة")
+    الورقة.append(list(أعمدة_التصدير.values()))
+    for الدفعة in الدفعات:
+        for العمود in أعمدة_الأيام:
+            الدفعة[أعمدة_التصدير[العمود]] = الدفعة[أعمدة_التصدير[العمود]].dt.date
+        for الصف in الدفعة.astype(object).where(الدفعة.notna(), None).itertuples(index=False):
+            الورقة.append(list(الصف))
+    الكتاب.save(المسار)
+
+
+def كتابة_parquet(الدفعات, المسار):
+    if pq is None:
+        raise RuntimeError("التصدير إلى Parquet يتطلب تثبيت pyarrow")
+    # مخطط ثابت حتى لا تختلف الأنواع بين دفعة وأخرى
+    المخطط = pa.schema([
+        (العنوان, pa.int64() if العمود in ('معرف', 'عدد_الأيام') else pa.date32() if العمود in أعمدة_الأيام
+         else pa.string())
+        for العمود, العنوان in أعمدة_التصدير.items()
+    ])
+    with pq.ParquetWriter(المسار, المخطط) as الكاتب:
+        for الدفعة in الدفعات:
+            الكاتب.write_table(pa.Table.from_pandas(الدفعة, schema=المخطط, preserve_index=False))
+
+
+الصيغ = {'csv': كتابة_csv, 'xlsx': كتابة_xlsx, 'parquet': كتابة_parquet}
+
+
+def الصيغ_المتاحة():
+    """الصيغ المثبتة مكتباتها"""
+    return [ص for ص in الصيغ if (ص != 'xlsx' or openpyxl is not None) and (ص != 'parquet' or pq is not None)]
+
+
+def تصدير_الطلبات(المخزن, المسار, الصيغة='csv', حجم_الدفعة=10_000, **المرشحات):
+    """كتابة تقرير الطلبات المطابقة للمرشحات في ملف وإرجاع عدد صفوفه"""
+    if الصيغة not in الصيغ:
+        raise ValueError(f"صيغة تصدير غير معروفة: {الصيغة}")
+    العدد = 0
+
+    def عد(الدفعات):
+        nonlocal العدد
+        for الدفعة in الدفعات:
+            العدد += len(الدفعة)
+            yield الدفعة
+
+    الصيغ[الصيغة](عد(دفعات_التقرير(المخزن, حجم_الدفعة, **المرشحات)), المسار)
+    return العدد
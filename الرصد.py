@@ -0,0 +1,183 @@
+"""رصد الأداء: توقيت عمليات القراءة والكتابة وكل إعادة تشغيل للصفحة
+
+كل عملية وكل تشغيل يُكتب سطر JSON في سجل الأداء (VACATION_PERF_LOG، فارغ لتعطيله)
+ويُحفظ آخرها في ذاكرة العملية لتعرضها صفحة التشخيص.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+import pandas as pd
+
+# عدد العمليات والتشغيلات الأخيرة المحفوظة للتشخيص
+حد_العمليات = int(os.environ.get('VACATION_PERF_KEEP', '5000'))
+حد_التشغيلات = حد_العمليات // 5
+
+# سطر JSON لكل حدث؛ يمكن توجيهه لأي معالج آخر عبر logging
+_المسجل = logging.getLogger('نظام_الإجازات.الأداء')
+_المسجل.setLevel(logging.INFO)
+مسار_السجل = os.environ.get('VACATION_PERF_LOG', 'سجل_الأداء.jsonl')
+
+# التنسيق والكتابة في خيط منفصل حتى لا تنتظرهما الصفحة
+_الطابور = queue.SimpleQueue()
+
+
+def _كاتب_السجل():
+    while (السجل := _الطابور.get()) is not None:
+        if مسار_السجل and not _المسجل.handlers:
+            # عند أول حدث لا عند الاستيراد: المسار النسبي في مجلد البيانات مثل ملفات الجداول
+            المعالج = RotatingFileHandler(مسار_السجل, maxBytes=10 * 2 ** 20, backupCount=3, encoding='utf-8')
+            المعالج.setFormatter(logging.Formatter('%(message)s'))
+            _المسجل.addHandler(المعالج)
+            _المسجل.propagate = False
+        _المسجل.info(json.dumps(السجل, ensure_ascii=False, default=str))
+
+
+def _إيقاف_الكاتب():
+    _الطابور.put(None)
+    _الكاتب.join()
+
+
+_الكاتب = threading.Thread(target=_كاتب_السجل, name='سجل_الأداء', daemon=True)
+_الكاتب.start()
+atexit.register(_إيقاف_الكاتب)
+
+_العمليات = deque(maxlen=حد_العمليات)
+_التشغيلات = deque(maxlen=حد_التشغيلات)
+_قفل = threading.Lock()
+# التشغيل الحالي وعمق العمليات المتداخلة لكل خيط (كل جلسة Streamlit في خيطها)
+_المحلي = threading.local()
+
+
+def _إصدار(الحدث, السجل):
+    with _قفل:
+        (_التشغيلات if الحدث == 'تشغيل' else _العمليات).append(السجل)
+    if مسار_السجل or _المسجل.hasHandlers():
+        _الطابور.put({'الحدث': الحدث, 'الوقت': time.time(), **السجل})
+
+
+def تسجيل_عملية(العملية, الزمن, النوع='قراءة', البايتات=0, الصفوف=0, **الحقول):
+    """تسجيل عملية قيست خارج قياس() مثل قراءة الدفعات الممتدة عبر مولد"""
+    التشغيل = getattr(_المحلي, 'التشغيل', None)
+    السجل = {
+        'العملية': العملية, 'النوع': النوع, 'الزمن': الزمن, 'البايتات': البايتات, 'الصفوف': الصفوف,
+        'الصفحة': التشغيل['الصفحة'] if التشغيل else None, **الحقول,
+    }
+    # العمليات الداخلية (تحميل داخل إلحاق مثلاً) محسوبة ضمن العملية الخارجية
+    if التشغيل is not None and not getattr(_المحلي, 'العمق', 0):
+        التشغيل['عدد_العمليات'] += 1
+        التشغيل[f'زمن_{النوع}'] += الزمن
+        التشغيل[f'بايتات_{النوع}'] += البايتات
+        التشغيل['الصفوف'] += الصفوف
+    _إصدار('عملية', السجل)
+
+
+@contextmanager
+def قياس(العملية, النوع='قراءة', **الحقول):
+    """توقيت عملية قراءة أو كتابة؛ يضيف المستدعي 'البايتات' و'الصفوف' إلى القاموس المُعاد"""
+    السجل = {'البايتات': 0, 'الصفوف': 0, **الحقول}
+    _المحلي.العمق = getattr(_المحلي, 'العمق', 0) + 1
+    البداية = time.perf_counter()
+    try:
+        yield السجل
+    finally:
+        الزمن = time.perf_counter() - البداية
+        _المحلي.العمق -= 1
+        تسجيل_عملية(العملية, الزمن, النوع, **السجل)
+
+
+@contextmanager
+def تشغيل_الصفحة(المستخدم=None):
+    """توقيت إعادة تشغيل كاملة للسكربت مع مجاميع عملياتها؛ زمن العرض هو الباقي بعد القراءة والكتابة"""
+    التشغيل = {
+        'الصفحة': None, 'المستخدم': المستخدم, 'عدد_العمليات': 0,
+        'زمن_قراءة': 0.0, 'زمن_كتابة': 0.0, 'بايتات_قراءة': 0, 'بايتات_كتابة': 0, 'الصفوف': 0,
+    }
+    _المحلي.التشغيل = التشغيل
+    البداية = time.perf_counter()
+    try:
+        yield التشغيل
+    finally:
+        # يصل إلى هنا أيضاً عند st.rerun و st.stop لأنهما استثناءان
+        التشغيل['الزمن'] = time.perf_counter() - البداية
+        التشغيل['زمن_العرض'] = max(التشغيل['الزمن'] - التشغيل['زمن_قراءة'] - التشغيل['زمن_كتابة'], 0.0)
+        _المحلي.التشغيل = None
+        _إصدار('تشغيل', التشغيل)
+
+
+def تعيين_الصفحة(الصفحة):
+    """تسمية التشغيل الحالي بالصفحة المعروضة"""
+    التشغيل = getattr(_المحلي, 'التشغيل', None)
+    if التشغيل is not None:
+        التشغيل['الصفحة'] = الصفحة
+
+
+def _نسب_مئوية(البيانات, المفتاح):
+    if البيانات.empty:
+        return pd.DataFrame()
+    المجموعات = البيانات.groupby(المفتاح, dropna=False)['الزمن']
+    return pd.DataFrame({
+        'العدد': المجموعات.size(),
+        'p50': المجموعات.quantile(0.5) * 1000,
+        'p95': المجموعات.quantile(0.95) * 1000,
+        'p99': المجموعات.quantile(0.99) * 1000,
+        'الأقصى': المجموعات.max() * 1000,
+    })
+
+
+def ملخص_العمليات():
+    """العمليات الأخيرة مجمعة حسب العملية والجدول: العدد والنسب المئوية للزمن (م.ث) والبايتات والصفوف"""
+    with _قفل:
+        البيانات = pd.DataFrame(list(_العمليات))
+    if البيانات.empty:
+        return البيانات
+    # عبارات SQL المباشرة بلا جدول
+    البيانات['الجدول'] = البيانات.get('الجدول', pd.Series(dtype=object)).fillna('')
+    الملخص = _نسب_مئوية(البيانات, ['العملية', 'الجدول'])
+    المجاميع = البيانات.groupby(['العملية', 'الجدول'], dropna=False)[['البايتات', 'الصفوف']].sum()
+    return الملخص.join(المجاميع).sort_values('p95', ascending=False)
+
+
+def ملخص_التشغيلات():
+    """التشغيلات الأخيرة مجمعة حسب الصفحة: العدد والنسب المئوية للزمن بالميلي ثانية"""
+    with _قفل:
+        البيانات = pd.DataFrame(list(_التشغيلات))
+    return _نسب_مئوية(البيانات, 'الصفحة').sort_values('p95', ascending=False) if not البيانات.empty else البيانات
+
+
+def أبطأ_التشغيلات(العدد=20):
+    with _قفل:
+        البيانات = pd.DataFrame(list(_التشغيلات))
+    return البيانات.nlargest(العدد, 'الزمن') if not البيانات.empty else البيانات
+
+
+def مسح():
+    with _قفل:
+        _العمليات.clear()
+        _التشغيلات.clear()
+
+
+def رصد_الدفعات(الدفعات, العملية, البايتات=0, **الحقول):
+    """تمرير دفعات مولد مع تسجيل زمن إنتاجها وحده دون زمن المستهلك بينها"""
+    الزمن, الصفوف = 0.0, 0
+    المكرر = iter(الدفعات)
+    try:
+        while True:
+            البداية = time.perf_counter()
+            الدفعة = next(المكرر, None)
+            الزمن += time.perf_counter() - البداية
+            if الدفعة is None:
+                return
+            الصفوف += len(الدفعة)
+            yield الدفعة
+    finally:
+        if hasattr(المكرر, 'close'):
+            المكرر.close()
+        تسجيل_عملية(العملية, الزمن, البايتات=البايتات, الصفوف=الصفوف, **الحقول)
@@ -0,0 +1,106 @@
+"""قواعد تقديم طلب الإجازة وقرارات معتمديه المشتركة بين صفحات Streamlit وواجهة JSON"""
+import os
+from datetime import date, datetime
+
+import أيام_العمل
+from الاعتماد import المراحل_التالية, مراحل_الاعتماد, مرحلة_المستخدم
+from التخزين import جدول_أنواع_الإجازات
+
+# نسبة موظفي القسم التي يجب أن تبقى في العمل كل يوم
+الحد_الأدنى_للحضور = float(os.environ.get('VACATION_MIN_STAFFING', '0.7'))
+
+
+def الحد_الأقصى_للغياب(المخزن, القسم):
+    """أكبر عدد يُسمح بغيابه من القسم في اليوم الواحد (واحد على الأقل للأقسام الصغيرة)"""
+    عدد_القسم = المخزن.الإحصائيات()['المستخدمين']['حسب_القسم'].get(القسم, 0)
+    return max(1, int(عدد_القسم * (1 - الحد_الأدنى_للحضور)))
+
+
+def تقديم_طلب(المخزن, معرف_الموظف, القسم, نوع_الإجازة, تاريخ_البدء, تاريخ_الانتهاء, السبب=''):
+    """التحقق من طلب جديد وإضافته قيد المراجعة
+
+    يعيد (معرف الطلب، عدد أيام العمل)، ويرفع ValueError برسالة تُعرض للمستخدم إذا رُفض الطلب.
+    """
+    if نوع_الإجازة not in المخزن.قاموس_الأسماء(جدول_أنواع_الإجازات, 'اسم_الإجازة'):
+        raise ValueError("نوع الإجازة غير معروف")
+    if تاريخ_البدء < date.today():
+        raise ValueError("لا يمكن طلب إجازة تبدأ قبل اليوم")
+    if تاريخ_الانتهاء < تاريخ_البدء:
+        raise ValueError("تاريخ الانتهاء يجب أن يكون بعد تاريخ البدء")
+
+    # الفحص والإضافة في معاملة واحدة: جلستان لا تجتازان فحص الحضور معاً ثم تضيفان كلتاهما
+    with المخزن.معاملة_الطلبات():
+        return _فحص_وإضافة(المخزن, معرف_الموظف, القسم, نوع_الإجازة, تاريخ_البدء, تاريخ_الانتهاء, السبب)
+
+
+def _فحص_وإضافة(المخزن, معرف_الموظف, القسم, نوع_الإجازة, تاريخ_البدء, تاريخ_الانتهاء, السبب):
+    # التداخل مع طلبات الموظف وعدد الغائبين من قسمه في كل يوم من الفترة
+    المتداخلة, الغياب = المخزن.تعارضات_الطلب(معرف_الموظف, تاريخ_البدء, تاريخ_الانتهاء)
+    الحد_الأقصى = الحد_الأقصى_للغياب(المخزن, القسم)
+    الأيام_الممتلئة = [يوم for يوم, العدد in الغياب.items() if العدد >= الحد_الأقصى]
+    # أيام العمل فقط: دون العطل الرسمية وأيام راحة جدول القسم
+    عدد_الأيام = أيام_العمل.التقويم().أيام(تاريخ_البدء, تاريخ_الانتهاء, القسم)
+
+    if المتداخلة:
+        raise ValueError(f"الفترة تتداخل مع طلب سابق لك (رقم {', '.join(map(str, المتداخلة))})")
+    if عدد_الأيام == 0:
+        raise ValueError("الفترة كلها عطل أو أيام راحة ولا تحتوي أيام عمل")
+    if الأيام_الممتلئة:
+        raise ValueError(
+            f"بلغ عدد الغائبين من قسمك الحد الأقصى ({الحد_الأقصى}) في: "
+            + ", ".join(يوم.strftime('%Y-%m-%d') for يوم in الأيام_الممتلئة[:5])
+            + (" ..." if len(الأيام_الممتلئة) > 5 else "")
+        )
+
+    # إضافة الطلب دون إعادة كتابة الجدول
+    معرف = المخزن.إضافة_طلب({
+        'معرف_الموظف': معرف_الموظف,
+        'نوع_الإجازة': نوع_الإجازة,
+        'تاريخ_البدء': تاريخ_البدء.strftime('%Y-%m-%d'),
+        'تاريخ_الانتهاء': تاريخ_الانتهاء.strftime('%Y-%m-%d'),
+        'عدد_الأيام': عدد_الأيام,
+        'السبب': السبب,
+        'الحالة': 'قيد المراجعة',
+        'ملاحظات_المدير': '',
+        'معرف_المدير_الموافق': None,
+        'تاريخ_الطلب': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'الإصدار': 0,
+    })
+    return معرف, عدد_الأيام
+
+
+def طابور_المعتمد(المخزن, المستخدم, الإزاحة=0, الحد=50):
+    """صفحة من طابور مرحلة المستخدم (قاموس بالمعرف ونوع_المستخدم والقسم) في قسمه دون طلباته هو، وعددها الكلي"""
+    return المخزن.طابور_الاعتماد(
+        المستخدم['القسم'], مرحلة_المستخدم[المستخدم['نوع_المستخدم']], الإزاحة, الحد, المستخدم['معرف']
+    )
+
+
+def الحالة_بعد_الموافقة(المخزن, القسم, الحالة):
+    """أول مرحلة بعد «الحالة» لها معتمد نشط في القسم، أو «معتمد» إذا لم تبق مرحلة"""
+    return next(
+        (ح for ح in المراحل_التالية(الحالة) if المخزن.معتمدو_القسم(القسم, مراحل_الاعتماد[ح])), 'معتمد'
+    )
+
+
+def قرار_المعتمد(المخزن, المستخدم, المعرفات, القرار, الإصدارات=None):
+    """اعتماد («معتمد») أو رفض («مرفوض») طلبات من طابور مدير القسم أو المسؤول الإداري
+
+    الموافقة تنقل الطلب إلى المرحلة التالية التي لها معتمد في القسم، أو تعتمده نهائياً بعد آخرها؛ الرفض نهائي.
+    الطلبات التي لم تعد في طابور المستخدم (قررها غيره) تُعد متعارضة. يعيد (المنفذة، المتعارضة).
+    """
+    الحالة = مرحلة_المستخدم[المستخدم['نوع_المستخدم']]
+    _, الإجمالي = طابور_المعتمد(المخزن, المستخدم, الحد=0)
+    الطابور, _ = طابور_المعتمد(المخزن, المستخدم, الحد=الإجمالي)
+    الحالية = dict(zip(الطابور['معرف'].astype(int), الطابور['الإصدار'].fillna(0).astype(int)))
+    المعرفات = [int(م) for م in المعرفات]
+    المتاحة = [م for م in المعرفات if م in الحالية]
+    المتعارضة = [م for م in المعرفات if م not in الحالية]
+
+    if القرار == 'معتمد':
+        القرار = الحالة_بعد_الموافقة(المخزن, المستخدم['القسم'], الحالة)
+    الإصدارات = الحالية if الإصدارات is None else {int(م): int(إ) for م, إ in الإصدارات.items()}
+    المنفذة, المتعارضة_الآن = المخزن.تحديث_حالة_الطلبات(
+        المتاحة, القرار, المستخدم['معرف'], {م: الإصدارات.get(م, الحالية[م]) for م in المتاحة}
+    )
+    return المنفذة, المتعارضة + المتعارضة_الآن
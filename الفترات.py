@@ -0,0 +1,135 @@
+"""فهرس فترات الإجازة: التداخل مع طلبات الموظف وعدد الغائبين من القسم في كل يوم بزمن لوغاريتمي"""
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from الاعتماد import الحالات_المعلقة
+
+# الطلبات التي تُحسب غياباً: المعتمدة وما زال في إحدى مراحل الاعتماد
+الحالات_الفعالة = ('معتمد',) + الحالات_المعلقة
+
+
+def رقم_اليوم(التاريخ):
+    """رقم ترتيبي لليوم من نص YYYY-MM-DD أو كائن date"""
+    if isinstance(التاريخ, str):
+        التاريخ = date.fromisoformat(التاريخ[:10])
+    return التاريخ.toordinal()
+
+
+class فهرس_الفترات:
+    """قائمتان مرتبتان للبدايات والنهايات
+
+    عدد الفترات المتداخلة مع [ب، ن] = عدد البدايات <= ن - عدد النهايات < ب
+    لأن كل فترة تنتهي قبل ب تبدأ حتماً قبل ن.
+    """
+
+    def __init__(self):
+        self.البدايات = []
+        self.النهايات = []
+        self.الفترات = {}
+
+    @classmethod
+    def من_مصفوفات(cls, المعرفات, البدايات, النهايات):
+        الفهرس = cls()
+        الفهرس.البدايات = np.sort(البدايات).tolist()
+        الفهرس.النهايات = np.sort(النهايات).tolist()
+        الفهرس.الفترات = dict(zip(المعرفات.tolist(), zip(البدايات.tolist(), النهايات.tolist())))
+        return الفهرس
+
+    def __len__(self):
+        return len(self.الفترات)
+
+    def إضافة(self, المعرف, البداية, النهاية):
+        self.حذف(المعرف)
+        insort(self.البدايات, البداية)
+        insort(self.النهايات, النهاية)
+        self.الفترات[المعرف] = (البداية, النهاية)
+
+    def حذف(self, المعرف):
+        الفترة = self.الفترات.pop(المعرف, None)
+        if الفترة is not None:
+            del self.البدايات[bisect_left(self.البدايات, الفترة[0])]
+            del self.النهايات[bisect_left(self.النهايات, الفترة[1])]
+
+    def عدد_المتداخلة(self, البداية, النهاية):
+        return bisect_right(self.البدايات, النهاية) - bisect_left(self.النهايات, البداية)
+
+    def المتداخلة(self, البداية, النهاية):
+        """معرفات الفترات المتداخلة (مسح خطي، يُستدعى فقط بعد أن يثبت العدد وجود تداخل)"""
+        return [م for م, (ب, ن) in self.الفترات.items() if ب <= النهاية and ن >= البداية]
+
+    def الأعداد_اليومية(self, البداية, النهاية):
+        """عدد الفترات التي تغطي كل يوم من البداية إلى النهاية"""
+        return [
+            bisect_right(self.البدايات, اليوم) - bisect_left(self.النهايات, اليوم)
+            for اليوم in range(البداية, النهاية + 1)
+        ]
+
+
+class فهرس_الإجازات:
+    """فهارس فترات الطلبات الفعالة لكل موظف ولكل قسم"""
+
+    def __init__(self):
+        self.حسب_الموظف = defaultdict(فهرس_الفترات)
+        self.حسب_القسم = defaultdict(فهرس_الفترات)
+
+    @classmethod
+    def بناء(cls, الطلبات, الأقسام):
+        """بناء الفهارس من جدول الطلبات وقاموس معرف الموظف -> القسم"""
+        الفهرس = cls()
+        الطلبات = الطلبات[الطلبات['الحالة'].isin(الحالات_الفعالة)]
+        if الطلبات.empty:
+            return الفهرس
+        الطلبات = pd.DataFrame({
+            'معرف': الطلبات['معرف'].astype('int64').to_numpy(),
+            'معرف_الموظف': الطلبات['معرف_الموظف'].astype('int64').to_numpy(),
+            'القسم': الطلبات['معرف_الموظف'].map(الأقسام).fillna('').to_numpy(),
+            'البداية': _أرقام_الأيام(الطلبات['تاريخ_البدء']),
+            'النهاية': _أرقام_الأيام(الطلبات['تاريخ_الانتهاء']),
+        })
+        for الهدف, العمود in ((الفهرس.حسب_الموظف, 'معرف_الموظف'), (الفهرس.حسب_القسم, 'القسم')):
+            # ترتيب واحد حسب المفتاح ثم تقطيع المصفوفات بدلاً من groupby لكل مفتاح
+            المرتبة = الطلبات.sort_values(العمود, kind='stable')
+            المفاتيح, البدايات_المواقع = np.unique(المرتبة[العمود].to_numpy(), return_index=True)
+            الأجزاء = [
+                np.split(المرتبة[ع].to_numpy(), البدايات_المواقع[1:]) for ع in ('معرف', 'البداية', 'النهاية')
+            ]
+            for المفتاح, المعرفات, البدايات, النهايات in zip(المفاتيح.tolist(), *الأجزاء):
+                الهدف[المفتاح] = فهرس_الفترات.من_مصفوفات(المعرفات, البدايات, النهايات)
+        return الفهرس
+
+    def تحديث(self, الطلب, القسم):
+        """تطبيق طلب جديد أو تغيير حالته (قاموس بأعمدة جدول الطلبات) وقسم صاحبه"""
+        المعرف, معرف_الموظف = int(الطلب['معرف']), int(الطلب['معرف_الموظف'])
+        if الطلب['الحالة'] in الحالات_الفعالة:
+            البداية, النهاية = رقم_اليوم(الطلب['تاريخ_البدء']), رقم_اليوم(الطلب['تاريخ_الانتهاء'])
+            self.حسب_الموظف[معرف_الموظف].إضافة(المعرف, البداية, النهاية)
+            self.حسب_القسم[القسم].إضافة(المعرف, البداية, النهاية)
+        else:
+            self.حسب_الموظف[معرف_الموظف].حذف(المعرف)
+            self.حسب_القسم[القسم].حذف(المعرف)
+
+    def طلبات_متداخلة(self, معرف_الموظف, البداية, النهاية):
+        """معرفات طلبات الموظف الفعالة المتداخلة مع الفترة"""
+        الفهرس = self.حسب_الموظف.get(int(معرف_الموظف))
+        البداية, النهاية = رقم_اليوم(البداية), رقم_اليوم(النهاية)
+        if الفهرس is None or not الفهرس.عدد_المتداخلة(البداية, النهاية):
+            return []
+        return الفهرس.المتداخلة(البداية, النهاية)
+
+    def الغياب_اليومي(self, القسم, البداية, النهاية):
+        """قاموس اليوم -> عدد الغائبين من القسم بطلبات فعالة"""
+        البداية, النهاية = رقم_اليوم(البداية), رقم_اليوم(النهاية)
+        الفهرس = self.حسب_القسم.get(القسم)
+        الأعداد = الفهرس.الأعداد_اليومية(البداية, النهاية) if الفهرس is not None else [0] * (النهاية - البداية + 1)
+        return {date.fromordinal(البداية + ر): ع for ر, ع in enumerate(الأعداد)}
+
+
+def _أرقام_الأيام(التواريخ):
+    # عمود محلل في المخطط فلا يكلف التحويل شيئاً، والنصوص (بيانات خارج المخزن) تُحلل هنا
+    الأيام = pd.to_datetime(التواريخ, format='ISO8601').to_numpy().astype('datetime64[D]')
+    # يوم 0001-01-01 رقمه الترتيبي 1 في date.toordinal
+    return الأيام.astype('int64') + date(1970, 1, 1).toordinal()
@@ -0,0 +1,52 @@
+"""كلمات المرور وأدوار المستخدمين ورموز واجهة JSON"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+# أدوار المستخدمين المعروفة في النظام
+أنواع_المستخدمين = ["موظف", "مدير", "مسؤول_إداري", "مدير_النظام"]
+
+
+def تشفير_كلمة_المرور(كلمة_المرور):
+    return hashlib.sha256(كلمة_المرور.encode()).hexdigest()
+
+
+def تشفير_دفعة(كلمات_المرور):
+    """تشفير قائمة كلمات مرور (وحدة العمل في التشفير المتوازي)"""
+    return [تشفير_كلمة_المرور(ك) for ك in كلمات_المرور]
+
+
+# مفتاح توقيع رموز الواجهة؛ بدونه يُولد مفتاح لكل عملية فتسقط الرموز بإعادة تشغيلها
+_مفتاح_الرموز = os.environ.get('VACATION_API_SECRET', '').encode() or secrets.token_bytes(32)
+مدة_الرمز = int(os.environ.get('VACATION_API_TOKEN_TTL', '3600'))
+
+
+def _ترميز(البايتات):
+    return base64.urlsafe_b64encode(البايتات).rstrip(b'=')
+
+
+def _توقيع(الحمولة):
+    return _ترميز(hmac.new(_مفتاح_الرموز, الحمولة, hashlib.sha256).digest())
+
+
+def إصدار_رمز(اسم_المستخدم, المدة=None):
+    """رمز موقع يحمل اسم المستخدم ووقت انتهائه، يُتحقق منه دون جدول جلسات"""
+    الانتهاء = int(time.time()) + (المدة or مدة_الرمز)
+    الحمولة = _ترميز(json.dumps([اسم_المستخدم, الانتهاء]).encode())
+    return (الحمولة + b'.' + _توقيع(الحمولة)).decode()
+
+
+def التحقق_من_رمز(الرمز):
+    """اسم المستخدم في رمز سليم التوقيع لم تنته مدته، أو None"""
+    try:
+        الحمولة, التوقيع = الرمز.encode().split(b'.')
+        if not hmac.compare_digest(التوقيع, _توقيع(الحمولة)):
+            return None
+        اسم_المستخدم, الانتهاء = json.loads(base64.urlsafe_b64decode(الحمولة + b'=' * (-len(الحمولة) % 4)))
+    except (ValueError, TypeError):
+        return None
+    return اسم_المستخدم if الانتهاء > time.time() else None
@@ -0,0 +1,43 @@
+"""ترحيل ملفات CSV الحالية إلى قاعدة SQLite لمرة واحدة
+
+الاستخدام:
+    python ترحيل_إلى_sqlite.py --db الإجازات.db
+ثم تشغيل التطبيق مع VACATION_STORAGE=sqlite
+"""
+import argparse
+import sys
+
+from التخزين import مخزن_CSV, مخزن_SQLite, ملفات_الجداول
+
+
+def ترحيل(مسار_القاعدة, استبدال=False):
+    """نسخ الجداول الخمسة من ملفات CSV إلى القاعدة وإرجاع عدد الصفوف لكل جدول"""
+    المصدر = مخزن_CSV()
+    الوجهة = مخزن_SQLite(مسار_القاعدة)
+    if الوجهة.مهيأ() and not استبدال:
+        raise RuntimeError("القاعدة تحتوي على بيانات بالفعل، استخدم --replace للاستبدال")
+
+    الجداول = {اسم_الجدول: المصدر.جدول(اسم_الجدول) for اسم_الجدول in ملفات_الجداول}
+    الوجهة.استيراد(الجداول, استبدال=True)
+    return {اسم_الجدول: len(البيانات) for اسم_الجدول, البيانات in الجداول.items()}
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description="ترحيل بيانات نظام الإجازات من CSV إلى SQLite")
+    المحلل.add_argument('--db', default='الإجازات.db', help="مسار قاعدة SQLite")
+    المحلل.add_argument('--replace', action='store_true', help="استبدال البيانات الموجودة في القاعدة")
+    المعاملات = المحلل.parse_args()
+
+    try:
+        الأعداد = ترحيل(المعاملات.db, المعاملات.replace)
+    except RuntimeError as خطأ:
+        print(f"❌ {خطأ}", file=sys.stderr)
+        return 1
+
+    for اسم_الجدول, العدد in الأعداد.items():
+        print(f"✅ {اسم_الجدول}: {العدد} صف")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""واجهة JSON خفيفة لنظام الإجازات بجانب تطبيق Streamlit وعلى نفس طبقة البيانات
+
+الاستخدام:
+    python خادم_الواجهة.py --port 8600 --workers 16
+
+    POST /api/login               {"اسم_المستخدم": "...", "كلمة_المرور": "..."}  -> {"الرمز": "..."}
+    GET  /api/balance             رصيد المستخدم وسجل حركاته
+    POST /api/requests            {"نوع_الإجازة": 1, "تاريخ_البدء": "YYYY-MM-DD", "تاريخ_الانتهاء": "...", "السبب": "..."}
+    GET  /api/requests/pending    ?stage=&department=&type=&from=&to=&offset=0&limit=50 (مدير النظام)
+                                  ?offset=0&limit=50 طابور مرحلة مدير القسم أو المسؤول الإداري في قسمه
+    POST /api/requests/decision   {"المعرفات": [..], "الحالة": "معتمد" أو "مرفوض"} (مدير النظام والمعتمدون)
+
+كل طلب عدا الدخول يحمل الرأس Authorization: Bearer <الرمز>.
+العملية طويلة العمر فيبقى المخزن وفهارسه المشتقة ودليل المستخدمين في ذاكرتها بين الطلبات،
+وتعمل الطلبات على مجمع خيوط ثابت حتى يعيد كل خيط استخدام اتصال SQLite الخاص به.
+"""
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from طبقة_البيانات import نصوص_الأيام
+from المصادقة import تشفير_كلمة_المرور, إصدار_رمز, التحقق_من_رمز, مدة_الرمز
+from الإشعارات import الحصول_على_الموزع
+from الرصد import تشغيل_الصفحة, تعيين_الصفحة
+from الاعتماد import الحالات_المعلقة
+from الطلبات import تقديم_طلب, طابور_المعتمد, قرار_المعتمد
+from التخزين import الحصول_على_المخزن
+
+_المسجل = logging.getLogger('نظام_الإجازات.الواجهة')
+
+# أكبر جسم طلب مقبول بالبايت
+الحد_الأقصى_للجسم = 64 * 1024
+
+
+class خطأ_الواجهة(Exception):
+    """خطأ يُعاد للعميل برمز HTTP ورسالة"""
+
+    def __init__(self, رمز_الحالة, الرسالة):
+        super().__init__(الرسالة)
+        self.رمز_الحالة = رمز_الحالة
+
+
+def _سجلات(البيانات):
+    """صفوف جدول قابلة للتحويل إلى JSON: الأيام نصوص والقيم الفارغة null"""
+    return json.loads(نصوص_الأيام(البيانات).to_json(orient='records', force_ascii=False))
+
+
+def _يوم(القيمة, الحقل):
+    try:
+        return date.fromisoformat(str(القيمة))
+    except ValueError:
+        raise خطأ_الواجهة(HTTPStatus.BAD_REQUEST, f"{الحقل}: تاريخ غير صالح (YYYY-MM-DD)") from None
+
+
+def _عدد(القيمة, الحقل):
+    try:
+        return int(القيمة)
+    except (TypeError, ValueError):
+        raise خطأ_الواجهة(HTTPStatus.BAD_REQUEST, f"{الحقل}: عدد صحيح مطلوب") from None
+
+
+def الدخول(المستخدم, الجسم, _):
+    دليل_المستخدمين = الحصول_على_المخزن().دليل_المستخدمين()
+    مستخدم = دليل_المستخدمين.get(str(الجسم.get('اسم_المستخدم', '')))
+    if (مستخدم is None or مستخدم['الحالة'] != 'نشط'
+            or مستخدم['كلمة_المرور'] != تشفير_كلمة_المرور(str(الجسم.get('كلمة_المرور', '')))):
+        raise خطأ_الواجهة(HTTPStatus.UNAUTHORIZED, "اسم المستخدم أو كلمة المرور غير صحيحة")
+    return HTTPStatus.OK, {
+        'الرمز': إصدار_رمز(مستخدم['اسم_المستخدم']), 'المدة': مدة_الرمز,
+        'اسم_الموظف': مستخدم['اسم_الموظف'], 'نوع_المستخدم': مستخدم['نوع_المستخدم'],
+    }
+
+
+def الرصيد(المستخدم, _, __):
+    المخزن = الحصول_على_المخزن()
+    return HTTPStatus.OK, {
+        'الأرصدة': _سجلات(المخزن.أرصدة_الموظف(المستخدم['معرف'])),
+        'السجل': _سجلات(المخزن.سجل_أرصدة_الموظف(المستخدم['معرف'])),
+    }
+
+
+def طلب_جديد(المستخدم, الجسم, _):
+    try:
+        معرف, عدد_الأيام = تقديم_طلب(
+            الحصول_على_المخزن(), المستخدم['معرف'], المستخدم['القسم'],
+            _عدد(الجسم.get('نوع_الإجازة'), 'نوع_الإجازة'),
+            _يوم(الجسم.get('تاريخ_البدء'), 'تاريخ_البدء'), _يوم(الجسم.get('تاريخ_الانتهاء'), 'تاريخ_الانتهاء'),
+            str(الجسم.get('السبب', '')),
+        )
+    except ValueError as خطأ:
+        raise خطأ_الواجهة(HTTPStatus.UNPROCESSABLE_ENTITY, str(خطأ)) from None
+    return HTTPStatus.CREATED, {'معرف': معرف, 'عدد_الأيام': عدد_الأيام, 'الحالة': 'قيد المراجعة'}
+
+
+def الطلبات_المعلقة(المستخدم, _, المعاملات):
+    المخزن = الحصول_على_المخزن()
+    الإزاحة = _عدد(المعاملات.get('offset', 0), 'offset')
+    الحد = min(_عدد(المعاملات.get('limit', 50), 'limit'), 500)
+    if المستخدم['نوع_المستخدم'] != 'مدير_النظام':
+        # المعتمد يرى طابور مرحلته في قسمه فقط من فهرس الطوابير
+        الطلبات, الإجمالي = طابور_المعتمد(المخزن, المستخدم, max(الإزاحة, 0), max(الحد, 0))
+        return HTTPStatus.OK, {
+            'الإجمالي': الإجمالي,
+            'الطلبات': _سجلات(المخزن.إضافة_الأسماء(الطلبات, أسماء_الموظفين=True)),
+        }
+    المرحلة = المعاملات.get('stage', الحالات_المعلقة[0])
+    if المرحلة not in الحالات_المعلقة:
+        raise خطأ_الواجهة(HTTPStatus.BAD_REQUEST, f"stage: إحدى {', '.join(الحالات_المعلقة)}")
+    الطلبات, الإجمالي = المخزن.صفحة_الطلبات(
+        المرحلة,
+        القسم=المعاملات.get('department'),
+        نوع_الإجازة=_عدد(المعاملات['type'], 'type') if 'type' in المعاملات else None,
+        من_تاريخ=str(_يوم(المعاملات['from'], 'from')) if 'from' in المعاملات else None,
+        إلى_تاريخ=str(_يوم(المعاملات['to'], 'to')) if 'to' in المعاملات else None,
+        الإزاحة=max(الإزاحة, 0), الحد=max(الحد, 0),
+    )
+    return HTTPStatus.OK, {
+        'الإجمالي': الإجمالي,
+        'الطلبات': _سجلات(المخزن.إضافة_الأسماء(الطلبات, أسماء_الموظفين=True)),
+    }
+
+
+def قرار_الطلبات(المستخدم, الجسم, _):
+    الحالة = الجسم.get('الحالة')
+    if الحالة not in ('معتمد', 'مرفوض'):
+        raise خطأ_الواجهة(HTTPStatus.BAD_REQUEST, "الحالة: معتمد أو مرفوض")
+    المعرفات = [_عدد(م, 'المعرفات') for م in الجسم.get('المعرفات') or []]
+    # إصدار كل طلب كما في قائمة الطلبات المعلقة التي بُني عليها القرار (اختياري، بنفس ترتيب المعرفات)
+    الإصدارات = None
+    if الجسم.get('الإصدارات') is not None:
+        الإصدارات = [_عدد(إ, 'الإصدارات') for إ in الجسم['الإصدارات']]
+        if len(الإصدارات) != len(المعرفات):
+            raise خطأ_الواجهة(HTTPStatus.BAD_REQUEST, "الإصدارات: قيمة لكل معرف")
+        الإصدارات = dict(zip(المعرفات, الإصدارات))
+    المخزن = الحصول_على_المخزن()
+    if المستخدم['نوع_المستخدم'] == 'مدير_النظام':
+        المنفذة, المتعارضة = المخزن.تحديث_حالة_الطلبات(المعرفات, الحالة, المستخدم['معرف'], الإصدارات)
+    else:
+        # موافقة المعتمد تحيل الطلب إلى المرحلة التالية، وما ليس في طابوره يُعد متعارضاً
+        المنفذة, المتعارضة = قرار_المعتمد(المخزن, المستخدم, المعرفات, الحالة, الإصدارات)
+    # المتعارضة تغيرت بعد قراءتها فيُعاد جلبها قبل القرار؛ المتعذرة لم يكفِ رصيدها أو لم تعد موجودة
+    المعالجة = set(المنفذة) | set(المتعارضة)
+    return HTTPStatus.OK, {
+        'المنفذة': المنفذة, 'المتعارضة': المتعارضة, 'المتعذرة': [م for م in المعرفات if م not in المعالجة],
+    }
+
+
+# (الطريقة، المسار) -> (الدالة، الأدوار المسموحة أو None لكل مستخدم مسجل أو False للدخول بلا رمز)
+المسارات = {
+    ('POST', '/api/login'): (الدخول, False),
+    ('GET', '/api/balance'): (الرصيد, None),
+    ('POST', '/api/requests'): (طلب_جديد, None),
+    ('GET', '/api/requests/pending'): (الطلبات_المعلقة, {'مدير_النظام', 'مدير', 'مسؤول_إداري'}),
+    ('POST', '/api/requests/decision'): (قرار_الطلبات, {'مدير_النظام', 'مدير', 'مسؤول_إداري'}),
+}
+
+
+class معالج_الطلبات(BaseHTTPRequestHandler):
+    # الاتصال يبقى مفتوحاً بين الطلبات حتى لا يدفع العميل ثمن اتصال TCP جديد كل مرة
+    protocol_version = 'HTTP/1.1'
+    server_version = 'VacationAPI/1.0'
+    # إغلاق الاتصال الخامل حتى لا يحجز خيطاً من المجمع
+    timeout = 30
+    # الرؤوس والجسم يُكتبان منفصلين؛ مع Nagle ينتظر الجسم تأكيداً مؤجلاً (~40 م.ث) على الاتصال المفتوح
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._تنفيذ('GET')
+
+    def do_POST(self):
+        self._تنفيذ('POST')
+
+    def log_message(self, format, *args):
+        _المسجل.debug("%s - %s", self.address_string(), format % args)
+
+    def _المستخدم(self):
+        الرأس = self.headers.get('Authorization', '')
+        اسم_المستخدم = التحقق_من_رمز(الرأس[7:]) if الرأس.startswith('Bearer ') else None
+        # من الدليل في كل طلب حتى يسقط رمز المستخدم المعطل قبل انتهاء مدته
+        المستخدم = الحصول_على_المخزن().دليل_المستخدمين().get(اسم_المستخدم) if اسم_المستخدم else None
+        if المستخدم is None or المستخدم['الحالة'] != 'نشط':
+            raise خطأ_الواجهة(HTTPStatus.UNAUTHORIZED, "رمز مفقود أو غير صالح")
+        return المستخدم
+
+    def _الجسم(self):
+        الطول = int(self.headers.get('Content-Length') or 0)
+        if الطول > الحد_الأقصى_للجسم:
+            # الجسم لا يُقرأ فيُغلق الاتصال بعد الرد
+            self.close_connection = True
+            raise خطأ_الواجهة(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "الطلب أكبر من المسموح")
+        if not الطول:
+            return {}
+        try:
+            الجسم = json.loads(self.rfile.read(الطول))
+        except ValueError:
+            raise خطأ_الواجهة(HTTPStatus.BAD_REQUEST, "جسم JSON غير صالح") from None
+        if not isinstance(الجسم, dict):
+            raise خطأ_الواجهة(HTTPStatus.BAD_REQUEST, "جسم JSON يجب أن يكون كائناً")
+        return الجسم
+
+    def _تنفيذ(self, الطريقة):
+        الرابط = urlsplit(self.path)
+        المستخدم = None
+        with تشغيل_الصفحة() as التشغيل:
+            تعيين_الصفحة(f"api {الطريقة} {الرابط.path}")
+            try:
+                # يُقرأ الجسم دائماً حتى لا تبقى بقاياه في الاتصال المفتوح
+                الجسم = self._الجسم()
+                المسار = المسارات.get((الطريقة, الرابط.path))
+                if المسار is None:
+                    raise خطأ_الواجهة(HTTPStatus.NOT_FOUND, "مسار غير معروف")
+                الدالة, الأدوار = المسار
+                if الأدوار is not False:
+                    المستخدم = self._المستخدم()
+                    التشغيل['المستخدم'] = المستخدم['اسم_المستخدم']
+                    if الأدوار is not None and المستخدم['نوع_المستخدم'] not in الأدوار:
+                        raise خطأ_الواجهة(HTTPStatus.FORBIDDEN, "غير مسموح لنوع المستخدم هذا")
+                المعاملات = {م: ق[-1] for م, ق in parse_qs(الرابط.query).items()}
+                رمز_الحالة, النتيجة = الدالة(المستخدم, الجسم, المعاملات)
+            except خطأ_الواجهة as خطأ:
+                رمز_الحالة, النتيجة = خطأ.رمز_الحالة, {'الخطأ': str(خطأ)}
+            except Exception:
+                _المسجل.exception("فشل %s %s", الطريقة, self.path)
+                رمز_الحالة, النتيجة = HTTPStatus.INTERNAL_SERVER_ERROR, {'الخطأ': "خطأ داخلي"}
+            self._إرسال(رمز_الحالة, النتيجة)
+
+    def _إرسال(self, رمز_الحالة, النتيجة):
+        المحتوى = json.dumps(النتيجة, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(رمز_الحالة)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(المحتوى)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(المحتوى)
+
+
+class خادم_الواجهة(HTTPServer):
+    """خادم HTTP يوزع الاتصالات على مجمع خيوط ثابت بدلاً من خيط جديد لكل اتصال"""
+
+    def __init__(self, العنوان, العمال=16):
+        super().__init__(العنوان, معالج_الطلبات)
+        self._المجمع = ThreadPoolExecutor(العمال, thread_name_prefix='الواجهة')
+
+    def process_request(self, request, client_address):
+        self._المجمع.submit(self._معالجة, request, client_address)
+
+    def _معالجة(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._المجمع.shutdown(wait=True)
+
+
+def تشغيل(المضيف='127.0.0.1', المنفذ=8600, العمال=16):
+    """إنشاء الخادم مع ربط موزع الإشعارات بالمخزن (serve_forever على المستدعي)"""
+    الحصول_على_الموزع()
+    return خادم_الواجهة((المضيف, المنفذ), العمال)
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--host', default='127.0.0.1')
+    المحلل.add_argument('--port', type=int, default=8600)
+    المحلل.add_argument('--workers', type=int, default=16, help="عدد الخيوط (والاتصالات المفتوحة في آن واحد)")
+    المعاملات = المحلل.parse_args()
+
+    if not الحصول_على_المخزن().مهيأ():
+        print("❌ النظام غير مهيأ: شغّل التطبيق مرة أولاً", file=sys.stderr)
+        return 1
+    الخادم = تشغيل(المعاملات.host, المعاملات.port, المعاملات.workers)
+    print(f"✅ الواجهة تعمل على http://{المعاملات.host}:{المعاملات.port}/api")
+    try:
+        الخادم.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        الخادم.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
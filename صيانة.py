@@ -0,0 +1,167 @@
+"""أوامر صيانة نظام الإجازات
+
+الاستخدام:
+    python صيانة.py rebuild-stats
+    python صيانة.py rollover --year 2026
+    python صيانة.py import-users الموظفين.csv --errors الأخطاء.csv
+    python صيانة.py export التقرير.parquet --from 2025-01-01 --to 2025-12-31 --status معتمد --archive
+    python صيانة.py archive --before 2026-01-01
+    python صيانة.py calendar --add-holiday 2026-09-23 --weekmask العمليات=1111111
+    python صيانة.py recount-days --all
+يعمل على خلفية التخزين المختارة عبر VACATION_STORAGE كما في التطبيق
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from استيراد_المستخدمين import استيراد_المستخدمين
+from التصدير import الصيغ, تصدير_الطلبات
+import الأرشيف
+import أيام_العمل
+from التخزين import الحصول_على_المخزن
+
+
+def إعادة_بناء_الإحصائيات(المعاملات):
+    الإحصائيات = الحصول_على_المخزن().إعادة_بناء_الإحصائيات()
+    print(f"✅ المستخدمون: {الإحصائيات['المستخدمين']['الإجمالي']}")
+    for الحالة, العدد in sorted(الإحصائيات['حسب_الحالة'].items()):
+        print(f"✅ {الحالة}: {العدد} طلب")
+    return 0
+
+
+def ترحيل_الأرصدة(المعاملات):
+    البداية = time.perf_counter()
+    العدد = الحصول_على_المخزن().ترحيل_الأرصدة(المعاملات.year)
+    print(f"✅ تم ترحيل {العدد} رصيد إلى سنة {المعاملات.year} في {time.perf_counter() - البداية:.2f} ث")
+    return 0
+
+
+def استيراد_مستخدمين(المعاملات):
+    البداية = time.perf_counter()
+    try:
+        العدد, الأخطاء = استيراد_المستخدمين(
+            الحصول_على_المخزن(), المعاملات.path, حجم_الدفعة=المعاملات.chunk_size,
+            العمال=المعاملات.workers, تجربة=المعاملات.dry_run,
+        )
+    except (OSError, RuntimeError, ValueError) as خطأ:
+        print(f"❌ {خطأ}", file=sys.stderr)
+        return 1
+    الفعل = "سيضاف" if المعاملات.dry_run else "تم استيراد"
+    print(f"✅ {الفعل} {العدد} مستخدم في {time.perf_counter() - البداية:.2f} ث")
+    if not الأخطاء.empty:
+        print(f"⚠️ رُفض {len(الأخطاء)} سطر", file=sys.stderr)
+        if المعاملات.errors:
+            الأخطاء.to_csv(المعاملات.errors, index=False)
+        else:
+            print(الأخطاء.to_string(index=False), file=sys.stderr)
+    return 0
+
+
+def تصدير(المعاملات):
+    الصيغة = المعاملات.format or os.path.splitext(المعاملات.path)[1].lstrip('.').lower()
+    البداية = time.perf_counter()
+    try:
+        العدد = تصدير_الطلبات(
+            الحصول_على_المخزن(), المعاملات.path, الصيغة, حجم_الدفعة=المعاملات.chunk_size,
+            الحالة=المعاملات.status, القسم=المعاملات.department, نوع_الإجازة=المعاملات.type,
+            من_تاريخ=المعاملات.from_date, إلى_تاريخ=المعاملات.to_date, مع_الأرشيف=المعاملات.archive,
+        )
+    except (OSError, RuntimeError, ValueError) as خطأ:
+        print(f"❌ {خطأ}", file=sys.stderr)
+        return 1
+    print(f"✅ تم تصدير {العدد} طلب إلى {المعاملات.path} في {time.perf_counter() - البداية:.2f} ث")
+    return 0
+
+
+def أرشفة(المعاملات):
+    البداية = time.perf_counter()
+    العدد = الحصول_على_المخزن().أرشفة_الطلبات(المعاملات.before)
+    print(f"✅ تمت أرشفة {العدد} طلب منتهٍ قبل {المعاملات.before} في {time.perf_counter() - البداية:.2f} ث")
+    for السنة, القسم in sorted(الأرشيف.الفهرس().items()):
+        print(f"   {السنة}: {القسم['العدد']} طلب ({القسم['أول_بدء']} ← {القسم['آخر_انتهاء']})")
+    return 0
+
+
+def إعادة_حساب_الأيام(المعاملات):
+    البداية = time.perf_counter()
+    المخزن = الحصول_على_المخزن()
+    العدد = المخزن.إعادة_حساب_الأيام(None) if المعاملات.all else المخزن.إعادة_حساب_الأيام()
+    print(f"✅ تغير عدد أيام {العدد} طلب في {time.perf_counter() - البداية:.2f} ث")
+    return 0
+
+
+def تقويم(المعاملات):
+    الحالي = أيام_العمل.التقويم()
+    العطل = (set(الحالي.العطل) | set(المعاملات.add_holiday)) - set(المعاملات.remove_holiday)
+    الأقنعة = dict(الحالي.الأقنعة)
+    for القيمة in المعاملات.weekmask:
+        القسم, _, القناع = القيمة.rpartition('=')
+        الأقنعة[القسم] = القناع
+    try:
+        الجديد = أيام_العمل.حفظ_التقويم(العطل, الأقنعة)
+    except ValueError as خطأ:
+        print(f"❌ {خطأ}", file=sys.stderr)
+        return 1
+    print(f"✅ {len(الجديد.العطل)} عطلة رسمية")
+    for القسم, القناع in sorted(الجديد.الأقنعة.items()):
+        print(f"   {القسم or 'الافتراضي'}: {القناع}")
+    # الطلبات المعلقة تُحتسب بالتقويم الجديد؛ المعتمدة خُصمت من الرصيد ولا تتغير إلا بـ recount-days --all
+    المعاملات.all = False
+    return إعادة_حساب_الأيام(المعاملات)
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description="أوامر صيانة نظام الإجازات")
+    الأوامر = المحلل.add_subparsers(dest='الأمر', required=True)
+
+    الأمر = الأوامر.add_parser('rebuild-stats', help="إعادة حساب عدادات لوحات التحكم من الجداول")
+    الأمر.set_defaults(التنفيذ=إعادة_بناء_الإحصائيات)
+
+    الأمر = الأوامر.add_parser('rollover', help="ترحيل أرصدة كل الموظفين إلى سنة جديدة (لا يكرر ترحيل سنة سابقة)")
+    الأمر.add_argument('--year', type=int, default=datetime.now().year, help="السنة الجديدة")
+    الأمر.set_defaults(التنفيذ=ترحيل_الأرصدة)
+
+    الأمر = الأوامر.add_parser('import-users', help="استيراد مستخدمين وأرصدتهم من ملف CSV أو XLSX")
+    الأمر.add_argument('path', help="مسار الملف")
+    الأمر.add_argument('--chunk-size', type=int, default=5000, help="عدد الأسطر في كل دفعة قراءة")
+    الأمر.add_argument('--workers', type=int, default=None, help="عدد عمليات تشفير كلمات المرور")
+    الأمر.add_argument('--errors', help="حفظ تقرير الأسطر المرفوضة في ملف CSV")
+    الأمر.add_argument('--dry-run', action='store_true', help="فحص الملف فقط دون إضافة")
+    الأمر.set_defaults(التنفيذ=استيراد_مستخدمين)
+
+    الأمر = الأوامر.add_parser('export', help="تصدير طلبات الإجازة المرشحة إلى CSV أو XLSX أو Parquet")
+    الأمر.add_argument('path', help="مسار الملف الناتج")
+    الأمر.add_argument('--format', choices=list(الصيغ), help="الصيغة (افتراضياً من امتداد الملف)")
+    الأمر.add_argument('--from', dest='from_date', help="الطلبات المنتهية في هذا التاريخ أو بعده (YYYY-MM-DD)")
+    الأمر.add_argument('--to', dest='to_date', help="الطلبات البادئة في هذا التاريخ أو قبله (YYYY-MM-DD)")
+    الأمر.add_argument('--department', help="القسم")
+    الأمر.add_argument('--status', help="حالة الطلب")
+    الأمر.add_argument('--type', type=int, help="معرف نوع الإجازة")
+    الأمر.add_argument('--chunk-size', type=int, default=10_000, help="عدد الطلبات في كل دفعة")
+    الأمر.add_argument('--archive', action='store_true', help="تضمين الطلبات المؤرشفة")
+    الأمر.set_defaults(التنفيذ=تصدير)
+
+    الأمر = الأوامر.add_parser('archive', help="نقل الطلبات المعتمدة والمرفوضة المنتهية إلى أرشيف سنوي مضغوط")
+    الأمر.add_argument('--before', default=f'{datetime.now().year}-01-01',
+                       help="تاريخ القطع (YYYY-MM-DD)، افتراضياً بداية السنة الحالية")
+    الأمر.set_defaults(التنفيذ=أرشفة)
+
+    الأمر = الأوامر.add_parser('calendar', help="تعديل العطل الرسمية وجداول ورديات الأقسام ثم إعادة حساب الطلبات المعلقة")
+    الأمر.add_argument('--add-holiday', action='append', default=[], help="إضافة عطلة (YYYY-MM-DD)")
+    الأمر.add_argument('--remove-holiday', action='append', default=[], help="حذف عطلة (YYYY-MM-DD)")
+    الأمر.add_argument('--weekmask', action='append', default=[],
+                       help="أيام عمل القسم من الإثنين إلى الأحد بصيغة القسم=1111001 (=1111001 للافتراضي)")
+    الأمر.set_defaults(التنفيذ=تقويم)
+
+    الأمر = الأوامر.add_parser('recount-days', help="إعادة حساب عدد أيام العمل للطلبات المعلقة بالتقويم الحالي")
+    الأمر.add_argument('--all', action='store_true', help="كل الطلبات بما فيها المعتمدة (دون تعديل الأرصدة)")
+    الأمر.set_defaults(التنفيذ=إعادة_حساب_الأيام)
+
+    المعاملات = المحلل.parse_args()
+    return المعاملات.التنفيذ(المعاملات)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
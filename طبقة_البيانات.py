@@ -0,0 +1,530 @@
+"""طبقة البيانات: تحميل وحفظ جداول النظام مع ذاكرة مؤقتة مشتركة على مستوى العملية"""
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from الرصد import قياس, رصد_الدفعات
+
+try:
+    import fcntl
+except ImportError:  # ويندوز
+    fcntl = None
+    import msvcrt
+
+# أسماء ملفات الجداول
+ملف_المستخدمين = 'المستخدمين.csv'
+ملف_أنواع_الإجازات = 'أنواع_الإجازات.csv'
+ملف_أرصدة_الإجازات = 'أرصدة_الإجازات.csv'
+ملف_طلبات_الإجازة = 'طلبات_الإجازة.csv'
+ملف_الإشعارات = 'الإشعارات.csv'
+ملف_سجل_الأرصدة = 'سجل_الأرصدة.csv'
+ملف_العدادات = 'العدادات.json'
+ملف_الإحصائيات = 'الإحصائيات.json'
+
+# مخطط الجداول: النوع المضغوط لكل عمود، يُطبق عند التحميل ويُتحقق منه عند الحفظ
+# int32 للمعرفات والأعداد الإلزامية، Int32/Int8 للاختيارية، category للقيم المتكررة،
+# تاريخ لأعمدة الأيام المحللة مرة واحدة إلى datetime64، و str للنصوص الحرة
+تاريخ = 'datetime64[ns]'
+أنواع_الأعمدة = {
+    ملف_المستخدمين: {
+        'معرف': 'int32',
+        'اسم_المستخدم': str,
+        'كلمة_المرور': str,
+        'اسم_الموظف': str,
+        'نوع_المستخدم': 'category',
+        'القسم': 'category',
+        'الحالة': 'category',
+        'تاريخ_الإنشاء': str,
+    },
+    ملف_أنواع_الإجازات: {
+        'معرف': 'int32',
+        'اسم_الإجازة': str,
+        'الوصف': str,
+        'الحالة': 'category',
+        # 1 إذا خُصمت أيام النوع من الرصيد عند الاعتماد (الفراغ في الجداول الأقدم = الاعتيادية والعرضة)
+        'مخصومة': 'Int8',
+    },
+    ملف_أرصدة_الإجازات: {
+        'معرف': 'int32',
+        'معرف_الموظف': 'int32',
+        'رصيد_السنة_الحالية': 'Int32',
+        'رصيد_العام_السابق_1': 'Int32',
+        'رصيد_العام_السابق_2': 'Int32',
+        'السنة': 'Int32',
+        'تاريخ_التحديث': str,
+    },
+    ملف_طلبات_الإجازة: {
+        'معرف': 'int32',
+        'معرف_الموظف': 'int32',
+        'نوع_الإجازة': 'int32',
+        'تاريخ_البدء': تاريخ,
+        'تاريخ_الانتهاء': تاريخ,
+        'عدد_الأيام': 'int32',
+        'السبب': str,
+        'الحالة': 'category',
+        'ملاحظات_المدير': str,
+        'معرف_المدير_الموافق': 'Int32',
+        'تاريخ_الطلب': str,
+        # يزيد مع كل تعديل للصف ليُطبق القرار فقط إذا لم يتغير الطلب منذ عرضه (الفراغ في الصفوف الأقدم = 0)
+        'الإصدار': 'Int32',
+    },
+    ملف_الإشعارات: {
+        'معرف': 'int32',
+        'معرف_المستخدم': 'int32',
+        'الرسالة': str,
+        'مقروء': 'Int8',
+        'تاريخ_الإنشاء': str,
+    },
+    ملف_سجل_الأرصدة: {
+        'معرف': 'int32',
+        'معرف_الموظف': 'int32',
+        'معرف_الطلب': 'Int32',
+        'العملية': 'category',
+        'فرق_السنة_الحالية': 'Int32',
+        'فرق_العام_السابق_1': 'Int32',
+        'فرق_العام_السابق_2': 'Int32',
+        'الساقط': 'Int32',
+        'السنة': 'Int32',
+        'معرف_المنفذ': 'Int32',
+        'التاريخ': str,
+    },
+}
+
+
+def عمود_عددي(النوع):
+    return النوع not in (str, 'category', تاريخ)
+
+
+def _أنواع_القراءة(اسم_الملف):
+    """أنواع read_csv: الأعداد قابلة للفراغ حتى لا يفشل ملف ناقص، والتواريخ نصوص تُحلل بعد القراءة"""
+    return {
+        العمود: 'string' if النوع == تاريخ else النوع.capitalize() if عمود_عددي(النوع) else النوع
+        for العمود, النوع in أنواع_الأعمدة.get(os.path.basename(اسم_الملف), {}).items()
+    }
+
+
+# الحد الأقصى لحجم الذاكرة المؤقتة بالميجابايت
+الحد_الأقصى_للذاكرة = int(os.environ.get('VACATION_CACHE_MB', '256')) * 1024 * 1024
+
+
+class ذاكرة_الجداول:
+    """ذاكرة مؤقتة للجداول المحللة مفتاحها مسار الملف ووقت تعديله وحجمه"""
+
+    def __init__(self, الحد_الأقصى):
+        self.الحد_الأقصى = الحد_الأقصى
+        self._العناصر = OrderedDict()
+        self._الحجم = 0
+        self._قفل = threading.Lock()
+        self.الإصابات = 0
+        self.الإخفاقات = 0
+        self.الإخلاءات = 0
+
+    def جلب(self, المسار, البصمة):
+        """إرجاع نسخة من الجدول إذا كانت بصمة الملف مطابقة"""
+        with self._قفل:
+            عنصر = self._العناصر.get(المسار)
+            if عنصر is not None and عنصر[0] == البصمة:
+                self._العناصر.move_to_end(المسار)
+                self.الإصابات += 1
+                return عنصر[1].copy()
+            self.الإخفاقات += 1
+            return None
+
+    def تخزين(self, المسار, البصمة, البيانات):
+        """تخزين جدول محلل مع إخلاء الأقدم استخداماً عند تجاوز الحد"""
+        الحجم = int(البيانات.memory_usage(index=True, deep=True).sum())
+        with self._قفل:
+            self._إزالة(المسار)
+            if الحجم > self.الحد_الأقصى:
+                return
+            self._العناصر[المسار] = (البصمة, البيانات.copy(), الحجم)
+            self._الحجم += الحجم
+            while self._الحجم > self.الحد_الأقصى:
+                الأقدم = next(iter(self._العناصر))
+                self._إزالة(الأقدم)
+                self.الإخلاءات += 1
+
+    def إبطال(self, المسار):
+        with self._قفل:
+            self._إزالة(المسار)
+
+    def _إزالة(self, المسار):
+        عنصر = self._العناصر.pop(المسار, None)
+        if عنصر is not None:
+            self._الحجم -= عنصر[2]
+
+    def الإحصائيات(self):
+        with self._قفل:
+            return {
+                'الإصابات': self.الإصابات,
+                'الإخفاقات': self.الإخفاقات,
+                'الإخلاءات': self.الإخلاءات,
+                'عدد_الجداول': len(self._العناصر),
+                'الحجم_بالبايت': self._الحجم,
+            }
+
+
+# ذاكرة واحدة مشتركة بين كل الجلسات في العملية
+ذاكرة_الجداول_المشتركة = ذاكرة_الجداول(الحد_الأقصى_للذاكرة)
+
+
+def بصمة_الملف(المسار):
+    """وقت التعديل والحجم، أو None إذا لم يكن الملف موجوداً"""
+    try:
+        حالة = os.stat(المسار)
+    except FileNotFoundError:
+        return None
+    return (حالة.st_mtime_ns, حالة.st_size)
+
+
+def _تقديم_وقت_التعديل(المسار, السابق):
+    """جعل وقت تعديل الملف بعد كتابته أكبر من السابق دائماً (يُستدعى تحت قفل الملف)
+
+    دقة ساعة نظام الملفات (خاصة المشترك عبر الشبكة) قد تعطي كتابتين متتاليتين بنفس الحجم نفس البصمة،
+    فتبقى عملية أخرى على نسختها القديمة من الجدول وتكتب فوق ما تغير.
+    """
+    if السابق is not None and os.stat(المسار).st_mtime_ns <= السابق[0]:
+        الوقت = السابق[0] + 1000
+        os.utime(المسار, ns=(الوقت, الوقت))
+
+
+def تطبيق_الأنواع(اسم_الملف, البيانات):
+    """تحويل أعمدة الجدول إلى أنواعها في المخطط
+
+    العمود الإلزامي الذي فيه قيم فارغة يبقى بالنوع القابل للفراغ (Int32) بدلاً من فشل التحميل.
+    """
+    المحولة = {}
+    for العمود, النوع in أنواع_الأعمدة.get(os.path.basename(اسم_الملف), {}).items():
+        if العمود not in البيانات.columns:
+            continue
+        القيم = البيانات[العمود]
+        if النوع is str:
+            القيم = القيم.fillna('').astype(str)
+        elif النوع == 'category':
+            القيم = القيم.astype('category')
+            if القيم.hasnans:
+                if '' not in القيم.cat.categories:
+                    القيم = القيم.cat.add_categories([''])
+                القيم = القيم.fillna('')
+        elif النوع == تاريخ:
+            القيم = pd.to_datetime(القيم, format='ISO8601')
+        else:
+            القيم = القيم.astype(النوع.capitalize() if القيم.hasnans else النوع)
+        المحولة[العمود] = القيم
+    if not المحولة:
+        return البيانات
+    # إطار جديد دفعة واحدة: تعيين الأعمدة واحداً واحداً يعيد بناء كتل الإطار في كل مرة،
+    # وهو أغلب زمن الاستعلامات الصغيرة (رصيد موظف أو صفحة طلبات)
+    return pd.DataFrame(
+        {العمود: المحولة.get(العمود, البيانات[العمود]) for العمود in البيانات.columns}, index=البيانات.index
+    )
+
+
+def التحقق_من_الأنواع(اسم_الملف, البيانات):
+    """رفض حفظ جدول يخالف مخططه: أعداد غير صحيحة، أو فراغ في عمود إلزامي، أو تواريخ غير صالحة"""
+    الأخطاء = []
+    for العمود, النوع in أنواع_الأعمدة.get(os.path.basename(اسم_الملف), {}).items():
+        if العمود not in البيانات.columns or النوع in (str, 'category'):
+            continue
+        القيم = البيانات[العمود]
+        if النوع == تاريخ:
+            if not pd.api.types.is_datetime64_any_dtype(القيم):
+                try:
+                    القيم = pd.to_datetime(القيم, format='ISO8601')
+                except (TypeError, ValueError):
+                    الأخطاء.append(f"{العمود}: تاريخ غير صالح")
+                    continue
+        elif not pd.api.types.is_integer_dtype(القيم):
+            # قيم قادمة من قواميس أو نصوص: '' و None فراغ، وغير ذلك يجب أن يكون عدداً صحيحاً
+            القيم = القيم.mask(القيم.astype(str) == '')
+            الأرقام = pd.to_numeric(القيم, errors='coerce')
+            if (الأرقام.isna() & القيم.notna()).any() or (الأرقام % 1 > 0).any():
+                الأخطاء.append(f"{العمود}: قيم غير صحيحة")
+                continue
+            القيم = الأرقام
+        if not النوع[0].isupper() and القيم.isna().any():
+            الأخطاء.append(f"{العمود}: قيم فارغة في عمود إلزامي")
+    if الأخطاء:
+        raise ValueError(f"{os.path.basename(اسم_الملف)}: " + "، ".join(الأخطاء))
+
+
+def _نص_الأيام(القيم):
+    # الأيام المختلفة قليلة: تنسيق كل يوم مرة ثم الفهرسة برموزه، والرمز -1 (فارغ) يأخذ آخر عنصر ''
+    الرموز, الأيام = pd.factorize(القيم)
+    return np.append(np.datetime_as_string(الأيام.to_numpy(), unit='D').astype(object), '')[الرموز]
+
+
+def نصوص_الأيام(البيانات):
+    """نسخة أعمدة datetime64 فيها نصوص YYYY-MM-DD، أسرع بكثير من تنسيق to_csv لها قيمة قيمة"""
+    الأعمدة = البيانات.select_dtypes('datetime64').columns
+    if not len(الأعمدة):
+        return البيانات
+    return البيانات.assign(**{العمود: _نص_الأيام(البيانات[العمود]) for العمود in الأعمدة})
+
+
+def تعيين_قيمة(البيانات, الصفوف, العمود, القيمة):
+    """تعيين قيمة في صفوف عمود، مع إضافتها إلى فئات العمود الفئوي إذا كانت جديدة عليه"""
+    if isinstance(البيانات[العمود].dtype, pd.CategoricalDtype) and القيمة not in البيانات[العمود].cat.categories:
+        البيانات[العمود] = البيانات[العمود].cat.add_categories([القيمة])
+    البيانات.loc[الصفوف, العمود] = القيمة
+
+
+def زيادة_الإصدار(البيانات, الصفوف):
+    """زيادة إصدار صفوف معدلة، مع إنشاء العمود لجدول حُفظ قبل إضافته"""
+    if 'الإصدار' not in البيانات.columns:
+        البيانات['الإصدار'] = pd.array(np.zeros(len(البيانات)), dtype='Int32')
+    البيانات.loc[الصفوف, 'الإصدار'] = البيانات.loc[الصفوف, 'الإصدار'].fillna(0) + 1
+
+
+def نص_التاريخ(القيمة):
+    """اليوم بصيغة التخزين YYYY-MM-DD من Timestamp أو date أو نص"""
+    return القيمة if isinstance(القيمة, str) else القيمة.strftime('%Y-%m-%d')
+
+
+def تحميل_البيانات(اسم_الملف, بيانات_افتراضية=None, المخطط=None):
+    """تحميل البيانات من ملف CSV (أو CSV مضغوط .gz)
+
+    المخطط: اسم ملف الجدول الذي تؤخذ منه أنواع الأعمدة إذا اختلف عن اسم الملف، كأقسام الأرشيف.
+    البيانات الافتراضية للملف غير الموجود أو الفارغ (دون أعمدة) فقط؛ خطأ قراءة ملف موجود يُرفع، لأن الكتابات
+    المبنية على الجدول المحمّل (إعادة الكتابة وبذرة العداد) كانت ستمحو صفوفه لو حُمّل فارغاً.
+    """
+    المسار = os.path.abspath(اسم_الملف)
+    المخطط = المخطط or اسم_الملف
+    البصمة = بصمة_الملف(المسار)
+    if البصمة is not None and البصمة[1] > 0:
+        with قياس('تحميل', الجدول=os.path.basename(اسم_الملف)) as السجل:
+            البيانات = ذاكرة_الجداول_المشتركة.جلب(المسار, البصمة)
+            if البيانات is not None:
+                السجل.update(الصفوف=len(البيانات), من_الذاكرة=True)
+                return البيانات
+            try:
+                البيانات = تطبيق_الأنواع(المخطط, pd.read_csv(المسار, dtype=_أنواع_القراءة(المخطط)))
+            except pd.errors.EmptyDataError:
+                # جدول حُفظ بلا أعمدة: ملف من سطر فارغ ولا صفوف فيه تضيع
+                البيانات = None
+            if البيانات is not None:
+                ذاكرة_الجداول_المشتركة.تخزين(المسار, البصمة, البيانات)
+                السجل.update(البايتات=البصمة[1], الصفوف=len(البيانات), من_الذاكرة=False)
+                return البيانات
+    if بيانات_افتراضية is not None:
+        return بيانات_افتراضية
+    return pd.DataFrame()
+
+
+class _قارئ_محدود(io.RawIOBase):
+    """قراءة أول «الحد» بايت فقط من ملف مفتوح"""
+
+    def __init__(self, الملف, الحد):
+        self._الملف = الملف
+        self._المتبقي = الحد
+
+    def readable(self):
+        return True
+
+    def readinto(self, المخزن_المؤقت):
+        البيانات = self._الملف.read(min(len(المخزن_المؤقت), self._المتبقي))
+        المخزن_المؤقت[:len(البيانات)] = البيانات
+        self._المتبقي -= len(البيانات)
+        return len(البيانات)
+
+    def close(self):
+        self._الملف.close()
+        super().close()
+
+
+def تحميل_على_دفعات(اسم_الملف, حجم_الدفعة=10_000, المخطط=None):
+    """قراءة ملف CSV (أو CSV مضغوط .gz) كدفعات بأنواعها الثابتة دون تحميله كاملاً في الذاكرة
+
+    يُفتح الملف ويُؤخذ حجمه تحت القفل ثم يُقرأ دون القفل: الحفظ الذري يستبدل الملف بآخر جديد
+    ويبقى المفتوح كما هو، والإلحاق يكتب بعد الحجم المأخوذ، فتبقى القراءة لقطة متسقة لا تعطل الكتابة.
+    """
+    with قفل_الملف(اسم_الملف):
+        try:
+            الملف = open(اسم_الملف, 'rb')
+        except FileNotFoundError:
+            return
+        الحجم = os.fstat(الملف.fileno()).st_size
+    المخطط = المخطط or اسم_الملف
+    الأنواع = _أنواع_القراءة(المخطط)
+    الضغط = 'gzip' if اسم_الملف.endswith('.gz') else None
+    with io.BufferedReader(_قارئ_محدود(الملف, الحجم), buffer_size=1 << 20) as القارئ:
+        try:
+            الدفعات = pd.read_csv(
+                القارئ, dtype=الأنواع, chunksize=حجم_الدفعة, encoding='utf-8', compression=الضغط
+            )
+            for الدفعة in رصد_الدفعات(الدفعات, 'تحميل_دفعات', البايتات=الحجم, الجدول=os.path.basename(اسم_الملف)):
+                yield تطبيق_الأنواع(المخطط, الدفعة)
+        except pd.errors.EmptyDataError:
+            return
+
+
+# الأقفال التي تمسكها الخيوط الحالية حتى يكون القفل قابلاً لإعادة الدخول
+_الأقفال_المحجوزة = threading.local()
+
+
+@contextmanager
+def قفل_الملف(اسم_الملف):
+    """قفل حصري بين العمليات على ملف بيانات عبر ملف .lock مجاور"""
+    مسار_القفل = os.path.abspath(اسم_الملف) + '.lock'
+    المحجوزة = getattr(_الأقفال_المحجوزة, 'العدد', None)
+    if المحجوزة is None:
+        المحجوزة = _الأقفال_المحجوزة.العدد = {}
+    if المحجوزة.get(مسار_القفل):
+        المحجوزة[مسار_القفل] += 1
+        try:
+            yield
+        finally:
+            المحجوزة[مسار_القفل] -= 1
+        return
+
+    with open(مسار_القفل, 'a+b') as ملف_القفل:
+        if fcntl is not None:
+            fcntl.flock(ملف_القفل.fileno(), fcntl.LOCK_EX)
+        else:
+            ملف_القفل.seek(0)
+            msvcrt.locking(ملف_القفل.fileno(), msvcrt.LK_LOCK, 1)
+        المحجوزة[مسار_القفل] = 1
+        try:
+            yield
+        finally:
+            المحجوزة[مسار_القفل] = 0
+            if fcntl is not None:
+                fcntl.flock(ملف_القفل.fileno(), fcntl.LOCK_UN)
+            else:
+                ملف_القفل.seek(0)
+                msvcrt.locking(ملف_القفل.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _كتابة_ذرية(المسار, كتابة, ثنائي=False):
+    """الكتابة في ملف مؤقت في نفس المجلد ثم استبداله بالملف الأصلي"""
+    المجلد = os.path.dirname(os.path.abspath(المسار))
+    واصف, مسار_مؤقت = tempfile.mkstemp(dir=المجلد, prefix='.', suffix='.tmp')
+    السابقة = بصمة_الملف(المسار)
+    try:
+        with (os.fdopen(واصف, 'wb') if ثنائي else os.fdopen(واصف, 'w', encoding='utf-8', newline='')) as الملف:
+            كتابة(الملف)
+            الملف.flush()
+            os.fsync(الملف.fileno())
+        os.replace(مسار_مؤقت, المسار)
+        _تقديم_وقت_التعديل(المسار, السابقة)
+    except BaseException:
+        if os.path.exists(مسار_مؤقت):
+            os.remove(مسار_مؤقت)
+        raise
+
+
+def حفظ_البيانات(اسم_الملف, البيانات):
+    """حفظ البيانات في ملف CSV، مضغوطاً إذا انتهى اسمه بـ .gz، بعد التحقق من أنواع أعمدتها"""
+    التحقق_من_الأنواع(اسم_الملف, البيانات)
+    with قياس('حفظ', 'كتابة', الجدول=os.path.basename(اسم_الملف)) as السجل, قفل_الملف(اسم_الملف):
+        if اسم_الملف.endswith('.gz'):
+            _كتابة_ذرية(اسم_الملف, lambda الملف: نصوص_الأيام(البيانات).to_csv(
+                الملف, index=False, compression='gzip'
+            ), ثنائي=True)
+        else:
+            _كتابة_ذرية(اسم_الملف, lambda الملف: نصوص_الأيام(البيانات).to_csv(الملف, index=False))
+        ذاكرة_الجداول_المشتركة.إبطال(os.path.abspath(اسم_الملف))
+        السجل.update(البايتات=os.path.getsize(اسم_الملف), الصفوف=len(البيانات))
+
+
+def _قيمة_الخلية(القيمة):
+    if القيمة is None or (not isinstance(القيمة, str) and pd.isna(القيمة)):
+        return ''
+    if isinstance(القيمة, (pd.Timestamp, date)):
+        return نص_التاريخ(القيمة)
+    return القيمة
+
+
+def إضافة_صف(اسم_الملف, الصف):
+    """إلحاق صف واحد بنهاية ملف CSV دون إعادة كتابة الجدول"""
+    إضافة_صفوف(اسم_الملف, [الصف])
+
+
+def إضافة_صفوف(اسم_الملف, الصفوف):
+    """إلحاق قائمة صفوف (قواميس) بنهاية ملف CSV في كتابة واحدة"""
+    if not الصفوف:
+        return
+    التحقق_من_الأنواع(اسم_الملف, pd.DataFrame(الصفوف))
+    with قياس('إلحاق', 'كتابة', الجدول=os.path.basename(اسم_الملف), الصفوف=len(الصفوف)) as السجل, \
+            قفل_الملف(اسم_الملف):
+        الحجم_السابق = os.path.getsize(اسم_الملف) if os.path.exists(اسم_الملف) else 0
+        الأعمدة = None
+        if os.path.exists(اسم_الملف):
+            with open(اسم_الملف, encoding='utf-8', newline='') as الملف:
+                الأعمدة = next(csv.reader(الملف), None)
+
+        # ملف فارغ أو بأعمدة مختلفة: إعادة كتابة كاملة لمرة واحدة
+        if not الأعمدة or not set().union(*الصفوف) <= set(الأعمدة):
+            الحالي = تحميل_البيانات(اسم_الملف, pd.DataFrame())
+            الجديد = pd.DataFrame(الصفوف)
+            الترتيب = [ع for ع in أنواع_الأعمدة.get(os.path.basename(اسم_الملف), {}) if ع in الجديد.columns]
+            الجديد = الجديد[الترتيب + [ع for ع in الجديد.columns if ع not in الترتيب]]
+            حفظ_البيانات(اسم_الملف, الجديد if الحالي.empty else pd.concat([الحالي, الجديد], ignore_index=True))
+            السجل['البايتات'] = os.path.getsize(اسم_الملف)
+            return
+
+        with open(اسم_الملف, 'rb+') as الملف:
+            الملف.seek(0, os.SEEK_END)
+            if الملف.tell() > 0:
+                الملف.seek(-1, os.SEEK_END)
+                if الملف.read(1) != b'\n':
+                    الملف.write(os.linesep.encode())
+        with open(اسم_الملف, 'a', encoding='utf-8', newline='') as الملف:
+            csv.writer(الملف, lineterminator=os.linesep).writerows(
+                [_قيمة_الخلية(الصف.get(العمود)) for العمود in الأعمدة] for الصف in الصفوف
+            )
+            الملف.flush()
+            os.fsync(الملف.fileno())
+        ذاكرة_الجداول_المشتركة.إبطال(os.path.abspath(اسم_الملف))
+        السجل['البايتات'] = os.path.getsize(اسم_الملف) - الحجم_السابق
+
+
+def قراءة_json(اسم_الملف, افتراضي=None):
+    """قراءة ملف JSON صغير، أو القيمة الافتراضية إذا لم يكن موجوداً أو كان تالفاً"""
+    try:
+        with open(اسم_الملف, encoding='utf-8') as الملف:
+            return json.load(الملف)
+    except (FileNotFoundError, ValueError):
+        return افتراضي
+
+
+def كتابة_json(اسم_الملف, البيانات):
+    with قفل_الملف(اسم_الملف):
+        _كتابة_ذرية(اسم_الملف, lambda الملف: json.dump(البيانات, الملف, ensure_ascii=False))
+
+
+def تحديث_json(اسم_الملف, التعديل):
+    """تعديل ملف JSON تحت القفل وكتابته ذرياً، وإرجاع ما تعيده دالة التعديل"""
+    with قفل_الملف(اسم_الملف):
+        البيانات = قراءة_json(اسم_الملف, {})
+        النتيجة = التعديل(البيانات)
+        كتابة_json(اسم_الملف, البيانات)
+        return النتيجة
+
+
+def المعرف_التالي(اسم_الملف, العدد=1):
+    """حجز المعرف التالي لجدول (أو «العدد» معرفات متتالية تبدأ منه) من عداد دائم مشترك بين العمليات"""
+    def حجز(العدادات):
+        المفتاح = os.path.basename(اسم_الملف)
+        if المفتاح not in العدادات:
+            # أول استخدام: البدء من أكبر معرف موجود في الجدول
+            الجدول = تحميل_البيانات(اسم_الملف, pd.DataFrame())
+            العدادات[المفتاح] = int(الجدول['معرف'].max()) if 'معرف' in الجدول.columns and not الجدول.empty else 0
+        العدادات[المفتاح] += العدد
+        return العدادات[المفتاح] - العدد + 1
+
+    return تحديث_json(ملف_العدادات, حجز)
+
+
+def إحصائيات_الذاكرة():
+    """عدادات الإصابة والإخفاق في الذاكرة المؤقتة"""
+    return ذاكرة_الجداول_المشتركة.الإحصائيات()
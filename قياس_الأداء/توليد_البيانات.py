@@ -0,0 +1,81 @@
+"""مولد بيانات اصطناعية ببذرة ثابتة بنفس مخططات جداول النظام"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from التخزين import (
+    جدول_المستخدمين, جدول_أنواع_الإجازات, جدول_أرصدة_الإجازات, جدول_طلبات_الإجازة, جدول_الإشعارات, جدول_سجل_الأرصدة,
+    جدول_فارغ,
+)
+
+الأقسام = ['العمليات', 'الأمن', 'الجمارك', 'الصيانة', 'خدمة المسافرين', 'الشحن', 'الإطفاء', 'المراقبة الجوية']
+الحالات = np.array(['قيد المراجعة', 'معتمد', 'مرفوض'])
+
+
+def توليد_البيانات(عدد_المستخدمين, عدد_الطلبات, البذرة=0, عدد_الأنواع=10):
+    """إرجاع قاموس اسم الجدول -> DataFrame جاهز للحفظ أو الاستيراد"""
+    مولد = np.random.default_rng(البذرة)
+    الآن = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    المعرفات = np.arange(1, عدد_المستخدمين + 1)
+
+    المستخدمين = pd.DataFrame({
+        'معرف': المعرفات,
+        'اسم_المستخدم': [f'u{معرف}' for معرف in المعرفات],
+        'كلمة_المرور': '',
+        'اسم_الموظف': [f'موظف {معرف}' for معرف in المعرفات],
+        'نوع_المستخدم': 'موظف',
+        'القسم': مولد.choice(الأقسام, عدد_المستخدمين),
+        'الحالة': 'نشط',
+        'تاريخ_الإنشاء': الآن,
+    })
+    # أول موظف في كل قسم مديره والثاني مسؤوله الإداري حتى تكون لطوابير الاعتماد معتمدون
+    الترتيب_في_القسم = المستخدمين.groupby('القسم').cumcount()
+    المستخدمين.loc[الترتيب_في_القسم == 0, 'نوع_المستخدم'] = 'مدير'
+    المستخدمين.loc[الترتيب_في_القسم == 1, 'نوع_المستخدم'] = 'مسؤول_إداري'
+
+    أنواع_الإجازات = pd.DataFrame({
+        'معرف': np.arange(1, عدد_الأنواع + 1),
+        'اسم_الإجازة': [f'إجازة {ن}' for ن in range(1, عدد_الأنواع + 1)],
+        'الوصف': '',
+        'الحالة': 'مفعل',
+        # الاعتيادية والعرضة فقط تخصمان من الرصيد كما في تهيئة النظام
+        'مخصومة': (np.arange(1, عدد_الأنواع + 1) <= 2).astype('int8'),
+    })
+
+    أرصدة_الإجازات = pd.DataFrame({
+        'معرف': المعرفات,
+        'معرف_الموظف': المعرفات,
+        'رصيد_السنة_الحالية': 30,
+        'رصيد_العام_السابق_1': مولد.integers(0, 16, عدد_المستخدمين),
+        'رصيد_العام_السابق_2': مولد.integers(0, 11, عدد_المستخدمين),
+        'السنة': datetime.now().year,
+        'تاريخ_التحديث': الآن,
+    })
+
+    البداية = np.datetime64(f'{datetime.now().year - 2}-01-01') + مولد.integers(0, 3 * 365, عدد_الطلبات)
+    المدة = مولد.integers(1, 15, عدد_الطلبات)
+    النهاية = البداية + (المدة - 1)
+    طلبات_الإجازة = pd.DataFrame({
+        'معرف': np.arange(1, عدد_الطلبات + 1),
+        'معرف_الموظف': مولد.integers(1, عدد_المستخدمين + 1, عدد_الطلبات),
+        'نوع_الإجازة': مولد.integers(1, عدد_الأنواع + 1, عدد_الطلبات),
+        'تاريخ_البدء': np.datetime_as_string(البداية, unit='D'),
+        'تاريخ_الانتهاء': np.datetime_as_string(النهاية, unit='D'),
+        'عدد_الأيام': المدة,
+        'السبب': '',
+        'الحالة': مولد.choice(الحالات, عدد_الطلبات, p=[0.2, 0.7, 0.1]),
+        'ملاحظات_المدير': '',
+        'معرف_المدير_الموافق': None,
+        'تاريخ_الطلب': الآن,
+        'الإصدار': 0,
+    })
+
+    return {
+        جدول_المستخدمين: المستخدمين,
+        جدول_أنواع_الإجازات: أنواع_الإجازات,
+        جدول_أرصدة_الإجازات: أرصدة_الإجازات,
+        جدول_طلبات_الإجازة: طلبات_الإجازة,
+        جدول_الإشعارات: جدول_فارغ(جدول_الإشعارات),
+        جدول_سجل_الأرصدة: جدول_فارغ(جدول_سجل_الأرصدة),
+    }
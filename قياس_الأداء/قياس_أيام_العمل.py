@@ -0,0 +1,66 @@
+"""قياس محرك أيام العمل: حساب كل طلب على حدة مقابل busday_count المتجه على الجدول كاملاً
+
+الاستخدام:
+    python قياس_الأداء/قياس_أيام_العمل.py --users 5000 --requests 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import أيام_العمل  # noqa: E402
+from التخزين import مخزن_CSV, مخزن_SQLite, جدول_طلبات_الإجازة  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def زمن(الدالة):
+    البداية = time.perf_counter()
+    الدالة()
+    return time.perf_counter() - البداية
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=5000)
+    المحلل.add_argument('--requests', type=int, default=200_000)
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    الجداول = توليد_البيانات(المعاملات.users, المعاملات.requests, المعاملات.seed)
+    # عطل سنة كاملة وجدول ورديات مختلف لقسمين حتى يُقاس أكثر من تقويم
+    أيام_العمل.حفظ_التقويم(
+        [f'{س}-{ش:02d}-01' for س in range(2020, 2028) for ش in range(1, 13)],
+        {'العمليات': '1111111', 'الأمن': '1111110'},
+    )
+
+    المخزن_CSV = مخزن_CSV()
+    المخزن_CSV.تهيئة(الجداول)
+    الطلبات = المخزن_CSV.جدول(جدول_طلبات_الإجازة)
+    الأقسام = المخزن_CSV.قاموس_الأسماء('المستخدمين', 'القسم')
+    التقويم = أيام_العمل.التقويم()
+
+    # الطلب الواحد على عينة ثم التقدير للعدد الكامل
+    العينة = الطلبات.head(max(1, len(الطلبات) // 20))
+    زمن_الصفوف = زمن(lambda: [
+        التقويم.أيام(ط.تاريخ_البدء, ط.تاريخ_الانتهاء, الأقسام.get(ط.معرف_الموظف, ''))
+        for ط in العينة.itertuples(index=False)
+    ]) * len(الطلبات) / len(العينة)
+    زمن_المتجه = زمن(lambda: المخزن_CSV.الأيام_المحتسبة(الطلبات))
+    زمن_CSV = زمن(lambda: المخزن_CSV.إعادة_حساب_الأيام(None))
+    المخزن_SQLite = مخزن_SQLite('قياس.db')
+    المخزن_SQLite.تهيئة(الجداول)
+    زمن_SQLite = زمن(lambda: المخزن_SQLite.إعادة_حساب_الأيام(None))
+
+    print(f"{len(الطلبات)} طلب")
+    print(f"طلب واحد في كل مرة (تقدير): {زمن_الصفوف:9.2f} ث")
+    print(f"busday_count متجه:          {زمن_المتجه:9.3f} ث")
+    print(f"إعادة حساب CSV مع الحفظ:    {زمن_CSV:9.3f} ث")
+    print(f"إعادة حساب SQLite:          {زمن_SQLite:9.3f} ث")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""قياس الإشعارات: عد غير المقروءة بمسح الجدول مقابل الفهرس، وكتابة الأحداث فرادى مقابل الموزع
+
+الاستخدام:
+    python قياس_الأداء/قياس_الإشعارات.py --users 10000 --notifications 200000 --events 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from الإشعارات import موزع_الإشعارات  # noqa: E402
+from التخزين import مخزن_CSV, مخزن_SQLite, جدول_الإشعارات  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def معدل(الدالة, العدد):
+    البداية = time.perf_counter()
+    for ر in range(العدد):
+        الدالة(ر)
+    return العدد / (time.perf_counter() - البداية)
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=10_000)
+    المحلل.add_argument('--notifications', type=int, default=200_000)
+    المحلل.add_argument('--events', type=int, default=2_000)
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    مولد = np.random.default_rng(المعاملات.seed)
+    الجداول = توليد_البيانات(المعاملات.users, 0, المعاملات.seed)
+    الجداول[جدول_الإشعارات] = pd.DataFrame({
+        'معرف': np.arange(1, المعاملات.notifications + 1),
+        'معرف_المستخدم': مولد.integers(1, المعاملات.users + 1, المعاملات.notifications),
+        'الرسالة': 'إشعار',
+        'مقروء': مولد.integers(0, 2, المعاملات.notifications),
+        'تاريخ_الإنشاء': '',
+    })
+    المستخدمون = مولد.integers(1, المعاملات.users + 1, المعاملات.events).tolist()
+
+    print(f"{المعاملات.notifications} إشعار، {المعاملات.users} مستخدم")
+    for الاسم, المخزن in (('CSV', مخزن_CSV()), ('SQLite', مخزن_SQLite('قياس.db'))):
+        المخزن.تهيئة(الجداول)
+
+        def عد_بالمسح(ر):
+            الإشعارات = المخزن.جدول(جدول_الإشعارات)
+            return int(((الإشعارات['معرف_المستخدم'] == المستخدمون[ر]) & (الإشعارات['مقروء'] == 0)).sum())
+
+        # المسح على عينة فقط لأنه أبطأ بكثير
+        معدل_المسح = معدل(عد_بالمسح, max(1, المعاملات.events // 50))
+        معدل_الفهرس = معدل(lambda ر: المخزن.عدد_الإشعارات_غير_المقروءة(المستخدمون[ر]), المعاملات.events)
+
+        العينة = max(1, المعاملات.events // 10)
+        معدل_الفرادى = معدل(
+            lambda ر: المخزن.إضافة_إشعارات([{'معرف_المستخدم': المستخدمون[ر], 'الرسالة': 'فردي'}]), العينة
+        )
+        الموزع = موزع_الإشعارات(المخزن)
+        البداية = time.perf_counter()
+        for المستخدم in المستخدمون:
+            الموزع.إرسال(المستخدم, 'دفعة')
+        زمن_الإرسال = time.perf_counter() - البداية
+        الموزع.انتظار()
+        معدل_الموزع = len(المستخدمون) / (time.perf_counter() - البداية)
+
+        print(f"[{الاسم}]")
+        print(f"  عد بمسح الجدول:      {معدل_المسح:12,.0f} عد/ث")
+        print(f"  عد من الفهرس:         {معدل_الفهرس:12,.0f} عد/ث")
+        print(f"  كتابة كل حدث وحده:    {معدل_الفرادى:12,.0f} إشعار/ث")
+        print(f"  الموزع حتى آخر كتابة: {معدل_الموزع:12,.0f} إشعار/ث"
+              f" (الإرسال نفسه {len(المستخدمون) / زمن_الإرسال:,.0f}/ث)")
+
+
+if __name__ == "__main__":
+    main()
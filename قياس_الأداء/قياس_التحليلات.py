@@ -0,0 +1,90 @@
+"""قياس تجميع الغياب لصفحة التحليلات: حلقة على الطلبات مقابل التوسيع المتجه والمجاميع الشهرية المخزنة
+
+الاستخدام:
+    python قياس_الأداء/قياس_التحليلات.py --users 5000 --requests 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from التحليلات import تجميع_الغياب  # noqa: E402
+from التخزين import مخزن_CSV, مخزن_SQLite, جدول_المستخدمين  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def تجميع_بالحلقة(الطلبات, الأقسام, البداية, النهاية):
+    """البديل المباشر: date_range لكل طلب وعداد لكل يوم"""
+    العداد = Counter()
+    البداية, النهاية = pd.Timestamp(البداية), pd.Timestamp(النهاية)
+    for الطلب in الطلبات.itertuples(index=False):
+        for اليوم in pd.date_range(max(الطلب.تاريخ_البدء, البداية), min(الطلب.تاريخ_الانتهاء, النهاية)):
+            العداد[(اليوم, الأقسام.get(الطلب.معرف_الموظف, ''), الطلب.نوع_الإجازة)] += 1
+    return العداد
+
+
+def زمن(الدالة):
+    البداية = time.perf_counter()
+    الناتج = الدالة()
+    return time.perf_counter() - البداية, الناتج
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=5_000)
+    المحلل.add_argument('--requests', type=int, default=100_000)
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    الجداول = توليد_البيانات(المعاملات.users, المعاملات.requests, المعاملات.seed)
+    السنة = date.today().year - 1
+    البداية, النهاية = f'{السنة}-01-01', f'{السنة}-12-31'
+
+    print(f"{المعاملات.requests} طلب، {المعاملات.users} موظف، سنة {السنة}")
+    for الاسم, المخزن in (('CSV', مخزن_CSV()), ('SQLite', مخزن_SQLite('قياس.db'))):
+        المخزن.تهيئة(الجداول)
+        الأقسام = المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+        المعتمدة = المخزن._الطلبات_المعتمدة_في_الفترة(البداية, النهاية)
+
+        # الحلقة على عينة فقط لأنها أبطأ بكثير، ثم التقدير للعدد الكامل
+        العينة = max(1, len(المعتمدة) // 50)
+        زمن_الحلقة = زمن(lambda: تجميع_بالحلقة(المعتمدة.head(العينة), الأقسام, البداية, النهاية))[0]
+        زمن_الحلقة *= len(المعتمدة) / العينة
+        زمن_المتجه = زمن(lambda: تجميع_الغياب(المعتمدة, الأقسام, البداية, النهاية))[0]
+
+        زمن_البارد, المجاميع = زمن(lambda: المخزن.مجاميع_الغياب(البداية, النهاية))
+        زمن_الدافئ = زمن(lambda: المخزن.مجاميع_الغياب(البداية, النهاية))[0]
+
+        # اعتماد طلب واحد يُبطل أشهره فقط
+        المعلقة = المخزن.الطلبات_بالحالة('قيد المراجعة')
+        المعلقة = المعلقة[
+            (المعلقة['تاريخ_البدء'].dt.year == السنة) & (المعلقة['تاريخ_البدء'].dt.month == 6)
+        ]
+        المخزن.تحديث_حالة_الطلبات(المعلقة['معرف'].head(1).tolist(), 'معتمد', 1)
+        زمن_بعد_الكتابة, المحدثة = زمن(lambda: المخزن.مجاميع_الغياب(البداية, النهاية))
+        الكاملة = تجميع_الغياب(
+            المخزن._الطلبات_المعتمدة_في_الفترة(البداية, النهاية), الأقسام, البداية, النهاية
+        )
+        الترتيب = ['اليوم', 'القسم', 'نوع_الإجازة']
+        assert المحدثة.sort_values(الترتيب).reset_index(drop=True).equals(
+            الكاملة.sort_values(الترتيب).reset_index(drop=True)
+        ), "المجاميع المخزنة لا تطابق إعادة الحساب الكاملة"
+
+        print(f"[{الاسم}] {len(المعتمدة)} طلب معتمد، {int(المجاميع['العدد'].sum())} يوم غياب")
+        print(f"  حلقة لكل طلب (تقدير):     {زمن_الحلقة:8.2f} ث")
+        print(f"  توسيع متجه:               {زمن_المتجه:8.3f} ث")
+        print(f"  أول عرض (كل الأشهر):      {زمن_البارد:8.3f} ث")
+        print(f"  عرض من الذاكرة:            {زمن_الدافئ:8.3f} ث")
+        print(f"  بعد اعتماد طلب (شهر واحد): {زمن_بعد_الكتابة:8.3f} ث")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""اختبار ضغط لقرارات الطلبات من عمليات متوازية على نفس التخزين: لا قرار يضيع ولا رصيد يُخصم مرتين
+
+الاستخدام:
+    python قياس_الأداء/قياس_التزامن.py --backend csv --processes 8 --duration 20
+
+كل عملية تمثل نسخة من التطبيق خلف موزع الحمل: تقرأ مجموعة صغيرة من الطلبات المعلقة المتنازع عليها
+بإصداراتها، ثم تعتمدها أو ترفضها بعد مهلة قصيرة، وتضيف طلبات جديدة أحياناً. في النهاية يُتحقق من أن
+القرارات المقبولة لكل طلب بُنيت على إصدارات متتالية مختلفة، وأن الحالة النهائية هي آخرها، وأن السجل
+والأرصدة والعدادات المجمعة متسقة. مع --without-versions تُرسل القرارات دون إصدارات لعرض القرارات
+المبنية على نسخة قديمة التي كانت تُكتب فوق غيرها.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from الأرصدة import الأنواع_المخصومة, ترتيب_الخصم, صافي_القيود  # noqa: E402
+from التخزين import (  # noqa: E402
+    الحصول_على_المخزن, جدول_أنواع_الإجازات, جدول_طلبات_الإجازة, جدول_أرصدة_الإجازات, جدول_سجل_الأرصدة,
+)
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def عامل(الرقم, المتنازع_عليها, المدة, بالإصدارات):
+    """حلقة قرارات عملية واحدة؛ يعيد (القرارات المقبولة، عدد المتعارضة، معرفات الطلبات المضافة، عدد العمليات)"""
+    مولد = random.Random(الرقم)
+    المخزن = الحصول_على_المخزن()
+    المقبولة, المتعارضة, المضافة, العمليات = [], 0, [], 0
+    النهاية = time.time() + المدة
+    while time.time() < النهاية:
+        العمليات += 1
+        if مولد.random() < 0.1:
+            المضافة.append(المخزن.إضافة_طلب({
+                'معرف_الموظف': مولد.randint(1, 50), 'نوع_الإجازة': 3,
+                'تاريخ_البدء': '2030-01-01', 'تاريخ_الانتهاء': '2030-01-02', 'عدد_الأيام': 2,
+                'السبب': f'ضغط {الرقم}', 'الحالة': 'قيد المراجعة', 'ملاحظات_المدير': '',
+                'معرف_المدير_الموافق': None, 'تاريخ_الطلب': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'الإصدار': 0,
+            }))
+            continue
+
+        المعرفات = مولد.sample(المتنازع_عليها, مولد.randint(1, 3))
+        الطلبات = المخزن.جدول(جدول_طلبات_الإجازة).set_index('معرف')
+        الإصدارات = {م: int(الطلبات.at[م, 'الإصدار']) for م in المعرفات}
+        # وقت المدير أمام الصفحة بين العرض والقرار
+        time.sleep(مولد.uniform(0, 0.003))
+        الحالة = مولد.choice(['معتمد', 'مرفوض'])
+        المنفذة, المتعارضة_الآن = المخزن.تحديث_حالة_الطلبات(
+            المعرفات, الحالة, الرقم, الإصدارات if بالإصدارات else None
+        )
+        المقبولة += [(م, الإصدارات[م], الحالة) for م in المنفذة]
+        المتعارضة += len(المتعارضة_الآن)
+    return المقبولة, المتعارضة, المضافة, العمليات
+
+
+def التحقق(المخزن, الأرصدة_الأولى, عدد_الطلبات_الأول, المتنازع_عليها, المقبولة, المضافة):
+    """قائمة المخالفات، وعدد القرارات المبنية على إصدار سبق أن قُبل عليه قرار آخر"""
+    المخالفات = []
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة).set_index('معرف')
+
+    حسب_الطلب = defaultdict(list)
+    for معرف, الإصدار, الحالة in المقبولة:
+        حسب_الطلب[معرف].append((الإصدار, الحالة))
+    المكررة = 0
+    for معرف in المتنازع_عليها:
+        القرارات = sorted(حسب_الطلب[معرف])
+        الإصدارات = [إ for إ, _ in القرارات]
+        المكررة += len(الإصدارات) - len(set(الإصدارات))
+        الإصدار_النهائي = int(الطلبات.at[معرف, 'الإصدار'])
+        if الإصدار_النهائي != len(القرارات):
+            المخالفات.append(f"#{معرف}: الإصدار {الإصدار_النهائي} بعد {len(القرارات)} قرار مقبول")
+        if len(set(الإصدارات)) == len(الإصدارات) and الإصدارات != list(range(len(الإصدارات))):
+            المخالفات.append(f"#{معرف}: قرارات على إصدارات غير متتالية {الإصدارات}")
+        if القرارات and len(set(الإصدارات)) == len(الإصدارات) and الطلبات.at[معرف, 'الحالة'] != القرارات[-1][1]:
+            المخالفات.append(f"#{معرف}: الحالة النهائية ليست آخر قرار مقبول")
+
+    # صافي السجل لكل طلب متنازع عليه يساوي أيامه إذا انتهى معتمداً وصفراً غير ذلك
+    الصافي = صافي_القيود(المخزن.جدول(جدول_سجل_الأرصدة))
+    for معرف in المتنازع_عليها:
+        المتوقع = -int(الطلبات.at[معرف, 'عدد_الأيام']) if الطلبات.at[معرف, 'الحالة'] == 'معتمد' else 0
+        الفعلي = sum(الصافي.get(معرف, {}).values())
+        if الفعلي != المتوقع:
+            المخالفات.append(f"#{معرف}: صافي السجل {الفعلي} والمتوقع {المتوقع}")
+
+    # فرق أرصدة كل موظف عن بدايتها يساوي مجموع قيوده
+    الأرصدة = المخزن.جدول(جدول_أرصدة_الإجازات).set_index('معرف_الموظف')[ترتيب_الخصم].sum(axis=1)
+    السجل = المخزن.جدول(جدول_سجل_الأرصدة)
+    الفروق = السجل.groupby('معرف_الموظف')[
+        ['فرق_السنة_الحالية', 'فرق_العام_السابق_1', 'فرق_العام_السابق_2']
+    ].sum().sum(axis=1)
+    for معرف_الموظف, الفرق in الفروق.items():
+        if int(الأرصدة[معرف_الموظف] - الأرصدة_الأولى[معرف_الموظف]) != int(الفرق):
+            المخالفات.append(f"الموظف {معرف_الموظف}: الرصيد لا يطابق السجل")
+    if (المخزن.جدول(جدول_أرصدة_الإجازات)[ترتيب_الخصم].fillna(0) < 0).any().any():
+        المخالفات.append("رصيد سالب")
+
+    if len(set(المضافة)) != len(المضافة):
+        المخالفات.append("معرف طلب مكرر بين العمليات")
+    if len(الطلبات) != عدد_الطلبات_الأول + len(المضافة):
+        المخالفات.append(f"{len(الطلبات)} طلب والمتوقع {عدد_الطلبات_الأول + len(المضافة)}")
+
+    المجمعة = المخزن.الإحصائيات()['حسب_الحالة']
+    المعاد_بناؤها = المخزن.إعادة_بناء_الإحصائيات()['حسب_الحالة']
+    if {ح: ع for ح, ع in المجمعة.items() if ع} != {ح: ع for ح, ع in المعاد_بناؤها.items() if ع}:
+        المخالفات.append(f"العدادات المجمعة {المجمعة} لا تطابق الجدول {المعاد_بناؤها}")
+    return المخالفات, المكررة
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    المحلل.add_argument('--processes', type=int, default=8)
+    المحلل.add_argument('--duration', type=float, default=20, help="مدة الضغط بالثواني")
+    المحلل.add_argument('--users', type=int, default=200)
+    المحلل.add_argument('--requests', type=int, default=5000)
+    المحلل.add_argument('--contended', type=int, default=30, help="عدد الطلبات المتنازع عليها")
+    المحلل.add_argument('--without-versions', action='store_true', help="القرارات دون مقارنة الإصدار")
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    # العمليات الفرعية ترث المجلد والبيئة فتفتح نفس الملفات أو القاعدة
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    os.environ['VACATION_STORAGE'] = المعاملات.backend
+    المخزن = الحصول_على_المخزن()
+    الجداول = توليد_البيانات(المعاملات.users, المعاملات.requests, المعاملات.seed)
+    الطلبات = الجداول[جدول_طلبات_الإجازة]
+    # الطلبات المتنازع عليها معلقة ومخصومة من الرصيد لموظفين قليلين حتى تتزاحم على نفس الأرصدة أيضاً
+    المتنازع_عليها = الطلبات.index[
+        (الطلبات['الحالة'] == 'قيد المراجعة') & (الطلبات['معرف_الموظف'] <= 10)
+    ][:المعاملات.contended]
+    الطلبات.loc[المتنازع_عليها, 'نوع_الإجازة'] = min(الأنواع_المخصومة(الجداول[جدول_أنواع_الإجازات]))
+    المتنازع_عليها = الطلبات.loc[المتنازع_عليها, 'معرف'].astype(int).tolist()
+    المخزن.تهيئة(الجداول)
+    الأرصدة_الأولى = المخزن.جدول(جدول_أرصدة_الإجازات).set_index('معرف_الموظف')[ترتيب_الخصم].sum(axis=1)
+
+    with ProcessPoolExecutor(المعاملات.processes, mp_context=multiprocessing.get_context('spawn')) as المنفذ:
+        النتائج = list(المنفذ.map(
+            عامل, range(1, المعاملات.processes + 1), [المتنازع_عليها] * المعاملات.processes,
+            [المعاملات.duration] * المعاملات.processes, [not المعاملات.without_versions] * المعاملات.processes,
+        ))
+
+    المقبولة = [ق for ن in النتائج for ق in ن[0]]
+    المتعارضة = sum(ن[1] for ن in النتائج)
+    المضافة = [م for ن in النتائج for م in ن[2]]
+    العمليات = sum(ن[3] for ن in النتائج)
+    المخالفات, المكررة = التحقق(
+        المخزن, الأرصدة_الأولى, len(الطلبات), المتنازع_عليها, المقبولة, المضافة
+    )
+
+    print(f"{المعاملات.backend}: {المعاملات.processes} عملية، {len(المتنازع_عليها)} طلب متنازع عليه")
+    print(f"العمليات: {العمليات} ({العمليات / المعاملات.duration:.0f}/ث)، طلبات مضافة: {len(المضافة)}")
+    print(f"قرارات مقبولة: {len(المقبولة)}، متعارضة رُفضت: {المتعارضة}، "
+          f"مبنية على نسخة قديمة وكُتبت فوق غيرها: {المكررة}")
+    if المعاملات.without_versions:
+        return
+    if المخالفات or المكررة:
+        for المخالفة in المخالفات[:20]:
+            print(f"✗ {المخالفة}")
+        sys.exit(1)
+    print("✓ لا قرارات ضائعة، والسجل والأرصدة والعدادات متسقة")
+
+
+if __name__ == "__main__":
+    main()
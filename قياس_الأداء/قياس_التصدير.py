@@ -0,0 +1,69 @@
+"""قياس تصدير الطلبات: تحميل الجدول كاملاً ثم الكتابة مقابل التصدير المتدفق على دفعات (الزمن وذروة الذاكرة)
+
+الاستخدام:
+    python قياس_الأداء/قياس_التصدير.py --users 10000 --requests 500000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from التصدير import أعمدة_التصدير, الصيغ_المتاحة, تصدير_الطلبات  # noqa: E402
+from التخزين import مخزن_CSV, مخزن_SQLite, جدول_المستخدمين, جدول_طلبات_الإجازة  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def تصدير_كامل(المخزن, المسار):
+    """البديل المباشر: الجدول كله في الذاكرة ثم كتابة واحدة"""
+    الطلبات = المخزن.إضافة_الأسماء(المخزن.جدول(جدول_طلبات_الإجازة), أسماء_الموظفين=True)
+    الطلبات['القسم'] = الطلبات['معرف_الموظف'].map(المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم'))
+    الطلبات[list(أعمدة_التصدير)].rename(columns=أعمدة_التصدير).to_csv(المسار, index=False, encoding='utf-8-sig')
+    return len(الطلبات)
+
+
+def قياس(الدالة):
+    """(الزمن، ذروة الذاكرة بالميجابايت، الناتج)؛ الذروة من تشغيل ثانٍ لأن tracemalloc يبطئ التنفيذ"""
+    البداية = time.perf_counter()
+    الناتج = الدالة()
+    الزمن = time.perf_counter() - البداية
+    tracemalloc.start()
+    الدالة()
+    الذروة = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return الزمن, الذروة, الناتج
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=10_000)
+    المحلل.add_argument('--requests', type=int, default=500_000)
+    المحلل.add_argument('--chunk-size', type=int, default=10_000)
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    الجداول = توليد_البيانات(المعاملات.users, المعاملات.requests, المعاملات.seed)
+
+    print(f"{المعاملات.requests} طلب، دفعات من {المعاملات.chunk_size}")
+    for الاسم, المخزن in (('CSV', مخزن_CSV()), ('SQLite', مخزن_SQLite('قياس.db'))):
+        المخزن.تهيئة(الجداول)
+        # تسخين قواميس الأسماء حتى لا تُحسب على أي من الطريقتين
+        المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+        المخزن.قاموس_الأسماء(جدول_المستخدمين, 'اسم_الموظف')
+
+        print(f"[{الاسم}]")
+        الزمن, الذروة, العدد = قياس(lambda: تصدير_كامل(المخزن, 'كامل.csv'))
+        print(f"  تحميل كامل ← csv: {الزمن:6.2f} ث، ذروة {الذروة:7.1f} م.ب ({العدد} صف)")
+        for الصيغة in الصيغ_المتاحة():
+            الزمن, الذروة, العدد = قياس(lambda: تصدير_الطلبات(
+                المخزن, f'متدفق.{الصيغة}', الصيغة, حجم_الدفعة=المعاملات.chunk_size
+            ))
+            print(f"  متدفق ← {الصيغة:8}: {الزمن:6.2f} ث، ذروة {الذروة:7.1f} م.ب ({العدد} صف)")
+
+
+if __name__ == "__main__":
+    main()
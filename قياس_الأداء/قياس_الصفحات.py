@@ -0,0 +1,227 @@
+"""قياس كل صفحات التطبيق عبر AppTest على بيانات اصطناعية بعدة أحجام، مع مقارنة بخط أساس محفوظ
+
+الاستخدام:
+    python قياس_الأداء/قياس_الصفحات.py --scales 1000x10000 5000x50000 --save-baseline
+    python قياس_الأداء/قياس_الصفحات.py --scales 1000x10000 5000x50000 --threshold 0.25
+
+كل حجم (مستخدمون x طلبات) يُقاس في عملية منفصلة حتى لا تتشارك الذاكرة المؤقتة والمخزن.
+يخرج بالرمز 1 إذا تجاوز زمن صفحة أو ذروة ذاكرتها خط الأساس بأكثر من العتبة،
+وبالرمز 2 إذا لم يوجد خط أساس أو خلا من إحدى الصفحات المقاسة فلا يمر الفحص دون مقارنة.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+المجلد = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(المجلد))
+
+from المصادقة import تشفير_كلمة_المرور  # noqa: E402
+from التخزين import الحصول_على_المخزن, جدول_المستخدمين, جدول_طلبات_الإجازة  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+مسار_التطبيق = os.path.join(os.path.dirname(المجلد), 'app.py')
+مسار_خط_الأساس = os.path.join(المجلد, 'خط_الأساس.json')
+كلمة_مرور_القياس = 'قياس'
+
+# الصفحة -> (نوع المستخدم، اسم الصفحة في القائمة الجانبية أو None للصفحة الافتراضية)
+الصفحات = {
+    'صفحة_تسجيل_الدخول': (None, None),
+    'الرئيسية_الموظف': ('موظف', None),
+    'طلب_إجازة_جديدة': ('موظف', "طلب إجازة جديدة"),
+    'عرض_طلباتي': ('موظف', "طلباتي"),
+    'عرض_رصيد_الإجازات': ('موظف', "رصيد الإجازات"),
+    'الرئيسية_مدير_النظام': ('مدير_النظام', None),
+    'إدارة_المستخدمين': ('مدير_النظام', "إدارة المستخدمين"),
+    'الطلبات_المعلقة': ('مدير_النظام', "الطلبات المعلقة"),
+    'تحليلات_الغياب': ('مدير_النظام', "تحليلات الغياب"),
+    'تصدير_التقارير': ('مدير_النظام', "تصدير التقارير"),
+    'عرض_الإشعارات': ('مدير_النظام', "الإشعارات"),
+    'تشخيص_الأداء': ('مدير_النظام', "تشخيص الأداء"),
+}
+
+
+def تجهيز_البيانات(عدد_المستخدمين, عدد_الطلبات, البذرة):
+    """بيانات المولد مع مدير نظام كما في تهيئة_النظام وكلمة مرور معروفة للجميع"""
+    الجداول = توليد_البيانات(عدد_المستخدمين, عدد_الطلبات, البذرة)
+    المستخدمين = الجداول[جدول_المستخدمين]
+    المستخدمين['كلمة_المرور'] = تشفير_كلمة_المرور(كلمة_مرور_القياس)
+    المستخدمين.loc[0, ['نوع_المستخدم', 'القسم']] = ['مدير_النظام', 'الإدارة العامة']
+    الطلبات = الجداول[جدول_طلبات_الإجازة]
+    الطلبات['معرف_المدير_الموافق'] = np.where(الطلبات['الحالة'] != 'قيد المراجعة', 1, None)
+    return الجداول
+
+
+def _انتظار_الإيقاف(المشغل, timeout=3):
+    """بديل require_widgets_deltas في AppTest: ينتظر SHUTDOWN لا أول توقف، ويفحص كل 1 م.ث لا كل 100
+
+    الأصلي يعود عند توقف السكربت لإعادة التشغيل (st.rerun) فيسبق انتهاءه، ودقته 100 م.ث تبتلع أزمنة الصفحات.
+    يعتمد على داخليات streamlit==1.28.0 (المثبتة في requirements.txt): دالة require_widgets_deltas على مستوى
+    الوحدة streamlit/testing/v1/local_script_runner.py يستدعيها LocalScriptRunner.run باسمها العام،
+    و runner.events تنتهي بـ ScriptRunnerEvent.SHUTDOWN. يجب مراجعته عند ترقية streamlit.
+    """
+    from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+
+    البداية = time.time()
+    while time.time() - البداية < timeout:
+        if المشغل.events and المشغل.events[-1] == ScriptRunnerEvent.SHUTDOWN:
+            return
+        time.sleep(0.001)
+    المشغل.request_stop()
+    المشغل.join()
+    raise RuntimeError(f"AppTest script run timed out after {timeout}s")
+
+
+def تطبيق_جديد(المستخدم=None):
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    if not hasattr(local_script_runner, 'require_widgets_deltas'):
+        raise RuntimeError("require_widgets_deltas غير موجودة في هذا الإصدار من streamlit: راجع _انتظار_الإيقاف")
+    local_script_runner.require_widgets_deltas = _انتظار_الإيقاف
+    التطبيق = AppTest.from_file(مسار_التطبيق, default_timeout=600)
+    if المستخدم is not None:
+        التطبيق.session_state['معرف_المستخدم'] = int(المستخدم['معرف'])
+        for المفتاح in ('اسم_المستخدم', 'اسم_الموظف', 'نوع_المستخدم', 'القسم'):
+            التطبيق.session_state[المفتاح] = المستخدم[المفتاح]
+    return التطبيق
+
+
+def سيناريو(الصفحة, المستخدمون):
+    """دالة تجهز التطبيق (دون قياس) وتعيد الخطوة المقاسة"""
+    النوع, العنوان = الصفحات[الصفحة]
+    if النوع is None:
+        # تسجيل دخول كامل: عرض النموذج ثم إرساله والبحث في دليل المستخدمين
+        التطبيق = تطبيق_جديد().run()
+        التطبيق.text_input[0].input(المستخدمون['موظف']['اسم_المستخدم'])
+        التطبيق.text_input[1].input(كلمة_مرور_القياس)
+        return التطبيق, lambda: التطبيق.button[0].click().run()
+    التطبيق = تطبيق_جديد(المستخدمون[النوع])
+    if العنوان is None:
+        return التطبيق, التطبيق.run
+    التطبيق.run()
+    return التطبيق, lambda: التطبيق.sidebar.selectbox[0].set_value(العنوان).run()
+
+
+def قياس_حجم(عدد_المستخدمين, عدد_الطلبات, التكرار, البذرة):
+    """تشغيل كل الصفحات على حجم واحد وإرجاع قاموس الصفحة -> {الزمن، الذاكرة}"""
+    os.environ.setdefault('VACATION_LOGIN_DELAY', '0')
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    المخزن = الحصول_على_المخزن()
+    المخزن.تهيئة(تجهيز_البيانات(عدد_المستخدمين, عدد_الطلبات, البذرة))
+    المستخدمين = المخزن.المستخدمين()
+    المستخدمون = {
+        'مدير_النظام': المستخدمين.iloc[0].to_dict(),
+        'موظف': المستخدمين.iloc[1].to_dict(),
+    }
+
+    # تشغيل تمهيدي يبني الذاكرة المؤقتة والفهارس حتى تقيس النتائج الحالة المستقرة
+    for الصفحة in الصفحات:
+        سيناريو(الصفحة, المستخدمون)[1]()
+
+    النتائج = {}
+    for الصفحة in الصفحات:
+        الأزمنة = []
+        for _ in range(التكرار):
+            التطبيق, الخطوة = سيناريو(الصفحة, المستخدمون)
+            البداية = time.perf_counter()
+            الخطوة()
+            الأزمنة.append(time.perf_counter() - البداية)
+            if التطبيق.exception:
+                raise RuntimeError(f"{الصفحة}: {التطبيق.exception[0].message}")
+        # الذاكرة من تشغيل منفصل لأن tracemalloc يبطئ التنفيذ
+        _, الخطوة = سيناريو(الصفحة, المستخدمون)
+        tracemalloc.start()
+        الخطوة()
+        الذروة = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        النتائج[الصفحة] = {'الزمن': statistics.median(الأزمنة), 'الذاكرة': الذروة / 2 ** 20}
+    return النتائج
+
+
+def مقارنة(النتائج, خط_الأساس, العتبة):
+    """طباعة جدول النتائج وإرجاع قائمة التراجعات"""
+    التراجعات = []
+    for المفتاح, القيم in النتائج.items():
+        الأساس = خط_الأساس.get(المفتاح)
+        الأعمدة = [f"{المفتاح:45}", f"{القيم['الزمن'] * 1000:9.1f} م.ث", f"{القيم['الذاكرة']:8.1f} م.ب"]
+        if الأساس:
+            for المقياس in ('الزمن', 'الذاكرة'):
+                النسبة = القيم[المقياس] / الأساس[المقياس] - 1 if الأساس[المقياس] else 0
+                الأعمدة.append(f"{المقياس} {النسبة:+7.0%}")
+                if النسبة > العتبة:
+                    التراجعات.append(f"{المفتاح}: {المقياس} {النسبة:+.0%}")
+        print('  '.join(الأعمدة))
+    return التراجعات
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--scales', nargs='+', default=['1000x10000', '5000x50000'],
+                        help="أحجام البيانات بصيغة مستخدمون x طلبات")
+    المحلل.add_argument('--repeat', type=int, default=3, help="عدد مرات قياس كل صفحة (يؤخذ الوسيط)")
+    المحلل.add_argument('--baseline', default=مسار_خط_الأساس)
+    المحلل.add_argument('--threshold', type=float, default=0.25, help="نسبة التراجع المسموحة قبل الفشل")
+    المحلل.add_argument('--save-baseline', action='store_true', help="حفظ النتائج خط أساس جديداً")
+    المحلل.add_argument('--seed', type=int, default=0)
+    المحلل.add_argument('--worker', help=argparse.SUPPRESS)
+    المعاملات = المحلل.parse_args()
+
+    if المعاملات.worker:
+        عدد_المستخدمين, عدد_الطلبات = map(int, المعاملات.worker.split('x'))
+        print(json.dumps(قياس_حجم(عدد_المستخدمين, عدد_الطلبات, المعاملات.repeat, المعاملات.seed)))
+        return 0
+
+    خط_الأساس = {}
+    if os.path.exists(المعاملات.baseline):
+        with open(المعاملات.baseline, encoding='utf-8') as الملف:
+            خط_الأساس = json.load(الملف)
+    elif not المعاملات.save_baseline:
+        # قبل القياس: فحص بلا خط أساس لا يثبت شيئاً فلا يُنتظر
+        print(f"❌ لا يوجد خط أساس في {المعاملات.baseline} (أنشئه بـ --save-baseline)", file=sys.stderr)
+        return 2
+
+    الخلفية = os.environ.get('VACATION_STORAGE', 'csv').lower()
+    النتائج = {}
+    for الحجم in المعاملات.scales:
+        العملية = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', الحجم,
+             '--repeat', str(المعاملات.repeat), '--seed', str(المعاملات.seed)],
+            capture_output=True, text=True,
+        )
+        if العملية.returncode != 0:
+            print(العملية.stderr, file=sys.stderr)
+            return 2
+        for الصفحة, القيم in json.loads(العملية.stdout.strip().splitlines()[-1]).items():
+            النتائج[f"{الخلفية}/{الحجم}/{الصفحة}"] = القيم
+
+    التراجعات = مقارنة(النتائج, {} if المعاملات.save_baseline else خط_الأساس, المعاملات.threshold)
+
+    if المعاملات.save_baseline:
+        with open(المعاملات.baseline, 'w', encoding='utf-8') as الملف:
+            json.dump({**خط_الأساس, **النتائج}, الملف, ensure_ascii=False, indent=2)
+        print(f"✅ حُفظ خط الأساس في {المعاملات.baseline}")
+        return 0
+    الناقصة = [المفتاح for المفتاح in النتائج if المفتاح not in خط_الأساس]
+    if الناقصة:
+        print("❌ صفحات بلا خط أساس (أضفها بـ --save-baseline):", file=sys.stderr)
+        for المفتاح in الناقصة:
+            print(f"  {المفتاح}", file=sys.stderr)
+        return 2
+    if التراجعات:
+        print(f"❌ تراجع الأداء بأكثر من {المعاملات.threshold:.0%}:", file=sys.stderr)
+        for التراجع in التراجعات:
+            print(f"  {التراجع}", file=sys.stderr)
+        return 1
+    print("✅ لا تراجع عن خط الأساس")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
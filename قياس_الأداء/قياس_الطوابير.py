@@ -0,0 +1,68 @@
+"""قياس فتح طابور اعتماد قسم: ترشيح طلبات الشركة المعلقة بالقسم مقابل فهرس الطوابير
+
+الاستخدام:
+    python قياس_الأداء/قياس_الطوابير.py --backend sqlite --users 20000 --requests 200000 --departments 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from الاعتماد import الحالات_المعلقة  # noqa: E402
+from التخزين import الحصول_على_المخزن, جدول_المستخدمين  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def معدل(الدالة, الأقسام):
+    البداية = time.perf_counter()
+    for القسم in الأقسام:
+        الدالة(القسم)
+    return len(الأقسام) / (time.perf_counter() - البداية)
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    المحلل.add_argument('--users', type=int, default=20_000)
+    المحلل.add_argument('--requests', type=int, default=200_000)
+    المحلل.add_argument('--departments', type=int, default=200, help="عدد الأقسام التي يتوزع عليها الموظفون")
+    المحلل.add_argument('--opens', type=int, default=500, help="عدد مرات فتح الطابور")
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    os.environ['VACATION_STORAGE'] = المعاملات.backend
+    المخزن = الحصول_على_المخزن()
+    الجداول = توليد_البيانات(المعاملات.users, المعاملات.requests, المعاملات.seed)
+    # أقسام أكثر من أقسام المولد حتى يكون طابور القسم جزءاً صغيراً من طلبات الشركة المعلقة
+    الجداول[جدول_المستخدمين]['القسم'] = [
+        f'قسم {م % المعاملات.departments}' for م in الجداول[جدول_المستخدمين]['معرف']
+    ]
+    المخزن.تهيئة(الجداول)
+
+    مولد = np.random.default_rng(المعاملات.seed)
+    الأقسام = [f'قسم {ق}' for ق in مولد.integers(0, المعاملات.departments, المعاملات.opens)]
+    المرحلة = الحالات_المعلقة[0]
+
+    البداية = time.perf_counter()
+    _, العدد = المخزن.طابور_الاعتماد(الأقسام[0], المرحلة)
+    زمن_البناء = time.perf_counter() - البداية
+
+    معدل_الترشيح = معدل(lambda القسم: المخزن.صفحة_الطلبات(المرحلة, القسم=القسم), الأقسام)
+    معدل_الطابور = معدل(lambda القسم: المخزن.طابور_الاعتماد(القسم, المرحلة), الأقسام)
+
+    print(f"{المعاملات.backend}: {المعاملات.requests} طلب، {المعاملات.users} موظف في {المعاملات.departments} قسم")
+    print(f"طلبات الشركة في المرحلة: {المخزن.عدد_الطلبات_بالحالة(المرحلة)}، في طابور قسم نموذجي: {العدد}")
+    print(f"أول فتح (بناء الفهرس): {زمن_البناء:.2f} ث")
+    print(f"ترشيح طلبات الشركة: {معدل_الترشيح:10,.0f} فتح/ث")
+    print(f"فهرس الطوابير:      {معدل_الطابور:10,.0f} فتح/ث")
+    print(f"التسريع: {معدل_الطابور / معدل_الترشيح:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
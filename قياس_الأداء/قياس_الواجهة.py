@@ -0,0 +1,197 @@
+"""اختبار حمل لواجهة JSON ومقارنته بمسار Streamlit لنفس العمليات
+
+الاستخدام:
+    python قياس_الأداء/قياس_الواجهة.py --users 1000 --requests 10000 --clients 8 --duration 10
+
+يُشغَّل خادم الواجهة في عملية منفصلة على بيانات اصطناعية، ويرسل إليه عملاء متوازون طلبات
+الرصيد والطلبات المعلقة وتقديم الطلبات عبر اتصالات مفتوحة، ثم تُقاس نفس العمليات عبر AppTest
+(إعادة تشغيل كاملة للسكربت لكل تفاعل) ويُطبع عدد الطلبات في الثانية لكل مسار.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+المجلد = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(المجلد))
+
+from التخزين import الحصول_على_المخزن  # noqa: E402
+from قياس_الصفحات import تجهيز_البيانات, تطبيق_جديد, كلمة_مرور_القياس  # noqa: E402
+
+مسار_الخادم = os.path.join(os.path.dirname(المجلد), 'خادم_الواجهة.py')
+
+
+class عميل:
+    """اتصال HTTP مفتوح واحد مع رمز مستخدم"""
+
+    def __init__(self, المنفذ, اسم_المستخدم):
+        self.الاتصال = http.client.HTTPConnection('127.0.0.1', المنفذ, timeout=60)
+        self.الرمز = None
+        _, النتيجة = self.طلب('POST', '/api/login', {'اسم_المستخدم': اسم_المستخدم, 'كلمة_المرور': كلمة_مرور_القياس})
+        self.الرمز = النتيجة['الرمز']
+
+    def طلب(self, الطريقة, المسار, الجسم=None):
+        الرؤوس = {'Content-Type': 'application/json'}
+        if self.الرمز:
+            الرؤوس['Authorization'] = f'Bearer {self.الرمز}'
+        self.الاتصال.request(
+            الطريقة, المسار, json.dumps(الجسم).encode() if الجسم is not None else None, الرؤوس
+        )
+        الرد = self.الاتصال.getresponse()
+        return الرد.status, json.loads(الرد.read())
+
+
+def انتظار_المنفذ(المنفذ, المهلة=30):
+    النهاية = time.time() + المهلة
+    while time.time() < النهاية:
+        try:
+            socket.create_connection(('127.0.0.1', المنفذ), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("لم يبدأ خادم الواجهة")
+
+
+def منفذ_حر():
+    with socket.socket() as المقبس:
+        المقبس.bind(('127.0.0.1', 0))
+        return المقبس.getsockname()[1]
+
+
+def العمليات(الموظفون, المدير):
+    """العملية -> دالة تنفذها بعميل ورقم تكرار (لتقديم طلبات بتواريخ مختلفة)"""
+    اليوم = date.today()
+
+    def تقديم(العميل, الرقم):
+        # فترات متتالية غير متداخلة، وثلاثة أيام حتى تشمل يوم عمل واحداً على الأقل
+        البداية = اليوم + timedelta(days=400 + 4 * الرقم)
+        return العميل.طلب('POST', '/api/requests', {
+            'نوع_الإجازة': 3, 'تاريخ_البدء': str(البداية), 'تاريخ_الانتهاء': str(البداية + timedelta(days=2)),
+            'السبب': 'قياس',
+        })
+
+    return {
+        'الرصيد': (الموظفون, lambda العميل, _: العميل.طلب('GET', '/api/balance')),
+        'الطلبات_المعلقة': ([المدير], lambda العميل, _: العميل.طلب('GET', '/api/requests/pending?limit=25')),
+        'تقديم_طلب': (الموظفون, تقديم),
+    }
+
+
+def حمل_العملية(المنفذ, المستخدمون, التنفيذ, العملاء, المدة):
+    """عملاء متوازون ينفذون العملية حتى انتهاء المدة؛ يعيد (الطلبات في الثانية، الأزمنة، الأخطاء)"""
+    الأزمنة, الأخطاء = [], []
+    القفل = threading.Lock()
+    النهاية = time.perf_counter() + المدة
+
+    def عامل(الترتيب):
+        العميل = عميل(المنفذ, المستخدمون[الترتيب % len(المستخدمون)])
+        الرقم = 0
+        while time.perf_counter() < النهاية:
+            البداية = time.perf_counter()
+            الحالة, النتيجة = التنفيذ(العميل, الرقم)
+            الزمن = time.perf_counter() - البداية
+            with القفل:
+                # رفض الطلب لقواعد الإجازة (422) رد صحيح يُحسب، وغيره خطأ يوقف القياس
+                الأزمنة.append(الزمن)
+                if الحالة >= 400 and الحالة != 422:
+                    الأخطاء.append(النتيجة)
+            الرقم += 1
+
+    الخيوط = [threading.Thread(target=عامل, args=(ت,)) for ت in range(العملاء)]
+    البداية = time.perf_counter()
+    for الخيط in الخيوط:
+        الخيط.start()
+    for الخيط in الخيوط:
+        الخيط.join()
+    return len(الأزمنة) / (time.perf_counter() - البداية), الأزمنة, الأخطاء
+
+
+def زمن_streamlit(المستخدم, العنوان, التكرار, التفاعل=None):
+    """وسيط زمن إعادة التشغيل الكاملة لصفحة في AppTest بعد فتحها"""
+    الأزمنة = []
+    for _ in range(التكرار):
+        التطبيق = تطبيق_جديد(المستخدم).run()
+        التطبيق.sidebar.selectbox[0].set_value(العنوان).run()
+        البداية = time.perf_counter()
+        (التفاعل(التطبيق) if التفاعل else التطبيق).run()
+        الأزمنة.append(time.perf_counter() - البداية)
+        if التطبيق.exception:
+            raise RuntimeError(f"{العنوان}: {التطبيق.exception[0].message}")
+    return statistics.median(الأزمنة)
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=1000)
+    المحلل.add_argument('--requests', type=int, default=10_000)
+    المحلل.add_argument('--clients', type=int, default=8, help="عدد العملاء المتوازين")
+    المحلل.add_argument('--duration', type=float, default=10, help="مدة حمل كل عملية بالثواني")
+    المحلل.add_argument('--workers', type=int, default=16, help="خيوط خادم الواجهة")
+    المحلل.add_argument('--repeat', type=int, default=5, help="عدد مرات قياس كل صفحة Streamlit")
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.environ.setdefault('VACATION_LOGIN_DELAY', '0')
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    المخزن = الحصول_على_المخزن()
+    المخزن.تهيئة(تجهيز_البيانات(المعاملات.users, المعاملات.requests, المعاملات.seed))
+    المستخدمين = المخزن.المستخدمين()
+    المدير = المستخدمين.iloc[0]['اسم_المستخدم']
+    الموظفون = المستخدمين['اسم_المستخدم'].iloc[1:].tolist()
+
+    المنفذ = منفذ_حر()
+    الخادم = subprocess.Popen(
+        [sys.executable, مسار_الخادم, '--port', str(المنفذ), '--workers', str(المعاملات.workers)],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        انتظار_المنفذ(المنفذ)
+        نتائج_الواجهة = {}
+        for العملية, (المستخدمون, التنفيذ) in العمليات(الموظفون, المدير).items():
+            المعدل, الأزمنة, الأخطاء = حمل_العملية(
+                المنفذ, المستخدمون, التنفيذ, المعاملات.clients, المعاملات.duration
+            )
+            if الأخطاء:
+                raise RuntimeError(f"{العملية}: {الأخطاء[0]}")
+            نتائج_الواجهة[العملية] = (المعدل, statistics.median(الأزمنة), statistics.quantiles(الأزمنة, n=20)[-1])
+    finally:
+        الخادم.terminate()
+        الخادم.wait()
+
+    الموظف = المستخدمين.iloc[1].to_dict()
+    المدير_النظام = المستخدمين.iloc[0].to_dict()
+    البداية = date.today() + timedelta(days=200)
+
+    def تقديم(التطبيق):
+        # قائمة الأنواع بدالة تنسيق لا يحفظ AppTest قيمتها، فتُختار بالموقع
+        التطبيق.main.selectbox[0].select_index(2)
+        التطبيق.date_input[0].set_value(البداية)
+        التطبيق.date_input[1].set_value(البداية + timedelta(days=1))
+        return next(ز for ز in التطبيق.button if 'تقديم' in ز.label).click()
+
+    نتائج_streamlit = {
+        'الرصيد': زمن_streamlit(الموظف, "رصيد الإجازات", المعاملات.repeat),
+        'الطلبات_المعلقة': زمن_streamlit(المدير_النظام, "الطلبات المعلقة", المعاملات.repeat),
+        'تقديم_طلب': زمن_streamlit(الموظف, "طلب إجازة جديدة", المعاملات.repeat, تقديم),
+    }
+
+    print(f"{المعاملات.users} مستخدم، {المعاملات.requests} طلب، {المعاملات.clients} عميل للواجهة")
+    print(f"{'العملية':18} {'واجهة ط/ث':>12} {'p50 م.ث':>9} {'p95 م.ث':>9} {'Streamlit ط/ث':>15} {'النسبة':>8}")
+    for العملية, (المعدل, الوسيط, p95) in نتائج_الواجهة.items():
+        معدل_streamlit = 1 / نتائج_streamlit[العملية]
+        print(
+            f"{العملية:18} {المعدل:12.1f} {الوسيط * 1000:9.1f} {p95 * 1000:9.1f} "
+            f"{معدل_streamlit:15.1f} {المعدل / معدل_streamlit:7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""قياس زمن تجهيز جداول الطلبات للعرض: البحث لكل صف مقابل الربط المتجه
+
+الاستخدام:
+    python قياس_الأداء/قياس_تجهيز_العرض.py --users 10000 --requests 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from التخزين import مخزن_CSV, جدول_طلبات_الإجازة  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def تجهيز_بالبحث_لكل_صف(الطلبات, أنواع_الإجازات, المستخدمين):
+    """الطريقة السابقة: مسح القناعين لكل صف داخل iterrows"""
+    الصفوف = []
+    for _, طلب in الطلبات.iterrows():
+        نوع_الإجازة = أنواع_الإجازات[أنواع_الإجازات['معرف'] == طلب['نوع_الإجازة']]
+        اسم_الإجازة = نوع_الإجازة.iloc[0]['اسم_الإجازة'] if not نوع_الإجازة.empty else "غير معروف"
+        الموظف = المستخدمين[المستخدمين['معرف'] == طلب['معرف_الموظف']]
+        اسم_الموظف = الموظف.iloc[0]['اسم_الموظف'] if not الموظف.empty else "غير معروف"
+        الصفوف.append((اسم_الموظف, اسم_الإجازة))
+    return الصفوف
+
+
+def قياس(الدالة):
+    البداية = time.perf_counter()
+    النتيجة = الدالة()
+    return time.perf_counter() - البداية, النتيجة
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=10_000)
+    المحلل.add_argument('--requests', type=int, default=100_000)
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    المخزن = مخزن_CSV()
+    المخزن.تهيئة(توليد_البيانات(المعاملات.users, المعاملات.requests, المعاملات.seed))
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    print(f"{المعاملات.users} مستخدم، {len(الطلبات)} طلب")
+
+    زمن_قديم, _ = قياس(lambda: تجهيز_بالبحث_لكل_صف(الطلبات, المخزن.أنواع_الإجازات(), المخزن.المستخدمين()))
+    print(f"البحث لكل صف:            {زمن_قديم:8.3f} ث")
+
+    زمن_بارد, _ = قياس(lambda: المخزن.إضافة_الأسماء(الطلبات, أسماء_الموظفين=True))
+    print(f"الربط المتجه (بناء القواميس): {زمن_بارد:8.3f} ث")
+
+    زمن_دافئ, _ = قياس(lambda: المخزن.إضافة_الأسماء(الطلبات, أسماء_الموظفين=True))
+    print(f"الربط المتجه (قواميس جاهزة):  {زمن_دافئ:8.3f} ث")
+    print(f"التسريع: {زمن_قديم / زمن_دافئ:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
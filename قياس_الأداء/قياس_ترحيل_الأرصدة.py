@@ -0,0 +1,69 @@
+"""قياس ترحيل نهاية السنة: حلقة على كل موظف مقابل التمريرة المتجهة
+
+الاستخدام:
+    python قياس_الأداء/قياس_ترحيل_الأرصدة.py --users 50000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from الأرصدة import الرصيد_السنوي, ترحيل_السنة  # noqa: E402
+from التخزين import مخزن_CSV, مخزن_SQLite, جدول_أرصدة_الإجازات  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def ترحيل_بالحلقة(الأرصدة, السنة_الجديدة):
+    """البديل المباشر: تعديل صف واحد في كل دورة"""
+    الأرصدة = الأرصدة.copy()
+    for الفهرس, الرصيد in الأرصدة.iterrows():
+        if الرصيد['السنة'] >= السنة_الجديدة:
+            continue
+        الأرصدة.loc[الفهرس, 'رصيد_العام_السابق_2'] = الرصيد['رصيد_العام_السابق_1']
+        الأرصدة.loc[الفهرس, 'رصيد_العام_السابق_1'] = الرصيد['رصيد_السنة_الحالية']
+        الأرصدة.loc[الفهرس, 'رصيد_السنة_الحالية'] = الرصيد_السنوي
+        الأرصدة.loc[الفهرس, 'السنة'] = السنة_الجديدة
+    return الأرصدة
+
+
+def زمن(الدالة):
+    البداية = time.perf_counter()
+    الدالة()
+    return time.perf_counter() - البداية
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=50_000)
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    الجداول = توليد_البيانات(المعاملات.users, 0, المعاملات.seed)
+    الأرصدة = الجداول[جدول_أرصدة_الإجازات]
+    السنة_الجديدة = int(الأرصدة['السنة'].max()) + 1
+
+    # الحلقة على عينة فقط لأنها أبطأ بكثير، ثم التقدير للعدد الكامل
+    العينة = max(1, المعاملات.users // 50)
+    زمن_الحلقة = زمن(lambda: ترحيل_بالحلقة(الأرصدة.head(العينة), السنة_الجديدة)) * المعاملات.users / العينة
+    زمن_المتجه = زمن(lambda: ترحيل_السنة(الأرصدة, السنة_الجديدة))
+
+    المخزن_CSV = مخزن_CSV()
+    المخزن_CSV.تهيئة(الجداول)
+    زمن_CSV = زمن(lambda: المخزن_CSV.ترحيل_الأرصدة(السنة_الجديدة))
+    المخزن_SQLite = مخزن_SQLite('قياس.db')
+    المخزن_SQLite.تهيئة(الجداول)
+    زمن_SQLite = زمن(lambda: المخزن_SQLite.ترحيل_الأرصدة(السنة_الجديدة))
+
+    print(f"{المعاملات.users} موظف")
+    print(f"حلقة لكل صف (تقدير): {زمن_الحلقة:9.2f} ث")
+    print(f"تمريرة متجهة:         {زمن_المتجه:9.3f} ث")
+    print(f"ترحيل CSV مع السجل:   {زمن_CSV:9.3f} ث")
+    print(f"ترحيل SQLite مع السجل:{زمن_SQLite:9.3f} ث")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""قياس معدل تسجيل الدخول: إعادة تحميل ملف المستخدمين لكل محاولة مقابل فهرس المستخدمين
+
+الاستخدام:
+    python قياس_الأداء/قياس_تسجيل_الدخول.py --users 10000 --attempts 2000
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from التخزين import مخزن_CSV, جدول_المستخدمين, ملفات_الجداول  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def تشفير_كلمة_المرور(كلمة_المرور):
+    return hashlib.sha256(كلمة_المرور.encode()).hexdigest()
+
+
+def دخول_بالمسح(اسم_المستخدم, كلمة_المرور):
+    """الطريقة السابقة: قراءة الملف كاملاً ثم قناع من ثلاثة أعمدة"""
+    المستخدمين = pd.read_csv(ملفات_الجداول[جدول_المستخدمين], dtype={'اسم_المستخدم': str})
+    مستخدم = المستخدمين[
+        (المستخدمين['اسم_المستخدم'] == اسم_المستخدم) &
+        (المستخدمين['كلمة_المرور'] == تشفير_كلمة_المرور(كلمة_المرور)) &
+        (المستخدمين['الحالة'] == 'نشط')
+    ]
+    return not مستخدم.empty
+
+
+def دخول_بالفهرس(المخزن, اسم_المستخدم, كلمة_المرور):
+    مستخدم = المخزن.دليل_المستخدمين().get(اسم_المستخدم)
+    return (مستخدم is not None and
+            مستخدم['كلمة_المرور'] == تشفير_كلمة_المرور(كلمة_المرور) and
+            مستخدم['الحالة'] == 'نشط')
+
+
+def معدل(الدالة, المحاولات):
+    البداية = time.perf_counter()
+    for اسم_المستخدم, كلمة_المرور in المحاولات:
+        assert الدالة(اسم_المستخدم, كلمة_المرور)
+    return len(المحاولات) / (time.perf_counter() - البداية)
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=10_000)
+    المحلل.add_argument('--attempts', type=int, default=2_000)
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    الجداول = توليد_البيانات(المعاملات.users, 0, المعاملات.seed)
+    المستخدمين = الجداول[جدول_المستخدمين]
+    المستخدمين['كلمة_المرور'] = [تشفير_كلمة_المرور(f'p{م}') for م in المستخدمين['معرف']]
+    المخزن = مخزن_CSV()
+    المخزن.تهيئة(الجداول)
+
+    مولد = np.random.default_rng(المعاملات.seed)
+    المعرفات = مولد.integers(1, المعاملات.users + 1, المعاملات.attempts)
+    المحاولات = [(f'u{م}', f'p{م}') for م in المعرفات]
+
+    # محاولات أقل للطريقة السابقة لأنها تقرأ الملف كاملاً في كل مرة
+    معدل_قديم = معدل(دخول_بالمسح, المحاولات[:max(1, len(المحاولات) // 20)])
+    معدل_جديد = معدل(lambda م, ك: دخول_بالفهرس(المخزن, م, ك), المحاولات)
+    print(f"{المعاملات.users} مستخدم")
+    print(f"إعادة التحميل والمسح: {معدل_قديم:12,.0f} دخول/ث")
+    print(f"فهرس المستخدمين:      {معدل_جديد:12,.0f} دخول/ث")
+    print(f"التسريع: {معدل_جديد / معدل_قديم:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
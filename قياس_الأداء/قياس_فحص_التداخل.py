@@ -0,0 +1,84 @@
+"""قياس فحص التداخل وتغطية القسم عند تقديم طلب: مسح جدول الطلبات مقابل فهرس الفترات
+
+الاستخدام:
+    python قياس_الأداء/قياس_فحص_التداخل.py --users 10000 --requests 100000 --checks 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from الفترات import الحالات_الفعالة  # noqa: E402
+from التخزين import مخزن_CSV, جدول_المستخدمين, جدول_طلبات_الإجازة  # noqa: E402
+from توليد_البيانات import توليد_البيانات  # noqa: E402
+
+
+def فحص_بالمسح(الطلبات, الأقسام, معرف_الموظف, البداية, النهاية):
+    """البديل المباشر: أقنعة على الجدول كاملاً لكل فحص"""
+    الفعالة = الطلبات[الطلبات['الحالة'].isin(الحالات_الفعالة)]
+    متداخلة = الفعالة[
+        (الفعالة['معرف_الموظف'] == معرف_الموظف) &
+        (الفعالة['تاريخ_البدء'] <= النهاية) & (الفعالة['تاريخ_الانتهاء'] >= البداية)
+    ]
+    القسم = الفعالة[الفعالة['معرف_الموظف'].map(الأقسام) == الأقسام.get(معرف_الموظف)]
+    الأيام = pd.date_range(البداية, النهاية).strftime('%Y-%m-%d')
+    الغياب = [int(((القسم['تاريخ_البدء'] <= يوم) & (القسم['تاريخ_الانتهاء'] >= يوم)).sum()) for يوم in الأيام]
+    return متداخلة['معرف'].tolist(), الغياب
+
+
+def معدل(الدالة, الفحوص):
+    البداية = time.perf_counter()
+    for الفحص in الفحوص:
+        الدالة(*الفحص)
+    return len(الفحوص) / (time.perf_counter() - البداية)
+
+
+def main():
+    المحلل = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    المحلل.add_argument('--users', type=int, default=10_000)
+    المحلل.add_argument('--requests', type=int, default=100_000)
+    المحلل.add_argument('--checks', type=int, default=2_000)
+    المحلل.add_argument('--seed', type=int, default=0)
+    المعاملات = المحلل.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='قياس_'))
+    المخزن = مخزن_CSV()
+    المخزن.تهيئة(توليد_البيانات(المعاملات.users, المعاملات.requests, المعاملات.seed))
+    الطلبات = المخزن.جدول(جدول_طلبات_الإجازة)
+    الأقسام = المخزن.قاموس_الأسماء(جدول_المستخدمين, 'القسم')
+
+    مولد = np.random.default_rng(المعاملات.seed)
+    الفحوص = []
+    for معرف_الموظف, الإزاحة, المدة in zip(
+        مولد.integers(1, المعاملات.users + 1, المعاملات.checks),
+        مولد.integers(0, 3 * 365, المعاملات.checks),
+        مولد.integers(1, 15, المعاملات.checks),
+    ):
+        البداية = date(date.today().year - 2, 1, 1) + timedelta(days=int(الإزاحة))
+        الفحوص.append((int(معرف_الموظف), البداية, البداية + timedelta(days=int(المدة) - 1)))
+
+    البداية = time.perf_counter()
+    المخزن.فهرس_الإجازات()
+    زمن_البناء = time.perf_counter() - البداية
+
+    # فحوص أقل للمسح لأنه يمر على الجدول كاملاً في كل مرة
+    العينة = [(م, ب.isoformat(), ن.isoformat()) for م, ب, ن in الفحوص[:max(1, len(الفحوص) // 50)]]
+    معدل_المسح = معدل(lambda م, ب, ن: فحص_بالمسح(الطلبات, الأقسام, م, ب, ن), العينة)
+    معدل_الفهرس = معدل(المخزن.تعارضات_الطلب, الفحوص)
+
+    print(f"{المعاملات.requests} طلب، {المعاملات.users} موظف")
+    print(f"بناء الفهرس مرة واحدة: {زمن_البناء:.2f} ث")
+    print(f"مسح الجدول:    {معدل_المسح:12,.0f} فحص/ث")
+    print(f"فهرس الفترات:  {معدل_الفهرس:12,.0f} فحص/ث")
+    print(f"التسريع: {معدل_الفهرس / معدل_المسح:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()